@@ -0,0 +1,436 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+End-to-end benchmark of MCP tool calls against a local fake Snowflake backend.
+
+Starts the server with the fake connector from fake_backend.py and a local
+Cortex REST stub, calls each tool through a FastMCP client, and reports
+latency percentiles, throughput and the server's peak resident memory for
+each transport. The memory transport runs the server in this process.
+
+Results are written as JSON. Pass --compare with an earlier results file to
+print the change of every measurement.
+
+Usage: python benchmarks/bench_end_to_end.py [--transport stdio streamable-http memory]
+       [--calls N] [--concurrency C] [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import fastmcp
+import yaml
+from fake_backend import (
+    BACKEND_ENV_VAR,
+    BackendSettings,
+    CortexStub,
+    install_fake_backend,
+)
+from fastmcp import Client
+from fastmcp.client.transports import StdioTransport
+
+from mcp_server_snowflake.tool_cache import get_package_version
+
+FAKE_BACKEND = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "fake_backend.py"
+)
+TRANSPORTS = ["stdio", "streamable-http", "memory"]
+SERVER_START_TIMEOUT_SECONDS = 60
+
+SERVICE_CONFIG = {
+    "search_services": [
+        {
+            "service_name": "docs_search",
+            "description": "Search service over product documentation",
+            "database_name": "BENCH_DB",
+            "schema_name": "PUBLIC",
+        }
+    ],
+    "analyst_services": [
+        {
+            "service_name": "sales_analyst",
+            "semantic_model": "BENCH_DB.PUBLIC.SALES",
+            "description": "Analyst over sales data",
+        }
+    ],
+    "agent_services": [
+        {
+            "service_name": "support_agent",
+            "description": "Agent answering support questions",
+            "database_name": "BENCH_DB",
+            "schema_name": "PUBLIC",
+        }
+    ],
+    "other_services": {
+        "object_manager": True,
+        "query_manager": True,
+        "semantic_manager": True,
+    },
+    "sql_statement_permissions": [{"All": True}],
+}
+
+TOOL_CALLS: Dict[str, Dict[str, Any]] = {
+    "run_snowflake_query": {
+        "statement": "SELECT * FROM BENCH_DB.PUBLIC.EVENTS WHERE id > 10 LIMIT 100"
+    },
+    "list_objects": {"object_type": "database", "like": "BENCH%"},
+    "query_semantic_view": {
+        "database_name": "BENCH_DB",
+        "schema_name": "PUBLIC",
+        "view_name": "SALES",
+        "dimensions": [{"table": "ORDERS", "name": "REGION"}],
+        "metrics": [{"table": "ORDERS", "name": "REVENUE"}],
+        "limit": 100,
+    },
+    "cortex_search": {
+        "service_name": "docs_search",
+        "database_name": "BENCH_DB",
+        "schema_name": "PUBLIC",
+        "query": "How do I rotate keys?",
+        "columns": ["CHUNK", "TITLE"],
+        "limit": 10,
+    },
+    "cortex_analyst": {
+        "service_name": "sales_analyst",
+        "semantic_model": "BENCH_DB.PUBLIC.SALES",
+        "query": "What was revenue by region?",
+    },
+    "cortex_agent": {
+        "service_name": "support_agent",
+        "database_name": "BENCH_DB",
+        "schema_name": "PUBLIC",
+        "query": "Summarize open tickets",
+    },
+}
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def peak_rss_mb(pid: int) -> Optional[float]:
+    """Peak resident memory of a process, from /proc where available."""
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if pid == os.getpid():
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Reported in bytes on macOS and kilobytes elsewhere
+        return usage / 1024 / (1024 if sys.platform == "darwin" else 1)
+    return None
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def read_pid(pid_file: str) -> Optional[int]:
+    try:
+        with open(pid_file) as file:
+            return int(file.read())
+    except (OSError, ValueError):
+        return None
+
+
+@asynccontextmanager
+async def open_client(
+    transport: str, config_file: str, settings: BackendSettings, log_file: str
+):
+    """Start the server over a transport and yield a connected client and its pid."""
+    env = {**os.environ, BACKEND_ENV_VAR: settings.model_dump_json()}
+    server_args = [FAKE_BACKEND, "--service-config-file", config_file]
+
+    if transport == "memory":
+        from fastmcp import FastMCP
+
+        from mcp_server_snowflake.server import (
+            SnowflakeService,
+            initialize_middleware,
+            initialize_resources,
+            initialize_tools,
+        )
+
+        install_fake_backend(settings)
+        service = SnowflakeService(
+            service_config_file=config_file, transport="stdio", connection_params={}
+        )
+        server = FastMCP("Snowflake MCP Server")
+        initialize_tools(service, server)
+        initialize_middleware(server, service)
+        initialize_resources(service, server)
+        async with Client(server) as client:
+            yield client, os.getpid()
+
+    elif transport == "stdio":
+        stdio = StdioTransport(
+            command=sys.executable,
+            args=[*server_args, "--transport", "stdio"],
+            env=env,
+            keep_alive=False,
+            log_file=Path(log_file),
+        )
+        async with Client(stdio) as client:
+            yield client, read_pid(settings.pid_file)
+
+    else:
+        port = free_port()
+        log = open(log_file, "w")
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                *server_args,
+                "--transport",
+                transport,
+                "--server-host",
+                "127.0.0.1",
+                "--port",
+                str(port),
+            ],
+            env=env,
+            stdout=log,
+            stderr=log,
+        )
+        try:
+            url = f"http://127.0.0.1:{port}/mcp"
+            deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(
+                        f"{transport} server exited on startup, see {log_file}"
+                    )
+                try:
+                    with socket.create_connection(("127.0.0.1", port), timeout=1):
+                        break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise RuntimeError(f"{transport} server did not start")
+                    await asyncio.sleep(0.1)
+            async with Client(url) as client:
+                yield client, process.pid
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+            log.close()
+
+
+async def measure(
+    client: Client,
+    tool: str,
+    arguments: Dict[str, Any],
+    calls: int,
+    concurrency: int,
+    warmup: int,
+) -> Dict[str, Any]:
+    for _ in range(warmup):
+        await client.call_tool(tool, arguments)
+
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            result = await client.call_tool(tool, arguments, raise_on_error=False)
+            latencies.append(time.perf_counter() - start)
+            errors += bool(result.is_error)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(calls)))
+    wall_seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "tool": tool,
+        "calls": calls,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "throughput_per_second": calls / wall_seconds,
+    }
+
+
+async def run_transport(
+    transport: str,
+    config_file: str,
+    settings: BackendSettings,
+    tools: List[str],
+    args: argparse.Namespace,
+) -> Dict[str, Any]:
+    results = []
+    log_file = os.path.splitext(settings.pid_file)[0] + ".log"
+    async with open_client(transport, config_file, settings, log_file) as (
+        client,
+        pid,
+    ):
+        available = {tool.name for tool in await client.list_tools()}
+        for tool in tools:
+            if tool not in available:
+                raise RuntimeError(f"Tool {tool} is not registered over {transport}")
+            result = await measure(
+                client,
+                tool,
+                TOOL_CALLS[tool],
+                args.calls,
+                args.concurrency,
+                args.warmup,
+            )
+            results.append({"transport": transport, **result})
+        rss = peak_rss_mb(pid) if pid is not None else None
+    return {"results": results, "peak_rss_mb": rss}
+
+
+def print_results(report: Dict[str, Any]) -> None:
+    print(
+        f"{'transport':<17}{'tool':<22}{'p50 ms':>9}{'p99 ms':>9}"
+        f"{'calls/s':>10}{'errors':>8}"
+    )
+    for result in report["results"]:
+        print(
+            f"{result['transport']:<17}{result['tool']:<22}"
+            f"{result['p50_ms']:>9.2f}{result['p99_ms']:>9.2f}"
+            f"{result['throughput_per_second']:>10.1f}{result['errors']:>8}"
+        )
+    print()
+    for transport, rss in report["peak_rss_mb"].items():
+        rss_text = f"{rss:.1f} MB" if rss is not None else "unavailable"
+        print(f"Peak server RSS, {transport}: {rss_text}")
+
+
+def print_comparison(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print the change of each measurement relative to a baseline report."""
+    previous = {(r["transport"], r["tool"]): r for r in baseline["results"]}
+    print(
+        f"\n{'transport':<17}{'tool':<22}{'p50':>9}{'p99':>9}{'calls/s':>10}"
+        "  (change from baseline)"
+    )
+    for result in report["results"]:
+        before = previous.get((result["transport"], result["tool"]))
+        if before is None:
+            continue
+        changes = [
+            (result[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            for key in ("p50_ms", "p99_ms", "throughput_per_second")
+        ]
+        print(
+            f"{result['transport']:<17}{result['tool']:<22}"
+            + "".join(
+                f"{change:>+8.1f}%" if i < 2 else f"{change:>+9.1f}%"
+                for i, change in enumerate(changes)
+            )
+        )
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    settings = BackendSettings(
+        statement_latency=args.latency_ms / 1000,
+        per_row_latency=args.per_row_latency_us / 1e6,
+        rows=args.rows,
+        columns=args.columns,
+        cortex_latency=args.cortex_latency_ms / 1000,
+    )
+    stub = CortexStub(settings).start()
+    settings.cortex_url = stub.url
+
+    report: Dict[str, Any] = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fastmcp": fastmcp.__version__,
+            "package": get_package_version(),
+        },
+        "settings": settings.model_dump(exclude={"cortex_url", "pid_file"}),
+        "calls": args.calls,
+        "concurrency": args.concurrency,
+        "results": [],
+        "peak_rss_mb": {},
+    }
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            config_file = os.path.join(directory, "config.yaml")
+            with open(config_file, "w") as file:
+                yaml.dump(SERVICE_CONFIG, file)
+            for transport in args.transport:
+                transport_settings = settings.model_copy(
+                    update={"pid_file": os.path.join(directory, f"{transport}.pid")}
+                )
+                measured = await run_transport(
+                    transport, config_file, transport_settings, args.tools, args
+                )
+                report["results"].extend(measured["results"])
+                report["peak_rss_mb"][transport] = measured["peak_rss_mb"]
+    finally:
+        stub.stop()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--transport", nargs="+", choices=TRANSPORTS, default=TRANSPORTS[:2]
+    )
+    parser.add_argument(
+        "--tools", nargs="+", choices=list(TOOL_CALLS), default=list(TOOL_CALLS)
+    )
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--per-row-latency-us", type=float, default=0.0)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--columns", type=int, default=8)
+    parser.add_argument("--cortex-latency-ms", type=float, default=20.0)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    # Servers started over memory share this process, so run it last so the
+    # fake backend is never installed before a subprocess is measured
+    args.transport.sort(key=lambda transport: transport == "memory")
+
+    report = asyncio.run(run(args))
+    print_results(report)
+    if args.compare:
+        with open(args.compare) as file:
+            print_comparison(report, json.load(file))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Micro-benchmark of object manager tool-argument decoding.
+
+Compares registry-based parse_object against the previous approach of
+json.loads followed by model construction.
+
+Usage: python benchmarks/bench_object_args.py [--number N]
+"""
+
+import argparse
+import json
+import timeit
+
+from mcp_server_snowflake.object_manager.registry import OBJECT_REGISTRY
+from mcp_server_snowflake.object_manager.tools import parse_object
+
+SAMPLES = {
+    "database": {"name": "DB", "comment": "bench", "data_retention_time_in_days": 1},
+    "table": {
+        "name": "T",
+        "database_name": "DB",
+        "schema_name": "PUBLIC",
+        "columns": [
+            {"name": f"C{i}", "datatype": "NUMBER", "nullable": True} for i in range(20)
+        ],
+    },
+    "warehouse": {
+        "name": "WH",
+        "warehouse_size": "X-SMALL",
+        "auto_suspend": 60,
+        "auto_resume": "true",
+    },
+    "image_repository": {"name": "R", "database_name": "DB", "schema_name": "S"},
+}
+
+
+def legacy_parse(target_object: str, object_type: str):
+    model = OBJECT_REGISTRY[object_type].model
+    return model(**json.loads(target_object))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'object_type':<18}{'input':<8}{'legacy ops/s':>14}{'registry ops/s':>16}")
+    for object_type, sample in SAMPLES.items():
+        as_json = json.dumps(sample)
+        legacy = timeit.timeit(
+            lambda: legacy_parse(as_json, object_type), number=args.number
+        )
+        registry_json = timeit.timeit(
+            lambda: parse_object(as_json, object_type), number=args.number
+        )
+        registry_dict = timeit.timeit(
+            lambda: parse_object(sample, object_type), number=args.number
+        )
+        print(
+            f"{object_type:<18}{'json':<8}{args.number / legacy:>14,.0f}"
+            f"{args.number / registry_json:>16,.0f}"
+        )
+        print(
+            f"{object_type:<18}{'dict':<8}{'':>14}{args.number / registry_dict:>16,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Micro-benchmark of query comment construction.
+
+Compares SnowflakeService.build_query_comment, which renders a template
+compiled at config load, against the previous recursive per-call
+substitution. Both use the default template. "render" excludes generating
+variable values (UUID, timestamp, environment lookups) to show the cost of the
+template itself.
+
+Usage: python benchmarks/bench_query_comment.py [--number N]
+"""
+
+import argparse
+import json
+import os
+import re
+import timeit
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from mcp_server_snowflake.query_comment import CompiledQueryComment
+from mcp_server_snowflake.server import (
+    DEFAULT_QUERY_COMMENT_TEMPLATE,
+    SnowflakeService,
+)
+
+
+def legacy_build_query_comment(template, query_context, tool_name, statement_type):
+    substitutions = {
+        "request_id": str(uuid.uuid4()),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "tool_name": tool_name,
+        "statement_type": statement_type,
+        "model": query_context.get(
+            "model", os.environ.get("SNOWFLAKE_MCP_MODEL", "unknown")
+        ),
+        "session_id": query_context.get("session_id", "unknown"),
+        "agent_name": query_context.get("agent_name", "mcp-server-snowflake"),
+        "user_email": query_context.get(
+            "user_email", os.environ.get("SNOWFLAKE_MCP_USER_EMAIL", "unknown")
+        ),
+        "user_name": query_context.get(
+            "user_name", os.environ.get("SNOWFLAKE_MCP_USER_NAME", "unknown")
+        ),
+        "intent": query_context.get("intent"),
+        "query_parameters": query_context.get("query_parameters"),
+        "server_name": "mcp-server-snowflake",
+        "server_version": "1.6",
+    }
+
+    def substitute_value(value):
+        if isinstance(value, str):
+            match = re.fullmatch(r"\{(\w+)\}", value)
+            if match and match.group(1) in substitutions:
+                return substitutions[match.group(1)]
+            for key, sub_value in substitutions.items():
+                if sub_value is not None:
+                    value = value.replace(f"{{{key}}}", str(sub_value))
+            return value
+        if isinstance(value, dict):
+            return {k: substitute_value(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [substitute_value(item) for item in value]
+        return value
+
+    return json.dumps(substitute_value(template))
+
+
+def make_service():
+    # Only the attributes build_query_comment reads
+    service = SnowflakeService.__new__(SnowflakeService)
+    service.query_comment_enabled = True
+    service.query_comment_template = DEFAULT_QUERY_COMMENT_TEMPLATE
+    service.query_context = {
+        "model": "bench-model",
+        "intent": {"category": "aggregation", "question": "Total users"},
+    }
+    service._compiled_query_comments = {}
+    return service
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=50000)
+    args = parser.parse_args()
+
+    service = make_service()
+    legacy = timeit.timeit(
+        lambda: legacy_build_query_comment(
+            DEFAULT_QUERY_COMMENT_TEMPLATE,
+            service.query_context,
+            "run_snowflake_query",
+            "Select",
+        ),
+        number=args.number,
+    )
+    compiled = timeit.timeit(
+        lambda: service.build_query_comment("run_snowflake_query", "Select"),
+        number=args.number,
+    )
+    stable = timeit.timeit(
+        lambda: service.build_query_comment("run_snowflake_query", "Select", True),
+        number=args.number,
+    )
+    compiled_template = CompiledQueryComment(DEFAULT_QUERY_COMMENT_TEMPLATE)
+    values = {
+        key: f"value-{key}" for key in compiled_template.variables
+    } | service.query_context
+    render = timeit.timeit(
+        lambda: compiled_template.render(values.__getitem__), number=args.number
+    )
+    for name, elapsed in SimpleNamespace(
+        legacy=legacy, compiled=compiled, stable=stable, render=render
+    ).__dict__.items():
+        print(f"{name:<10}{elapsed / args.number * 1e6:>8.2f} us/comment")
+
+
+if __name__ == "__main__":
+    main()
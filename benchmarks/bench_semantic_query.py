@@ -0,0 +1,74 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Micro-benchmark of semantic view statement construction.
+
+Compares the cached statement templates used by write_semantic_view_query with
+the previous per-call string concatenation, for views with many dimensions.
+
+Usage: python benchmarks/bench_semantic_query.py [--number N]
+"""
+
+import argparse
+import timeit
+
+from mcp_server_snowflake.semantic_manager.objects import SemanticExpression
+from mcp_server_snowflake.semantic_manager.tools import write_semantic_view_query
+
+
+def legacy_write(view_name, database_name, schema_name, dimensions, metrics, where):
+    statement = "SELECT * FROM SEMANTIC_VIEW (identifier(?)"
+    bindvars = [f"{database_name}.{schema_name}.{view_name}"]
+    for keyword, exprs in (("DIMENSIONS", dimensions), ("METRICS", metrics)):
+        if exprs:
+            statement += f" {keyword}"
+            for index, expr in enumerate(exprs):
+                statement += " identifier(?)"
+                bindvars.extend([f"{expr.table}.{expr.name}"])
+                if index != len(exprs) - 1:
+                    statement += ","
+    statement += ")"
+    if where:
+        statement += f" WHERE {where}"
+    return statement, bindvars
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'dimensions':>10}{'legacy us':>12}{'template us':>14}{'speedup':>10}")
+    for count in (10, 100, 300, 1000):
+        dimensions = [
+            SemanticExpression(table="ORDERS", name=f"DIMENSION_{i}")
+            for i in range(count)
+        ]
+        metrics = [SemanticExpression(table="ORDERS", name="TOTAL")]
+        legacy = timeit.timeit(
+            lambda: legacy_write("SV", "DB", "S", dimensions, metrics, "A = 1"),
+            number=args.number,
+        )
+        templated = timeit.timeit(
+            lambda: write_semantic_view_query(
+                "SV", "DB", "S", dimensions, metrics, where_clause="A = 1"
+            ),
+            number=args.number,
+        )
+        print(
+            f"{count:>10}{legacy / args.number * 1e6:>12.1f}"
+            f"{templated / args.number * 1e6:>14.1f}{legacy / templated:>10.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
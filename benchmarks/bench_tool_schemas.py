@@ -0,0 +1,158 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of tool registration with and without the tool schema cache.
+
+Registers every tool group except the object inventory, first with an empty
+cache and then with the cache written by the first run, and lists the tools
+as a client would. Every start runs in a new Python process, so the warm case
+does not benefit from schemas already generated in memory by the cold one.
+Tool modules are imported before timing so only schema generation and
+registration are measured.
+
+Usage: python benchmarks/bench_tool_schemas.py [--number N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+from fastmcp import Client, FastMCP
+
+import mcp_server_snowflake.cortex_services.tools  # noqa: F401
+import mcp_server_snowflake.object_manager.tools  # noqa: F401
+import mcp_server_snowflake.query_manager.tools  # noqa: F401
+import mcp_server_snowflake.semantic_manager.tools  # noqa: F401
+from mcp_server_snowflake.server import SnowflakeService, initialize_tools
+from mcp_server_snowflake.tool_cache import TOOL_CACHE_ENV_VAR, get_tool_cache
+
+CONFIG = {
+    "agent_services": [
+        {
+            "service_name": "agent",
+            "description": "Agent",
+            "database_name": "DB",
+            "schema_name": "PUBLIC",
+        }
+    ],
+    "search_services": [
+        {
+            "service_name": "search",
+            "description": "Search",
+            "database_name": "DB",
+            "schema_name": "PUBLIC",
+            "columns": [],
+        }
+    ],
+    "analyst_services": [
+        {
+            "service_name": "analyst",
+            "semantic_model": "DB.PUBLIC.MODEL",
+            "description": "Analyst",
+        }
+    ],
+    "other_services": {
+        "object_manager": True,
+        "query_manager": True,
+        "semantic_manager": True,
+    },
+    "sql_statement_permissions": [{"All": True}],
+}
+
+
+def start(service_config_file: str) -> dict:
+    """Start a server in this process and time tool registration and listing."""
+    service = SnowflakeService(
+        service_config_file=service_config_file,
+        transport="stdio",
+        connection_params={},
+    )
+    server = FastMCP("Snowflake MCP Server")
+    begin = time.perf_counter()
+    initialize_tools(service, server)
+    registered = time.perf_counter()
+
+    async def list_tools():
+        async with Client(server) as client:
+            return await client.list_tools()
+
+    tools = asyncio.run(list_tools())
+    listed = time.perf_counter()
+    cache = get_tool_cache(server)
+    return {
+        "register_seconds": registered - begin,
+        "list_seconds": listed - registered,
+        "schemas": {tool.name: tool.inputSchema for tool in tools},
+        "hits": cache.hits if cache else 0,
+    }
+
+
+def start_in_subprocess(service_config_file: str, cache_dir: str) -> dict:
+    """Time a start in a new interpreter using the given tool cache directory."""
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", service_config_file],
+        env={**os.environ, TOOL_CACHE_ENV_VAR: cache_dir},
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=5)
+    parser.add_argument("--child", metavar="CONFIG", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(start(args.child)))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        config_file = os.path.join(directory, "config.yaml")
+        with open(config_file, "w") as f:
+            yaml.dump(CONFIG, f)
+
+        print(f"{'cache':<8}{'tools':>6}{'register ms':>14}{'list ms':>10}")
+        warm_cache_dir = os.path.join(directory, "warm")
+        # Fill the warm cache
+        reference_schemas = start_in_subprocess(config_file, warm_cache_dir)["schemas"]
+
+        for label in ("cold", "warm"):
+            register_times, list_times = [], []
+            for _ in range(args.number):
+                cache_dir = (
+                    tempfile.mkdtemp(dir=directory)
+                    if label == "cold"
+                    else warm_cache_dir
+                )
+                result = start_in_subprocess(config_file, cache_dir)
+                schemas = result["schemas"]
+                assert schemas == reference_schemas
+                assert result["hits"] == (0 if label == "cold" else len(schemas))
+                register_times.append(result["register_seconds"])
+                list_times.append(result["list_seconds"])
+            print(
+                f"{label:<8}{len(schemas):>6}"
+                f"{min(register_times) * 1000:>14.1f}{min(list_times) * 1000:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
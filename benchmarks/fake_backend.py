@@ -0,0 +1,302 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Local fake Snowflake backend for end-to-end benchmarks.
+
+FakeConnection stands in for snowflake.connector connections in the server
+process, with programmable statement latency and result sizes, and
+CortexStub serves the Cortex Search, Analyst and Agent REST endpoints on
+localhost. Connection.host points at the stub, so Cortex tools make real HTTP
+requests.
+
+Run this module in place of the server to serve MCP with the fake backend
+installed. Backend settings are read as JSON from FAKE_SNOWFLAKE_BACKEND and
+all other arguments are passed to the server:
+
+Usage: python benchmarks/fake_backend.py --service-config-file <path> [--transport T]
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+BACKEND_ENV_VAR = "FAKE_SNOWFLAKE_BACKEND"
+
+# Returned by DESCRIBE SEMANTIC VIEW for every view
+SEMANTIC_VIEW_ROWS = [
+    {
+        "object_kind": "TABLE",
+        "object_name": "ORDERS",
+        "parent_entity": None,
+        "property": "BASE_TABLE_NAME",
+        "property_value": "ORDERS",
+    },
+    {
+        "object_kind": "DIMENSION",
+        "object_name": "REGION",
+        "parent_entity": "ORDERS",
+        "property": "EXPRESSION",
+        "property_value": "orders.region",
+    },
+    {
+        "object_kind": "METRIC",
+        "object_name": "REVENUE",
+        "parent_entity": "ORDERS",
+        "property": "EXPRESSION",
+        "property_value": "SUM(orders.amount)",
+    },
+]
+
+
+class BackendSettings(BaseModel):
+    """Latency and result sizes of the fake backend."""
+
+    # Seconds each statement takes, plus per_row_latency for every row returned
+    statement_latency: float = 0.005
+    per_row_latency: float = 0.0
+    rows: int = 100
+    columns: int = 8
+    # Seconds each Cortex REST request takes
+    cortex_latency: float = 0.02
+    search_results: int = 10
+    # Base URL of a running CortexStub, such as http://127.0.0.1:8123
+    cortex_url: Optional[str] = None
+    # The server process writes its pid here, so callers can read its memory use
+    pid_file: Optional[str] = None
+
+
+def make_rows(rows: int, columns: int) -> List[Dict[str, Any]]:
+    return [
+        {f"COLUMN_{c}": f"value_{r}_{c}" if c % 2 else r * c for c in range(columns)}
+        for r in range(rows)
+    ]
+
+
+class FakeCursor:
+    """Cursor returning generated rows after the configured latency."""
+
+    def __init__(self, connection: "FakeConnection", use_dict: bool):
+        self.connection = connection
+        self.use_dict = use_dict
+        self.sfqid: Optional[str] = None
+        self.description: List[tuple] = []
+        self.rowcount = 0
+        self._rows: List[Dict[str, Any]] = []
+
+    def execute(self, statement: str, params: Any = None, **kwargs) -> "FakeCursor":
+        settings = self.connection.settings
+        self.connection.record(statement, params, kwargs)
+        normalized = " ".join(statement.split()).upper()
+        if normalized.startswith("DESCRIBE SEMANTIC VIEW"):
+            rows = SEMANTIC_VIEW_ROWS
+        elif normalized.startswith("SELECT 'MCP SERVER SNOWFLAKE'"):
+            rows = [{"'MCP SERVER SNOWFLAKE'": "MCP Server Snowflake"}]
+        else:
+            rows = self.connection.result_rows
+        time.sleep(settings.statement_latency + settings.per_row_latency * len(rows))
+        self.sfqid = str(uuid.uuid4())
+        self._rows = rows
+        self.rowcount = len(rows)
+        self.description = [(name,) for name in (rows[0] if rows else {})]
+        return self
+
+    def _format(self, row: Dict[str, Any]):
+        return dict(row) if self.use_dict else tuple(row.values())
+
+    def fetchall(self) -> list:
+        rows, self._rows = self._rows, []
+        return [self._format(row) for row in rows]
+
+    def fetchone(self):
+        if not self._rows:
+            return None
+        row, self._rows = self._rows[0], self._rows[1:]
+        return self._format(row)
+
+    def close(self) -> None:
+        self._rows = []
+
+    def __enter__(self) -> "FakeCursor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class FakeRest:
+    token = "fake-session-token"
+
+
+class FakeConnection:
+    """
+    Stand-in for snowflake.connector.SnowflakeConnection.
+
+    Every executed statement is recorded in statements as a tuple of the
+    statement, its parameters and its keyword arguments.
+    """
+
+    def __init__(self, settings: BackendSettings, **connect_kwargs):
+        self.settings = settings
+        self.connect_kwargs = connect_kwargs
+        self.host = settings.cortex_url or "http://127.0.0.1:1"
+        self.rest = FakeRest()
+        self.result_rows = make_rows(settings.rows, settings.columns)
+        self.statements: List[tuple] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def record(self, statement: str, params: Any, kwargs: Dict[str, Any]) -> None:
+        with self._lock:
+            self.statements.append((statement, params, kwargs))
+
+    def cursor(self, cursor_class: Any = None) -> FakeCursor:
+        return FakeCursor(self, use_dict=cursor_class is not None)
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        self._closed = True
+
+
+class FakeRoot:
+    """Stand-in for snowflake.core.Root, which the benchmarked tools do not use."""
+
+    def __init__(self, connection: FakeConnection):
+        self.connection = connection
+
+
+class CortexStub:
+    """
+    Threaded HTTP server answering Cortex REST requests with canned responses.
+
+    Parameters
+    ----------
+    settings : BackendSettings
+        Response latency and number of search results
+    host : str, default="127.0.0.1"
+    port : int, default=0
+        Port to listen on, or 0 for any free port
+    """
+
+    def __init__(self, settings: BackendSettings, host: str = "127.0.0.1", port=0):
+        self.settings = settings
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                stub.requests += 1
+                time.sleep(stub.settings.cortex_latency)
+                content_type, body = stub.respond(self.path, payload)
+                self.send_response(200 if body is not None else 404)
+                self.send_header("Content-Type", content_type)
+                body = (body or "").encode()
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+        self._thread: Optional[threading.Thread] = None
+
+    def respond(self, path: str, payload: Dict[str, Any]) -> tuple:
+        if path.endswith(":query"):
+            results = [
+                {column: f"{column} {i}" for column in payload.get("columns") or []}
+                for i in range(payload.get("limit") or self.settings.search_results)
+            ]
+            return "application/json", json.dumps({"results": results})
+        if path.endswith("/cortex/analyst/message"):
+            message = {
+                "role": "analyst",
+                "content": [
+                    {"type": "text", "text": "Revenue by region."},
+                    {
+                        "type": "sql",
+                        "statement": "SELECT region, SUM(amount) FROM orders "
+                        "GROUP BY region",
+                    },
+                ],
+            }
+            return "application/json", json.dumps({"message": message})
+        if path.endswith(":run"):
+            data = json.dumps({"content": [{"type": "text", "text": "Done."}]})
+            return (
+                "text/event-stream",
+                f"event: response.text.delta\ndata: {{}}\n\n"
+                f"event: response\ndata: {data}\n\n",
+            )
+        return "application/json", None
+
+    def start(self) -> "CortexStub":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def install_fake_backend(settings: BackendSettings) -> List[FakeConnection]:
+    """
+    Replace the Snowflake connector and Root in this process with fakes.
+
+    Returns
+    -------
+    list[FakeConnection]
+        Connections opened from now on, in order
+    """
+    import snowflake.connector
+    import snowflake.core
+
+    connections: List[FakeConnection] = []
+
+    def connect(**kwargs) -> FakeConnection:
+        connection = FakeConnection(settings, **kwargs)
+        connections.append(connection)
+        return connection
+
+    snowflake.connector.connect = connect
+    snowflake.core.Root = FakeRoot
+    if settings.pid_file:
+        with open(settings.pid_file, "w") as file:
+            file.write(str(os.getpid()))
+    return connections
+
+
+def main():
+    settings = BackendSettings.model_validate_json(
+        os.environ.get(BACKEND_ENV_VAR) or "{}"
+    )
+    install_fake_backend(settings)
+
+    from mcp_server_snowflake.server import main as server_main
+
+    server_main()
+
+
+if __name__ == "__main__":
+    main()
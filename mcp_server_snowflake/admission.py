@@ -0,0 +1,264 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import math
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from mcp_server_snowflake.metrics import time_phase
+
+# Tools that run warehouse queries or call Cortex models. Other tools only
+# read metadata.
+DEFAULT_QUERY_TOOLS = [
+    "run_snowflake_query",
+    "export_query_results",
+    "query_semantic_view",
+    "cortex_analyst",
+    "cortex_agent",
+]
+
+# Weight of the latest call in the moving average of call durations
+DURATION_SMOOTHING = 0.2
+
+
+class RateLimit(BaseModel):
+    """Token bucket refilled at rate calls per second, holding up to burst calls."""
+
+    rate: float
+    burst: int = 1
+
+
+class AdmissionConfig(BaseModel):
+    """The admission_control section of the service configuration."""
+
+    max_concurrent: Optional[int] = None
+    max_concurrent_per_session: Optional[int] = None
+    max_concurrent_queries: Optional[int] = None
+    max_concurrent_metadata: Optional[int] = None
+    query_tools: List[str] = DEFAULT_QUERY_TOOLS
+    queue_timeout_seconds: float = 30
+    rate_limits: Dict[str, RateLimit] = {}
+
+
+class AdmissionRejected(Exception):
+    """A tool call was not admitted. The client may retry after retry_after seconds."""
+
+    def __init__(self, message: str, retry_after: float):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"{message} Retry after {self.retry_after} seconds.")
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token, returning 0, or the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class FairLimiter:
+    """
+    Concurrency limit whose free slots are handed round-robin to sessions.
+
+    A session with many queued calls gets one slot in turn with every other
+    waiting session, rather than all the slots it queued for first.
+
+    Parameters
+    ----------
+    limit : int, optional
+        Calls running at once across sessions
+    per_session : int, optional
+        Calls running at once in one session
+    """
+
+    def __init__(self, limit: Optional[int], per_session: Optional[int]):
+        self.limit = limit
+        self.per_session = per_session
+        self.active = 0
+        self.active_by_session: Counter = Counter()
+        # Sessions with queued calls, in the order they are next served
+        self.waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self.average_duration = 0.0
+
+    def can_start(self, session: str) -> bool:
+        return (self.limit is None or self.active < self.limit) and (
+            self.per_session is None
+            or self.active_by_session[session] < self.per_session
+        )
+
+    def queued(self) -> int:
+        return sum(len(waiters) for waiters in self.waiters.values())
+
+    def retry_after(self) -> float:
+        """Rough seconds until a call queued now would start."""
+        slots = self.limit or self.per_session or 1
+        return self.average_duration * (self.queued() + 1) / slots
+
+    def _start(self, session: str) -> None:
+        self.active += 1
+        self.active_by_session[session] += 1
+
+    def _wake(self) -> None:
+        granted = True
+        while granted:
+            granted = False
+            for session in list(self.waiters):
+                if not self.can_start(session):
+                    continue
+                waiters = self.waiters.pop(session)
+                future = waiters.popleft()
+                if waiters:
+                    # Served sessions move to the back of the line
+                    self.waiters[session] = waiters
+                self._start(session)
+                future.set_result(None)
+                granted = True
+
+    def release(self, session: str, duration: float) -> None:
+        self.active -= 1
+        self.active_by_session[session] -= 1
+        if not self.active_by_session[session]:
+            del self.active_by_session[session]
+        self.average_duration += DURATION_SMOOTHING * (duration - self.average_duration)
+        self._wake()
+
+    async def acquire(self, session: str, timeout: float) -> None:
+        if session not in self.waiters and self.can_start(session):
+            self._start(session)
+            return
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.setdefault(session, deque()).append(future)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except BaseException:
+            if future.done():
+                # Granted just as the wait ended
+                self.release(session, self.average_duration)
+            else:
+                future.cancel()
+                waiters = self.waiters.get(session)
+                if waiters is not None:
+                    waiters.remove(future)
+                    if not waiters:
+                        del self.waiters[session]
+            raise
+
+
+class AdmissionController:
+    """
+    Concurrency and rate limits applied to tool calls before they run.
+
+    Query and metadata tools wait in separate queues, so cheap metadata calls
+    are not stuck behind long-running queries, and every call also counts
+    against the global and per-session limits.
+
+    Parameters
+    ----------
+    config : AdmissionConfig
+        Limits from the configuration file
+    """
+
+    def __init__(self, config: AdmissionConfig):
+        self.config = config
+        self.query_tools = frozenset(config.query_tools)
+        self.limiters = {
+            "query": FairLimiter(
+                config.max_concurrent_queries, config.max_concurrent_per_session
+            ),
+            "metadata": FairLimiter(
+                config.max_concurrent_metadata, config.max_concurrent_per_session
+            ),
+        }
+        self.global_limiter = FairLimiter(
+            config.max_concurrent, config.max_concurrent_per_session
+        )
+        self.buckets = {
+            tool: TokenBucket(limit.rate, limit.burst)
+            for tool, limit in config.rate_limits.items()
+        }
+
+    def tool_class(self, tool_name: str) -> str:
+        return "query" if tool_name in self.query_tools else "metadata"
+
+    @asynccontextmanager
+    async def admit(self, tool_name: str, session: str) -> AsyncIterator[None]:
+        """
+        Wait for the tool call's turn, then hold its slots until the block exits.
+
+        Raises
+        ------
+        AdmissionRejected
+            If the tool's rate limit is exhausted or the call is still queued
+            after queue_timeout_seconds
+        """
+        bucket = self.buckets.get(tool_name)
+        if bucket is not None:
+            wait = bucket.take()
+            if wait:
+                raise AdmissionRejected(
+                    f"Rate limit of {tool_name} exceeded.", retry_after=wait
+                )
+
+        deadline = time.monotonic() + self.config.queue_timeout_seconds
+        acquired = []
+        try:
+            with time_phase("admission"):
+                for limiter in (
+                    self.limiters[self.tool_class(tool_name)],
+                    self.global_limiter,
+                ):
+                    try:
+                        await limiter.acquire(session, deadline - time.monotonic())
+                    except asyncio.TimeoutError:
+                        raise AdmissionRejected(
+                            f"Server is busy: {tool_name} waited "
+                            f"{self.config.queue_timeout_seconds:g} seconds to "
+                            "start.",
+                            retry_after=limiter.retry_after(),
+                        ) from None
+                    acquired.append(limiter)
+
+            start = time.monotonic()
+            try:
+                yield
+            finally:
+                duration = time.monotonic() - start
+                for limiter in acquired:
+                    limiter.release(session, duration)
+                acquired = []
+        finally:
+            # Slots taken before a later limiter timed out
+            for limiter in acquired:
+                limiter.release(session, limiter.average_duration)
+
+
+def compile_admission_control(
+    admission_control: Optional[dict],
+) -> Optional[AdmissionController]:
+    """Compile the admission_control configuration section, or return None if absent."""
+    if not admission_control:
+        return None
+    return AdmissionController(AdmissionConfig(**admission_control))
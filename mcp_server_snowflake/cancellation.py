@@ -0,0 +1,190 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from fastmcp.utilities.logging import get_logger
+from pydantic import BaseModel
+
+logger = get_logger(__name__)
+
+# Statement parameter the connector sends as the request id of a statement
+REQUEST_ID_PARAM = "requestId"
+STATEMENT_TIMEOUT_PARAM = "STATEMENT_TIMEOUT_IN_SECONDS"
+
+
+class StatementTimeoutConfig(BaseModel):
+    """The statement_timeouts section of the service configuration."""
+
+    default: Optional[int] = None
+    tools: Dict[str, int] = {}
+
+    def timeout_for(self, tool_name: str) -> Optional[int]:
+        return self.tools.get(tool_name, self.default)
+
+
+def compile_statement_timeouts(
+    statement_timeouts: Optional[dict],
+) -> StatementTimeoutConfig:
+    """Compile the statement_timeouts configuration section."""
+    return StatementTimeoutConfig(**(statement_timeouts or {}))
+
+
+class StatementCancelled(Exception):
+    """A statement was not started because its tool call was cancelled."""
+
+
+class CancellableCall:
+    """
+    Statements running on behalf of one tool call, so they can be cancelled.
+
+    Each statement is sent with a request id chosen here. When the MCP client
+    cancels the call or disconnects, cancel aborts the statements still
+    running by request id, which the connector does from outside the thread
+    blocked waiting for them.
+
+    Parameters
+    ----------
+    timeout_seconds : int, optional
+        STATEMENT_TIMEOUT_IN_SECONDS sent with every statement of the call
+    """
+
+    def __init__(self, timeout_seconds: Optional[int] = None):
+        self.timeout_seconds = timeout_seconds
+        self.cancelled = False
+        self._running: Dict[str, Tuple[Any, str]] = {}
+        self._lock = threading.Lock()
+
+    def statement_params(
+        self, statement_params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Return statement parameters with a new request id and the timeout."""
+        params = dict(statement_params or {})
+        params[REQUEST_ID_PARAM] = str(uuid.uuid4())
+        if self.timeout_seconds is not None:
+            params.setdefault(STATEMENT_TIMEOUT_PARAM, self.timeout_seconds)
+        return params
+
+    @contextmanager
+    def running(self, cursor: Any, statement: str, request_id: str) -> Iterator[None]:
+        """Track a statement while it executes."""
+        with self._lock:
+            if self.cancelled:
+                raise StatementCancelled("The tool call was cancelled.")
+            self._running[request_id] = (cursor, statement)
+        try:
+            yield
+        finally:
+            with self._lock:
+                del self._running[request_id]
+
+    def cancel(self) -> List[str]:
+        """
+        Abort the running statements and refuse new ones.
+
+        SYSTEM$CANCEL_QUERY needs the query id, which the connector only
+        exposes once execute returns, so it cannot target a statement still
+        running. Statements are aborted by request id instead, through the
+        connection's _cancel_query: the abort request the connector itself
+        sends when a query times out or is interrupted. It is private, so a
+        connector without it is logged and the statement left to its
+        STATEMENT_TIMEOUT_IN_SECONDS.
+
+        Returns
+        -------
+        list[str]
+            Request ids of the statements an abort was sent for
+        """
+        with self._lock:
+            self.cancelled = True
+            running = list(self._running.items())
+        aborted = []
+        for request_id, (cursor, statement) in running:
+            cancel_query = getattr(cursor.connection, "_cancel_query", None)
+            if cancel_query is None:
+                logger.warning(
+                    f"Unable to cancel statement {request_id}: the Snowflake "
+                    "connector does not support aborting requests."
+                )
+                continue
+            try:
+                cancel_query(statement, uuid.UUID(request_id))
+                aborted.append(request_id)
+            except Exception as e:
+                logger.warning(f"Unable to cancel statement {request_id}: {e}")
+        return aborted
+
+    def cancel_in_background(self) -> threading.Thread:
+        """
+        Call cancel in a new thread and return it.
+
+        Aborting makes a request to Snowflake, and the default executor may be
+        full of threads waiting on the very statements being aborted.
+        """
+        thread = threading.Thread(
+            target=self.cancel, name="snowflake-mcp-cancel", daemon=True
+        )
+        thread.start()
+        return thread
+
+
+_current_call: ContextVar[Optional[CancellableCall]] = ContextVar(
+    "snowflake_mcp_cancellable_call", default=None
+)
+
+
+def get_current_call() -> Optional[CancellableCall]:
+    """Return the cancellable tool call in progress, if any."""
+    return _current_call.get()
+
+
+@contextmanager
+def cancellable_call(
+    timeout_seconds: Optional[int] = None,
+) -> Iterator[CancellableCall]:
+    """Make statements executed within the block cancellable together."""
+    call = CancellableCall(timeout_seconds)
+    token = _current_call.set(call)
+    try:
+        yield call
+    finally:
+        _current_call.reset(token)
+
+
+def execute_statement(
+    cursor: Any,
+    statement: str,
+    *args: Any,
+    statement_params: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """
+    Execute a statement so the current tool call can cancel it.
+
+    Outside a cancellable call this is cursor.execute. Inside one, the
+    statement is sent with a request id and the call's statement timeout.
+
+    Raises
+    ------
+    StatementCancelled
+        If the call was cancelled before the statement started
+    """
+    call = _current_call.get()
+    if call is not None:
+        statement_params = call.statement_params(statement_params)
+        with call.running(cursor, statement, statement_params[REQUEST_ID_PARAM]):
+            return cursor.execute(statement, *args, _statement_params=statement_params)
+    if statement_params:
+        return cursor.execute(statement, *args, _statement_params=statement_params)
+    return cursor.execute(statement, *args)
@@ -0,0 +1,140 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from mcp_server_snowflake.utils import DEFAULT_SESSION
+
+# Tools that only read, so identical concurrent calls can share one result.
+# run_snowflake_query is only coalesced for READ_ONLY_STATEMENT_TYPES.
+DEFAULT_COALESCED_TOOLS = [
+    "list_objects",
+    "describe_object",
+    "list_semantic_views",
+    "describe_semantic_view",
+    "describe_semantic_views_bulk",
+    "show_semantic_dimensions",
+    "show_semantic_metrics",
+    "get_semantic_view_ddl",
+    "query_semantic_view",
+    "search_inventory",
+    "run_snowflake_query",
+]
+
+READ_ONLY_STATEMENT_TYPES = frozenset({"Select", "Show", "Describe"})
+
+
+class CoalescingConfig(BaseModel):
+    """The request_coalescing section of the service configuration."""
+
+    enabled: bool = True
+    tools: List[str] = DEFAULT_COALESCED_TOOLS
+
+
+def get_coalesced_tools(request_coalescing: Optional[dict]) -> frozenset:
+    """Return the tools to coalesce, which is empty if coalescing is disabled."""
+    config = CoalescingConfig(**(request_coalescing or {}))
+    return frozenset(config.tools) if config.enabled else frozenset()
+
+
+def get_coalescing_key(
+    tool_name: str,
+    arguments: Optional[Dict[str, Any]],
+    session_id: str = DEFAULT_SESSION,
+) -> Optional[Hashable]:
+    """
+    Return the key identical calls share, or None if the call must run alone.
+
+    Arguments left at None are dropped, and run_snowflake_query statements are
+    compared in canonical form. Only calls from the same MCP session share a
+    key, since tools keep per-session state such as the last query id, which
+    a call receiving another session's result would not update.
+    """
+    arguments = {
+        name: value for name, value in (arguments or {}).items() if value is not None
+    }
+    if tool_name == "run_snowflake_query":
+        statement = arguments.get("statement")
+        if not isinstance(statement, str):
+            return None
+        # Imported here so servers without the query manager skip sqlglot
+        from mcp_server_snowflake.query_manager.tools import (
+            canonicalize_statement,
+            get_statement_type,
+        )
+
+        if get_statement_type(statement) not in READ_ONLY_STATEMENT_TYPES:
+            return None
+        arguments["statement"] = canonicalize_statement(statement)
+    try:
+        return session_id, tool_name, json.dumps(arguments, sort_keys=True, default=str)
+    except (TypeError, ValueError):
+        return None
+
+
+class SingleFlight:
+    """
+    De-duplicate concurrent calls with the same key.
+
+    The first call runs. Calls with the same key arriving while it runs wait
+    for it and receive its result or exception. Nothing is cached once the
+    call finishes.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def run(
+        self, key: Hashable, fn: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """
+        Run fn, or wait for the call in flight with the same key.
+
+        Returns
+        -------
+        tuple
+            The result, and whether it was shared from another call
+        """
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            try:
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The running call was cancelled, not this one, so run it here
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiting calls re-raise it; mark it retrieved in case there are none
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._calls[key]
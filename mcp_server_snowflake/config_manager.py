@@ -0,0 +1,110 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastmcp.utilities.logging import get_logger
+
+logger = get_logger(__name__)
+
+FileSignature = Tuple[int, int, int]
+
+
+class ServiceConfigManager:
+    """
+    Keeps the service configuration in sync with the configuration file.
+
+    Checking for changes costs a single stat call. The file is read and parsed
+    again only when its modification time, size or inode changes, and the
+    parsed configuration is cached for the configuration resource. A new
+    configuration is applied to the service before listeners are notified,
+    so middleware and tools can swap in the new values. If the edited file
+    cannot be parsed, the previous configuration stays in effect.
+
+    Parameters
+    ----------
+    snowflake_service : SnowflakeService
+        Service whose configuration file is watched
+
+    Attributes
+    ----------
+    config : dict
+        Most recently applied configuration
+    """
+
+    def __init__(self, snowflake_service):
+        self.snowflake_service = snowflake_service
+        self.path = snowflake_service.service_config_file
+        self.config: Dict[str, Any] = {}
+        self._signature: Optional[FileSignature] = None
+        self._listeners: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _stat(self) -> Optional[FileSignature]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def load(self) -> None:
+        """Read and apply the configuration file, raising if it is invalid."""
+        with self._lock:
+            # Stat before reading so an edit made during the read is seen next time
+            signature = self._stat()
+            self.config = self.snowflake_service.unpack_service_specs()
+            self._signature = signature
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Register a callable to run after a changed configuration is applied."""
+        self._listeners.append(listener)
+
+    def reload_if_changed(self) -> bool:
+        """
+        Apply the configuration file again if it changed since the last check.
+
+        Returns
+        -------
+        bool
+            True if a new configuration was applied
+        """
+        signature = self._stat()
+        if signature == self._signature:
+            return False
+
+        with self._lock:
+            if signature == self._signature:
+                return False
+            # Remember the signature even on failure so a broken file is not
+            # parsed again on every request
+            self._signature = signature
+            try:
+                self.config = self.snowflake_service.unpack_service_specs()
+            except Exception as e:
+                logger.warning(
+                    f"Keeping previous service configuration, reload failed: {e}"
+                )
+                return False
+
+            logger.info(f"Reloaded service configuration from {self.path}")
+            for listener in self._listeners:
+                try:
+                    listener()
+                except Exception as e:
+                    logger.error(f"Error applying reloaded service configuration: {e}")
+        return True
+
+    def get_config(self) -> Dict[str, Any]:
+        """Return the parsed configuration, reloading it first if the file changed."""
+        self.reload_if_changed()
+        return self.config
@@ -22,6 +22,8 @@ from mcp_server_snowflake.cortex_services.prompts import (
     get_cortex_search_description,
 )
 from mcp_server_snowflake.environment import construct_snowflake_post
+from mcp_server_snowflake.metrics import time_phase
+from mcp_server_snowflake.tool_cache import cached_tool
 from mcp_server_snowflake.utils import SnowflakeException, SnowflakeResponse
 
 sfse = SnowflakeResponse()
@@ -79,9 +81,10 @@ async def query_cortex_agent(
         "stream": False,  # Ignored by Agent API
     }
     try:
-        response = requests.post(
-            host, headers=headers, json=payload, stream=True, timeout=120
-        )
+        with time_phase("cortex_http"):
+            response = requests.post(
+                host, headers=headers, json=payload, stream=True, timeout=120
+            )
     except requests.exceptions.Timeout:
         raise SnowflakeException(
             tool="Cortex Agent",
@@ -175,7 +178,8 @@ async def query_cortex_search(
     if isinstance(columns, list) and len(columns) > 0:
         payload["columns"] = columns
     try:
-        response = requests.post(host, headers=headers, json=payload, timeout=60)
+        with time_phase("cortex_http"):
+            response = requests.post(host, headers=headers, json=payload, timeout=60)
     except requests.exceptions.Timeout:
         raise SnowflakeException(
             tool="Cortex Search",
@@ -261,7 +265,8 @@ async def query_cortex_analyst(
     }
 
     try:
-        response = requests.post(host, headers=headers, json=payload, timeout=120)
+        with time_phase("cortex_http"):
+            response = requests.post(host, headers=headers, json=payload, timeout=120)
     except requests.exceptions.Timeout:
         raise SnowflakeException(
             tool="Cortex Analyst",
@@ -282,7 +287,8 @@ async def query_cortex_analyst(
 def initialize_cortex_agent_tool(server: FastMCP, snowflake_service):
     if snowflake_service.agent_services:
 
-        @server.tool(
+        @cached_tool(
+            server,
             name="cortex_agent",
             description=get_cortex_agent_description(snowflake_service.agent_services),
         )
@@ -316,7 +322,8 @@ def initialize_cortex_agent_tool(server: FastMCP, snowflake_service):
 def initialize_cortex_search_tool(server: FastMCP, snowflake_service):
     if snowflake_service.search_services:
 
-        @server.tool(
+        @cached_tool(
+            server,
             name="cortex_search",
             description=get_cortex_search_description(
                 snowflake_service.search_services
@@ -369,7 +376,8 @@ def initialize_cortex_search_tool(server: FastMCP, snowflake_service):
 def initialize_cortex_analyst_tool(server: FastMCP, snowflake_service):
     if snowflake_service.analyst_services:
 
-        @server.tool(
+        @cached_tool(
+            server,
             name="cortex_analyst",
             description=get_cortex_analyst_description(
                 snowflake_service.analyst_services
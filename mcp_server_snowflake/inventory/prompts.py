@@ -0,0 +1,9 @@
+search_inventory_prompt = """
+Search a local snapshot of Snowflake databases, schemas, tables, views, stages, and semantic views.
+Matches keywords against object names and comments without running queries in Snowflake.
+Prefer this tool over list_objects for discovering what exists in the account."""
+
+refresh_inventory_prompt = """
+Refresh the local Snowflake object inventory used by search_inventory.
+Only objects changed since the last refresh are fetched unless a full refresh is requested.
+Objects dropped since the last refresh are removed either way."""
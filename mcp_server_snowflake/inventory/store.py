@@ -0,0 +1,295 @@
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+# Object types tracked in the inventory
+inventory_object_types = (
+    "database",
+    "schema",
+    "table",
+    "view",
+    "stage",
+    "semantic_view",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    object_type TEXT NOT NULL,
+    database_name TEXT NOT NULL,
+    schema_name TEXT NOT NULL,
+    name TEXT NOT NULL,
+    kind TEXT,
+    owner TEXT,
+    comment TEXT,
+    created_on TEXT,
+    last_altered TEXT,
+    PRIMARY KEY (object_type, database_name, schema_name, name)
+);
+CREATE INDEX IF NOT EXISTS objects_name ON objects (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS objects_scope ON objects (database_name, schema_name);
+CREATE TABLE IF NOT EXISTS watermarks (
+    database_name TEXT NOT NULL,
+    source TEXT NOT NULL,
+    last_altered TEXT,
+    refreshed_at TEXT NOT NULL,
+    PRIMARY KEY (database_name, source)
+);
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_COLUMNS = (
+    "object_type",
+    "database_name",
+    "schema_name",
+    "name",
+    "kind",
+    "owner",
+    "comment",
+    "created_on",
+    "last_altered",
+)
+
+
+def _to_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class InventoryStore:
+    """
+    Local SQLite snapshot of Snowflake objects.
+
+    Database and schema rows use an empty string for the container names they do
+    not have so that every object has a unique primary key.
+
+    Parameters
+    ----------
+    path : str
+        Path to the SQLite file, or ":memory:" for a process-local snapshot
+    """
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            Path(path).expanduser().parent.mkdir(parents=True, exist_ok=True)
+            path = str(Path(path).expanduser())
+        self.path = path
+        # Tool calls and background refreshes use different threads
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def get_metadata(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM metadata WHERE key = ?", (key,)
+            ).fetchone()
+        return row["value"] if row else None
+
+    def set_metadata(self, key: str, value: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
+                (key, value),
+            )
+
+    def get_watermark(self, database_name: str, source: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT last_altered FROM watermarks WHERE database_name = ? AND source = ?",
+                (database_name, source),
+            ).fetchone()
+        return row["last_altered"] if row else None
+
+    def replace_databases(self, rows: Iterable[dict[str, Any]]) -> list[str]:
+        """
+        Replace database rows and drop everything under databases that are gone.
+
+        Returns
+        -------
+        list[str]
+            Names of databases removed from the snapshot
+        """
+        rows = list(rows)
+        names = {row["name"] for row in rows}
+        with self._lock, self._connection:
+            existing = {
+                row["name"]
+                for row in self._connection.execute(
+                    "SELECT name FROM objects WHERE object_type = 'database'"
+                )
+            }
+            removed = sorted(existing - names)
+            for name in removed:
+                self._connection.execute(
+                    "DELETE FROM objects WHERE database_name = ? OR (object_type = 'database' AND name = ?)",
+                    (name, name),
+                )
+                self._connection.execute(
+                    "DELETE FROM watermarks WHERE database_name = ?", (name,)
+                )
+            self._upsert(rows)
+        return removed
+
+    def apply_batch(
+        self,
+        database_name: str,
+        source: str,
+        object_types: tuple[str, ...],
+        rows: Iterable[dict[str, Any]],
+        replace: bool,
+        schema_name: Optional[str] = None,
+    ) -> int:
+        """
+        Write the rows fetched for one database and source.
+
+        Parameters
+        ----------
+        database_name : str
+            Database the rows belong to
+        source : str
+            Name of the query that produced the rows, used for the watermark
+        object_types : tuple[str, ...]
+            Object types produced by the source, cleared first when replacing
+        rows : Iterable[dict]
+            Rows keyed by the objects table columns
+        replace : bool
+            Whether rows for the source are replaced (full refresh) or upserted
+        schema_name : str, optional
+            Limit a replace to one schema. The source watermark is kept.
+
+        Returns
+        -------
+        int
+            Number of rows written
+        """
+        rows = list(rows)
+        watermark = max(
+            (_to_text(row["last_altered"]) for row in rows if row.get("last_altered")),
+            default=None,
+        )
+        with self._lock, self._connection:
+            if replace:
+                statement = f"DELETE FROM objects WHERE database_name = ? AND object_type IN ({', '.join('?' * len(object_types))})"
+                params: tuple[Any, ...] = (database_name, *object_types)
+                if schema_name is not None:
+                    statement += " AND schema_name = ?"
+                    params += (schema_name,)
+                self._connection.execute(statement, params)
+            if not replace or schema_name is not None:
+                previous = self._connection.execute(
+                    "SELECT last_altered FROM watermarks WHERE database_name = ? AND source = ?",
+                    (database_name, source),
+                ).fetchone()
+                if previous and previous["last_altered"]:
+                    watermark = max(filter(None, (watermark, previous["last_altered"])))
+            self._upsert(rows)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO watermarks (database_name, source, last_altered, refreshed_at) VALUES (?, ?, ?, ?)",
+                (
+                    database_name,
+                    source,
+                    watermark,
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+        return len(rows)
+
+    def count_by_schema(
+        self, database_name: str, object_types: tuple[str, ...]
+    ) -> dict[str, int]:
+        """Number of objects of the given types per schema of a database."""
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT schema_name, count(*) AS n FROM objects WHERE database_name = ? AND object_type IN ({', '.join('?' * len(object_types))}) GROUP BY 1",
+                (database_name, *object_types),
+            ).fetchall()
+        return {row["schema_name"]: row["n"] for row in rows}
+
+    def _upsert(self, rows: list[dict[str, Any]]) -> None:
+        values = []
+        for row in rows:
+            values.append(
+                tuple(
+                    (row.get(column) or "")
+                    if column in ("database_name", "schema_name")
+                    else _to_text(row.get(column))
+                    for column in _COLUMNS
+                )
+            )
+        self._connection.executemany(
+            f"INSERT OR REPLACE INTO objects ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+            values,
+        )
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        object_type: Optional[str] = None,
+        database_name: Optional[str] = None,
+        schema_name: Optional[str] = None,
+        limit: int = 50,
+    ) -> list[dict[str, Any]]:
+        """Search object names and comments. Matching is case-insensitive."""
+        statement = f"SELECT {', '.join(_COLUMNS)} FROM objects WHERE 1 = 1"
+        params: list[Any] = []
+        if query:
+            statement += " AND (name LIKE ? OR comment LIKE ?)"
+            params.extend([f"%{query}%", f"%{query}%"])
+        if object_type:
+            statement += " AND object_type = ?"
+            params.append(object_type)
+        if database_name:
+            statement += " AND database_name = ? COLLATE NOCASE"
+            params.append(database_name)
+        if schema_name:
+            statement += " AND schema_name = ? COLLATE NOCASE"
+            params.append(schema_name)
+        # Exact name matches first, then shorter names
+        statement += (
+            " ORDER BY (name = ? COLLATE NOCASE) DESC, length(name), name LIMIT ?"
+        )
+        params.extend([query or "", limit])
+
+        with self._lock:
+            rows = self._connection.execute(statement, params).fetchall()
+        return [
+            {key: row[key] for key in _COLUMNS if row[key] not in (None, "")}
+            for row in rows
+        ]
+
+    def summary(self) -> dict[str, Any]:
+        """Object counts per database and type plus refresh times."""
+        with self._lock:
+            counts = self._connection.execute(
+                "SELECT database_name, object_type, count(*) AS n FROM objects GROUP BY 1, 2"
+            ).fetchall()
+            refreshed = self._connection.execute(
+                "SELECT min(refreshed_at) AS oldest, max(refreshed_at) AS newest FROM watermarks"
+            ).fetchone()
+        databases: dict[str, dict[str, int]] = {}
+        totals: dict[str, int] = {}
+        for row in counts:
+            name = row["database_name"] or "<account>"
+            databases.setdefault(name, {})[row["object_type"]] = row["n"]
+            totals[row["object_type"]] = totals.get(row["object_type"], 0) + row["n"]
+        return {
+            "last_refresh": self.get_metadata("last_refresh"),
+            "oldest_database_refresh": refreshed["oldest"],
+            "newest_database_refresh": refreshed["newest"],
+            "totals": totals,
+            "databases": databases,
+        }
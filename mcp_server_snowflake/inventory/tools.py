@@ -0,0 +1,475 @@
+import threading
+import time
+from concurrent.futures import as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Annotated, Any, Literal, Optional
+
+from fastmcp import FastMCP
+from fastmcp.utilities.logging import get_logger
+from pydantic import Field
+
+from mcp_server_snowflake.cancellation import execute_statement
+from mcp_server_snowflake.inventory.prompts import (
+    refresh_inventory_prompt,
+    search_inventory_prompt,
+)
+from mcp_server_snowflake.inventory.store import InventoryStore
+from mcp_server_snowflake.metrics import record_query_id, time_phase
+from mcp_server_snowflake.tool_cache import cached_tool
+from mcp_server_snowflake.utils import (
+    ContextThreadPoolExecutor,
+    SnowflakeException,
+    execute_query,
+    lower_keys,
+    sanitize_tool_name,
+)
+
+logger = get_logger(__name__)
+
+DEFAULT_REFRESH_INTERVAL_SECONDS = 3600
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_PAGE_SIZE = 5000
+DEFAULT_EXCLUDED_DATABASES = ["SNOWFLAKE"]
+
+# INFORMATION_SCHEMA sources crawled per database. Each one reports
+# LAST_ALTERED so later refreshes only fetch objects changed since the last run.
+# {source: (information schema view, object types produced, select statement)}
+INFORMATION_SCHEMA_SOURCES = {
+    "schemata": (
+        "SCHEMATA",
+        ("schema",),
+        "SELECT 'schema' AS object_type, catalog_name AS database_name, "
+        "'' AS schema_name, schema_name AS name, "
+        "IFF(is_transient = 'YES', 'TRANSIENT', 'PERMANENT') AS kind, "
+        "schema_owner AS owner, comment, created AS created_on, last_altered "
+        "FROM identifier(?) WHERE schema_name <> 'INFORMATION_SCHEMA'",
+    ),
+    "tables": (
+        "TABLES",
+        ("table", "view"),
+        "SELECT IFF(table_type ILIKE '%VIEW', 'view', 'table') AS object_type, "
+        "table_catalog AS database_name, table_schema AS schema_name, "
+        "table_name AS name, table_type AS kind, table_owner AS owner, comment, "
+        "created AS created_on, last_altered "
+        "FROM identifier(?) WHERE table_schema <> 'INFORMATION_SCHEMA'",
+    ),
+    "stages": (
+        "STAGES",
+        ("stage",),
+        "SELECT 'stage' AS object_type, stage_catalog AS database_name, "
+        "stage_schema AS schema_name, stage_name AS name, stage_type AS kind, "
+        "stage_owner AS owner, comment, created AS created_on, last_altered "
+        "FROM identifier(?)",
+    ),
+}
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def fetch_paged(
+    snowflake_service,
+    statement: str,
+    bindvars: list[Any],
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> list[dict[str, Any]]:
+    """Fetch rows in pages so large schemas are not materialized twice."""
+    rows = []
+    with snowflake_service.get_connection(
+        use_dict_cursor=True,
+        session_parameters=snowflake_service.get_query_tag_param(),
+    ) as (
+        con,
+        cur,
+    ):
+        with time_phase("execute"):
+            execute_statement(cur, statement, bindvars)
+            record_query_id(cur.sfqid)
+        while True:
+            with time_phase("fetch"):
+                page = cur.fetchmany(page_size)
+            if not page:
+                break
+            rows.extend(lower_keys(row) for row in page)
+    return rows
+
+
+def crawl_source(
+    snowflake_service,
+    database_name: str,
+    source: str,
+    since: Optional[str] = None,
+    schema_name: Optional[str] = None,
+) -> list[dict[str, Any]]:
+    """
+    Fetch the objects one source reports for a database.
+
+    With since, only objects altered after it are returned, plus the first
+    object of every schema. Each row carries schema_count, the number of objects
+    the schema holds now, so dropped objects can be detected without listing
+    every name. With schema_name, all objects of that one schema are returned.
+    """
+    if source == "semantic_views":
+        rows = execute_query(
+            "SHOW SEMANTIC VIEWS IN DATABASE identifier(?)",
+            snowflake_service,
+            [_quote_identifier(database_name)],
+        )
+        return [
+            {
+                "object_type": "semantic_view",
+                "database_name": row.get("database_name"),
+                "schema_name": row.get("schema_name"),
+                "name": row.get("name"),
+                "owner": row.get("owner"),
+                "comment": row.get("comment"),
+                "created_on": row.get("created_on"),
+            }
+            for row in rows
+        ]
+
+    view, _, statement = INFORMATION_SCHEMA_SOURCES[source]
+    bindvars: list[Any] = [
+        f"{_quote_identifier(database_name)}.INFORMATION_SCHEMA.{view}"
+    ]
+    if since:
+        statement = (
+            "SELECT *, COUNT(*) OVER (PARTITION BY schema_name) AS schema_count "
+            f"FROM ({statement}) "
+            "QUALIFY last_altered > TO_TIMESTAMP_LTZ(?) "
+            "OR ROW_NUMBER() OVER (PARTITION BY schema_name ORDER BY name) = 1"
+        )
+        bindvars.append(since)
+    elif schema_name is not None:
+        statement = f"SELECT * FROM ({statement}) WHERE schema_name = ?"
+        bindvars.append(schema_name)
+    return fetch_paged(snowflake_service, statement, bindvars)
+
+
+class Inventory:
+    """
+    Account-wide object inventory backed by a local SQLite snapshot.
+
+    The first search warms the snapshot synchronously. Later searches are served
+    from SQLite and trigger a background incremental refresh once the snapshot
+    is older than refresh_interval_seconds.
+
+    Parameters
+    ----------
+    snowflake_service : SnowflakeService
+        Service used to run crawl queries
+    path : str
+        SQLite file path
+    refresh_interval_seconds : int
+        Age after which searches trigger a background refresh
+    max_workers : int
+        Number of crawl queries run concurrently
+    exclude_databases : list[str]
+        Databases that are never crawled
+    """
+
+    def __init__(
+        self,
+        snowflake_service,
+        path: str,
+        refresh_interval_seconds: int = DEFAULT_REFRESH_INTERVAL_SECONDS,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        exclude_databases: Optional[list[str]] = None,
+    ):
+        self.snowflake_service = snowflake_service
+        self.store = InventoryStore(path)
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.max_workers = max_workers
+        self.exclude_databases = {
+            name.upper()
+            for name in (
+                DEFAULT_EXCLUDED_DATABASES
+                if exclude_databases is None
+                else exclude_databases
+            )
+        }
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def last_refresh(self) -> Optional[datetime]:
+        value = self.store.get_metadata("last_refresh")
+        return datetime.fromisoformat(value) if value else None
+
+    def is_stale(self) -> bool:
+        last_refresh = self.last_refresh
+        if last_refresh is None:
+            return True
+        age = (datetime.now(timezone.utc) - last_refresh).total_seconds()
+        return age > self.refresh_interval_seconds
+
+    def refresh(self, full: bool = False) -> dict[str, Any]:
+        """
+        Crawl the account and update the snapshot.
+
+        Incremental refreshes fetch only objects whose LAST_ALTERED is newer than
+        the stored watermark, along with the current object count of every
+        schema. Dropped databases are always detected. A schema whose count
+        differs from the snapshot's lost objects and is crawled again in full.
+        """
+        with self._refresh_lock:
+            return self._refresh(full)
+
+    def _refresh(self, full: bool) -> dict[str, Any]:
+        """Refresh the snapshot. The caller holds the refresh lock."""
+        started = time.perf_counter()
+        try:
+            databases = execute_query("SHOW DATABASES", self.snowflake_service)
+        except Exception as e:
+            raise SnowflakeException(tool="refresh_inventory", message=str(e))
+
+        database_rows = [
+            {
+                "object_type": "database",
+                "name": row.get("name"),
+                "kind": row.get("kind"),
+                "owner": row.get("owner"),
+                "comment": row.get("comment"),
+                "created_on": row.get("created_on"),
+            }
+            for row in databases
+            if _upper(row.get("name")) not in self.exclude_databases
+        ]
+        removed = self.store.replace_databases(database_rows)
+
+        tasks = {}
+        rows_written = 0
+        errors = []
+        with ContextThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for database in database_rows:
+                database_name = database["name"]
+                for source in [*INFORMATION_SCHEMA_SOURCES, "semantic_views"]:
+                    incremental = not full and source != "semantic_views"
+                    since = (
+                        self.store.get_watermark(database_name, source)
+                        if incremental
+                        else None
+                    )
+                    future = executor.submit(
+                        crawl_source,
+                        self.snowflake_service,
+                        database_name,
+                        source,
+                        since,
+                    )
+                    tasks[future] = (database_name, source, since)
+
+            # SQLite writes happen on this thread as crawl results arrive
+            for future in as_completed(tasks):
+                database_name, source, since = tasks[future]
+                object_types = (
+                    ("semantic_view",)
+                    if source == "semantic_views"
+                    else INFORMATION_SCHEMA_SOURCES[source][1]
+                )
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    # Shared and application databases may not expose every view
+                    logger.warning(
+                        f"Inventory crawl of {source} in {database_name} failed: {e}"
+                    )
+                    errors.append(f"{database_name}.{source}: {e}")
+                    continue
+                rows_written += self.store.apply_batch(
+                    database_name,
+                    source,
+                    object_types,
+                    rows,
+                    replace=since is None,
+                )
+                if since is not None:
+                    rows_written += self._remove_dropped(
+                        database_name, source, object_types, rows, errors
+                    )
+
+        self.store.set_metadata("last_refresh", datetime.now(timezone.utc).isoformat())
+        return {
+            "mode": "full" if full else "incremental",
+            "databases": len(database_rows),
+            "removed_databases": removed,
+            "rows_written": rows_written,
+            "errors": errors,
+            "duration_ms": round((time.perf_counter() - started) * 1000),
+        }
+
+    def _remove_dropped(
+        self,
+        database_name: str,
+        source: str,
+        object_types: tuple[str, ...],
+        rows: list[dict[str, Any]],
+        errors: list[str],
+    ) -> int:
+        """
+        Reconcile schemas whose snapshot count differs from Snowflake's.
+
+        Every object created or altered since the watermark was just upserted,
+        so a snapshot schema holding more objects than Snowflake reports lost
+        some. Such schemas are crawled again in full; schemas Snowflake no
+        longer reports are cleared.
+        """
+        current = {row.get("schema_name") or "": row["schema_count"] for row in rows}
+        rows_written = 0
+        for schema_name, count in self.store.count_by_schema(
+            database_name, object_types
+        ).items():
+            if current.get(schema_name, 0) == count:
+                continue
+            schema_rows = []
+            if schema_name in current:
+                try:
+                    schema_rows = crawl_source(
+                        self.snowflake_service,
+                        database_name,
+                        source,
+                        schema_name=schema_name,
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f"Inventory crawl of {source} in {database_name}.{schema_name} failed: {e}"
+                    )
+                    errors.append(f"{database_name}.{schema_name}.{source}: {e}")
+                    continue
+            rows_written += self.store.apply_batch(
+                database_name,
+                source,
+                object_types,
+                schema_rows,
+                replace=True,
+                schema_name=schema_name,
+            )
+        return rows_written
+
+    def refresh_in_background(self) -> bool:
+        """Start an incremental refresh unless one is already running."""
+        # Taken here rather than in the thread, so concurrent searches start one
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+
+        def run():
+            try:
+                self._refresh(full=False)
+            except Exception as e:
+                logger.warning(f"Background inventory refresh failed: {e}")
+            finally:
+                self._refresh_lock.release()
+
+        threading.Thread(target=run, name="inventory-refresh", daemon=True).start()
+        return True
+
+    def search(self, **kwargs) -> dict[str, Any]:
+        if self.last_refresh is None:
+            # Warm-up: nothing to serve yet
+            with self._refresh_lock:
+                # Another search may have warmed up while this one waited
+                if self.last_refresh is None:
+                    self._refresh(full=False)
+        elif self.is_stale():
+            self.refresh_in_background()
+        return {
+            "results": self.store.search(**kwargs),
+            "last_refresh": self.store.get_metadata("last_refresh"),
+            "refreshing": self._refresh_lock.locked(),
+        }
+
+
+def _upper(name: Optional[str]) -> str:
+    return (name or "").upper()
+
+
+def get_default_inventory_path(snowflake_service) -> str:
+    connection_params = snowflake_service.connection_params or {}
+    account = (
+        connection_params.get("account")
+        or connection_params.get("connection_name")
+        or "default"
+    )
+    return str(
+        Path("~/.cache/mcp-server-snowflake").expanduser()
+        / f"inventory_{sanitize_tool_name(account)}.sqlite3"
+    )
+
+
+def initialize_inventory_tools(server: FastMCP, snowflake_service):
+    config = snowflake_service.inventory_config
+    inventory = Inventory(
+        snowflake_service,
+        path=config.get("path") or get_default_inventory_path(snowflake_service),
+        refresh_interval_seconds=config.get(
+            "refresh_interval_seconds", DEFAULT_REFRESH_INTERVAL_SECONDS
+        ),
+        max_workers=config.get("max_workers", DEFAULT_MAX_WORKERS),
+        exclude_databases=config.get("exclude_databases"),
+    )
+
+    @cached_tool(
+        server,
+        name="search_inventory",
+        description=search_inventory_prompt,
+    )
+    def search_inventory_tool(
+        query: Annotated[
+            str | None,
+            Field(
+                description="Case-insensitive keyword matched against object names and comments.",
+                default=None,
+            ),
+        ] = None,
+        object_type: Annotated[
+            Literal["database", "schema", "table", "view", "stage", "semantic_view"]
+            | None,
+            Field(description="Optional object type to filter by.", default=None),
+        ] = None,
+        database_name: Annotated[
+            str | None,
+            Field(description="Optional database to search in.", default=None),
+        ] = None,
+        schema_name: Annotated[
+            str | None,
+            Field(description="Optional schema to search in.", default=None),
+        ] = None,
+        limit: Annotated[
+            int,
+            Field(description="Maximum number of objects to return.", ge=1, le=1000),
+        ] = 50,
+    ):
+        return inventory.search(
+            query=query,
+            object_type=object_type,
+            database_name=database_name,
+            schema_name=schema_name,
+            limit=limit,
+        )
+
+    @cached_tool(
+        server,
+        name="refresh_inventory",
+        description=refresh_inventory_prompt,
+    )
+    def refresh_inventory_tool(
+        full: Annotated[
+            bool,
+            Field(
+                description="Re-crawl everything instead of only objects changed since the last refresh. Needed to drop objects deleted inside existing databases."
+            ),
+        ] = False,
+    ):
+        return inventory.refresh(full=full)
+
+    @server.resource("inventory://summary")
+    async def get_inventory_summary():
+        """
+        Snowflake Object Inventory Summary.
+
+        Object counts per database and type in the local inventory snapshot.
+        """
+        return inventory.store.summary()
+
+    return inventory
@@ -0,0 +1,401 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import functools
+import inspect
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+METRICS_RESOURCE_URI = "metrics://snowflake-mcp/prometheus"
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds, from sub-millisecond parsing to long queries
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+# Phases of a tool call. Phases recorded inside the tool function, such as
+# execute and fetch, are also part of the time between validation and
+# serialization, and a tool may record a phase several times.
+PHASES = (
+    "middleware",
+    "admission",
+    "validation",
+    "parse",
+    "connection",
+    "execute",
+    "fetch",
+    "cortex_http",
+    "serialization",
+)
+
+NO_STATEMENT_TYPE = "none"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """
+    Thread-safe cumulative histogram with labels, rendered in Prometheus format.
+
+    Parameters
+    ----------
+    name : str
+        Metric name
+    documentation : str
+        Help text
+    label_names : Sequence[str]
+        Names of the labels every observation is made with
+    buckets : Sequence[float], default=DEFAULT_BUCKETS
+        Ascending bucket upper bounds. +Inf is added automatically.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # Per label values: bucket counts (not cumulative), sum and count
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values: Tuple[str, ...], value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [
+                    [0] * (len(self.buckets) + 1),
+                    0.0,
+                    0,
+                ]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def get_sample(self, label_values: Tuple[str, ...]) -> Optional[Tuple[float, int]]:
+        """Return the sum and count observed with the given labels."""
+        with self._lock:
+            series = self._series.get(label_values)
+            return (series[1], series[2]) if series else None
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted(
+                (labels, list(counts), total, count)
+                for labels, (counts, total, count) in self._series.items()
+            )
+        for label_values, counts, total, count in series:
+            labels = ",".join(
+                f'{name}="{_escape_label_value(value)}"'
+                for name, value in zip(self.label_names, label_values)
+            )
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                separator = "," if labels else ""
+                lines.append(
+                    f'{self.name}_bucket{{{labels}{separator}le="{_format_value(bound)}"}} '
+                    f"{cumulative}"
+                )
+            lines.append(f"{self.name}_sum{{{labels}}} {_format_value(total)}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+
+class Counter:
+    """
+    Thread-safe counter with labels, rendered in Prometheus format.
+
+    Parameters
+    ----------
+    name : str
+        Metric name, ending in _total
+    documentation : str
+        Help text
+    label_names : Sequence[str]
+        Names of the labels every increment is made with
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values: Tuple[str, ...], amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def get(self, label_values: Tuple[str, ...]) -> float:
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            labels = ",".join(
+                f'{name}="{_escape_label_value(label)}"'
+                for name, label in zip(self.label_names, label_values)
+            )
+            lines.append(f"{self.name}{{{labels}}} {_format_value(value)}")
+        return lines
+
+
+class ToolCallTimer:
+    """
+    Timings collected during a single tool call.
+
+    With a tracer, each timed phase is also recorded as a child span of the
+    current span.
+    """
+
+    __slots__ = (
+        "tool_name",
+        "statement_type",
+        "tracer",
+        "query_ids",
+        "phases",
+        "tool_start",
+        "tool_end",
+        "function_start",
+        "function_end",
+        "_lock",
+    )
+
+    def __init__(self, tool_name: str, tracer: Any = None):
+        self.tool_name = tool_name
+        self.statement_type = NO_STATEMENT_TYPE
+        self.tracer = tracer
+        self.query_ids: List[str] = []
+        self.phases: Dict[str, float] = {}
+        self.tool_start: Optional[float] = None
+        self.tool_end: Optional[float] = None
+        self.function_start: Optional[float] = None
+        self.function_end: Optional[float] = None
+        # Thread pools of a tool call add phases concurrently
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+_current_timer: ContextVar[Optional[ToolCallTimer]] = ContextVar(
+    "snowflake_mcp_tool_call_timer", default=None
+)
+
+
+def get_current_timer() -> Optional[ToolCallTimer]:
+    return _current_timer.get()
+
+
+@contextmanager
+def start_tool_call(tool_name: str, tracer: Any = None) -> Iterator[ToolCallTimer]:
+    """Collect phases recorded in this context into a new timer."""
+    timer = ToolCallTimer(tool_name, tracer)
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+
+
+@contextmanager
+def time_phase(phase: str) -> Iterator[None]:
+    """Add the time spent in the block to a phase of the current tool call."""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        if timer.tracer is None:
+            yield
+        else:
+            with timer.tracer.start_as_current_span(phase):
+                yield
+    finally:
+        timer.add(phase, time.perf_counter() - start)
+
+
+def record_query_id(query_id: Optional[str]) -> None:
+    """Attach a Snowflake query id to the current tool call and span."""
+    timer = _current_timer.get()
+    if timer is None or not isinstance(query_id, str):
+        return
+    timer.query_ids.append(query_id)
+    if timer.tracer is not None:
+        from opentelemetry import trace
+
+        trace.get_current_span().set_attribute("snowflake.query_id", query_id)
+
+
+def record_statement_type(statement_type: str) -> None:
+    """Label the current tool call's metrics with a SQL statement type."""
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.statement_type = statement_type
+
+
+def instrument_tool_function(fn: Callable) -> Callable:
+    """
+    Wrap a tool function to record when it starts and returns.
+
+    The time between tool execution starting and the function being called
+    is argument validation, and the time after it returns is serialization.
+    The wrapper keeps the function's signature, so tool schemas are unchanged.
+    """
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            timer = _current_timer.get()
+            if timer is None:
+                return await fn(*args, **kwargs)
+            timer.function_start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                timer.function_end = time.perf_counter()
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        timer = _current_timer.get()
+        if timer is None:
+            return fn(*args, **kwargs)
+        timer.function_start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            timer.function_end = time.perf_counter()
+
+    return wrapper
+
+
+class ToolMetrics:
+    """
+    Latency histograms of tool calls, labelled by tool and statement type, and
+    counts of coalesced and cancelled calls.
+
+    Parameters
+    ----------
+    buckets : Sequence[float], default=DEFAULT_BUCKETS
+        Histogram bucket upper bounds in seconds
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.calls = Histogram(
+            "snowflake_mcp_tool_call_seconds",
+            "Duration of MCP tool calls.",
+            ("tool", "statement_type", "status"),
+            buckets,
+        )
+        self.phases = Histogram(
+            "snowflake_mcp_tool_phase_seconds",
+            "Time spent in each phase of MCP tool calls.",
+            ("tool", "statement_type", "phase"),
+            buckets,
+        )
+        self.coalesced = Counter(
+            "snowflake_mcp_coalesced_calls_total",
+            "Tool calls that shared the result of an identical call in flight.",
+            ("tool",),
+        )
+        self.cancelled = Counter(
+            "snowflake_mcp_cancelled_calls_total",
+            "Tool calls cancelled by the client, and their statements aborted.",
+            ("tool",),
+        )
+
+    def observe_call(self, timer: ToolCallTimer, seconds: float, status: str) -> None:
+        """Record a finished tool call and the phases collected by its timer."""
+        labels = (timer.tool_name, timer.statement_type)
+        phases = dict(timer.phases)
+        if timer.tool_start is not None and timer.tool_end is not None:
+            # Time queued for admission is reported as its own phase
+            phases["middleware"] = max(
+                seconds
+                - (timer.tool_end - timer.tool_start)
+                - phases.get("admission", 0.0),
+                0.0,
+            )
+            if timer.function_start is not None:
+                phases["validation"] = timer.function_start - timer.tool_start
+            if timer.function_end is not None:
+                phases["serialization"] = timer.tool_end - timer.function_end
+        self.calls.observe((*labels, status), seconds)
+        for phase, phase_seconds in phases.items():
+            self.phases.observe((*labels, phase), phase_seconds)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        return (
+            "\n".join(
+                [
+                    *self.calls.render(),
+                    *self.phases.render(),
+                    *self.coalesced.render(),
+                    *self.cancelled.render(),
+                ]
+            )
+            + "\n"
+        )
+
+
+# Metrics of every tool call served by this process
+TOOL_METRICS = ToolMetrics()
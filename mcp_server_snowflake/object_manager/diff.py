@@ -0,0 +1,259 @@
+import re
+from typing import Any, Literal, get_args, get_origin
+
+from pydantic import BaseModel, Field
+
+from mcp_server_snowflake.object_manager.objects import SnowflakeObject
+
+# Properties that locate an object rather than describe it. They are never
+# part of a diff because changing them means addressing a different object.
+IDENTITY_FIELDS = frozenset({"name", "database_name", "schema_name"})
+
+
+class PropertyChange(BaseModel):
+    field: str = Field(description="The property that differs")
+    current: Any = Field(default=None, description="Value currently in Snowflake")
+    desired: Any = Field(default=None, description="Value requested by the caller")
+
+
+class ObjectDiff(BaseModel):
+    object_type: str
+    name: str
+    action: Literal["create", "alter", "none"]
+    changes: list[PropertyChange] = []
+
+    @property
+    def has_changes(self) -> bool:
+        return self.action != "none"
+
+
+def _is_literal_field(snowflake_object: SnowflakeObject, field_name: str) -> bool:
+    field = type(snowflake_object).model_fields.get(field_name)
+    if field is None:
+        return False
+    annotation = field.annotation
+    if get_origin(annotation) is Literal:
+        return True
+    # Optional[Literal[...]] and friends
+    return any(get_origin(arg) is Literal for arg in get_args(annotation))
+
+
+def _normalize_enum(value: Any) -> Any:
+    """Normalize enum-like values so "X-SMALL", "XSMALL" and "xsmall" compare equal."""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, str):
+        return value.upper().replace("-", "").replace("_", "")
+    return value
+
+
+def _normalize_scalar(value: Any) -> Any:
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, str) and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    return value
+
+
+# Snowflake data type synonyms mapped to the type fetch() reports, with the
+# parameters Snowflake fills in when the caller omits them.
+# {synonym: (canonical type, default parameters)}
+_DATATYPE_SYNONYMS = {
+    **{
+        name: ("NUMBER", (38, 0))
+        for name in (
+            "NUMBER",
+            "DECIMAL",
+            "DEC",
+            "NUMERIC",
+            "INT",
+            "INTEGER",
+            "BIGINT",
+            "SMALLINT",
+            "TINYINT",
+            "BYTEINT",
+        )
+    },
+    **{
+        name: ("FLOAT", ())
+        for name in ("FLOAT", "FLOAT4", "FLOAT8", "DOUBLE", "DOUBLE PRECISION", "REAL")
+    },
+    **{
+        name: ("VARCHAR", (16777216,))
+        for name in (
+            "VARCHAR",
+            "STRING",
+            "TEXT",
+            "NVARCHAR",
+            "NVARCHAR2",
+            "CHAR VARYING",
+            "NCHAR VARYING",
+        )
+    },
+    **{name: ("VARCHAR", (1,)) for name in ("CHAR", "CHARACTER", "NCHAR")},
+    **{name: ("BINARY", (8388608,)) for name in ("BINARY", "VARBINARY")},
+    "TIME": ("TIME", (9,)),
+    **{
+        name: ("TIMESTAMP_NTZ", (9,))
+        for name in (
+            "TIMESTAMP",
+            "DATETIME",
+            "TIMESTAMP_NTZ",
+            "TIMESTAMPNTZ",
+            "TIMESTAMP WITHOUT TIME ZONE",
+        )
+    },
+    **{
+        name: ("TIMESTAMP_LTZ", (9,))
+        for name in ("TIMESTAMP_LTZ", "TIMESTAMPLTZ", "TIMESTAMP WITH LOCAL TIME ZONE")
+    },
+    **{
+        name: ("TIMESTAMP_TZ", (9,))
+        for name in ("TIMESTAMP_TZ", "TIMESTAMPTZ", "TIMESTAMP WITH TIME ZONE")
+    },
+}
+
+_DATATYPE_PATTERN = re.compile(r"^([A-Z_0-9 ]+?)\s*(?:\((.*)\))?$")
+
+
+def _normalize_datatype(value: Any) -> str:
+    """
+    Normalize a column data type so synonyms and defaults compare equal.
+
+    INT and NUMBER(38,0), VARCHAR and VARCHAR(16777216), or DECIMAL(10) and
+    NUMBER(10,0) all normalize to the same string. TIMESTAMP is treated as
+    TIMESTAMP_NTZ, the default TIMESTAMP_TYPE_MAPPING. Unknown types are only
+    uppercased.
+    """
+    text = " ".join(str(value).upper().split())
+    match = _DATATYPE_PATTERN.match(text)
+    if match is None or match.group(1) not in _DATATYPE_SYNONYMS:
+        return text
+    name, defaults = _DATATYPE_SYNONYMS[match.group(1)]
+    try:
+        params = [
+            int(param) for param in (match.group(2) or "").split(",") if param.strip()
+        ]
+    except ValueError:
+        return text
+    # Omitted trailing parameters take their defaults, e.g. NUMBER(10) is NUMBER(10,0)
+    params += defaults[len(params) :]
+    return f"{name}({','.join(map(str, params))})" if params else name
+
+
+def _list_matches(desired: list, current: Any) -> bool:
+    """
+    Compare list properties such as table columns.
+
+    Each desired element is matched by name against the current elements and only
+    the keys the caller set are compared. Datatypes are compared after normalizing
+    synonyms and default parameters.
+    """
+    if not isinstance(current, list) or len(current) != len(desired):
+        return False
+    current_by_name = {
+        str(item.get("name", "")).upper(): item
+        for item in current
+        if isinstance(item, dict)
+    }
+    for item in desired:
+        if not isinstance(item, dict):
+            return False
+        existing = current_by_name.get(str(item.get("name", "")).upper())
+        if existing is None:
+            return False
+        for key, value in item.items():
+            if value is None or key == "name":
+                continue
+            other = existing.get(key)
+            if key == "datatype":
+                if _normalize_datatype(value) != _normalize_datatype(other):
+                    return False
+            elif _normalize_scalar(value) != _normalize_scalar(other):
+                return False
+    return True
+
+
+def values_match(
+    snowflake_object: SnowflakeObject, field_name: str, desired: Any, current: Any
+) -> bool:
+    """Return True when a desired property value is already satisfied."""
+    if isinstance(desired, list):
+        return _list_matches(desired, current)
+    if _is_literal_field(snowflake_object, field_name):
+        return _normalize_enum(desired) == _normalize_enum(current)
+    return _normalize_scalar(desired) == _normalize_scalar(current)
+
+
+def get_desired_properties(snowflake_object: SnowflakeObject) -> dict[str, Any]:
+    """Properties explicitly set by the caller, excluding identity fields and None."""
+    data = snowflake_object.model_dump(exclude_unset=True)
+    return {
+        key: value
+        for key, value in data.items()
+        if value is not None and key not in IDENTITY_FIELDS
+    }
+
+
+def diff_object(
+    snowflake_object: SnowflakeObject,
+    current: dict[str, Any] | None,
+    object_type: str,
+    desired: dict[str, Any] | None = None,
+) -> ObjectDiff:
+    """
+    Compute the property delta between a desired object and its current state.
+
+    Parameters
+    ----------
+    snowflake_object : SnowflakeObject
+        The desired state as passed to the tool
+    current : dict | None
+        The current state as returned by ``fetch().to_dict()`` or a SHOW row,
+        or None if the object does not exist
+    object_type : str
+        Display name of the object type used in the result
+    desired : dict, optional
+        Precomputed desired properties, by default derived from snowflake_object
+
+    Returns
+    -------
+    ObjectDiff
+        Structured diff with action "create", "alter" or "none"
+    """
+    if desired is None:
+        desired = get_desired_properties(snowflake_object)
+
+    if current is None:
+        return ObjectDiff(
+            object_type=object_type,
+            name=snowflake_object.name,
+            action="create",
+            changes=[
+                PropertyChange(field=key, current=None, desired=value)
+                for key, value in desired.items()
+            ],
+        )
+
+    changes = []
+    for key, value in desired.items():
+        if key not in current:
+            # Property is not reported by Snowflake so we cannot prove it is
+            # unchanged. Leave it to the ALTER to reconcile.
+            changes.append(PropertyChange(field=key, current=None, desired=value))
+        elif not values_match(snowflake_object, key, value, current[key]):
+            changes.append(
+                PropertyChange(field=key, current=current[key], desired=value)
+            )
+
+    return ObjectDiff(
+        object_type=object_type,
+        name=snowflake_object.name,
+        action="alter" if changes else "none",
+        changes=changes,
+    )
@@ -0,0 +1,433 @@
+import json
+import threading
+from typing import Any, Callable, Literal
+
+from pydantic import BaseModel, Field, model_validator
+
+from mcp_server_snowflake.object_manager.diff import ObjectDiff, diff_object
+from mcp_server_snowflake.object_manager.objects import (
+    SnowflakeDatabase,
+    SnowflakeSchema,
+    SnowflakeTable,
+    SnowflakeWarehouse,
+)
+from mcp_server_snowflake.object_manager.registry import (
+    get_model_spec,
+    get_object_spec,
+)
+from mcp_server_snowflake.utils import (
+    ContextThreadPoolExecutor,
+    SnowflakeException,
+    execute_query,
+)
+
+# Maximum number of concurrent SHOW queries and DDL statements
+DEFAULT_MAX_WORKERS = 8
+
+# Columns of the tables in some schemas of a database, bound to
+# <database>.INFORMATION_SCHEMA.COLUMNS and the upper-cased schema names
+TABLE_COLUMNS_STATEMENT = """
+SELECT
+    table_schema,
+    table_name,
+    column_name,
+    data_type,
+    character_maximum_length,
+    numeric_precision,
+    numeric_scale,
+    datetime_precision,
+    is_nullable,
+    comment
+FROM identifier(?)
+WHERE UPPER(table_schema) IN ({schemas})
+ORDER BY table_schema, table_name, ordinal_position
+"""
+
+
+class DesiredState(BaseModel):
+    databases: list[SnowflakeDatabase] = Field(
+        default_factory=list, description="Databases that should exist"
+    )
+    schemas: list[SnowflakeSchema] = Field(
+        default_factory=list, description="Schemas that should exist"
+    )
+    tables: list[SnowflakeTable] = Field(
+        default_factory=list, description="Tables that should exist"
+    )
+    warehouses: list[SnowflakeWarehouse] = Field(
+        default_factory=list, description="Warehouses that should exist"
+    )
+
+    @model_validator(mode="before")
+    @classmethod
+    def parse_json_string(cls, data):
+        """Some LLMs pass the whole document as a JSON string."""
+        if isinstance(data, str):
+            try:
+                return json.loads(data)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON string: {e}")
+        return data
+
+
+class PlanStep(BaseModel):
+    stage: int = Field(description="Objects in lower stages are applied first")
+    fully_qualified_name: str
+    diff: ObjectDiff
+    status: Literal["pending", "unchanged", "applied", "skipped", "failed"]
+    error: str | None = None
+
+
+class ObjectPlan(BaseModel):
+    steps: list[PlanStep] = []
+
+    @property
+    def summary(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for step in self.steps:
+            counts[step.diff.action] = counts.get(step.diff.action, 0) + 1
+        return counts
+
+
+def _upper(name: str | None) -> str:
+    return (name or "").upper()
+
+
+def _kind_from_options(row: dict) -> str:
+    return "TRANSIENT" if "TRANSIENT" in _upper(row.get("options")) else "PERMANENT"
+
+
+# SHOW output columns do not match the pydantic model fields one to one, so each
+# object type maps its SHOW row into the shape expected by diff_object.
+def _database_state(row: dict) -> dict[str, Any]:
+    return {
+        "name": row.get("name"),
+        "kind": _kind_from_options(row),
+        "comment": row.get("comment"),
+        "data_retention_time_in_days": row.get("retention_time"),
+    }
+
+
+def _schema_state(row: dict) -> dict[str, Any]:
+    return {
+        "name": row.get("name"),
+        "kind": _kind_from_options(row),
+        "comment": row.get("comment"),
+        "data_retention_time_in_days": row.get("retention_time"),
+    }
+
+
+def _table_state(row: dict) -> dict[str, Any]:
+    return {
+        "name": row.get("name"),
+        "kind": "TRANSIENT" if _upper(row.get("kind")) == "TRANSIENT" else "PERMANENT",
+        "comment": row.get("comment"),
+        "data_retention_time_in_days": row.get("retention_time"),
+    }
+
+
+def _column_datatype(row: dict) -> str:
+    """Render an INFORMATION_SCHEMA data type the way fetch() reports it."""
+    data_type = _upper(row.get("data_type"))
+    if data_type == "NUMBER":
+        return f"NUMBER({row.get('numeric_precision')},{row.get('numeric_scale')})"
+    if data_type == "TEXT":
+        return f"VARCHAR({row.get('character_maximum_length')})"
+    if data_type == "BINARY":
+        return f"BINARY({row.get('character_maximum_length')})"
+    if data_type in ("TIME", "TIMESTAMP_LTZ", "TIMESTAMP_NTZ", "TIMESTAMP_TZ"):
+        return f"{data_type}({row.get('datetime_precision')})"
+    return data_type
+
+
+def _column_state(row: dict) -> dict[str, Any]:
+    return {
+        "name": row.get("column_name"),
+        "datatype": _column_datatype(row),
+        "nullable": _upper(row.get("is_nullable")) == "YES",
+        "comment": row.get("comment"),
+    }
+
+
+def _warehouse_state(row: dict) -> dict[str, Any]:
+    return {
+        "name": row.get("name"),
+        "warehouse_type": row.get("type"),
+        "warehouse_size": row.get("size"),
+        "auto_suspend": row.get("auto_suspend"),
+        "auto_resume": row.get("auto_resume"),
+        "min_cluster_count": row.get("min_cluster_count"),
+        "max_cluster_count": row.get("max_cluster_count"),
+        "scaling_policy": row.get("scaling_policy"),
+        "comment": row.get("comment"),
+    }
+
+
+def _run_concurrently(
+    tasks: list[Callable[[], Any]], max_workers: int = DEFAULT_MAX_WORKERS
+) -> list[Any]:
+    if not tasks:
+        return []
+    if len(tasks) == 1:
+        return [tasks[0]()]
+    with ContextThreadPoolExecutor(
+        max_workers=min(max_workers, len(tasks))
+    ) as executor:
+        return list(executor.map(lambda task: task(), tasks))
+
+
+def fetch_current_state(
+    snowflake_service,
+    desired: DesiredState,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> dict[tuple[str, ...], dict[str, Any]]:
+    """
+    Fetch the current state of every object in a desired-state document.
+
+    Uses one SHOW query per object type and database instead of one fetch per
+    object, and one INFORMATION_SCHEMA.COLUMNS query per database for tables
+    whose columns are given. Containers that do not exist yet are not queried.
+
+    Returns
+    -------
+    dict
+        Current state keyed by (object type, upper-cased name parts)
+    """
+    state: dict[tuple[str, ...], dict[str, Any]] = {}
+
+    top_level = []
+    if desired.warehouses:
+        top_level.append(("warehouse", "SHOW WAREHOUSES"))
+    if desired.databases or desired.schemas or desired.tables:
+        top_level.append(("database", "SHOW DATABASES"))
+
+    results = _run_concurrently(
+        [
+            lambda statement=statement: execute_query(statement, snowflake_service)
+            for _, statement in top_level
+        ],
+        max_workers,
+    )
+    for (object_type, _), rows in zip(top_level, results):
+        for row in rows:
+            if object_type == "warehouse":
+                state[("warehouse", _upper(row["name"]))] = _warehouse_state(row)
+            else:
+                state[("database", _upper(row["name"]))] = _database_state(row)
+
+    # Only look inside databases that already exist
+    database_names = {
+        _upper(obj.database_name): obj.database_name
+        for obj in [*desired.schemas, *desired.tables]
+    }
+    column_schemas: dict[str, set[str]] = {}
+    for table in desired.tables:
+        if table.columns is not None:
+            column_schemas.setdefault(_upper(table.database_name), set()).add(
+                _upper(table.schema_name)
+            )
+    # (object type, database key, statement, bind variables)
+    scoped = []
+    for key in sorted(database_names):
+        if ("database", key) not in state:
+            continue
+        # SHOW statements only bind identifiers. The keyword comes from the registry.
+        for object_type, objects in (
+            ("schema", desired.schemas),
+            ("table", desired.tables),
+        ):
+            if objects:
+                keyword = get_object_spec(object_type).show_keyword
+                scoped.append(
+                    (
+                        object_type,
+                        key,
+                        f"SHOW {keyword} IN DATABASE identifier(?)",
+                        [database_names[key]],
+                    )
+                )
+        schemas = sorted(column_schemas.get(key, ()))
+        if schemas:
+            scoped.append(
+                (
+                    "column",
+                    key,
+                    TABLE_COLUMNS_STATEMENT.format(
+                        schemas=", ".join("?" for _ in schemas)
+                    ),
+                    [f"{database_names[key]}.INFORMATION_SCHEMA.COLUMNS", *schemas],
+                )
+            )
+
+    results = _run_concurrently(
+        [
+            lambda statement=statement, bindvars=bindvars: execute_query(
+                statement, snowflake_service, bindvars
+            )
+            for _, _, statement, bindvars in scoped
+        ],
+        max_workers,
+    )
+    columns: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+    for (object_type, database_name, _, _), rows in zip(scoped, results):
+        for row in rows:
+            if object_type == "schema":
+                key = ("schema", database_name, _upper(row["name"]))
+                state[key] = _schema_state(row)
+            elif object_type == "table":
+                key = (
+                    "table",
+                    database_name,
+                    _upper(row.get("schema_name")),
+                    _upper(row["name"]),
+                )
+                state[key] = _table_state(row)
+            else:
+                key = (
+                    "table",
+                    database_name,
+                    _upper(row.get("table_schema")),
+                    _upper(row.get("table_name")),
+                )
+                columns.setdefault(key, []).append(_column_state(row))
+    for key, table_columns in columns.items():
+        if key in state:
+            state[key]["columns"] = table_columns
+
+    return state
+
+
+def _object_keys(desired: DesiredState) -> list[tuple[int, tuple[str, ...], Any]]:
+    """Return (stage, state key, spec) for every object in dependency order."""
+    keys = []
+    for obj in desired.warehouses:
+        keys.append((0, ("warehouse", _upper(obj.name)), obj))
+    for obj in desired.databases:
+        keys.append((0, ("database", _upper(obj.name)), obj))
+    for obj in desired.schemas:
+        keys.append((1, ("schema", _upper(obj.database_name), _upper(obj.name)), obj))
+    for obj in desired.tables:
+        key = (
+            "table",
+            _upper(obj.database_name),
+            _upper(obj.schema_name),
+            _upper(obj.name),
+        )
+        keys.append((2, key, obj))
+    return keys
+
+
+def _build_plan(
+    snowflake_service,
+    desired: DesiredState,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> list[tuple[PlanStep, tuple[str, ...], Any]]:
+    try:
+        current = fetch_current_state(snowflake_service, desired, max_workers)
+    except Exception as e:
+        raise SnowflakeException(tool="plan_objects", message=str(e))
+
+    planned = []
+    for stage, key, obj in _object_keys(desired):
+        diff = diff_object(
+            obj, current.get(key), object_type=get_model_spec(obj).display_name
+        )
+        step = PlanStep(
+            stage=stage,
+            fully_qualified_name=".".join(key[1:]),
+            diff=diff,
+            status="pending" if diff.has_changes else "unchanged",
+        )
+        planned.append((step, key, obj))
+    return planned
+
+
+def _parent_keys(key: tuple[str, ...]) -> list[tuple[str, ...]]:
+    if key[0] == "schema":
+        return [("database", key[1])]
+    if key[0] == "table":
+        return [("database", key[1]), ("schema", key[1], key[2])]
+    return []
+
+
+def plan_objects(
+    snowflake_service,
+    desired: DesiredState,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> ObjectPlan:
+    """
+    Compute the changes needed to bring Snowflake to the desired state.
+
+    Table columns are compared with INFORMATION_SCHEMA.COLUMNS. Other
+    properties that SHOW does not report are planned as changes, and verified
+    against a full fetch when the plan is applied.
+    """
+    planned = _build_plan(snowflake_service, desired, max_workers)
+    return ObjectPlan(steps=[step for step, _, _ in planned])
+
+
+def apply_objects(
+    snowflake_service,
+    desired: DesiredState,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> ObjectPlan:
+    """
+    Plan and apply a desired-state document.
+
+    Stages are applied in dependency order (warehouses and databases, then
+    schemas, then tables) and the steps within a stage run concurrently, each
+    worker thread with its own Root over the service's connection. Steps whose
+    parent database or schema failed are skipped.
+    """
+    # Imported here to avoid a circular import with tools.py
+    from mcp_server_snowflake.object_manager.tools import (
+        create_object,
+        create_or_alter_object,
+    )
+
+    planned = _build_plan(snowflake_service, desired, max_workers)
+    snowflake_service._ensure_connected()
+    roots = threading.local()
+    failed: set[tuple[str, ...]] = set()
+
+    def get_root():
+        # snowflake.core does not document Root and its resource collections
+        # as thread-safe, so workers do not share one
+        root = getattr(roots, "root", None)
+        if root is None:
+            from snowflake.core import Root
+
+            root = roots.root = Root(snowflake_service.connection)
+        return root
+
+    def apply_step(step: PlanStep, obj) -> None:
+        try:
+            if step.diff.action == "create":
+                create_object(obj, get_root(), mode="if_not_exists")
+            else:
+                # Re-checks the full object so properties missing from SHOW
+                # output only trigger DDL when they really differ
+                create_or_alter_object(obj, get_root())
+            step.status = "applied"
+        except Exception as e:
+            step.status = "failed"
+            step.error = str(e)
+
+    for stage in sorted({step.stage for step, _, _ in planned}):
+        tasks = []
+        for step, key, obj in planned:
+            if step.stage != stage or step.status != "pending":
+                continue
+            if any(parent in failed for parent in _parent_keys(key)):
+                step.status = "skipped"
+                step.error = "A parent object failed to apply."
+                continue
+            tasks.append(lambda step=step, obj=obj: apply_step(step, obj))
+        _run_concurrently(tasks, max_workers)
+        failed.update(
+            key
+            for step, key, _ in planned
+            if step.stage == stage and step.status in ("failed", "skipped")
+        )
+
+    return ObjectPlan(steps=[step for step, _, _ in planned])
@@ -1,2 +1,12 @@
 def get_object_mgmt_prompt(action: str, object_types: list[str]):
     return f"""Generic tool to {action.lower()} a Snowflake object including {", ".join(object_types)}."""
+
+
+def object_plan_prompt(action: str):
+    if action == "plan":
+        return """Plan changes for a set of databases, schemas, tables, and warehouses without applying them.
+Current state is read with a few batched SHOW queries. Returns, per object, whether it would be created, altered, or left unchanged and which properties differ.
+Use before create_or_alter_objects to review changes."""
+    return """Create or alter a set of databases, schemas, tables, and warehouses to match a desired state.
+Objects already in the desired state are left untouched. Changes are applied concurrently in dependency order (databases and warehouses, then schemas, then tables).
+Prefer this tool over repeated create_or_alter_object calls when managing many objects."""
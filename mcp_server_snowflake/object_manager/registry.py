@@ -0,0 +1,147 @@
+from dataclasses import dataclass
+from typing import Any, Callable, get_args
+
+from pydantic import BaseModel, TypeAdapter
+from snowflake.core import Root
+
+from mcp_server_snowflake.object_manager.objects import (
+    ObjectMetadata,
+    SnowflakeComputePool,
+    SnowflakeDatabase,
+    SnowflakeImageRepository,
+    SnowflakeRole,
+    SnowflakeSchema,
+    SnowflakeStage,
+    SnowflakeTable,
+    SnowflakeUser,
+    SnowflakeView,
+    SnowflakeWarehouse,
+    supported_objects,
+)
+
+
+@dataclass(frozen=True)
+class ObjectTypeSpec:
+    """
+    Everything the object manager tools need to know about one object type.
+
+    Attributes
+    ----------
+    object_type : str
+        Tool-facing object type, one of supported_objects
+    model : type[ObjectMetadata]
+        Pydantic model used for tool arguments
+    adapter : TypeAdapter
+        Prebuilt validator for the model
+    display_name : str
+        Name used in tool responses, such as "ComputePool"
+    show_keyword : str
+        Plural keyword used in SHOW statements, such as "compute pools"
+    scoped : bool
+        Whether SHOW accepts an IN ACCOUNT/DATABASE/SCHEMA clause
+    supports_limit : bool
+        Whether SHOW accepts a LIMIT clause
+    parents : tuple[str, ...]
+        Model fields naming the containers of the object
+    core_path : Callable
+        Resolves the snowflake.core collection for an object
+    """
+
+    object_type: str
+    model: type[ObjectMetadata]
+    adapter: TypeAdapter
+    display_name: str
+    show_keyword: str
+    scoped: bool
+    supports_limit: bool
+    parents: tuple[str, ...]
+    core_path: Callable[[ObjectMetadata, Root], Any]
+
+    def parse(self, target_object: Any) -> ObjectMetadata:
+        """Decode a tool argument into this type's model."""
+        if isinstance(target_object, self.model):
+            return target_object
+        if isinstance(target_object, (str, bytes)):
+            return self.adapter.validate_json(target_object)
+        if isinstance(target_object, BaseModel):
+            # FastMCP may have matched a different member of the union
+            target_object = target_object.model_dump(exclude_unset=True)
+        return self.adapter.validate_python(target_object)
+
+
+def _spec(
+    object_type: str,
+    model: type[ObjectMetadata],
+    display_name: str,
+    show_keyword: str,
+    scoped: bool,
+    supports_limit: bool,
+) -> ObjectTypeSpec:
+    parents = tuple(
+        field
+        for field in ("database_name", "schema_name")
+        if field in model.model_fields
+    )
+    return ObjectTypeSpec(
+        object_type=object_type,
+        model=model,
+        adapter=TypeAdapter(model),
+        display_name=display_name,
+        show_keyword=show_keyword,
+        scoped=scoped,
+        supports_limit=supports_limit,
+        parents=parents,
+        core_path=model.get_core_path,
+    )
+
+
+# Built once at import. Keyed by the values of supported_objects.
+OBJECT_REGISTRY: dict[str, ObjectTypeSpec] = {
+    spec.object_type: spec
+    for spec in (
+        _spec("database", SnowflakeDatabase, "Database", "databases", False, True),
+        _spec("schema", SnowflakeSchema, "Schema", "schemas", True, True),
+        _spec("table", SnowflakeTable, "Table", "tables", True, True),
+        _spec("view", SnowflakeView, "View", "views", True, True),
+        _spec("warehouse", SnowflakeWarehouse, "Warehouse", "warehouses", True, False),
+        _spec(
+            "compute_pool",
+            SnowflakeComputePool,
+            "ComputePool",
+            "compute pools",
+            False,
+            True,
+        ),
+        _spec("role", SnowflakeRole, "Role", "roles", False, False),
+        _spec("stage", SnowflakeStage, "Stage", "stages", True, False),
+        _spec("user", SnowflakeUser, "User", "users", False, True),
+        _spec(
+            "image_repository",
+            SnowflakeImageRepository,
+            "ImageRepository",
+            "image repositories",
+            True,
+            False,
+        ),
+    )
+}
+
+assert set(OBJECT_REGISTRY) == set(get_args(supported_objects)), (
+    "OBJECT_REGISTRY must cover every supported object type"
+)
+
+# Reverse lookup used when only the model instance is at hand
+_MODEL_REGISTRY: dict[type[ObjectMetadata], ObjectTypeSpec] = {
+    spec.model: spec for spec in OBJECT_REGISTRY.values()
+}
+
+
+def get_object_spec(object_type: str) -> ObjectTypeSpec:
+    try:
+        return OBJECT_REGISTRY[object_type]
+    except KeyError:
+        raise ValueError(f"Invalid object type: {object_type}")
+
+
+def get_model_spec(snowflake_object: ObjectMetadata) -> ObjectTypeSpec:
+    return _MODEL_REGISTRY[type(snowflake_object)]
@@ -1,32 +1,41 @@
-import json
 from typing import Annotated, Any, Literal, Union, get_args
 
+import sqlglot
 from fastmcp import FastMCP
 from pydantic import Field
 from snowflake.core import CreateMode, Root
+from snowflake.core.exceptions import NotFoundError
+from sqlglot import exp
 
+from mcp_server_snowflake.object_manager.diff import (
+    diff_object,
+    get_desired_properties,
+)
 from mcp_server_snowflake.object_manager.objects import (
-    SnowflakeComputePool,
-    SnowflakeDatabase,
-    SnowflakeImageRepository,
     SnowflakeObject,
-    SnowflakeRole,
-    SnowflakeSchema,
-    SnowflakeStage,
-    SnowflakeTable,
-    SnowflakeUser,
-    SnowflakeView,
-    SnowflakeWarehouse,
     supported_objects,
 )
+from mcp_server_snowflake.object_manager.plan import (
+    DesiredState,
+    apply_objects,
+    plan_objects,
+)
 from mcp_server_snowflake.object_manager.prompts import (
     get_object_mgmt_prompt,
+    object_plan_prompt,
+)
+from mcp_server_snowflake.object_manager.registry import (
+    OBJECT_REGISTRY,
+    get_model_spec,
+    get_object_spec,
+)
+from mcp_server_snowflake.tool_cache import cached_tool
+from mcp_server_snowflake.utils import (
+    SnowflakeException,
+    compile_sql_permissions,
+    execute_query,
+    execute_result_scan,
 )
-from mcp_server_snowflake.utils import SnowflakeException, execute_query
-
-
-def get_class_name(object_type: Any) -> str:
-    return object_type.__class__.__name__.removesuffix("Model")
 
 
 def create_object(
@@ -42,41 +51,74 @@ def create_object(
         create_mode = CreateMode.if_not_exists
     else:
         create_mode = CreateMode.if_not_exists
+    spec = get_model_spec(snowflake_object)
     core_object = snowflake_object.get_core_object()
-    core_path = snowflake_object.get_core_path(root=root)
+    core_path = spec.core_path(snowflake_object, root)
     try:
         core_path.create(core_object, mode=create_mode)
-        return f"Created {get_class_name(core_object)} {core_object.name}."
+        return f"Created {spec.display_name} {core_object.name}."
     except Exception as e:
         raise SnowflakeException(tool="create_object", message=str(e))
 
 
 def drop_object(snowflake_object: SnowflakeObject, root: Root, if_exists: bool = False):
+    spec = get_model_spec(snowflake_object)
     core_object = snowflake_object.get_core_object()
-    core_path = snowflake_object.get_core_path(root=root)
+    core_path = spec.core_path(snowflake_object, root)
     try:
         core_path[core_object.name].drop(if_exists=if_exists)
-        return f"Dropped {get_class_name(core_object)} {core_object.name}."
+        return f"Dropped {spec.display_name} {core_object.name}."
     except Exception as e:
         raise SnowflakeException(tool="drop_object", message=str(e))
 
 
 def create_or_alter_object(snowflake_object: SnowflakeObject, root: Root):
+    # Capture the caller's properties before get_core_object converts nested models
+    desired = get_desired_properties(snowflake_object)
+    spec = get_model_spec(snowflake_object)
     core_object = snowflake_object.get_core_object()
-    core_path = snowflake_object.get_core_path(root=root)
+    core_path = spec.core_path(snowflake_object, root)
+    object_type = spec.display_name
     try:
-        # First need to fetch the existing object
-        existing_object = core_path[core_object.name].fetch()
-
-        # Then update the existing object with the new properties
-        data = snowflake_object.model_dump(exclude_unset=True)
-        # Update only non-None values
-        for key, value in data.items():
-            if value is not None and hasattr(existing_object, key):
-                setattr(existing_object, key, value)
+        # First need to fetch the existing object, if any
+        try:
+            existing_object = core_path[core_object.name].fetch()
+        except NotFoundError:
+            existing_object = None
+
+        diff = diff_object(
+            snowflake_object,
+            existing_object.to_dict() if existing_object is not None else None,
+            object_type=object_type,
+            desired=desired,
+        )
+
+        # Skip the DDL round trip entirely when nothing has drifted
+        if not diff.has_changes:
+            return {
+                "message": f"{object_type} {core_object.name} is already in the desired state.",
+                **diff.model_dump(),
+            }
+
+        if existing_object is None:
+            core_path[core_object.name].create_or_alter(core_object)
+            return {
+                "message": f"Created {object_type} {core_object.name}.",
+                **diff.model_dump(),
+            }
+
+        # Then update the existing object with only the changed properties
+        for change in diff.changes:
+            if hasattr(existing_object, change.field):
+                setattr(
+                    existing_object, change.field, getattr(core_object, change.field)
+                )
         # Then create or alter the object
         core_path[core_object.name].create_or_alter(existing_object)
-        return f"Created or altered {get_class_name(core_object)} {core_object.name}."
+        return {
+            "message": f"Altered {object_type} {core_object.name}.",
+            **diff.model_dump(),
+        }
 
     except Exception as e:
         raise SnowflakeException(tool="create_or_alter_object", message=str(e))
@@ -84,13 +126,112 @@ def create_or_alter_object(snowflake_object: SnowflakeObject, root: Root):
 
 def describe_object(snowflake_object: SnowflakeObject, root: Root):
     core_object = snowflake_object.get_core_object()
-    core_path = snowflake_object.get_core_path(root=root)
+    core_path = get_model_spec(snowflake_object).core_path(snowflake_object, root)
     try:
         return core_path[core_object.name].fetch().to_dict()
     except Exception as e:
         raise SnowflakeException(tool="describe_object", message=str(e))
 
 
+# Expressions a list_objects filter may be built from
+SHOW_FILTER_NODES = (
+    exp.Column,
+    exp.Identifier,
+    exp.Literal,
+    exp.Boolean,
+    exp.Null,
+    exp.Paren,
+    exp.Neg,
+    exp.And,
+    exp.Or,
+    exp.Not,
+    exp.EQ,
+    exp.NEQ,
+    exp.GT,
+    exp.GTE,
+    exp.LT,
+    exp.LTE,
+    exp.Like,
+    exp.ILike,
+    exp.Escape,
+    exp.In,
+    exp.Between,
+    exp.Is,
+)
+
+# Scalar functions a list_objects filter may call, keyed by their Snowflake name.
+# Matched by expression class, since sqlglot's own names differ for some of them
+# (StartsWith is STARTS_WITH to sqlglot but STARTSWITH in Snowflake).
+SHOW_FILTER_FUNCTIONS = {
+    "LOWER": exp.Lower,
+    "UPPER": exp.Upper,
+    "TRIM": exp.Trim,
+    "LENGTH": exp.Length,
+    "COALESCE": exp.Coalesce,
+    "CONTAINS": exp.Contains,
+    "STARTSWITH": exp.StartsWith,
+    "ENDSWITH": exp.EndsWith,
+    "CURRENT_DATE": exp.CurrentDate,
+    "CURRENT_TIMESTAMP": exp.CurrentTimestamp,
+}
+
+
+def _quote_show_column(column: str) -> str:
+    """SHOW output columns are lowercase and must be quoted in a RESULT_SCAN."""
+    column = column.strip().strip('"').lower()
+    if not column or not all(c.isalnum() or c == "_" for c in column):
+        raise SnowflakeException(
+            tool="list_objects", message=f"Invalid column name: {column!r}"
+        )
+    return f'"{column}"'
+
+
+def _normalize_show_filter(where: str) -> str:
+    """
+    Validate a filter over SHOW output columns and quote its column references.
+
+    Only a single boolean expression over the SHOW result is allowed, built from
+    column references, literals, comparisons, boolean operators, LIKE, ILIKE,
+    IN, BETWEEN, IS NULL and the functions in SHOW_FILTER_FUNCTIONS. Anything
+    else, such as subqueries, SYSTEM$ functions or UDFs, is rejected.
+    """
+    try:
+        statements = sqlglot.parse(f"SELECT * FROM _show WHERE {where}", "snowflake")
+    except sqlglot.errors.ParseError as e:
+        raise SnowflakeException(tool="list_objects", message=f"Invalid where: {e}")
+
+    if len(statements) != 1 or not isinstance(statements[0], exp.Select):
+        raise SnowflakeException(
+            tool="list_objects", message="where must be a single filter expression."
+        )
+    select = statements[0]
+    if (
+        len(list(select.find_all(exp.Select))) != 1
+        or [table.name for table in select.find_all(exp.Table)] != ["_show"]
+        or select.args.get("where") is None
+    ):
+        raise SnowflakeException(
+            tool="list_objects",
+            message="where may only reference columns of the SHOW output.",
+        )
+
+    condition = select.args["where"].this
+    for node in condition.walk():
+        if isinstance(node, SHOW_FILTER_NODES):
+            continue
+        if isinstance(node, tuple(SHOW_FILTER_FUNCTIONS.values())):
+            continue
+        raise SnowflakeException(
+            tool="list_objects",
+            message=f"where may not contain {node.sql(dialect='snowflake')}.",
+        )
+
+    for column in condition.find_all(exp.Column):
+        column.set("this", exp.to_identifier(column.name.lower(), quoted=True))
+        column.set("table", None)
+    return condition.sql(dialect="snowflake")
+
+
 def list_objects(
     snowflake_service,
     object_type: supported_objects,
@@ -98,14 +239,13 @@ def list_objects(
     schema_name: str = None,
     like: str = None,
     starts_with: str = None,
+    columns: list[str] = None,
+    where: str = None,
+    limit: int = None,
 ):
     bindvars = []
-    if object_type == "image_repository":
-        object_name = "image repositories"
-    elif object_type == "compute_pool":
-        object_name = "compute pools"
-    else:
-        object_name = f"{object_type}s"
+    spec = get_object_spec(object_type)
+    object_name = spec.show_keyword
 
     # Note: SHOW statements do not support variable binding. String formatting is
     # safe here because object_type is restricted to a set of whitelisted values.
@@ -115,7 +255,7 @@ def list_objects(
         statement += " LIKE ?"
         bindvars.extend([f"%{like.replace('%', '')}%"])
 
-    if object_type in ["database", "compute_pool", "role", "user"]:
+    if not spec.scoped:
         pass
     elif database_name is None and schema_name is None:
         statement += " IN ACCOUNT"
@@ -139,8 +279,33 @@ def list_objects(
         sanitized_starts_with = starts_with.replace("'", "")
         statement += f" STARTS WITH '{sanitized_starts_with}'"
 
+    if limit is not None:
+        if not 1 <= int(limit) <= 1000:
+            raise SnowflakeException(
+                tool="list_objects", message="Limit must be between 1 and 1,000"
+            )
+        limit = int(limit)
+        # A filter must see every row, so only push the limit into SHOW without one
+        if spec.supports_limit and not where:
+            statement += f" LIMIT {limit}"
+
+    # Project and filter the SHOW output server-side so only needed data is fetched
+    projection = None
+    if columns or where or (limit is not None and not spec.supports_limit):
+        select_list = ", ".join(_quote_show_column(c) for c in columns or []) or "*"
+        projection = f"SELECT {select_list} FROM TABLE(RESULT_SCAN(?))"
+        if where:
+            projection += f" WHERE {_normalize_show_filter(where)}"
+        if limit is not None:
+            projection += f" LIMIT {limit}"
+
     try:
-        result = execute_query(statement, snowflake_service, bindvars)
+        if projection:
+            result = execute_result_scan(
+                statement, projection, snowflake_service, bindvars
+            )
+        else:
+            result = execute_query(statement, snowflake_service, bindvars)
 
         if len(result) > 0:
             return result[0:1000]  # Limit to 1000 results
@@ -151,45 +316,16 @@ def list_objects(
 
 
 def parse_object(target_object: Any, obj_type: supported_objects):
-    """Parse a string into a Pydantic model.
-    If the target_object is a string, parse it into a Pydantic model.
-    If the target_object is already a Pydantic model, return it.
+    """Parse a tool argument into a Pydantic model.
+    If the target_object is a string, decode it directly from JSON.
+    If the target_object is already the right Pydantic model, return it.
     This is to handle the case where the LLM passes the object as a JSON string.
     """
-    if isinstance(target_object, str):
-        try:
-            if obj_type == "database":
-                obj_type = SnowflakeDatabase
-            elif obj_type == "schema":
-                obj_type = SnowflakeSchema
-            elif obj_type == "table":
-                obj_type = SnowflakeTable
-            elif obj_type == "view":
-                obj_type = SnowflakeView
-            elif obj_type == "warehouse":
-                obj_type = SnowflakeWarehouse
-            elif obj_type == "compute_pool":
-                obj_type = SnowflakeComputePool
-            elif obj_type == "role":
-                obj_type = SnowflakeRole
-            elif obj_type == "stage":
-                obj_type = SnowflakeStage
-            elif obj_type == "user":
-                obj_type = SnowflakeUser
-            elif obj_type == "image_repository":
-                obj_type = SnowflakeImageRepository
-            else:
-                raise ValueError(f"Invalid object type: {obj_type}")
-            parsed_data = json.loads(target_object)
-            return obj_type(**parsed_data)
-        except Exception as e:
-            raise e
-    else:
-        return target_object
+    return get_object_spec(obj_type).parse(target_object)
 
 
 def initialize_object_manager_tools(server: FastMCP, snowflake_service):
-    supported_objects_list = list(get_args(supported_objects))
+    supported_objects_list = list(OBJECT_REGISTRY)
     object_type_annotation = Annotated[
         supported_objects,
         Field(
@@ -207,7 +343,8 @@ def initialize_object_manager_tools(server: FastMCP, snowflake_service):
         ),
     ]
 
-    @server.tool(
+    @cached_tool(
+        server,
         name="create_object",
         description=get_object_mgmt_prompt("create", supported_objects_list),
     )
@@ -223,7 +360,8 @@ def initialize_object_manager_tools(server: FastMCP, snowflake_service):
         snowflake_service._ensure_connected()
         return create_object(target_object, snowflake_service.root, mode)
 
-    @server.tool(
+    @cached_tool(
+        server,
         name="drop_object",
         description=get_object_mgmt_prompt("drop", supported_objects_list),
     )
@@ -236,7 +374,8 @@ def initialize_object_manager_tools(server: FastMCP, snowflake_service):
         snowflake_service._ensure_connected()
         return drop_object(target_object, snowflake_service.root, if_exists)
 
-    @server.tool(
+    @cached_tool(
+        server,
         name="create_or_alter_object",
         description=get_object_mgmt_prompt("create_or_alter", supported_objects_list),
     )
@@ -248,7 +387,8 @@ def initialize_object_manager_tools(server: FastMCP, snowflake_service):
         snowflake_service._ensure_connected()
         return create_or_alter_object(target_object, snowflake_service.root)
 
-    @server.tool(
+    @cached_tool(
+        server,
         name="describe_object",
         description=get_object_mgmt_prompt("describe", supported_objects_list),
     )
@@ -260,7 +400,8 @@ def initialize_object_manager_tools(server: FastMCP, snowflake_service):
         snowflake_service._ensure_connected()
         return describe_object(target_object, snowflake_service.root)
 
-    @server.tool(
+    @cached_tool(
+        server,
         name="list_objects",
         description=get_object_mgmt_prompt("list", supported_objects_list),
     )
@@ -282,6 +423,29 @@ def initialize_object_manager_tools(server: FastMCP, snowflake_service):
                 default=None,
             ),
         ] = None,
+        columns: Annotated[
+            list[str] | None,
+            Field(
+                description="Optional SHOW output columns to return, such as name and created_on. Omit to return all columns.",
+                default=None,
+            ),
+        ] = None,
+        where: Annotated[
+            str | None,
+            Field(
+                description="Optional filter over SHOW output columns (without the WHERE keyword), such as \"owner = 'SYSADMIN'\". Supports comparisons, AND, OR, NOT, LIKE, ILIKE, IN, BETWEEN, IS NULL and the functions "
+                + ", ".join(SHOW_FILTER_FUNCTIONS)
+                + ".",
+                default=None,
+            ),
+        ] = None,
+        limit: Annotated[
+            int | None,
+            Field(
+                description="Optional maximum number of objects to return (1-1000).",
+                default=None,
+            ),
+        ] = None,
     ):
         return list_objects(
             snowflake_service,
@@ -290,8 +454,39 @@ def initialize_object_manager_tools(server: FastMCP, snowflake_service):
             schema_name,
             like,
             starts_with,
+            columns,
+            where,
+            limit,
         )
 
+    desired_state_annotation = Annotated[
+        Union[str, DesiredState],
+        Field(
+            description="Desired state document with lists of databases, schemas, tables, and warehouses. Always pass as an object, not a string"
+        ),
+    ]
+
+    @cached_tool(
+        server,
+        name="plan_objects",
+        description=object_plan_prompt("plan"),
+    )
+    def plan_objects_tool(desired_state: desired_state_annotation):
+        desired_state = DesiredState.model_validate(desired_state)
+        plan = plan_objects(snowflake_service, desired_state)
+        return {"summary": plan.summary, **plan.model_dump()}
+
+    # Named create_or_alter_* so the Create permission governs it in CheckQueryType
+    @cached_tool(
+        server,
+        name="create_or_alter_objects",
+        description=object_plan_prompt("apply"),
+    )
+    def create_or_alter_objects_tool(desired_state: desired_state_annotation):
+        desired_state = DesiredState.model_validate(desired_state)
+        plan = apply_objects(snowflake_service, desired_state)
+        return {"summary": plan.summary, **plan.model_dump()}
+
 
 def validate_object_tool(
     function_name: str, sql_allow_list: list[str], sql_disallow_list: list[str]
@@ -310,15 +505,6 @@ def validate_object_tool(
     else:
         return ("", True)
 
-    # User has not added any permissions, so we default to disallowing all object actions
-    if len(sql_allow_list) == 0 and len(sql_disallow_list) == 0:
-        valid = False
-
-    if func_type in sql_allow_list:
-        valid = True
-    elif func_type in sql_disallow_list:
-        valid = False
-    else:
-        valid = False
-
-    return (func_type, valid)
+    # Object actions must be allowed explicitly, so empty permissions disallow all
+    permissions = compile_sql_permissions(sql_allow_list, sql_disallow_list)
+    return (func_type, permissions.is_action_allowed(func_type))
@@ -0,0 +1,168 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import re
+from json.encoder import encode_basestring_ascii
+from typing import Any, Callable, Iterable, Union
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+# Returned by a resolver for variables it does not know. Such placeholders are
+# left in the comment as written.
+MISSING = object()
+
+
+class _Value:
+    """A template leaf that is exactly one placeholder, such as "{intent}"."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: str):
+        self.key = key
+
+
+class _Interpolation:
+    """A template leaf that mixes text and placeholders, such as "mcp-{model}"."""
+
+    __slots__ = ("segments",)
+
+    def __init__(self, segments: list[Union[str, tuple[str]]]):
+        # Literal text is a str and placeholders are a one-item tuple
+        self.segments = segments
+
+
+_Part = Union[str, _Value, _Interpolation]
+
+
+def _dumps(value: Any) -> str:
+    """json.dumps with a fast path for the strings and nulls most values are."""
+    if type(value) is str:
+        return encode_basestring_ascii(value)
+    if value is None:
+        return "null"
+    return json.dumps(value)
+
+
+class CompiledQueryComment:
+    """
+    Query comment template compiled once into JSON text and placeholder slots.
+
+    Rendering joins precomputed JSON text with the serialized values of the
+    variables the template uses, and produces the same text as substituting
+    the template and calling json.dumps on the result.
+
+    Parameters
+    ----------
+    template : dict
+        Query comment template from the configuration file
+    omit_variables : Iterable[str], optional
+        Variables whose leaves are left out of the comment entirely
+    """
+
+    def __init__(self, template: Any, omit_variables: Iterable[str] = ()):
+        self.template = template
+        self._omit = {f"{{{key}}}" for key in omit_variables}
+        self.variables: set[str] = set()
+        parts: list[_Part] = []
+        self._compile(template, parts)
+        self.parts = self._merge(parts)
+
+    def _omitted(self, value: Any) -> bool:
+        return isinstance(value, str) and any(
+            placeholder in value for placeholder in self._omit
+        )
+
+    def _compile(self, value: Any, parts: list[_Part]) -> None:
+        if isinstance(value, dict):
+            items = [(k, v) for k, v in value.items() if not self._omitted(v)]
+            parts.append("{")
+            for index, (key, item) in enumerate(items):
+                if index:
+                    parts.append(", ")
+                # Serialize the key exactly as json.dumps would, including non-str keys
+                parts.append(json.dumps({key: None})[1:-5])
+                self._compile(item, parts)
+            parts.append("}")
+        elif isinstance(value, list):
+            items = [item for item in value if not self._omitted(item)]
+            parts.append("[")
+            for index, item in enumerate(items):
+                if index:
+                    parts.append(", ")
+                self._compile(item, parts)
+            parts.append("]")
+        elif isinstance(value, str):
+            match = _PLACEHOLDER.fullmatch(value)
+            if match:
+                self.variables.add(match.group(1))
+                parts.append(_Value(match.group(1)))
+                return
+            segments: list[Union[str, tuple[str]]] = []
+            position = 0
+            for match in _PLACEHOLDER.finditer(value):
+                if match.start() > position:
+                    segments.append(value[position : match.start()])
+                segments.append((match.group(1),))
+                self.variables.add(match.group(1))
+                position = match.end()
+            if not segments:
+                parts.append(json.dumps(value))
+                return
+            if position < len(value):
+                segments.append(value[position:])
+            parts.append(_Interpolation(segments))
+        else:
+            parts.append(json.dumps(value))
+
+    @staticmethod
+    def _merge(parts: list[_Part]) -> list[_Part]:
+        merged: list[_Part] = []
+        for part in parts:
+            if isinstance(part, str) and merged and isinstance(merged[-1], str):
+                merged[-1] += part
+            else:
+                merged.append(part)
+        return merged
+
+    def render(self, resolve: Callable[[str], Any]) -> str:
+        """
+        Render the comment as a JSON string.
+
+        Parameters
+        ----------
+        resolve : Callable[[str], Any]
+            Returns the value of a template variable, or MISSING if unknown.
+            Called once per variable used by the template.
+        """
+        values = {key: resolve(key) for key in self.variables}
+        out = []
+        for part in self.parts:
+            if isinstance(part, str):
+                out.append(part)
+            elif isinstance(part, _Value):
+                value = values[part.key]
+                out.append(_dumps(f"{{{part.key}}}" if value is MISSING else value))
+            else:
+                text = []
+                for segment in part.segments:
+                    if isinstance(segment, str):
+                        text.append(segment)
+                    else:
+                        value = values[segment[0]]
+                        # Unknown and null values leave the placeholder as written
+                        text.append(
+                            f"{{{segment[0]}}}"
+                            if value is MISSING or value is None
+                            else str(value)
+                        )
+                out.append(encode_basestring_ascii("".join(text)))
+        return "".join(out)
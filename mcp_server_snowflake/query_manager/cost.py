@@ -0,0 +1,176 @@
+import json
+from typing import Optional
+
+from fastmcp.utilities.logging import get_logger
+from pydantic import BaseModel
+from sqlglot import exp
+
+from mcp_server_snowflake.utils import SnowflakeException, TTLCache, execute_query
+
+logger = get_logger(__name__)
+
+
+class QueryCostConfig(BaseModel):
+    """Thresholds from the query_cost section of the service configuration."""
+
+    max_partitions_total: Optional[int] = None
+    max_partitions_assigned: Optional[int] = None
+    max_bytes_assigned: Optional[int] = None
+    # Warehouse for over-budget queries. They are rejected if not set.
+    over_budget_warehouse: Optional[str] = None
+    cache_ttl_seconds: float = 300
+    cache_size: int = 256
+
+
+class QueryCostEstimate(BaseModel):
+    """Global statistics of an EXPLAIN plan."""
+
+    partitions_total: int = 0
+    partitions_assigned: int = 0
+    bytes_assigned: int = 0
+
+
+def parse_explain_json(rows: list[dict]) -> QueryCostEstimate:
+    """Read the GlobalStats of an EXPLAIN USING JSON result."""
+    if not rows:
+        raise ValueError("EXPLAIN returned no rows")
+    content = next(iter(rows[0].values()))
+    plan = json.loads(content) if isinstance(content, str) else content
+    global_stats = plan.get("GlobalStats") or {}
+    return QueryCostEstimate(
+        partitions_total=int(global_stats.get("partitionsTotal") or 0),
+        partitions_assigned=int(global_stats.get("partitionsAssigned") or 0),
+        bytes_assigned=int(global_stats.get("bytesAssigned") or 0),
+    )
+
+
+class CostEstimator:
+    """
+    EXPLAIN estimates cached by canonical statement text.
+
+    Retries and statements differing only in formatting run EXPLAIN once per
+    TTL.
+
+    Parameters
+    ----------
+    ttl_seconds : float, default=300
+        Seconds an estimate is reused
+    max_entries : int, default=256
+        Maximum number of estimates kept
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 256):
+        self.cache = TTLCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+
+    def estimate(self, statement: str, snowflake_service) -> QueryCostEstimate:
+        """Return the EXPLAIN estimate of a canonical statement."""
+        estimate = self.cache.get(statement)
+        if estimate is None:
+            estimate = parse_explain_json(
+                execute_query(f"EXPLAIN USING JSON {statement}", snowflake_service)
+            )
+            self.cache.set(statement, estimate)
+        return estimate
+
+
+class QueryCostGate:
+    """
+    Pre-flight cost check of queries against EXPLAIN estimates.
+
+    Parameters
+    ----------
+    config : QueryCostConfig
+        Thresholds from the configuration file
+    """
+
+    def __init__(self, config: QueryCostConfig):
+        self.config = config
+        self.estimator = CostEstimator(config.cache_ttl_seconds, config.cache_size)
+
+    def violations(self, estimate: QueryCostEstimate) -> list[str]:
+        limits = (
+            ("partitions", estimate.partitions_total, self.config.max_partitions_total),
+            (
+                "assigned partitions",
+                estimate.partitions_assigned,
+                self.config.max_partitions_assigned,
+            ),
+            ("bytes", estimate.bytes_assigned, self.config.max_bytes_assigned),
+        )
+        return [
+            f"{value} {name} exceeds the limit of {limit}."
+            for name, value, limit in limits
+            if limit is not None and value > limit
+        ]
+
+
+def compile_query_cost(query_cost: Optional[dict]) -> Optional[QueryCostGate]:
+    """Compile the query_cost configuration section, or return None if absent."""
+    if not query_cost:
+        return None
+    return QueryCostGate(QueryCostConfig(**query_cost))
+
+
+def canonical_query(expression: Optional[exp.Expression]) -> Optional[str]:
+    """Return the text EXPLAIN estimates are cached by, or None for non-queries."""
+    if not isinstance(expression, exp.Query):
+        return None
+    return expression.sql(dialect="snowflake", comments=False)
+
+
+def check_query_cost(
+    expression: Optional[exp.Expression],
+    snowflake_service,
+    tool_name: str = "run_snowflake_query",
+) -> Optional[str]:
+    """
+    Check a query's estimated cost before it runs.
+
+    Only queries are estimated. The estimate is cached by canonical statement
+    text, so it does not notice a changed USE context until it expires.
+
+    Returns
+    -------
+    str or None
+        Warehouse to run the statement on instead of the default one, if it
+        is over budget and over_budget_warehouse is configured
+
+    Raises
+    ------
+    SnowflakeException
+        If the query is over budget and no over_budget_warehouse is set. The
+        message includes the estimate.
+    """
+    gate: Optional[QueryCostGate] = snowflake_service.query_cost
+    statement = canonical_query(expression)
+    if gate is None or statement is None:
+        return None
+
+    try:
+        estimate = gate.estimator.estimate(statement, snowflake_service)
+    except Exception as e:
+        raise SnowflakeException(
+            tool=tool_name,
+            message=f"Unable to estimate query cost: {e}",
+            status_code=403,
+        )
+
+    violations = gate.violations(estimate)
+    if not violations:
+        return None
+    summary = (
+        f"Estimated scan of {estimate.bytes_assigned} bytes in "
+        f"{estimate.partitions_assigned} of {estimate.partitions_total} partitions."
+    )
+    warehouse = gate.config.over_budget_warehouse
+    if warehouse:
+        logger.info(f"{summary} Running on warehouse {warehouse}.")
+        return warehouse
+    raise SnowflakeException(
+        tool=tool_name,
+        message=(
+            f"Query is over budget. {summary} {' '.join(violations)} Add filters "
+            "on clustering or date columns, or select fewer columns."
+        ),
+        status_code=403,
+    )
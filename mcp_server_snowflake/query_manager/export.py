@@ -0,0 +1,243 @@
+import re
+import uuid
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel
+
+from mcp_server_snowflake.cancellation import execute_statement
+from mcp_server_snowflake.metrics import record_query_id, time_phase
+from mcp_server_snowflake.query_manager.cost import canonical_query
+from mcp_server_snowflake.query_manager.profile import QUERY_ID_PATTERN
+from mcp_server_snowflake.utils import (
+    SnowflakeException,
+    execute_query,
+    lower_keys,
+    optional_int,
+)
+
+ExportFormat = Literal["parquet", "csv"]
+
+FILE_FORMATS = {
+    "parquet": "TYPE = PARQUET COMPRESSION = SNAPPY",
+    "csv": "TYPE = CSV COMPRESSION = GZIP FIELD_OPTIONALLY_ENCLOSED_BY = '\"'",
+}
+
+# A stage name, optionally followed by a path, such as @DB.SCHEMA.STAGE/exports
+STAGE_PATTERN = re.compile(r'^(@[\w$."~%]+)(/[\w$./=-]*)?$')
+
+PREVIEW_STATEMENT = "SELECT * FROM TABLE(RESULT_SCAN(?)) LIMIT {limit}"
+
+
+class ResultExportConfig(BaseModel):
+    """The result_export section of the service configuration."""
+
+    stage: str
+    file_format: ExportFormat = "parquet"
+    # Largest file COPY INTO writes before starting another, in bytes
+    max_file_size: Optional[int] = None
+    preview_rows: int = 10
+    url_expiration_seconds: int = 3600
+
+
+class ExportedFile(BaseModel):
+    file_name: str
+    size_bytes: Optional[int] = None
+    row_count: Optional[int] = None
+    url: Optional[str] = None
+
+
+class QueryExport(BaseModel):
+    query_id: str
+    location: str
+    file_format: ExportFormat
+    row_count: int
+    files: list[ExportedFile] = []
+    preview: list[dict] = []
+    url_expiration_seconds: int
+
+
+def compile_result_export(
+    result_export: Optional[dict],
+) -> Optional[ResultExportConfig]:
+    """Compile the result_export configuration section, or return None if absent."""
+    if not result_export:
+        return None
+    config = ResultExportConfig(**result_export)
+    if not STAGE_PATTERN.match(config.stage):
+        raise ValueError(
+            f"result_export stage {config.stage} is not a stage such as @DB.SCHEMA.STAGE."
+        )
+    return config
+
+
+def build_copy_statement(
+    query_id: str,
+    location: str,
+    file_format: ExportFormat,
+    max_file_size: Optional[int] = None,
+) -> str:
+    """Build a COPY INTO statement unloading a query result to a stage location."""
+    options = [
+        f"FILE_FORMAT = ({FILE_FORMATS[file_format]})",
+        "HEADER = TRUE",
+        "DETAILED_OUTPUT = TRUE",
+    ]
+    if max_file_size is not None:
+        options.append(f"MAX_FILE_SIZE = {int(max_file_size)}")
+    # COPY INTO cannot bind the query id; it was checked against QUERY_ID_PATTERN
+    return (
+        f"COPY INTO {location}data_\n"
+        f"FROM (SELECT * FROM TABLE(RESULT_SCAN('{query_id}')))\n" + "\n".join(options)
+    )
+
+
+def export_query_results(
+    snowflake_service,
+    statement: Optional[str] = None,
+    query_id: Optional[str] = None,
+    file_format: Optional[ExportFormat] = None,
+) -> dict[str, Any]:
+    """
+    Unload a query result to the configured stage instead of returning it.
+
+    A statement is run first and its result exported; a query id exports the
+    result of an earlier query, which Snowflake keeps for 24 hours.
+
+    Parameters
+    ----------
+    snowflake_service : SnowflakeService
+        Service with a result_export configuration
+    statement : str, optional
+        Query to run and export
+    query_id : str, optional
+        Query whose result to export. Defaults to the last query the current
+        MCP session ran with run_snowflake_query if no statement is given.
+    file_format : str, optional
+        parquet or csv. Defaults to the configured format.
+
+    Returns
+    -------
+    dict
+        QueryExport with the unloaded files and their row counts, presigned
+        URLs to download them, and the first rows of the result
+
+    Raises
+    ------
+    SnowflakeException
+        If the statement is not a query, the query id is missing or
+        malformed, or the export fails
+    """
+    tool_name = "export_query_results"
+    config = snowflake_service.result_export
+    if config is None:
+        raise SnowflakeException(
+            tool=tool_name,
+            message="No result_export stage is configured.",
+            status_code=400,
+        )
+    file_format = file_format or config.file_format
+
+    if statement is not None:
+        # Imported here to avoid a cycle, as the tools module registers this one
+        from mcp_server_snowflake.query_manager.tools import (
+            parse_statement,
+            run_query,
+        )
+
+        if canonical_query(parse_statement(statement)) is None:
+            raise SnowflakeException(
+                tool=tool_name,
+                message="Only queries such as SELECT can be exported.",
+                status_code=400,
+            )
+        query_id = run_query(statement, snowflake_service, tool_name, fetch=False)
+    query_id = query_id or snowflake_service.get_last_query_id()
+    if not query_id:
+        raise SnowflakeException(
+            tool=tool_name,
+            message="No statement or query id given and no query has been run yet.",
+            status_code=400,
+        )
+    if not QUERY_ID_PATTERN.match(query_id):
+        raise SnowflakeException(
+            tool=tool_name,
+            message=f"{query_id} is not a Snowflake query id.",
+            status_code=400,
+        )
+
+    stage_name, stage_path = STAGE_PATTERN.match(config.stage).groups()
+    directory = "/".join(
+        part for part in ((stage_path or "").strip("/"), uuid.uuid4().hex) if part
+    )
+    location = f"{stage_name}/{directory}/"
+
+    try:
+        with snowflake_service.get_connection(
+            use_dict_cursor=True,
+            session_parameters=snowflake_service.get_query_tag_param(),
+        ) as (
+            con,
+            cur,
+        ):
+            with time_phase("execute"):
+                execute_statement(
+                    cur,
+                    build_copy_statement(
+                        query_id, location, file_format, config.max_file_size
+                    ),
+                )
+                record_query_id(cur.sfqid)
+            with time_phase("fetch"):
+                unloaded = [lower_keys(row) for row in cur.fetchall()]
+
+        files = []
+        for row in unloaded:
+            file_name = str(row.get("file_name"))
+            # Names may be relative to the stage or to the export directory
+            if not file_name.startswith(f"{directory}/"):
+                file_name = f"{directory}/{file_name}"
+            files.append(
+                ExportedFile(
+                    file_name=file_name,
+                    size_bytes=optional_int(row.get("file_size")),
+                    row_count=optional_int(row.get("row_count")),
+                )
+            )
+
+        if files:
+            values = ", ".join("(?)" for _ in files)
+            urls = execute_query(
+                f"SELECT column1 AS file_name, GET_PRESIGNED_URL({stage_name}, "
+                f"column1, ?) AS url FROM VALUES {values}",
+                snowflake_service,
+                [config.url_expiration_seconds, *(f.file_name for f in files)],
+            )
+            url_by_file = {
+                row["file_name"]: row["url"] for row in map(lower_keys, urls)
+            }
+            for exported in files:
+                exported.url = url_by_file.get(exported.file_name)
+
+        preview = []
+        if config.preview_rows > 0:
+            preview = execute_query(
+                PREVIEW_STATEMENT.format(limit=int(config.preview_rows)),
+                snowflake_service,
+                [query_id],
+            )
+    except Exception as e:
+        raise SnowflakeException(
+            tool=tool_name,
+            message=f"Error exporting query results: {e}",
+            status_code=500,
+        )
+
+    return QueryExport(
+        query_id=query_id,
+        location=location,
+        file_format=file_format,
+        row_count=sum(f.row_count or 0 for f in files),
+        files=files,
+        preview=preview,
+        url_expiration_seconds=config.url_expiration_seconds,
+    ).model_dump(exclude_none=True)
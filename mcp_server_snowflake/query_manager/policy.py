@@ -0,0 +1,268 @@
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlglot import exp
+
+from mcp_server_snowflake.utils import (
+    SnowflakeException,
+    SqlPermissions,
+    compile_sql_permissions,
+)
+
+# Nodes that are statements in their own right when nested in another statement
+NESTED_STATEMENT_TYPES = (
+    exp.DDL,
+    exp.DML,
+    exp.Drop,
+    exp.Alter,
+    exp.TruncateTable,
+    exp.Grant,
+    exp.Use,
+    exp.Command,
+)
+
+
+class SqlPolicyConfig(BaseModel):
+    """Rules from the sql_policies section of the service configuration."""
+
+    allowed_databases: list[str] = []
+    denied_databases: list[str] = []
+    # Schemas are written as DATABASE.SCHEMA
+    allowed_schemas: list[str] = []
+    denied_schemas: list[str] = []
+    # A trailing * matches any function name with that prefix, such as SYSTEM$*
+    denied_functions: list[str] = []
+    max_joins: Optional[int] = None
+    max_scan_bytes: Optional[int] = None
+    check_nested_statements: bool = True
+    # Used to resolve unqualified table names
+    default_database: Optional[str] = None
+    default_schema: Optional[str] = None
+
+
+def _normalize(identifier: str) -> str:
+    return identifier.strip().strip('"').upper()
+
+
+class SqlPolicy:
+    """
+    SQL policy compiled for evaluation in a single pass over a parsed statement.
+
+    Identifiers are compared case-insensitively.
+
+    Parameters
+    ----------
+    config : SqlPolicyConfig
+        Policy rules from the configuration file
+    """
+
+    def __init__(self, config: SqlPolicyConfig):
+        self.config = config
+        self.allowed_databases = frozenset(map(_normalize, config.allowed_databases))
+        self.denied_databases = frozenset(map(_normalize, config.denied_databases))
+        self.allowed_schemas = frozenset(map(_normalize, config.allowed_schemas))
+        self.denied_schemas = frozenset(map(_normalize, config.denied_schemas))
+        functions = [_normalize(name) for name in config.denied_functions]
+        self.denied_functions = frozenset(
+            name for name in functions if not name.endswith("*")
+        )
+        self.denied_function_prefixes = tuple(
+            name[:-1] for name in functions if name.endswith("*")
+        )
+        self.default_database = (
+            _normalize(config.default_database) if config.default_database else None
+        )
+        self.default_schema = (
+            _normalize(config.default_schema) if config.default_schema else None
+        )
+        self.checks_databases = bool(self.allowed_databases or self.denied_databases)
+        self.checks_schemas = bool(self.allowed_schemas or self.denied_schemas)
+        self.checks_functions = bool(
+            self.denied_functions or self.denied_function_prefixes
+        )
+
+    @property
+    def checks_references(self) -> bool:
+        """Whether rules depend on the objects and functions a statement uses."""
+        return self.checks_databases or self.checks_schemas or self.checks_functions
+
+    def check_function(self, function: exp.Func) -> Optional[str]:
+        if isinstance(function, exp.Anonymous):
+            name = _normalize(function.name)
+        else:
+            name = function.sql_name()
+        if name in self.denied_functions or name.startswith(
+            self.denied_function_prefixes
+        ):
+            return f"Function {name} is not allowed."
+        return None
+
+    def check_table(self, table: exp.Table, cte_names: set[str]) -> Optional[str]:
+        name = table.name
+        if not table.catalog and not table.db and _normalize(name) in cte_names:
+            return None
+        if not name or name.startswith("@"):
+            # identifier() and stage references are only known at run time
+            return (
+                f"Reference {table.sql(dialect='snowflake')} cannot be resolved "
+                "to a database and schema."
+            )
+
+        database = _normalize(table.catalog) if table.catalog else self.default_database
+        schema = _normalize(table.db) if table.db else self.default_schema
+        if self.checks_databases:
+            if database is None:
+                return f"Table {name} must be qualified with a database name."
+            if database in self.denied_databases or (
+                self.allowed_databases and database not in self.allowed_databases
+            ):
+                return f"Database {database} is not allowed."
+        if self.checks_schemas:
+            if database is None or schema is None:
+                return (
+                    f"Table {name} must be qualified with a database and schema name."
+                )
+            qualified_schema = f"{database}.{schema}"
+            if qualified_schema in self.denied_schemas or (
+                self.allowed_schemas and qualified_schema not in self.allowed_schemas
+            ):
+                return f"Schema {qualified_schema} is not allowed."
+        return None
+
+    def evaluate(
+        self, expression: Optional[exp.Expression], permissions: SqlPermissions
+    ) -> list[str]:
+        """
+        Return every rule the statement violates, except the scan size limit.
+
+        Parameters
+        ----------
+        expression : sqlglot.exp.Expression or None
+            Parsed statement, or None if it could not be parsed
+        permissions : SqlPermissions
+            Statement permissions applied to nested statements
+        """
+        if expression is None or isinstance(expression, exp.Command):
+            if self.checks_references:
+                return [
+                    "Statement could not be fully parsed, so the objects and "
+                    "functions it uses cannot be verified."
+                ]
+            return []
+
+        violations: list[str] = []
+        tables: list[exp.Table] = []
+        cte_names: set[str] = set()
+        joins = 0
+        is_block = isinstance(expression, exp.Block)
+
+        def add(violation: Optional[str]) -> None:
+            if violation and violation not in violations:
+                violations.append(violation)
+
+        for node in expression.walk():
+            if isinstance(node, exp.Table):
+                # Checked after the walk, once every CTE name is known
+                tables.append(node)
+            elif isinstance(node, exp.CTE):
+                cte_names.add(_normalize(node.alias_or_name))
+            elif isinstance(node, exp.Join):
+                joins += 1
+            elif isinstance(node, exp.Func) and self.checks_functions:
+                add(self.check_function(node))
+
+            if (
+                self.config.check_nested_statements
+                and node is not expression
+                and (
+                    isinstance(node, NESTED_STATEMENT_TYPES)
+                    or (is_block and node.parent is expression)
+                )
+            ):
+                statement_type = type(node).__name__
+                if not permissions.is_statement_allowed(statement_type):
+                    add(
+                        f"{statement_type} statement nested in "
+                        f"{type(expression).__name__} is not allowed."
+                    )
+                if isinstance(node, exp.Command) and self.checks_references:
+                    add(
+                        "Statement could not be fully parsed, so the objects and "
+                        "functions it uses cannot be verified."
+                    )
+
+        if self.checks_databases or self.checks_schemas:
+            for table in tables:
+                add(self.check_table(table, cte_names))
+
+        if self.config.max_joins is not None and joins > self.config.max_joins:
+            add(
+                f"Statement has {joins} joins, more than the limit of "
+                f"{self.config.max_joins}."
+            )
+        return violations
+
+
+def compile_sql_policy(sql_policies: Optional[dict]) -> Optional[SqlPolicy]:
+    """Compile the sql_policies configuration section, or return None if absent."""
+    if not sql_policies:
+        return None
+    return SqlPolicy(SqlPolicyConfig(**sql_policies))
+
+
+def enforce_sql_policy(
+    statement: str,
+    expression: Optional[exp.Expression],
+    snowflake_service,
+    tool_name: str = "run_snowflake_query",
+) -> None:
+    """
+    Raise if a statement violates the configured SQL policy.
+
+    The scan size limit is checked with EXPLAIN only when every other rule
+    passes, and statements whose scan size cannot be estimated are rejected.
+    Estimates come from the service's cost_estimator, so the cost check and
+    routing of the same statement reuse them.
+
+    Raises
+    ------
+    SnowflakeException
+        If the statement violates any rule
+    """
+    policy: Optional[SqlPolicy] = snowflake_service.sql_policy
+    if policy is None:
+        return
+
+    permissions = compile_sql_permissions(
+        snowflake_service.sql_statement_allowed,
+        snowflake_service.sql_statement_disallowed,
+    )
+    violations = policy.evaluate(expression, permissions)
+
+    max_scan_bytes = policy.config.max_scan_bytes
+    if (
+        not violations
+        and max_scan_bytes is not None
+        and isinstance(expression, (exp.Query, exp.DML))
+    ):
+        try:
+            # Same text as canonical_query, so queries share cached estimates
+            scan_bytes = snowflake_service.cost_estimator.estimate(
+                expression.sql(dialect="snowflake", comments=False),
+                snowflake_service,
+            ).bytes_assigned
+        except Exception as e:
+            violations.append(f"Unable to estimate scan size: {e}")
+        else:
+            if scan_bytes > max_scan_bytes:
+                violations.append(
+                    f"Estimated scan of {scan_bytes} bytes exceeds the limit of "
+                    f"{max_scan_bytes} bytes."
+                )
+
+    if violations:
+        raise SnowflakeException(
+            tool=tool_name,
+            message="Statement violates SQL policy. " + " ".join(violations),
+            status_code=403,
+        )
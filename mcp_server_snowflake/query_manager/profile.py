@@ -0,0 +1,307 @@
+import json
+import re
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from mcp_server_snowflake.utils import (
+    SnowflakeException,
+    execute_query,
+    lower_keys,
+    optional_int,
+)
+
+OPERATOR_STATS_STATEMENT = "SELECT * FROM TABLE(GET_QUERY_OPERATOR_STATS(?))"
+
+# Recent queries of the current user, across sessions, without the latency
+# of ACCOUNT_USAGE
+QUERY_HISTORY_STATEMENT = """
+SELECT
+    query_id,
+    execution_status,
+    warehouse_name,
+    warehouse_size,
+    total_elapsed_time,
+    compilation_time,
+    execution_time,
+    queued_provisioning_time,
+    queued_repair_time,
+    queued_overload_time,
+    bytes_scanned,
+    rows_produced,
+    partitions_scanned,
+    partitions_total,
+    bytes_spilled_to_local_storage,
+    bytes_spilled_to_remote_storage
+FROM TABLE(SNOWFLAKE.INFORMATION_SCHEMA.QUERY_HISTORY(RESULT_LIMIT => 10000))
+WHERE query_id = ?
+""".strip()
+
+QUERY_ID_PATTERN = re.compile(r"^[0-9a-fA-F]{8}(-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}$")
+
+MAX_HOTSPOTS = 5
+# Scans reading at least this share of at least this many partitions are
+# reported as poorly pruned
+PRUNING_MIN_PARTITIONS = 100
+PRUNING_SCANNED_RATIO = 0.8
+# Joins producing this many times more rows than they read are reported
+JOIN_EXPLOSION_RATIO = 10
+QUEUED_WARNING_MS = 1000
+
+# Operator attributes describing what an operator works on, most specific first
+DETAIL_ATTRIBUTES = (
+    "equality_join_condition",
+    "additional_join_condition",
+    "filter_condition",
+    "grouping_keys",
+    "sort_keys",
+    "functions",
+)
+
+
+class QueryStats(BaseModel):
+    """Whole-query statistics from QUERY_HISTORY. Times are in milliseconds."""
+
+    execution_status: Optional[str] = None
+    warehouse_name: Optional[str] = None
+    warehouse_size: Optional[str] = None
+    total_elapsed_ms: Optional[int] = None
+    compilation_ms: Optional[int] = None
+    execution_ms: Optional[int] = None
+    queued_ms: Optional[int] = None
+    bytes_scanned: Optional[int] = None
+    rows_produced: Optional[int] = None
+    partitions_scanned: Optional[int] = None
+    partitions_total: Optional[int] = None
+    bytes_spilled_local: Optional[int] = None
+    bytes_spilled_remote: Optional[int] = None
+
+
+class OperatorHotspot(BaseModel):
+    """An operator that took a large share of the query's execution time."""
+
+    operator_id: int
+    operator_type: str
+    percent_of_time: float
+    table_name: Optional[str] = None
+    detail: Optional[str] = None
+    input_rows: Optional[int] = None
+    output_rows: Optional[int] = None
+    bytes_scanned: Optional[int] = None
+    partitions_scanned: Optional[int] = None
+    partitions_total: Optional[int] = None
+    bytes_spilled_local: Optional[int] = None
+    bytes_spilled_remote: Optional[int] = None
+
+
+class QueryProfile(BaseModel):
+    query_id: str
+    stats: Optional[QueryStats] = None
+    hotspots: list[OperatorHotspot] = []
+    suggestions: list[str] = []
+    # Parts of the profile that could not be retrieved
+    errors: list[str] = []
+
+
+def _variant(value: Any) -> dict:
+    """Return a VARIANT column as a dict; the connector returns it as JSON text."""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return {}
+    return value if isinstance(value, dict) else {}
+
+
+def parse_query_stats(row: dict) -> QueryStats:
+    row = lower_keys(row)
+    queued = [
+        row.get(column)
+        for column in (
+            "queued_provisioning_time",
+            "queued_repair_time",
+            "queued_overload_time",
+        )
+    ]
+    return QueryStats(
+        execution_status=row.get("execution_status"),
+        warehouse_name=row.get("warehouse_name"),
+        warehouse_size=row.get("warehouse_size"),
+        total_elapsed_ms=optional_int(row.get("total_elapsed_time")),
+        compilation_ms=optional_int(row.get("compilation_time")),
+        execution_ms=optional_int(row.get("execution_time")),
+        queued_ms=(
+            sum(int(value) for value in queued if value is not None)
+            if any(value is not None for value in queued)
+            else None
+        ),
+        bytes_scanned=optional_int(row.get("bytes_scanned")),
+        rows_produced=optional_int(row.get("rows_produced")),
+        partitions_scanned=optional_int(row.get("partitions_scanned")),
+        partitions_total=optional_int(row.get("partitions_total")),
+        bytes_spilled_local=optional_int(row.get("bytes_spilled_to_local_storage")),
+        bytes_spilled_remote=optional_int(row.get("bytes_spilled_to_remote_storage")),
+    )
+
+
+def parse_operators(rows: list[dict]) -> list[OperatorHotspot]:
+    """Convert GET_QUERY_OPERATOR_STATS rows, slowest operator first."""
+    operators = []
+    for row in rows:
+        row = lower_keys(row)
+        statistics = _variant(row.get("operator_statistics"))
+        breakdown = _variant(row.get("execution_time_breakdown"))
+        attributes = _variant(row.get("operator_attributes"))
+        io = statistics.get("io") or {}
+        pruning = statistics.get("pruning") or {}
+        spilling = statistics.get("spilling") or {}
+        detail = next(
+            (attributes[key] for key in DETAIL_ATTRIBUTES if attributes.get(key)),
+            None,
+        )
+        operators.append(
+            OperatorHotspot(
+                operator_id=int(row.get("operator_id") or 0),
+                operator_type=row.get("operator_type") or "Unknown",
+                percent_of_time=float(breakdown.get("overall_percentage") or 0.0),
+                table_name=attributes.get("table_name"),
+                detail=detail if detail is None else str(detail),
+                input_rows=optional_int(statistics.get("input_rows")),
+                output_rows=optional_int(statistics.get("output_rows")),
+                bytes_scanned=optional_int(io.get("bytes_scanned")),
+                partitions_scanned=optional_int(pruning.get("partitions_scanned")),
+                partitions_total=optional_int(pruning.get("partitions_total")),
+                bytes_spilled_local=optional_int(
+                    spilling.get("bytes_spilled_local_storage")
+                ),
+                bytes_spilled_remote=optional_int(
+                    spilling.get("bytes_spilled_remote_storage")
+                ),
+            )
+        )
+
+    # overall_percentage is a fraction in some releases and a percentage in others
+    if operators and sum(op.percent_of_time for op in operators) <= 1.0 + 1e-6:
+        for op in operators:
+            op.percent_of_time *= 100
+    for op in operators:
+        op.percent_of_time = round(op.percent_of_time, 1)
+    operators.sort(key=lambda op: op.percent_of_time, reverse=True)
+    return operators
+
+
+def suggest_optimizations(
+    stats: Optional[QueryStats], operators: list[OperatorHotspot]
+) -> list[str]:
+    """Return hints for the most common causes of slow queries."""
+    suggestions = []
+    for op in operators:
+        name = f"{op.operator_type} [{op.operator_id}]"
+        if (
+            op.partitions_total
+            and op.partitions_total >= PRUNING_MIN_PARTITIONS
+            and (op.partitions_scanned or 0)
+            >= PRUNING_SCANNED_RATIO * op.partitions_total
+        ):
+            suggestions.append(
+                f"{name} on {op.table_name or 'a table'} read {op.partitions_scanned} "
+                f"of {op.partitions_total} partitions. Filter on clustering or date "
+                "columns so partitions can be pruned, and select only needed columns."
+            )
+        if op.bytes_spilled_remote:
+            suggestions.append(
+                f"{name} spilled {op.bytes_spilled_remote} bytes to remote storage. "
+                "Reduce the rows reaching it with earlier filters or aggregation, "
+                "or use a larger warehouse."
+            )
+        elif op.bytes_spilled_local:
+            suggestions.append(
+                f"{name} spilled {op.bytes_spilled_local} bytes to local storage. "
+                "Reduce the rows reaching it with earlier filters or aggregation."
+            )
+        if op.operator_type == "CartesianJoin":
+            suggestions.append(
+                f"{name} is a cartesian join. Add a join condition between its inputs."
+            )
+        elif (
+            "Join" in op.operator_type
+            and op.input_rows
+            and op.output_rows
+            and op.output_rows > JOIN_EXPLOSION_RATIO * op.input_rows
+        ):
+            suggestions.append(
+                f"{name} produced {op.output_rows} rows from {op.input_rows} input "
+                "rows. Check the join condition for missing keys or duplicates."
+            )
+    if stats is not None and stats.queued_ms and stats.queued_ms >= QUEUED_WARNING_MS:
+        suggestions.append(
+            f"The query waited {stats.queued_ms} ms in the warehouse queue. The "
+            "warehouse is busy; retry later or use another warehouse."
+        )
+    return suggestions
+
+
+def get_query_profile(
+    snowflake_service, query_id: Optional[str] = None
+) -> dict[str, Any]:
+    """
+    Summarize where a query spent its time.
+
+    Parameters
+    ----------
+    snowflake_service : SnowflakeService
+        Service used to read the profile
+    query_id : str, optional
+        Query to profile. Defaults to the last query the current MCP
+        session ran with run_snowflake_query.
+
+    Returns
+    -------
+    dict
+        QueryProfile with QUERY_HISTORY statistics, the slowest operators and
+        optimization suggestions. Parts that could not be read are listed in
+        errors.
+
+    Raises
+    ------
+    SnowflakeException
+        If no query id is available or it is malformed
+    """
+    query_id = query_id or snowflake_service.get_last_query_id()
+    if not query_id:
+        raise SnowflakeException(
+            tool="get_query_profile",
+            message="No query id given and no query has been run yet.",
+            status_code=400,
+        )
+    if not QUERY_ID_PATTERN.match(query_id):
+        raise SnowflakeException(
+            tool="get_query_profile",
+            message=f"{query_id} is not a Snowflake query id.",
+            status_code=400,
+        )
+
+    profile = QueryProfile(query_id=query_id)
+    try:
+        history = execute_query(QUERY_HISTORY_STATEMENT, snowflake_service, [query_id])
+        if history:
+            profile.stats = parse_query_stats(history[0])
+        else:
+            profile.errors.append(
+                "Query not found in QUERY_HISTORY for the current user."
+            )
+    except Exception as e:
+        profile.errors.append(f"Unable to read QUERY_HISTORY: {e}")
+
+    operators: list[OperatorHotspot] = []
+    try:
+        operators = parse_operators(
+            execute_query(OPERATOR_STATS_STATEMENT, snowflake_service, [query_id])
+        )
+    except Exception as e:
+        # Running queries and queries older than 14 days have no operator stats
+        profile.errors.append(f"Unable to read operator statistics: {e}")
+
+    profile.hotspots = operators[:MAX_HOTSPOTS]
+    profile.suggestions = suggest_optimizations(profile.stats, operators)
+    return profile.model_dump(exclude_none=True)
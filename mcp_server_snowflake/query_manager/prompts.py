@@ -2,3 +2,18 @@ query_tool_prompt = """
 Run a SQL query in Snowflake.
 DML and DDL queries are supported.
 Tool should only be used if other tools do not suffice."""
+
+query_profile_prompt = """
+Explain why a Snowflake query was slow.
+Returns execution statistics (elapsed, compilation and queued time, bytes and partitions scanned,
+spilling), the operators that took the most time, and suggestions such as filters that would
+let partitions be pruned. Defaults to the last query this session ran with run_snowflake_query.
+Use it after a slow query to improve the SQL before running it again."""
+
+export_query_results_prompt = """
+Export the result of a Snowflake query to a stage instead of returning it inline.
+Runs the statement, or uses the result of an earlier query id, and unloads it as compressed
+Parquet or CSV files. Returns the files with their sizes and row counts, presigned URLs to
+download them, and a preview of the first rows. Use it for results too large to read in full;
+defaults to the last query this session ran with run_snowflake_query. Exporting by query id
+requires COPY statements to be allowed."""
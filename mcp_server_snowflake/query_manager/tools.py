@@ -1,15 +1,34 @@
-from typing import Annotated
+from functools import lru_cache
+from typing import Annotated, Literal, Optional
 
 import sqlglot
 from fastmcp import FastMCP
 from pydantic import Field
 
-from mcp_server_snowflake.query_manager.prompts import query_tool_prompt
-from mcp_server_snowflake.utils import SnowflakeException
+from mcp_server_snowflake.cancellation import execute_statement
+from mcp_server_snowflake.metrics import (
+    record_query_id,
+    record_statement_type,
+    time_phase,
+)
+from mcp_server_snowflake.query_manager.cost import canonical_query, check_query_cost
+from mcp_server_snowflake.query_manager.export import export_query_results
+from mcp_server_snowflake.query_manager.policy import enforce_sql_policy
+from mcp_server_snowflake.query_manager.profile import get_query_profile
+from mcp_server_snowflake.query_manager.prompts import (
+    export_query_results_prompt,
+    query_profile_prompt,
+    query_tool_prompt,
+)
+from mcp_server_snowflake.tool_cache import cached_tool
+from mcp_server_snowflake.utils import SnowflakeException, compile_sql_permissions
 
 
 def run_query(
-    statement: str, snowflake_service, tool_name: str = "run_snowflake_query"
+    statement: str,
+    snowflake_service,
+    tool_name: str = "run_snowflake_query",
+    fetch: bool = True,
 ):
     """
     Execute SQL statement and fetch all results using Snowflake connector.
@@ -25,20 +44,43 @@ def run_query(
         The Snowflake service instance to use for connection
     tool_name : str
         Name of the tool executing the query (for query comments)
+    fetch : bool, default=True
+        Whether to fetch the results. If False, they are left in Snowflake
+        for RESULT_SCAN and the query id is returned.
 
     Returns
     -------
-    list[dict]
-        List of dictionaries containing query results with column names as keys
+    list[dict] or str
+        List of dictionaries containing query results with column names as
+        keys, or the query id if fetch is False
 
     Raises
     ------
     snowflake.connector.errors.Error
         If connection fails or SQL execution encounters an error
+    SnowflakeException
+        If the statement violates the configured SQL policy or cost limits
     """
+    # Uses the same cached parse as the permission check and canonicalization
+    expression = parse_statement(statement)
+    enforce_sql_policy(statement, expression, snowflake_service)
+    warehouse = check_query_cost(expression, snowflake_service, tool_name)
+
     try:
         # Get statement type for query comment
         statement_type = get_statement_type(statement)
+        if changes_session_state(expression):
+            # Later statements may use the state, so they stay on this session
+            snowflake_service.pause_routing()
+            warehouse = None
+        if warehouse is None and snowflake_service.warehouse_router is not None:
+            warehouse = snowflake_service.route_warehouse(
+                statement_type, canonical_query(expression)
+            )
+
+        result_reuse = snowflake_service.query_comment_result_reuse
+        if result_reuse:
+            statement = canonicalize_statement(statement)
 
         # Build query comment if enabled
         query_comment = snowflake_service.build_query_comment(
@@ -46,6 +88,24 @@ def run_query(
             statement_type=statement_type,
         )
 
+        # Snowflake only reuses cached results for identical statement text, so
+        # per-request metadata moves into the statement's QUERY_TAG
+        statement_params = None
+        if query_comment and result_reuse:
+            statement_params = snowflake_service.build_statement_query_tag(
+                query_comment
+            )
+            if statement_params is None:
+                # Too long for QUERY_TAG, so fall back to a comment without
+                # per-request values
+                query_comment = snowflake_service.build_query_comment(
+                    tool_name=tool_name,
+                    statement_type=statement_type,
+                    stable=True,
+                )
+            else:
+                query_comment = None
+
         # Prepend comment to statement if enabled
         if query_comment:
             statement_with_comment = f"/* {query_comment} */\n{statement}"
@@ -55,12 +115,21 @@ def run_query(
         with snowflake_service.get_connection(
             use_dict_cursor=True,
             session_parameters=snowflake_service.get_query_tag_param(),
+            warehouse=warehouse,
         ) as (
             con,
             cur,
         ):
-            cur.execute(statement_with_comment)
-            return cur.fetchall()
+            with time_phase("execute"):
+                execute_statement(
+                    cur, statement_with_comment, statement_params=statement_params
+                )
+                record_query_id(cur.sfqid)
+            snowflake_service.set_last_query_id(cur.sfqid)
+            if not fetch:
+                return cur.sfqid
+            with time_phase("fetch"):
+                return cur.fetchall()
     except Exception as e:
         raise SnowflakeException(
             tool="query_manager",
@@ -70,7 +139,8 @@ def run_query(
 
 
 def initialize_query_manager_tool(server: FastMCP, snowflake_service):
-    @server.tool(
+    @cached_tool(
+        server,
         name="run_snowflake_query",
         description=query_tool_prompt,
     )
@@ -82,7 +152,58 @@ def initialize_query_manager_tool(server: FastMCP, snowflake_service):
     ):
         return run_query(statement, snowflake_service)
 
-    @server.tool(
+    @cached_tool(
+        server,
+        name="get_query_profile",
+        description=query_profile_prompt,
+    )
+    def get_query_profile_tool(
+        query_id: Annotated[
+            Optional[str],
+            Field(
+                description="Query id to profile. Defaults to the last query this session ran with run_snowflake_query.",
+                default=None,
+            ),
+        ] = None,
+    ):
+        return get_query_profile(snowflake_service, query_id)
+
+    if snowflake_service.result_export is not None:
+
+        @cached_tool(
+            server,
+            name="export_query_results",
+            description=export_query_results_prompt,
+        )
+        def export_query_results_tool(
+            statement: Annotated[
+                Optional[str],
+                Field(
+                    description="SELECT query to run and export. Omit to export the result of query_id.",
+                    default=None,
+                ),
+            ] = None,
+            query_id: Annotated[
+                Optional[str],
+                Field(
+                    description="Query id whose result to export. Defaults to the last query this session ran with run_snowflake_query.",
+                    default=None,
+                ),
+            ] = None,
+            file_format: Annotated[
+                Optional[Literal["parquet", "csv"]],
+                Field(
+                    description="File format. Defaults to the configured format.",
+                    default=None,
+                ),
+            ] = None,
+        ):
+            return export_query_results(
+                snowflake_service, statement, query_id, file_format
+            )
+
+    @cached_tool(
+        server,
         name="set_query_context",
         description="""Set runtime context for query comments and observability.
 
@@ -186,7 +307,8 @@ to update intent/query_parameters for different queries.""",
             "context": updated_context,
         }
 
-    @server.tool(
+    @cached_tool(
+        server,
         name="get_query_context",
         description="Get the current query context that will be included in query comments.",
     )
@@ -198,22 +320,74 @@ to update intent/query_parameters for different queries.""",
         }
 
 
-def get_statement_type(sql_string):
+@lru_cache(maxsize=256)
+def parse_statement(sql_string: str) -> Optional[sqlglot.exp.Expression]:
     """
-    Parses a SQL statement and returns its primary command type.
+    Parse a SQL statement, or return None if it cannot be parsed.
+
+    Parses are cached so the permission check, policy evaluation and
+    canonicalization of one statement share a single parse. Callers must not
+    modify the returned tree.
     """
     try:
-        # Parse the SQL statement. The root of the AST is the statement type.
-        expression_tree = sqlglot.parse_one(sql_string, dialect="snowflake")
+        with time_phase("parse"):
+            return sqlglot.parse_one(sql_string, dialect="snowflake")
+    except sqlglot.errors.ParseError:
+        return None
+
 
+def changes_session_state(expression: Optional[sqlglot.exp.Expression]) -> bool:
+    """
+    Whether a statement leaves state only its own session sees.
+
+    That is session variables, temporary objects and session parameters,
+    which statements run on other sessions cannot use.
+    """
+    if isinstance(expression, sqlglot.exp.Block):
+        return any(changes_session_state(e) for e in expression.expressions)
+    if isinstance(expression, sqlglot.exp.Set):
+        return True
+    if isinstance(expression, sqlglot.exp.Create):
+        properties = expression.args.get("properties")
+        return (
+            properties is not None
+            and properties.find(sqlglot.exp.TemporaryProperty) is not None
+        )
+    if isinstance(expression, sqlglot.exp.Alter):
+        return (expression.args.get("kind") or "").upper() == "SESSION"
+    return False
+
+
+def canonicalize_statement(statement: str) -> str:
+    """
+    Render a statement in a canonical Snowflake SQL form.
+
+    Statements that differ only in whitespace, keyword case, or comments produce
+    identical text. Statements sqlglot cannot fully parse are only trimmed.
+    """
+    expression = parse_statement(statement)
+    # Multiple statements parse into a Block
+    if expression is None or isinstance(
+        expression, (sqlglot.exp.Command, sqlglot.exp.Block)
+    ):
+        return statement.strip()
+    return expression.sql(dialect="snowflake", comments=False)
+
+
+def get_statement_type(sql_string):
+    """
+    Parses a SQL statement and returns its primary command type.
+    """
+    # The root of the AST is the statement type.
+    expression_tree = parse_statement(sql_string)
+    if expression_tree is None:
+        # We will map this back to user's Unknown statement type setting
+        statement_type = "Unknown"
+    else:
         # The expression type is the class of the root node.
         statement_type = type(expression_tree).__name__
-
-        return statement_type
-    except (
-        sqlglot.errors.ParseError
-    ):  # We will map this back to user's Unknown statement type setting
-        return "Unknown"
+    record_statement_type(statement_type)
+    return statement_type
 
 
 def validate_sql_type(
@@ -221,27 +395,10 @@ def validate_sql_type(
 ) -> tuple[str, bool]:
     """
     Validates a SQL statement type against a list of allowed and disallowed statement types.
+
+    Disallowed types take precedence over allowed types unless "all" is allowed.
+    Types in neither list are allowed only if "unknown" is allowed.
     """
     statement_type = get_statement_type(sql_string)
-    if (
-        "all" in sql_allow_list
-    ):  # Escape hatch for allowing all statements if user elects to explicitly
-        valid = True
-    elif (
-        statement_type.lower() in sql_disallow_list
-    ):  # Allow/Disallow lists should already be lowercase at load
-        valid = False
-    elif statement_type.lower() in sql_allow_list:
-        valid = True
-    # There may be a new unmapped type that is not in the allow/disallow lists. If the user has set Unknown to True, allow it.
-    elif "unknown" in sql_allow_list:
-        valid = True
-
-    # User has not added any permissions, so we default to disallowing all statements
-    elif len(sql_allow_list) == 0 and len(sql_disallow_list) == 0:
-        valid = False
-
-    else:  # If not in allowed or disallowed and unknown in disallow or omitted, return error. User can always add to list as they find statements not otherwise allowed.
-        valid = False
-
-    return (statement_type, valid)
+    permissions = compile_sql_permissions(sql_allow_list, sql_disallow_list)
+    return (statement_type, permissions.is_statement_allowed(statement_type))
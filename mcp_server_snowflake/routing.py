@@ -0,0 +1,182 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+
+from fastmcp.utilities.logging import get_logger
+from pydantic import BaseModel
+
+logger = get_logger(__name__)
+
+
+class WarehouseRule(BaseModel):
+    """
+    A warehouse_routing rule. Every condition that is set must match.
+
+    Size conditions only match statements run with run_snowflake_query that
+    EXPLAIN can estimate.
+    """
+
+    warehouse: str
+    tools: List[str] = []
+    statement_types: List[str] = []
+    min_bytes_assigned: Optional[int] = None
+    min_partitions_assigned: Optional[int] = None
+
+    @property
+    def needs_estimate(self) -> bool:
+        return (
+            self.min_bytes_assigned is not None
+            or self.min_partitions_assigned is not None
+        )
+
+
+class WarehouseRoutingConfig(BaseModel):
+    """The warehouse_routing section of the service configuration."""
+
+    rules: List[WarehouseRule] = []
+    # Connections kept open for each routed warehouse
+    pool_size: int = 4
+
+
+class WarehouseRouter:
+    """
+    Choose a warehouse for each statement from the first matching rule.
+
+    Statements matching no rule run on the default connection.
+
+    Parameters
+    ----------
+    config : WarehouseRoutingConfig
+        Rules from the configuration file
+    estimator : CostEstimator, optional
+        Source of EXPLAIN estimates for size conditions
+    """
+
+    def __init__(self, config: WarehouseRoutingConfig, estimator: Any = None):
+        self.config = config
+        self.estimator = estimator
+        self.rules = [
+            (
+                rule,
+                frozenset(rule.tools),
+                frozenset(t.lower() for t in rule.statement_types),
+            )
+            for rule in config.rules
+        ]
+
+    def route(
+        self,
+        tool_name: Optional[str],
+        statement_type: Optional[str] = None,
+        statement: Optional[str] = None,
+        snowflake_service: Any = None,
+    ) -> Optional[str]:
+        """
+        Return the warehouse for a statement, or None for the default connection.
+
+        Parameters
+        ----------
+        tool_name : str, optional
+            Tool running the statement
+        statement_type : str, optional
+            Statement type from get_statement_type
+        statement : str, optional
+            Canonical query text, required for size conditions
+        snowflake_service : SnowflakeService, optional
+            Service used to run EXPLAIN for size conditions
+        """
+        estimate = None
+        for rule, tools, statement_types in self.rules:
+            if tools and tool_name not in tools:
+                continue
+            if statement_types and (
+                statement_type is None or statement_type.lower() not in statement_types
+            ):
+                continue
+            if rule.needs_estimate:
+                if statement is None or self.estimator is None:
+                    continue
+                if estimate is None:
+                    try:
+                        estimate = self.estimator.estimate(statement, snowflake_service)
+                    except Exception as e:
+                        logger.warning(f"Unable to estimate statement for routing: {e}")
+                        return None
+                if (
+                    rule.min_bytes_assigned is not None
+                    and estimate.bytes_assigned < rule.min_bytes_assigned
+                ) or (
+                    rule.min_partitions_assigned is not None
+                    and estimate.partitions_assigned < rule.min_partitions_assigned
+                ):
+                    continue
+            return rule.warehouse
+        return None
+
+
+def compile_warehouse_routing(
+    warehouse_routing: Optional[dict], estimator: Any = None
+) -> Optional[WarehouseRouter]:
+    """Compile the warehouse_routing configuration section, or return None if absent."""
+    if not warehouse_routing:
+        return None
+    return WarehouseRouter(WarehouseRoutingConfig(**warehouse_routing), estimator)
+
+
+class ConnectionPool:
+    """
+    Connections to one warehouse, each used by one statement at a time.
+
+    Connections are opened on demand up to max_size and kept open. Callers
+    wait for a free connection once all are in use.
+
+    Parameters
+    ----------
+    connect : Callable[[], Any]
+        Opens a new connection
+    max_size : int
+        Maximum number of open connections
+    """
+
+    def __init__(self, connect: Callable[[], Any], max_size: int):
+        self._connect = connect
+        self.max_size = max_size
+        self._available = threading.BoundedSemaphore(max_size)
+        self._idle: List[Any] = []
+        self._connections: List[Any] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        with self._available:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                connection = self._connect()
+                with self._lock:
+                    self._connections.append(connection)
+            try:
+                yield connection
+            finally:
+                with self._lock:
+                    self._idle.append(connection)
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections, self._idle = self._connections, [], []
+        for connection in connections:
+            connection.close()
@@ -0,0 +1,146 @@
+import difflib
+from typing import Literal
+
+from mcp_server_snowflake.semantic_manager.objects import (
+    SemanticDefinition,
+    SemanticExpression,
+    SemanticView,
+    SemanticViewReference,
+)
+from mcp_server_snowflake.utils import TTLCache
+
+# Semantic view definitions change rarely, so compiled catalogs are reused for a while
+SEMANTIC_VIEW_CACHE_TTL_SECONDS = 300
+
+ExpressionKind = Literal["dimension", "metric", "fact"]
+
+
+def _key(identifier: str) -> str:
+    return identifier.strip().strip('"').upper()
+
+
+class CompiledSemanticView:
+    """
+    Semantic view indexed for constant-time validation of query arguments.
+
+    Identifiers are compared case-insensitively.
+
+    Parameters
+    ----------
+    semantic_view : SemanticView
+        Parsed semantic view definition
+    """
+
+    def __init__(self, semantic_view: SemanticView):
+        self.semantic_view = semantic_view
+        self.tables = {_key(table.table_alias): table for table in semantic_view.tables}
+        self.expressions: dict[
+            tuple[str, str], tuple[ExpressionKind, SemanticDefinition]
+        ] = {}
+        self.by_name: dict[str, list[tuple[ExpressionKind, SemanticDefinition]]] = {}
+        self.candidates: dict[ExpressionKind, list[str]] = {
+            "dimension": [],
+            "metric": [],
+            "fact": [],
+        }
+        for kind, definitions in (
+            ("dimension", semantic_view.dimensions),
+            ("metric", semantic_view.metrics),
+            ("fact", semantic_view.facts),
+        ):
+            for definition in definitions:
+                entry = (kind, definition)
+                self.expressions[(_key(definition.table), _key(definition.name))] = (
+                    entry
+                )
+                self.by_name.setdefault(_key(definition.name), []).append(entry)
+                self.candidates[kind].append(f"{definition.table}.{definition.name}")
+        self._upper_candidates = {
+            kind: {name.upper(): name for name in names}
+            for kind, names in self.candidates.items()
+        }
+
+    def suggest(self, kind: ExpressionKind, expr: SemanticExpression) -> list[str]:
+        """Return up to three known expressions of a kind closest to expr."""
+        # The same name under another logical table is the most likely intent
+        suggestions = [
+            f"{definition.table}.{definition.name}"
+            for found_kind, definition in self.by_name.get(_key(expr.name), [])
+            if found_kind == kind
+        ]
+        close = difflib.get_close_matches(
+            f"{_key(expr.table)}.{_key(expr.name)}",
+            list(self._upper_candidates[kind]),
+            n=3,
+            cutoff=0.6,
+        )
+        for match in close:
+            name = self._upper_candidates[kind][match]
+            if name not in suggestions:
+                suggestions.append(name)
+        return suggestions[:3]
+
+    def check(self, kind: ExpressionKind, expr: SemanticExpression) -> str | None:
+        """Return an error message if expr is not a known expression of kind."""
+        found = self.expressions.get((_key(expr.table), _key(expr.name)))
+        if found is not None:
+            if found[0] == kind:
+                return None
+            return f"{expr.table}.{expr.name} is a {found[0]}, not a {kind}."
+
+        if _key(expr.table) not in self.tables:
+            message = f"Unknown logical table {expr.table} for {kind} {expr.name}."
+        else:
+            message = f"Unknown {kind} {expr.table}.{expr.name}."
+        suggestions = self.suggest(kind, expr)
+        if suggestions:
+            message += f" Did you mean {', '.join(suggestions)}?"
+        return message
+
+    def validate(
+        self,
+        dimensions: list[SemanticExpression] = [],
+        metrics: list[SemanticExpression] = [],
+        facts: list[SemanticExpression] = [],
+    ) -> list[str]:
+        """Return error messages for every argument not defined in the view."""
+        errors = []
+        for kind, exprs in (
+            ("dimension", dimensions),
+            ("metric", metrics),
+            ("fact", facts),
+        ):
+            for expr in exprs:
+                error = self.check(kind, expr)
+                if error:
+                    errors.append(error)
+        return errors
+
+
+class SemanticCatalog:
+    """
+    Cache of compiled semantic views.
+
+    Parameters
+    ----------
+    ttl_seconds : float
+        Seconds a compiled view is reused before it is described again
+    """
+
+    def __init__(self, ttl_seconds: float = SEMANTIC_VIEW_CACHE_TTL_SECONDS):
+        self._cache = TTLCache(ttl_seconds=ttl_seconds)
+
+    def put(self, semantic_view: SemanticView) -> CompiledSemanticView:
+        compiled = CompiledSemanticView(semantic_view)
+        key = ".".join(
+            (semantic_view.database_name, semantic_view.schema_name, semantic_view.name)
+        ).upper()
+        self._cache.set(key, compiled)
+        return compiled
+
+    def get(self, view: SemanticViewReference) -> CompiledSemanticView | None:
+        """Return the compiled view, or None if it is not cached."""
+        return self._cache.get(view.fully_qualified_name.upper())
+
+    def clear(self) -> None:
+        self._cache.clear()
@@ -1,21 +1,40 @@
+import json
+from typing import Any
+
 from pydantic import BaseModel
 
 
+class SemanticViewReference(BaseModel):
+    database_name: str
+    schema_name: str
+    view_name: str
+
+    @property
+    def fully_qualified_name(self) -> str:
+        return f"{self.database_name}.{self.schema_name}.{self.view_name}"
+
+
 class SemanticExpression(BaseModel):
     table: str
     name: str
-    # sql_expr: str
-    # synonyms: list[str]
-    # comment: str = None
 
 
-# class LogicalTable(BaseModel):
-#     table_alias: str
-#     name: str
-#     primary_keys: list[str] = []
-#     unique_keys: list[str] = []
-#     synonyms: list[str] = []
-#     comment: str = None
+class SemanticDefinition(SemanticExpression):
+    """A fact, dimension, or metric as defined in a semantic view."""
+
+    sql_expr: str | None = None
+    data_type: str | None = None
+    synonyms: list[str] = []
+    comment: str | None = None
+
+
+class LogicalTable(BaseModel):
+    table_alias: str
+    name: str | None = None
+    primary_keys: list[str] = []
+    unique_keys: list[str] = []
+    synonyms: list[str] = []
+    comment: str | None = None
 
 
 # class WindowMetric(SemanticExpression):
@@ -24,21 +43,109 @@ class SemanticExpression(BaseModel):
 #     asc: bool = True
 
 
-# class SemanticRelationship(BaseModel):
-#     name: str
-#     left_table_alias: str
-#     right_table_alias: str
-#     left_table_columns: list[str]
-#     right_table_columns: list[str]
-
-
-# class SemanticView(BaseModel):
-#     database_name: str
-#     schema_name: str
-#     name: str
-#     comment: str = None
-#     tables: list[LogicalTable]
-#     relationships: list[SemanticRelationship] = []
-#     facts: list[SemanticExpression] = []
-#     dimensions: list[SemanticExpression] = []
-#     metrics: list[SemanticExpression|WindowMetric] = []
+class SemanticRelationship(BaseModel):
+    name: str
+    left_table_alias: str | None = None
+    right_table_alias: str | None = None
+    left_table_columns: list[str] = []
+    right_table_columns: list[str] = []
+
+
+def _parse_list(value: Any) -> list[str]:
+    """DESCRIBE reports list properties as JSON arrays."""
+    if value in (None, ""):
+        return []
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    try:
+        parsed = json.loads(value)
+    except (TypeError, ValueError):
+        return [item.strip() for item in str(value).split(",") if item.strip()]
+    if isinstance(parsed, list):
+        return [str(item) for item in parsed]
+    return [str(parsed)]
+
+
+class SemanticView(BaseModel):
+    database_name: str
+    schema_name: str
+    name: str
+    comment: str | None = None
+    tables: list[LogicalTable] = []
+    relationships: list[SemanticRelationship] = []
+    facts: list[SemanticDefinition] = []
+    dimensions: list[SemanticDefinition] = []
+    metrics: list[SemanticDefinition] = []
+
+    @classmethod
+    def from_describe(
+        cls, view: SemanticViewReference, describe_rows: list[dict]
+    ) -> "SemanticView":
+        """
+        Build a semantic view from DESCRIBE SEMANTIC VIEW output.
+
+        DESCRIBE returns one row per property. Rows are grouped by object kind,
+        parent table and object name.
+        """
+        objects: dict[tuple, dict[str, Any]] = {}
+        for row in describe_rows:
+            key = (
+                (row.get("object_kind") or "").upper(),
+                row.get("parent_entity"),
+                row.get("object_name"),
+            )
+            prop = (row.get("property") or "").lower()
+            if prop:
+                objects.setdefault(key, {})[prop] = row.get("property_value")
+
+        semantic_view = cls(
+            database_name=view.database_name,
+            schema_name=view.schema_name,
+            name=view.view_name,
+        )
+        for (kind, parent, name), props in objects.items():
+            if not kind:
+                semantic_view.comment = props.get("comment")
+            elif kind == "TABLE":
+                base_table = ".".join(
+                    filter(
+                        None,
+                        (
+                            props.get("base_table_database_name"),
+                            props.get("base_table_schema_name"),
+                            props.get("base_table_name"),
+                        ),
+                    )
+                )
+                semantic_view.tables.append(
+                    LogicalTable(
+                        table_alias=name,
+                        name=base_table or None,
+                        primary_keys=_parse_list(props.get("primary_key")),
+                        unique_keys=_parse_list(props.get("unique_key")),
+                        synonyms=_parse_list(props.get("synonyms")),
+                        comment=props.get("comment"),
+                    )
+                )
+            elif kind == "RELATIONSHIP":
+                semantic_view.relationships.append(
+                    SemanticRelationship(
+                        name=name,
+                        left_table_alias=props.get("table") or parent,
+                        right_table_alias=props.get("ref_table"),
+                        left_table_columns=_parse_list(props.get("foreign_key")),
+                        right_table_columns=_parse_list(props.get("ref_key")),
+                    )
+                )
+            elif kind in ("FACT", "DIMENSION", "METRIC"):
+                getattr(semantic_view, f"{kind.lower()}s").append(
+                    SemanticDefinition(
+                        table=props.get("table") or parent or "",
+                        name=name,
+                        sql_expr=props.get("expression"),
+                        data_type=props.get("data_type"),
+                        synonyms=_parse_list(props.get("synonyms")),
+                        comment=props.get("comment"),
+                    )
+                )
+        return semantic_view
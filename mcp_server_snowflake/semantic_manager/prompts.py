@@ -2,6 +2,8 @@ write_semantic_view_query_prompt = """
 Writes a query statement to query a semantic view using DIMENSIONS, METRICS, and/or FACTS.
 Supports optional WHERE, ORDER BY, and LIMIT clauses.
 Query statement cannot combine FACTS and METRICS in same query.
+Returns the statement, its bind variables, and a fingerprint that is identical for identical queries.
+Does not query Snowflake: dimensions, metrics, and facts are only checked against the semantic view if it was described recently, otherwise errors surface when the query runs.
 Use tool if asked to create a query to query a semantic view."""
 
 query_semantic_view_prompt = """
@@ -9,3 +11,8 @@ Writes and runs a statement to query a semantic view using DIMENSIONS, METRICS,
 Supports optional WHERE, ORDER BY, and LIMIT clauses.
 Query statement cannot combine FACTS and METRICS in same query.
 Use tool if asked to query a semantic view directly."""
+
+describe_semantic_views_bulk_prompt = """
+Describes one or more semantic views in a single call, including their logical tables, relationships, facts, dimensions, and metrics.
+Prefer this tool over calling describe_semantic_view, show_semantic_dimensions, and show_semantic_metrics separately.
+Results are cached for a few minutes."""
@@ -1,14 +1,41 @@
-from typing import Annotated, Literal
+import hashlib
+from functools import lru_cache
+from typing import Annotated, Any, Literal, NamedTuple
 
 from fastmcp import FastMCP
+from fastmcp.utilities.logging import get_logger
 from pydantic import Field
 
-from mcp_server_snowflake.semantic_manager.objects import SemanticExpression
+from mcp_server_snowflake.semantic_manager.catalog import (
+    SEMANTIC_VIEW_CACHE_TTL_SECONDS,
+    CompiledSemanticView,
+    SemanticCatalog,
+)
+from mcp_server_snowflake.semantic_manager.objects import (
+    SemanticDefinition,
+    SemanticExpression,
+    SemanticView,
+    SemanticViewReference,
+)
 from mcp_server_snowflake.semantic_manager.prompts import (
+    describe_semantic_views_bulk_prompt,
     query_semantic_view_prompt,
     write_semantic_view_query_prompt,
 )
-from mcp_server_snowflake.utils import SnowflakeException, execute_query
+from mcp_server_snowflake.tool_cache import cached_tool
+from mcp_server_snowflake.utils import (
+    ContextThreadPoolExecutor,
+    SnowflakeException,
+    TTLCache,
+    compile_sql_permissions,
+    execute_query,
+)
+
+logger = get_logger(__name__)
+
+# Maximum number of concurrent introspection queries for bulk descriptions
+DEFAULT_MAX_WORKERS = 8
+MAX_BULK_VIEWS = 25
 
 
 def list_semantic_views(
@@ -145,6 +172,208 @@ def get_semantic_view_ddl(
         raise SnowflakeException(tool="get_semantic_view_ddl", message=str(e))
 
 
+def compact_semantic_view(
+    semantic_view: SemanticView,
+    dimension_rows: list[dict],
+    metric_rows: list[dict],
+    ddl: str | None = None,
+) -> dict[str, Any]:
+    """
+    Merge the introspection results for one semantic view into one structure.
+
+    SHOW DIMENSIONS and SHOW METRICS only contribute fields DESCRIBE did not
+    report, so each expression appears once. Empty fields are omitted.
+    """
+    definitions = {
+        (kind, definition.table.upper(), definition.name.upper()): definition
+        for kind, definitions in (
+            ("dimensions", semantic_view.dimensions),
+            ("metrics", semantic_view.metrics),
+        )
+        for definition in definitions
+    }
+    for kind, rows in (("dimensions", dimension_rows), ("metrics", metric_rows)):
+        for row in rows:
+            key = (
+                kind,
+                (row.get("table_name") or "").upper(),
+                (row.get("name") or "").upper(),
+            )
+            definition = definitions.get(key)
+            if definition is None:
+                definition = SemanticDefinition(
+                    table=row.get("table_name") or "", name=row.get("name") or ""
+                )
+                definitions[key] = definition
+                getattr(semantic_view, kind).append(definition)
+            if not definition.data_type:
+                definition.data_type = row.get("data_type")
+            if not definition.comment:
+                definition.comment = row.get("comment")
+
+    result = semantic_view.model_dump(exclude_defaults=True)
+    if ddl:
+        result["ddl"] = ddl
+    return result
+
+
+def describe_semantic_views_bulk(
+    snowflake_service,
+    views: list[SemanticViewReference],
+    include_ddl: bool = False,
+    cache: TTLCache | None = None,
+    catalog: SemanticCatalog | None = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> list[dict[str, Any]]:
+    """
+    Describe several semantic views in one call.
+
+    DESCRIBE, SHOW SEMANTIC DIMENSIONS, SHOW SEMANTIC METRICS and optionally
+    GET_DDL run concurrently for every view that is not cached. A failure for
+    one view is reported in its entry and does not fail the others.
+
+    Parameters
+    ----------
+    snowflake_service : SnowflakeService
+        Service used to run introspection queries
+    views : list[SemanticViewReference]
+        Views to describe. Duplicates are described once.
+    include_ddl : bool, default=False
+        Whether to include the GET_DDL output for each view
+    cache : TTLCache, optional
+        Cache of previous descriptions keyed by view name and include_ddl
+    catalog : SemanticCatalog, optional
+        Catalog updated with every view described, so later queries against
+        these views are validated without another DESCRIBE
+    max_workers : int
+        Maximum number of concurrent introspection queries
+
+    Returns
+    -------
+    list[dict]
+        One compact description per unique view, in request order
+    """
+    if not views:
+        raise SnowflakeException(
+            tool="describe_semantic_views_bulk",
+            message="Please specify at least one semantic view.",
+        )
+    if len(views) > MAX_BULK_VIEWS:
+        raise SnowflakeException(
+            tool="describe_semantic_views_bulk",
+            message=f"At most {MAX_BULK_VIEWS} semantic views can be described at once.",
+        )
+
+    unique: dict[str, SemanticViewReference] = {}
+    for view in views:
+        unique.setdefault(view.fully_qualified_name.upper(), view)
+
+    results: dict[str, dict[str, Any]] = {}
+    pending = []
+    for key, view in unique.items():
+        cached = cache.get((key, include_ddl)) if cache is not None else None
+        if cached is not None:
+            results[key] = cached
+        else:
+            pending.append((key, view))
+
+    if pending:
+        tasks = {}
+        with ContextThreadPoolExecutor(
+            max_workers=min(max_workers, len(pending) * 4)
+        ) as executor:
+            for key, view in pending:
+                args = (view.view_name, view.database_name, view.schema_name)
+                tasks[key] = {
+                    "describe": executor.submit(
+                        describe_semantic_view, snowflake_service, *args
+                    ),
+                    "dimensions": executor.submit(
+                        show_semantic_expressions,
+                        snowflake_service,
+                        "DIMENSIONS",
+                        view.database_name,
+                        view.schema_name,
+                        view.view_name,
+                    ),
+                    "metrics": executor.submit(
+                        show_semantic_expressions,
+                        snowflake_service,
+                        "METRICS",
+                        view.database_name,
+                        view.schema_name,
+                        view.view_name,
+                    ),
+                }
+                if include_ddl:
+                    tasks[key]["ddl"] = executor.submit(
+                        get_semantic_view_ddl, snowflake_service, *args
+                    )
+
+        for key, view in pending:
+            try:
+                # "No dimensions found." style messages mean an empty result
+                fetched = {name: future.result() for name, future in tasks[key].items()}
+                semantic_view = SemanticView.from_describe(view, fetched["describe"])
+                description = compact_semantic_view(
+                    semantic_view,
+                    fetched["dimensions"]
+                    if isinstance(fetched["dimensions"], list)
+                    else [],
+                    fetched["metrics"] if isinstance(fetched["metrics"], list) else [],
+                    fetched.get("ddl"),
+                )
+            except Exception as e:
+                results[key] = {
+                    "database_name": view.database_name,
+                    "schema_name": view.schema_name,
+                    "name": view.view_name,
+                    "error": str(e),
+                }
+                continue
+            if cache is not None:
+                cache.set((key, include_ddl), description)
+            if catalog is not None:
+                catalog.put(semantic_view)
+            results[key] = description
+
+    return [results[key] for key in unique]
+
+
+class SemanticQuery(NamedTuple):
+    statement: str
+    bindvars: list[str]
+    fingerprint: str
+
+
+@lru_cache(maxsize=256)
+def _semantic_view_template(shape: tuple[int, int, int]) -> str:
+    """
+    Build the SEMANTIC_VIEW sub-select for a clause shape.
+
+    Parameters
+    ----------
+    shape : tuple[int, int, int]
+        Number of dimensions, metrics and facts, in clause order
+    """
+    parts = ["SELECT * FROM SEMANTIC_VIEW (identifier(?)"]
+    # Clause order affects output column order
+    for keyword, count in zip(("DIMENSIONS", "METRICS", "FACTS"), shape):
+        if count:
+            parts.append(f" {keyword} " + ", ".join(["identifier(?)"] * count))
+    parts.append(")")
+    return "".join(parts)
+
+
+def semantic_query_fingerprint(statement: str, bindvars: list[str]) -> str:
+    """Stable identifier of a statement and its bind variables."""
+    digest = hashlib.sha256(statement.encode())
+    for value in bindvars:
+        digest.update(b"\x00")
+        digest.update(value.encode())
+    return digest.hexdigest()[:32]
+
+
 def write_semantic_view_query(
     view_name: str,
     database_name: str,
@@ -155,7 +384,8 @@ def write_semantic_view_query(
     where_clause: str = None,
     order_by: str = None,
     limit: int | str = None,
-) -> tuple[str, list[str]]:
+    semantic_view: CompiledSemanticView | None = None,
+) -> "SemanticQuery":
     """
     Query a semantic view with comprehensive support for all SEMANTIC_VIEW clauses.
 
@@ -165,6 +395,12 @@ def write_semantic_view_query(
     - Must specify at least one of DIMENSIONS, METRICS, or FACTS
     - Cannot specify both FACTS and METRICS in the same query
     - When using FACTS + DIMENSIONS, all must be from the same logical table
+    - When semantic_view is given, every expression must be defined in it
+
+    Returns
+    -------
+    SemanticQuery
+        Statement, bind variables, and a fingerprint of both
     """
 
     # Validation: Ensure at least one clause is specified
@@ -181,38 +417,21 @@ def write_semantic_view_query(
             message="Cannot specify both FACTS and METRICS in the same SEMANTIC_VIEW query",
         )
 
-    statement = "SELECT * FROM SEMANTIC_VIEW (identifier(?)"
-    bindvars = [f"{database_name}.{schema_name}.{view_name}"]
+    # Validation: Catch unknown expressions locally instead of in Snowflake
+    if semantic_view is not None:
+        errors = semantic_view.validate(dimensions, metrics, facts)
+        if errors:
+            raise SnowflakeException(
+                tool="write_semantic_view_query",
+                message=" ".join(errors),
+            )
 
-    # Add clauses in order (affects output column order)
-    if dimensions:
-        statement += " DIMENSIONS"
-        for index, expr in enumerate(dimensions):
-            is_last = index == len(dimensions) - 1
-            statement += " identifier(?)"
-            bindvars.extend([f"{expr.table}.{expr.name}"])
-            if not is_last:
-                statement += ","
-
-    if metrics:
-        statement += " METRICS"
-        for index, expr in enumerate(metrics):
-            is_last = index == len(metrics) - 1
-            statement += " identifier(?)"
-            bindvars.extend([f"{expr.table}.{expr.name}"])
-            if not is_last:
-                statement += ","
-
-    if facts:
-        statement += " FACTS"
-        for index, expr in enumerate(facts):
-            is_last = index == len(facts) - 1
-            statement += " identifier(?)"
-            bindvars.extend([f"{expr.table}.{expr.name}"])
-            if not is_last:
-                statement += ","
-
-    statement += ")"  # Close out the semantic sub-select
+    # Only the bind variables depend on the view and expression names
+    statement = _semantic_view_template((len(dimensions), len(metrics), len(facts)))
+    bindvars = [f"{database_name}.{schema_name}.{view_name}"]
+    bindvars.extend(f"{expr.table}.{expr.name}" for expr in dimensions)
+    bindvars.extend(f"{expr.table}.{expr.name}" for expr in metrics)
+    bindvars.extend(f"{expr.table}.{expr.name}" for expr in facts)
 
     # Add optional clauses
     if where_clause:
@@ -229,10 +448,30 @@ def write_semantic_view_query(
             )
         statement += f" LIMIT {int(limit)}"
 
-    try:
-        return (statement, bindvars)
-    except Exception as e:
-        raise SnowflakeException(tool="write_semantic_view_query", message=str(e))
+    return SemanticQuery(
+        statement, bindvars, semantic_query_fingerprint(statement, bindvars)
+    )
+
+
+def get_compiled_semantic_view(
+    catalog: SemanticCatalog | None,
+    view_name: str,
+    database_name: str,
+    schema_name: str,
+) -> CompiledSemanticView | None:
+    """
+    Return the compiled semantic view if the catalog has it.
+
+    Views are added to the catalog when they are described, so a miss returns
+    None without querying Snowflake.
+    """
+    if catalog is None:
+        return None
+    return catalog.get(
+        SemanticViewReference(
+            database_name=database_name, schema_name=schema_name, view_name=view_name
+        )
+    )
 
 
 def query_semantic_view(
@@ -246,9 +485,17 @@ def query_semantic_view(
     where_clause: str = None,
     order_by: str = None,
     limit: int | str = None,
+    catalog: SemanticCatalog | None = None,
 ):
+    """
+    Run a SEMANTIC_VIEW query.
+
+    Snowflake validates the expressions. The catalog may be stale or miss
+    names its parser did not understand, so it is only used to add the
+    closest defined names to the error of a failed query.
+    """
     try:
-        (statement, bindvars) = write_semantic_view_query(
+        query = write_semantic_view_query(
             view_name,
             database_name,
             schema_name,
@@ -259,10 +506,17 @@ def query_semantic_view(
             order_by,
             limit,
         )
-
-        return execute_query(statement, snowflake_service, bindvars)
+        return execute_query(query.statement, snowflake_service, query.bindvars)
     except Exception as e:
-        raise SnowflakeException(tool="query_semantic_view", message=str(e))
+        message = str(e)
+        semantic_view = get_compiled_semantic_view(
+            catalog, view_name, database_name, schema_name
+        )
+        if semantic_view is not None:
+            message = " ".join(
+                [message, *semantic_view.validate(dimensions, metrics, facts)]
+            )
+        raise SnowflakeException(tool="query_semantic_view", message=message)
 
 
 def validate_semantic_view_tool(
@@ -275,21 +529,17 @@ def validate_semantic_view_tool(
     else:  # All other semantic view tools are permissible
         return ("", True)
 
-    # User has not added any permissions, so we default to disallowing all object actions
-    if len(sql_allow_list) == 0 and len(sql_disallow_list) == 0:
-        valid = False
-    if func_type in sql_allow_list:
-        valid = True
-    elif func_type in sql_disallow_list:
-        valid = False
-    else:
-        valid = False
-
-    return (func_type, valid)
+    # Listing must be allowed explicitly, so empty permissions disallow it
+    permissions = compile_sql_permissions(sql_allow_list, sql_disallow_list)
+    return (func_type, permissions.is_action_allowed(func_type))
 
 
 def initialize_semantic_manager_tools(server: FastMCP, snowflake_service):
-    @server.tool(
+    semantic_view_cache = TTLCache(ttl_seconds=SEMANTIC_VIEW_CACHE_TTL_SECONDS)
+    semantic_catalog = SemanticCatalog(ttl_seconds=SEMANTIC_VIEW_CACHE_TTL_SECONDS)
+
+    @cached_tool(
+        server,
         name="list_semantic_views",
         description="List all semantic views in the account, database, or schema.",
     )
@@ -327,7 +577,8 @@ def initialize_semantic_manager_tools(server: FastMCP, snowflake_service):
             snowflake_service, database_name, schema_name, like, starts_with
         )
 
-    @server.tool(
+    @cached_tool(
+        server,
         name="describe_semantic_view",
         description="Describe a semantic view.",
     )
@@ -352,7 +603,33 @@ def initialize_semantic_manager_tools(server: FastMCP, snowflake_service):
             snowflake_service, view_name, database_name, schema_name
         )
 
-    @server.tool(
+    @cached_tool(
+        server,
+        name="describe_semantic_views_bulk",
+        description=describe_semantic_views_bulk_prompt,
+    )
+    def describe_semantic_views_bulk_tool(
+        views: Annotated[
+            list[SemanticViewReference],
+            Field(
+                description="Semantic views to describe. Each view should specify database_name, schema_name, and view_name."
+            ),
+        ],
+        include_ddl: Annotated[
+            bool,
+            Field(description="Whether to include the DDL of each semantic view."),
+        ] = False,
+    ):
+        return describe_semantic_views_bulk(
+            snowflake_service,
+            views,
+            include_ddl,
+            cache=semantic_view_cache,
+            catalog=semantic_catalog,
+        )
+
+    @cached_tool(
+        server,
         name="show_semantic_dimensions",
         description="Show all semantic dimensions in the account, database, or schema.",
     )
@@ -396,7 +673,8 @@ def initialize_semantic_manager_tools(server: FastMCP, snowflake_service):
             starts_with,
         )
 
-    @server.tool(
+    @cached_tool(
+        server,
         name="show_semantic_metrics",
         description="Show all semantic metrics in the account, database, or schema.",
     )
@@ -437,7 +715,8 @@ def initialize_semantic_manager_tools(server: FastMCP, snowflake_service):
             starts_with,
         )
 
-    @server.tool(
+    @cached_tool(
+        server,
         name="get_semantic_view_ddl",
         description="Get the DDL for a semantic view.",
     )
@@ -462,7 +741,8 @@ def initialize_semantic_manager_tools(server: FastMCP, snowflake_service):
             snowflake_service, view_name, database_name, schema_name
         )
 
-    @server.tool(
+    @cached_tool(
+        server,
         name="write_semantic_view_query_tool",
         description=write_semantic_view_query_prompt,
     )
@@ -520,7 +800,7 @@ def initialize_semantic_manager_tools(server: FastMCP, snowflake_service):
             ),
         ],
     ):
-        return write_semantic_view_query(
+        query = write_semantic_view_query(
             view_name,
             database_name,
             schema_name,
@@ -530,9 +810,15 @@ def initialize_semantic_manager_tools(server: FastMCP, snowflake_service):
             where_clause,
             order_by,
             limit,
+            # Writing a query runs nothing, so only validate views already described
+            semantic_view=get_compiled_semantic_view(
+                semantic_catalog, view_name, database_name, schema_name
+            ),
         )
+        return query._asdict()
 
-    @server.tool(
+    @cached_tool(
+        server,
         name="query_semantic_view",
         description=query_semantic_view_prompt,
     )
@@ -601,4 +887,5 @@ def initialize_semantic_manager_tools(server: FastMCP, snowflake_service):
             where_clause,
             order_by,
             limit,
+            catalog=semantic_catalog,
         )
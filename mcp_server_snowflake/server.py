@@ -10,50 +10,95 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import argparse
+import copy
 import json
 import os
+import sys
+import threading
 import uuid
 from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager, contextmanager
+from contextlib import ExitStack, asynccontextmanager, contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Generator, Literal, Optional, Tuple, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Literal,
+    Optional,
+    Tuple,
+    cast,
+)
 
 import yaml
 from fastmcp import FastMCP
 from fastmcp.utilities.logging import get_logger
-from snowflake.connector import DictCursor, connect
-from snowflake.core import Root
 
-from mcp_server_snowflake.cortex_services.tools import (
-    initialize_cortex_agent_tool,
-    initialize_cortex_analyst_tool,
-    initialize_cortex_search_tool,
+from mcp_server_snowflake.admission import (
+    AdmissionController,
+    compile_admission_control,
+)
+from mcp_server_snowflake.cancellation import (
+    StatementTimeoutConfig,
+    compile_statement_timeouts,
 )
+from mcp_server_snowflake.coalescing import get_coalesced_tools
+from mcp_server_snowflake.config_manager import ServiceConfigManager
 from mcp_server_snowflake.environment import (
     get_spcs_container_token,
     is_running_in_spcs_container,
 )
-from mcp_server_snowflake.object_manager.tools import initialize_object_manager_tools
-from mcp_server_snowflake.query_manager.tools import initialize_query_manager_tool
-from mcp_server_snowflake.semantic_manager.tools import (
-    initialize_semantic_manager_tools,
+from mcp_server_snowflake.metrics import (
+    METRICS_CONTENT_TYPE,
+    METRICS_RESOURCE_URI,
+    NO_STATEMENT_TYPE,
+    TOOL_METRICS,
+    get_current_timer,
+    time_phase,
+)
+from mcp_server_snowflake.query_comment import MISSING, CompiledQueryComment
+from mcp_server_snowflake.routing import (
+    ConnectionPool,
+    WarehouseRouter,
+    WarehouseRoutingConfig,
+    compile_warehouse_routing,
 )
 from mcp_server_snowflake.server_utils import initialize_middleware
+from mcp_server_snowflake.tool_cache import (
+    ToolSchemaCache,
+    attach_tool_cache,
+    get_default_tool_cache_path,
+    get_tool_cache,
+)
+from mcp_server_snowflake.tracing import configure_tracing, get_current_trace_id
 from mcp_server_snowflake.utils import (
+    TTLCache,
     cleanup_snowflake_service,
     get_login_params,
-    load_tools_config_resource,
+    get_session_id,
     unpack_sql_statement_permissions,
     warn_deprecated_params,
 )
 
+# The Snowflake connector, snowflake.core, sqlglot and the tool modules are
+# slow to import. They are imported where first used, so stdio clients only
+# pay for the tool groups the configuration enables.
+if TYPE_CHECKING:
+    from mcp_server_snowflake.query_manager.cost import CostEstimator, QueryCostGate
+    from mcp_server_snowflake.query_manager.export import ResultExportConfig
+    from mcp_server_snowflake.query_manager.policy import SqlPolicy
+
 # Used to quantify Snowflake usage
 server_name = "mcp-server-snowflake"
 tag_major_version = 1
 tag_minor_version = 6
 query_tag = {"origin": "sf_sit", "name": "mcp_server"}
 
+# Snowflake keeps query results for 24 hours, so older query ids are useless
+LAST_QUERY_ID_TTL_SECONDS = 24 * 60 * 60
+
 # Default query comment template - matches dbt query tag format for observability
 DEFAULT_QUERY_COMMENT_TEMPLATE = {
     "agent": "{agent_name}",
@@ -74,6 +119,53 @@ DEFAULT_QUERY_COMMENT_TEMPLATE = {
     },
 }
 
+# Values of built-in query comment template variables. Runtime context set via
+# set_query_context takes precedence over environment variables.
+QUERY_COMMENT_VARIABLES: Dict[str, Callable[[Dict[str, Any], str, str], Any]] = {
+    "request_id": lambda context, tool_name, statement_type: str(uuid.uuid4()),
+    "timestamp": lambda context, tool_name, statement_type: datetime.now(
+        timezone.utc
+    ).isoformat(),
+    "tool_name": lambda context, tool_name, statement_type: tool_name,
+    "statement_type": lambda context, tool_name, statement_type: statement_type,
+    "model": lambda context, tool_name, statement_type: (
+        context["model"]
+        if "model" in context
+        else os.environ.get("SNOWFLAKE_MCP_MODEL", "unknown")
+    ),
+    "session_id": lambda context, tool_name, statement_type: context.get(
+        "session_id", "unknown"
+    ),
+    "agent_name": lambda context, tool_name, statement_type: context.get(
+        "agent_name", server_name
+    ),
+    "user_email": lambda context, tool_name, statement_type: (
+        context["user_email"]
+        if "user_email" in context
+        else os.environ.get("SNOWFLAKE_MCP_USER_EMAIL", "unknown")
+    ),
+    "user_name": lambda context, tool_name, statement_type: (
+        context["user_name"]
+        if "user_name" in context
+        else os.environ.get("SNOWFLAKE_MCP_USER_NAME", "unknown")
+    ),
+    "intent": lambda context, tool_name, statement_type: context.get("intent"),
+    "query_parameters": lambda context, tool_name, statement_type: context.get(
+        "query_parameters"
+    ),
+    "trace_id": lambda context, tool_name, statement_type: get_current_trace_id(),
+    "server_name": lambda context, tool_name, statement_type: server_name,
+    "server_version": lambda context, tool_name, statement_type: (
+        f"{tag_major_version}.{tag_minor_version}"
+    ),
+}
+
+# Template variables that change on every query. They are left out of stable
+# query comments so repeated statements keep identical text.
+VOLATILE_QUERY_COMMENT_VARIABLES = ("request_id", "timestamp", "trace_id")
+# Snowflake rejects longer QUERY_TAG values
+QUERY_TAG_MAX_LENGTH = 2000
+
 logger = get_logger(server_name)
 
 
@@ -119,8 +211,30 @@ class SnowflakeService:
         List of allowed SQL statement types
     sql_statement_disallowed : list
         List of disallowed SQL statement types
+    sql_policy : SqlPolicy, optional
+        Compiled SQL policy applied to run_snowflake_query statements
+    query_cost : QueryCostGate, optional
+        Cost thresholds checked before run_snowflake_query runs a query
+    cost_estimator : CostEstimator, optional
+        Cached EXPLAIN estimates shared by the SQL policy, cost check and
+        warehouse routing
+    result_export : ResultExportConfig, optional
+        Stage export_query_results unloads results to
     connection : snowflake.connector.Connection
         Snowflake connection object
+    coalesced_tools : frozenset
+        Tools whose identical concurrent calls share one execution
+    statement_timeouts : StatementTimeoutConfig
+        STATEMENT_TIMEOUT_IN_SECONDS sent with the statements of each tool
+    admission_control : AdmissionController, optional
+        Concurrency and rate limits applied to tool calls
+    warehouse_router : WarehouseRouter, optional
+        Rules choosing a warehouse for each statement
+    warehouse_pools : dict
+        Connection pools of warehouses other than the default one, by name
+    routing_paused : bool
+        Whether the default session holds session variables, temporary
+        objects or session parameters, so statements stay on it
     """
 
     def __init__(
@@ -147,15 +261,33 @@ class SnowflakeService:
         self.agent_services = []
         self.sql_statement_allowed = []
         self.sql_statement_disallowed = []
+        self.sql_policy: Optional["SqlPolicy"] = None
+        self.query_cost: Optional["QueryCostGate"] = None
+        self.cost_estimator: Optional["CostEstimator"] = None
+        self.result_export: Optional["ResultExportConfig"] = None
+        self.warehouse_router: Optional[WarehouseRouter] = None
+        self.admission_control: Optional[AdmissionController] = None
+        self.coalesced_tools: frozenset = frozenset()
+        self.statement_timeouts = StatementTimeoutConfig()
         self.object_manager = False
         self.query_manager = False
         self.semantic_manager = False
+        self.inventory = False
+        self.inventory_config: Dict[str, Any] = {}
         self.default_session_parameters: Dict[str, Any] = {}
         self.query_tag = query_tag if query_tag is not None else None
         self.query_comment_template: Optional[Dict[str, Any]] = None
         self.query_comment_enabled = False
-        # Runtime query context set by agents via set_query_context tool
+        self.query_comment_result_reuse = False
+        self._compiled_query_comments: Dict[bool, CompiledQueryComment] = {}
+        # Runtime query context set by agents via set_query_context tool. It is
+        # replaced rather than updated, as tools read it from worker threads.
         self.query_context: Dict[str, str] = {}
+        self._query_context_lock = threading.Lock()
+        # Query id of the last statement run by run_snowflake_query, by MCP session
+        self._last_query_ids = TTLCache(
+            ttl_seconds=LAST_QUERY_ID_TTL_SECONDS, max_entries=1024
+        )
         self.tag_major_version = (
             tag_major_version if tag_major_version is not None else None
         )
@@ -166,28 +298,47 @@ class SnowflakeService:
         # Environment detection for authentication
         self._is_spcs_container = is_running_in_spcs_container()
 
-        self.unpack_service_specs()
+        self.config_manager = ServiceConfigManager(self)
+        self.config_manager.load()
         # Connection is lazily established on first tool use to avoid
         # triggering SSO/Okta auth on MCP server startup.
         self.connection = None
         self.root = None
+        self.warehouse_pools: Dict[str, ConnectionPool] = {}
+        self.routing_paused = False
+        self._connect_lock = threading.Lock()
 
     def _ensure_connected(self) -> None:
         """Lazily establish the Snowflake connection on first use."""
         if self.connection is None:
-            self.connection = self._get_persistent_connection()
-            self.root = Root(self.connection)
+            # Concurrent tools may race to open the first connection
+            with self._connect_lock:
+                if self.connection is None:
+                    from snowflake.core import Root
 
-    def unpack_service_specs(self) -> None:
+                    connection = self._get_persistent_connection()
+                    self.root = Root(connection)
+                    self.connection = connection
+
+    def unpack_service_specs(self) -> Dict[str, Any]:
         """
         Load and parse service specifications from configuration file.
 
         Reads the YAML configuration file and extracts service specifications
-        for all services managed by YAML configuration.
+        for all services managed by YAML configuration. All values are parsed
+        before any is assigned, so a configuration reloaded while serving
+        requests replaces the previous one as a whole. Values are replaced and
+        never modified in place, so tools running in worker threads always see
+        either the previous or the new value of each attribute.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Parsed configuration file
         """
         try:
             with open(self.service_config_file, "r") as file:
-                service_config = yaml.safe_load(file)
+                service_config = yaml.safe_load(file) or {}
         except FileNotFoundError:
             logger.error(
                 f"Service configuration file not found: {self.service_config_file}"
@@ -201,36 +352,101 @@ class SnowflakeService:
             raise
 
         try:
-            self.search_services = service_config.get("search_services", [])
-            self.analyst_services = service_config.get("analyst_services", [])
-            self.agent_services = service_config.get(
+            search_services = service_config.get("search_services", [])
+            analyst_services = service_config.get("analyst_services", [])
+            agent_services = service_config.get(
                 "agent_services", []
             )  # Not supported yet
-            self.sql_statement_allowed, self.sql_statement_disallowed = (
+            sql_statement_allowed, sql_statement_disallowed = (
                 unpack_sql_statement_permissions(
                     service_config.get("sql_statement_permissions", [])
                 )
             )
-            other_services = service_config.get("other_services", {})
-            if other_services is not None:
-                self.object_manager = other_services.get("object_manager", False)
-                self.query_manager = other_services.get("query_manager", False)
-                self.semantic_manager = other_services.get("semantic_manager", False)
+            sql_policy = None
+            if service_config.get("sql_policies"):
+                from mcp_server_snowflake.query_manager.policy import (
+                    compile_sql_policy,
+                )
+
+                sql_policy = compile_sql_policy(service_config["sql_policies"])
+            query_cost = None
+            cost_estimator = None
+            warehouse_router = None
+            if (
+                service_config.get("query_cost")
+                or service_config.get("warehouse_routing")
+                or (sql_policy and sql_policy.config.max_scan_bytes is not None)
+            ):
+                from mcp_server_snowflake.query_manager.cost import (
+                    CostEstimator,
+                    compile_query_cost,
+                )
+
+                query_cost = compile_query_cost(service_config.get("query_cost"))
+                # The policy, cost check and routing share cached estimates,
+                # so each statement runs EXPLAIN once
+                cost_estimator = query_cost.estimator if query_cost else CostEstimator()
+                warehouse_router = compile_warehouse_routing(
+                    service_config.get("warehouse_routing"), cost_estimator
+                )
+            result_export = None
+            if service_config.get("result_export"):
+                from mcp_server_snowflake.query_manager.export import (
+                    compile_result_export,
+                )
+
+                result_export = compile_result_export(service_config["result_export"])
+            admission_control = compile_admission_control(
+                service_config.get("admission_control")
+            )
+            coalesced_tools = get_coalesced_tools(
+                service_config.get("request_coalescing")
+            )
+            statement_timeouts = compile_statement_timeouts(
+                service_config.get("statement_timeouts")
+            )
+            other_services = service_config.get("other_services", {}) or {}
+            object_manager = other_services.get("object_manager", False)
+            query_manager = other_services.get("query_manager", False)
+            semantic_manager = other_services.get("semantic_manager", False)
+            inventory = other_services.get("inventory", False)
+            inventory_config = service_config.get("inventory") or {}
 
             # Parse query comment configuration
-            query_comment_config = service_config.get("query_comment", {})
-            if query_comment_config:
-                self.query_comment_enabled = query_comment_config.get("enabled", False)
-                custom_template = query_comment_config.get("template")
-                if custom_template:
-                    self.query_comment_template = custom_template
-                elif self.query_comment_enabled:
-                    self.query_comment_template = DEFAULT_QUERY_COMMENT_TEMPLATE.copy()
+            query_comment_config = service_config.get("query_comment", {}) or {}
+            query_comment_enabled = query_comment_config.get("enabled", False)
+            query_comment_result_reuse = query_comment_config.get("result_reuse", False)
+            query_comment_template = query_comment_config.get("template") or None
+            if query_comment_template is None and query_comment_enabled:
+                query_comment_template = DEFAULT_QUERY_COMMENT_TEMPLATE.copy()
 
         except Exception as e:
             logger.error(f"Error extracting service specifications: {e}")
             raise
 
+        self.search_services = search_services
+        self.analyst_services = analyst_services
+        self.agent_services = agent_services
+        self.sql_statement_allowed = sql_statement_allowed
+        self.sql_statement_disallowed = sql_statement_disallowed
+        self.sql_policy = sql_policy
+        self.query_cost = query_cost
+        self.cost_estimator = cost_estimator
+        self.result_export = result_export
+        self.warehouse_router = warehouse_router
+        self.admission_control = admission_control
+        self.coalesced_tools = coalesced_tools
+        self.statement_timeouts = statement_timeouts
+        self.object_manager = object_manager
+        self.query_manager = query_manager
+        self.semantic_manager = semantic_manager
+        self.inventory = inventory
+        self.inventory_config = inventory_config
+        self.query_comment_enabled = query_comment_enabled
+        self.query_comment_result_reuse = query_comment_result_reuse
+        self.query_comment_template = query_comment_template
+        return service_config
+
     def get_api_headers(self) -> Dict[str, str]:
         """
         Get authentication headers for REST API calls.
@@ -283,6 +499,7 @@ class SnowflakeService:
     def _get_persistent_connection(
         self,
         session_parameters: Optional[Dict[str, Any]] = None,
+        warehouse: Optional[str] = None,
     ) -> Any:
         """
         Get a persistent Snowflake connection.
@@ -294,6 +511,8 @@ class SnowflakeService:
         ----------
         session_parameters : dict, optional
             Additional session parameters to add to connection
+        warehouse : str, optional
+            Warehouse to use instead of the one in the connection parameters
         major_version : int, optional
             Major version of the query tag
         minor_version : int, optional
@@ -338,6 +557,10 @@ class SnowflakeService:
                         "SNOWFLAKE_DEFAULT_CONNECTION_NAME", "default"
                     ),
                 }
+            if warehouse is not None:
+                connection_params["warehouse"] = warehouse
+
+            from snowflake.connector import connect
 
             connection = connect(
                 **connection_params,
@@ -353,11 +576,96 @@ class SnowflakeService:
             logger.error(f"Error establishing persistent Snowflake connection: {e}")
             raise
 
+    def _get_warehouse_pool(self, warehouse: str) -> ConnectionPool:
+        """Return the connection pool of a non-default warehouse."""
+        pool = self.warehouse_pools.get(warehouse)
+        if pool is None:
+            with self._connect_lock:
+                pool = self.warehouse_pools.get(warehouse)
+                if pool is None:
+                    router = self.warehouse_router
+                    pool = ConnectionPool(
+                        lambda: self._get_persistent_connection(warehouse=warehouse),
+                        router.config.pool_size
+                        if router
+                        else WarehouseRoutingConfig().pool_size,
+                    )
+                    self.warehouse_pools[warehouse] = pool
+        return pool
+
+    def pause_routing(self) -> None:
+        """
+        Keep statements on the default connection from now on.
+
+        Called before a statement leaves state that only its own session
+        sees, such as a session variable or a temporary table, so later
+        statements using it are not routed to pooled sessions without it.
+        """
+        if self.warehouse_router is not None and not self.routing_paused:
+            logger.info(
+                "Default session now holds session state, statements will no "
+                "longer be routed to other warehouses."
+            )
+        self.routing_paused = True
+
+    def _copy_session_context(self, connection: Any) -> None:
+        """Set a pooled connection's database and schema to the default session's."""
+        database = getattr(self.connection, "database", None)
+        if database is None:
+            return
+        schema = getattr(self.connection, "schema", None)
+        if (
+            getattr(connection, "database", None) == database
+            and getattr(connection, "schema", None) == schema
+        ):
+            return
+        # The connector reports names as stored, so quoting keeps their case
+        names = [database] if schema is None else [database, schema]
+        target = ".".join('"' + name.replace('"', '""') + '"' for name in names)
+        kind = "DATABASE" if schema is None else "SCHEMA"
+        with connection.cursor() as cur:
+            cur.execute(f"USE {kind} {target}")
+
+    def route_warehouse(
+        self,
+        statement_type: Optional[str] = None,
+        statement: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Choose a warehouse for a statement of the current tool call.
+
+        Parameters
+        ----------
+        statement_type : str, optional
+            Statement type, defaults to the one recorded for the tool call
+        statement : str, optional
+            Canonical query text, used by rules on EXPLAIN estimates
+
+        Returns
+        -------
+        str or None
+            Warehouse from the first matching warehouse_routing rule, or None
+            to use the default connection
+        """
+        router = self.warehouse_router
+        if router is None or self.routing_paused:
+            return None
+        timer = get_current_timer()
+        tool_name = timer.tool_name if timer else None
+        if (
+            statement_type is None
+            and timer
+            and timer.statement_type != NO_STATEMENT_TYPE
+        ):
+            statement_type = timer.statement_type
+        return router.route(tool_name, statement_type, statement, self)
+
     @contextmanager
     def get_connection(
         self,
         use_dict_cursor: bool = False,
         session_parameters: Optional[Dict[str, Any]] = None,
+        warehouse: Optional[str] = None,
     ) -> Generator[Tuple[Any, Any], None, None]:
         """
         Get a Snowflake connection with the specified configuration.
@@ -374,6 +682,12 @@ class SnowflakeService:
             Whether to use DictCursor instead of regular cursor
         session_parameters : dict, optional
             Additional session parameters to add to connection such as query tag
+        warehouse : str, optional
+            Run on a pooled connection to this warehouse instead of the
+            default connection, which avoids a USE WAREHOUSE round trip and
+            leaves the shared session unchanged. The pooled session is first
+            set to the default session's database and schema. Defaults to the
+            warehouse chosen by route_warehouse.
 
         Yields
         ------
@@ -388,18 +702,30 @@ class SnowflakeService:
         """
 
         try:
-            self._ensure_connected()
-
-            cursor = (
-                self.connection.cursor(DictCursor)
-                if use_dict_cursor
-                else self.connection.cursor()
-            )
-
-            try:
-                yield self.connection, cursor
-            finally:
-                cursor.close()
+            with ExitStack() as stack:
+                with time_phase("connection"):
+                    if warehouse is None:
+                        warehouse = self.route_warehouse()
+                    if warehouse is None:
+                        self._ensure_connected()
+                        connection = self.connection
+                    else:
+                        connection = stack.enter_context(
+                            self._get_warehouse_pool(warehouse).connection()
+                        )
+                        self._copy_session_context(connection)
+                    from snowflake.connector import DictCursor
+
+                    cursor = (
+                        connection.cursor(DictCursor)
+                        if use_dict_cursor
+                        else connection.cursor()
+                    )
+
+                try:
+                    yield connection, cursor
+                finally:
+                    cursor.close()
 
         except Exception as e:
             logger.error(f"Error establishing Snowflake connection: {e}")
@@ -438,6 +764,21 @@ class SnowflakeService:
         else:
             return None
 
+    def set_last_query_id(self, query_id: str) -> None:
+        """Record the query id of the last statement run in the current MCP session."""
+        self._last_query_ids.set(get_session_id(), query_id)
+
+    def get_last_query_id(self) -> Optional[str]:
+        """
+        Get the query id of the last statement run in the current MCP session.
+
+        Returns
+        -------
+        str or None
+            Query id, or None if the session has not run a query yet
+        """
+        return self._last_query_ids.get(get_session_id())
+
     def set_query_context(self, **kwargs: str) -> Dict[str, str]:
         """
         Set runtime query context values for query comments.
@@ -457,8 +798,9 @@ class SnowflakeService:
         Dict[str, str]
             The updated query context dictionary
         """
-        self.query_context.update(kwargs)
-        return self.query_context.copy()
+        with self._query_context_lock:
+            self.query_context = {**self.query_context, **kwargs}
+            return self.query_context.copy()
 
     def get_query_context(self) -> Dict[str, str]:
         """
@@ -473,18 +815,21 @@ class SnowflakeService:
 
     def clear_query_context(self) -> None:
         """Clear all runtime query context values."""
-        self.query_context.clear()
+        with self._query_context_lock:
+            self.query_context = {}
 
     def build_query_comment(
         self,
         tool_name: str = "unknown",
         statement_type: str = "unknown",
+        stable: bool = False,
     ) -> Optional[str]:
         """
         Build a query comment string with template variable substitution.
 
         Substitutes template variables in the query comment template with actual values.
-        Supported variables:
+        The template is compiled once, so each call only generates the values of
+        the variables it uses. Supported variables:
         - {request_id}: Unique UUID for this request
         - {timestamp}: ISO 8601 timestamp
         - {tool_name}: Name of the MCP tool being used
@@ -494,6 +839,7 @@ class SnowflakeService:
         - {agent_name}: Agent name (from query_context or 'unknown')
         - {server_name}: MCP server name
         - {server_version}: Server version string
+        - {trace_id}: OpenTelemetry trace id of the tool call, if tracing
         - Any custom keys set via set_query_context
 
         Parameters
@@ -502,74 +848,73 @@ class SnowflakeService:
             Name of the MCP tool making the query
         statement_type : str
             Type of SQL statement being executed
+        stable : bool, default=False
+            Leave out template values that reference per-request variables
+            such as {request_id} and {timestamp}
 
         Returns
         -------
         str or None
             JSON string of the query comment, or None if disabled
         """
-        if not self.query_comment_enabled or self.query_comment_template is None:
+        # Read once, as a configuration reload may replace it meanwhile
+        template = self.query_comment_template
+        if not self.query_comment_enabled or template is None:
             return None
 
-        # Build substitution values - runtime context takes precedence over env vars
-        substitutions = {
-            "request_id": str(uuid.uuid4()),
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "tool_name": tool_name,
-            "statement_type": statement_type,
-            # Model: check runtime context first, then env var, then default
-            "model": self.query_context.get(
-                "model", os.environ.get("SNOWFLAKE_MCP_MODEL", "unknown")
-            ),
-            # Session ID: from runtime context or default
-            "session_id": self.query_context.get("session_id", "unknown"),
-            # Agent name: from runtime context or default to server name
-            "agent_name": self.query_context.get("agent_name", server_name),
-            # User info: from runtime context
-            "user_email": self.query_context.get(
-                "user_email", os.environ.get("SNOWFLAKE_MCP_USER_EMAIL", "unknown")
-            ),
-            "user_name": self.query_context.get(
-                "user_name", os.environ.get("SNOWFLAKE_MCP_USER_NAME", "unknown")
-            ),
-            # Intent and query_parameters: complex objects from agent (default to null)
-            "intent": self.query_context.get("intent"),
-            "query_parameters": self.query_context.get("query_parameters"),
-            "server_name": server_name,
-            "server_version": f"{tag_major_version}.{tag_minor_version}",
-        }
-        # Add any additional custom context values
-        for key, value in self.query_context.items():
-            if key not in substitutions:
-                substitutions[key] = value
-
-        def substitute_value(value: Any) -> Any:
-            """Recursively substitute template variables in values."""
-            if isinstance(value, str):
-                # Check if the entire string is a single placeholder like "{intent}"
-                # If so, return the actual value (could be dict, None, etc.)
-                import re
-
-                match = re.fullmatch(r"\{(\w+)\}", value)
-                if match:
-                    key = match.group(1)
-                    if key in substitutions:
-                        return substitutions[key]
-                # Otherwise do string replacement
-                result = value
-                for key, sub_value in substitutions.items():
-                    if sub_value is not None:
-                        result = result.replace(f"{{{key}}}", str(sub_value))
-                return result
-            elif isinstance(value, dict):
-                return {k: substitute_value(v) for k, v in value.items()}
-            elif isinstance(value, list):
-                return [substitute_value(item) for item in value]
-            else:
-                return value
+        compiled = self._get_compiled_query_comment(template, stable)
+        context = self.query_context
+
+        def resolve(key: str) -> Any:
+            # Built-in variables first; runtime context overrides their defaults
+            variable = QUERY_COMMENT_VARIABLES.get(key)
+            if variable is not None:
+                return variable(context, tool_name, statement_type)
+            # Any additional custom context values
+            return context.get(key, MISSING)
+
+        return compiled.render(resolve)
+
+    def _get_compiled_query_comment(
+        self, template: Dict[str, Any], stable: bool
+    ) -> CompiledQueryComment:
+        """Compile the query comment template once per template and mode."""
+        compiled = self._compiled_query_comments.get(stable)
+        if compiled is None or compiled.template is not template:
+            compiled = CompiledQueryComment(
+                template,
+                omit_variables=VOLATILE_QUERY_COMMENT_VARIABLES if stable else (),
+            )
+            self._compiled_query_comments[stable] = compiled
+        return compiled
+
+    def build_statement_query_tag(self, query_comment: str) -> Optional[Dict[str, Any]]:
+        """
+        Build per-statement parameters that carry a query comment in QUERY_TAG.
 
-        comment = substitute_value(self.query_comment_template)
-        return json.dumps(comment)
+        The comment is added under "query_comment" to the server query tag so
+        existing query tag tracking is kept.
+
+        Parameters
+        ----------
+        query_comment : str
+            JSON string returned by build_query_comment
+
+        Returns
+        -------
+        dict or None
+            Statement parameters, or None if the tag would exceed the QUERY_TAG
+            length limit
+        """
+        session_parameters = self.get_query_tag_param()
+        query_tag = (
+            json.loads(session_parameters["QUERY_TAG"]) if session_parameters else {}
+        )
+        query_tag["query_comment"] = json.loads(query_comment)
+        serialized = json.dumps(query_tag)
+        if len(serialized) > QUERY_TAG_MAX_LENGTH:
+            return None
+        return {"QUERY_TAG": serialized}
 
 
 def get_var(var_name: str, env_var_name: str, args) -> Optional[str]:
@@ -665,6 +1010,13 @@ def parse_arguments():
         help="Enable verbose/debug logging",
         default=False,
     )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        required=False,
+        help="Report an import time breakdown of server startup and exit",
+        default=False,
+    )
 
     return parser.parse_args()
 
@@ -701,6 +1053,9 @@ def create_lifespan(args):
                 endpoint=endpoint or args.endpoint,
             )
 
+            # Tracing is process-wide, so it is set up once at startup
+            configure_tracing(snowflake_service.config_manager.config.get("tracing"))
+
             # Initialize tools and resources now that we have the service
             logger.info("Initializing tools and resources...")
             initialize_tools(snowflake_service, server)
@@ -726,37 +1081,147 @@ def initialize_resources(snowflake_service: SnowflakeService, server: FastMCP):
         Tools Specification Configuration.
 
         Provides access to the YAML tools configuration file as JSON.
+        The file is parsed again only after it changes.
         """
-        tools_config = await load_tools_config_resource(
-            snowflake_service.service_config_file
-        )
-        return json.loads(tools_config)
+        return snowflake_service.config_manager.get_config()
+
+    @server.resource(METRICS_RESOURCE_URI, mime_type="text/plain")
+    async def get_tool_metrics():
+        """
+        Tool Call Metrics.
+
+        Latency histograms of tool calls and their phases in the Prometheus
+        text format, for transports without the /metrics endpoint.
+        """
+        return TOOL_METRICS.render()
+
+
+def initialize_metrics_route(server: FastMCP):
+    """Serve tool call metrics at /metrics on HTTP transports."""
+    from starlette.responses import PlainTextResponse
+
+    @server.custom_route("/metrics", methods=["GET"], include_in_schema=False)
+    async def get_metrics(request):
+        return PlainTextResponse(TOOL_METRICS.render(), media_type=METRICS_CONTENT_TYPE)
 
 
 def initialize_tools(snowflake_service: SnowflakeService, server: FastMCP):
     if snowflake_service is not None:
+        # Reuse tool schemas generated by an earlier start with this configuration
+        tool_cache = None
+        tool_cache_path = get_default_tool_cache_path(
+            snowflake_service.config_manager.config
+        )
+        if tool_cache_path is not None:
+            tool_cache = ToolSchemaCache(tool_cache_path)
+            attach_tool_cache(server, tool_cache)
+
         # Add tools for object manager
         if snowflake_service.object_manager:
+            from mcp_server_snowflake.object_manager.tools import (
+                initialize_object_manager_tools,
+            )
+
             initialize_object_manager_tools(server, snowflake_service)
 
         # Add tools for query manager
         if snowflake_service.query_manager:
+            from mcp_server_snowflake.query_manager.tools import (
+                initialize_query_manager_tool,
+            )
+
             initialize_query_manager_tool(server, snowflake_service)
 
         # Add tools for semantic manager
         if snowflake_service.semantic_manager:
+            from mcp_server_snowflake.semantic_manager.tools import (
+                initialize_semantic_manager_tools,
+            )
+
             initialize_semantic_manager_tools(server, snowflake_service)
 
-        # Add tool for agent service
-        if snowflake_service.agent_services:
-            initialize_cortex_agent_tool(server, snowflake_service)
+        # Add tools and resource for object inventory
+        if snowflake_service.inventory:
+            from mcp_server_snowflake.inventory.tools import initialize_inventory_tools
 
-        # Add tool for search service
-        if snowflake_service.search_services:
-            initialize_cortex_search_tool(server, snowflake_service)
+            initialize_inventory_tools(server, snowflake_service)
 
-        if snowflake_service.analyst_services:
-            initialize_cortex_analyst_tool(server, snowflake_service)
+        # Add tools for Cortex services and keep them in sync with the file
+        registered_cortex_services: Dict[str, list] = {}
+        refresh_cortex_tools(snowflake_service, server, registered_cortex_services)
+        snowflake_service.config_manager.add_listener(
+            lambda: refresh_cortex_tools(
+                snowflake_service, server, registered_cortex_services
+            )
+        )
+
+        if tool_cache is not None:
+            tool_cache.save()
+
+
+def refresh_cortex_tools(
+    snowflake_service: SnowflakeService,
+    server: FastMCP,
+    registered_services: Dict[str, list],
+) -> None:
+    """
+    Register, re-register or remove the Cortex service tools.
+
+    Tool descriptions list the configured services, so a tool is registered
+    again whenever its service list changes and removed when the list is empty.
+
+    Parameters
+    ----------
+    snowflake_service : SnowflakeService
+        Service holding the current service lists
+    server : FastMCP
+        Server the tools are registered on
+    registered_services : Dict[str, list]
+        Service lists of the currently registered tools, updated in place
+    """
+    if not (
+        registered_services
+        or snowflake_service.agent_services
+        or snowflake_service.search_services
+        or snowflake_service.analyst_services
+    ):
+        return
+
+    from mcp_server_snowflake.cortex_services.tools import (
+        initialize_cortex_agent_tool,
+        initialize_cortex_analyst_tool,
+        initialize_cortex_search_tool,
+    )
+
+    for tool_name, services, initialize in (
+        (
+            "cortex_agent",
+            snowflake_service.agent_services,
+            initialize_cortex_agent_tool,
+        ),
+        (
+            "cortex_search",
+            snowflake_service.search_services,
+            initialize_cortex_search_tool,
+        ),
+        (
+            "cortex_analyst",
+            snowflake_service.analyst_services,
+            initialize_cortex_analyst_tool,
+        ),
+    ):
+        if registered_services.get(tool_name) == (services or None):
+            continue
+        if tool_name in registered_services:
+            server.remove_tool(tool_name)
+            del registered_services[tool_name]
+        if services:
+            initialize(server, snowflake_service)
+            registered_services[tool_name] = copy.deepcopy(services)
+
+    tool_cache = get_tool_cache(server)
+    if tool_cache is not None:
+        tool_cache.save()
 
 
 def main():
@@ -777,6 +1242,19 @@ def main():
 
     warn_deprecated_params()
 
+    if args.profile_startup:
+        from mcp_server_snowflake.startup_profile import (
+            format_startup_report,
+            profile_startup,
+        )
+
+        service_config_file = get_var(
+            "service_config_file", "SERVICE_CONFIG_FILE", args
+        )
+        # stdout is reserved for the MCP protocol on stdio transports
+        sys.stderr.write(format_startup_report(profile_startup(service_config_file)))
+        return
+
     # Create server with lifespan that has access to args
     server = FastMCP("Snowflake MCP Server", lifespan=create_lifespan(args))
 
@@ -792,6 +1270,7 @@ def main():
             port = int(os.environ.get("SNOWFLAKE_MCP_PORT", str(args.port)))
             endpoint = os.environ.get("SNOWFLAKE_MCP_ENDPOINT", args.endpoint)
             logger.info(f"Starting server with transport: {args.transport}")
+            initialize_metrics_route(server)
             server.run(transport=args.transport, host=host, port=port, path=endpoint)
         else:
             logger.info(f"Starting server with transport: {args.transport or 'stdio'}")
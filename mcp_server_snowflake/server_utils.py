@@ -1,37 +1,75 @@
+import asyncio
+import time
+from typing import Optional
+
 from fastmcp import FastMCP
 from fastmcp.exceptions import ToolError
+from fastmcp.server.dependencies import get_http_headers
 from fastmcp.server.middleware import Middleware, MiddlewareContext
 
-from mcp_server_snowflake.object_manager.tools import validate_object_tool
-from mcp_server_snowflake.query_manager.tools import validate_sql_type
+from mcp_server_snowflake.admission import AdmissionController, AdmissionRejected
+from mcp_server_snowflake.cancellation import cancellable_call
+from mcp_server_snowflake.coalescing import SingleFlight, get_coalescing_key
+from mcp_server_snowflake.metrics import (
+    TOOL_METRICS,
+    ToolMetrics,
+    get_current_timer,
+    start_tool_call,
+)
+from mcp_server_snowflake.tracing import get_tracer, tool_call_span
+from mcp_server_snowflake.utils import compile_sql_permissions, get_session_id
 
 
 class CheckQueryType(Middleware):
     """Middleware that checks SQL statement to ensure it is of an approved type."""
 
     def __init__(self, sql_allow_list: list[str], sql_disallow_list: list[str]):
-        self.sql_allow_list = sql_allow_list
-        self.sql_disallow_list = sql_disallow_list
+        self.update_permissions(sql_allow_list, sql_disallow_list)
+
+    def update_permissions(
+        self, sql_allow_list: list[str], sql_disallow_list: list[str]
+    ) -> None:
+        """Replace both permission lists at once."""
+        self.permissions = compile_sql_permissions(sql_allow_list, sql_disallow_list)
 
     async def on_call_tool(self, context: MiddlewareContext, call_next):
         """Called for all MCP tool calls."""
         tool_name = context.message.name
+        # Read both lists together so a concurrent reload cannot mix them.
+        # Passing the compiled tuples reuses the same decision table.
+        permissions = self.permissions
+        sql_allow_list = permissions.sql_allow_list
+        sql_disallow_list = permissions.sql_disallow_list
 
         # Check SQL statement permissions before running query
-        if tool_name.lower() == "run_snowflake_query" and context.message.arguments.get(
-            "statement", None
-        ):
+        if tool_name.lower() in (
+            "run_snowflake_query",
+            "export_query_results",
+        ) and context.message.arguments.get("statement", None):
+            # Imported here so servers without the query manager skip sqlglot
+            from mcp_server_snowflake.query_manager.tools import validate_sql_type
+
             statement_type, valid = validate_sql_type(
                 context.message.arguments.get("statement", None),
-                self.sql_allow_list,
-                self.sql_disallow_list,
+                sql_allow_list,
+                sql_disallow_list,
             )
 
+        elif tool_name.lower() == "export_query_results" and (
+            context.message.arguments or {}
+        ).get("query_id"):
+            # The result of any earlier query would be unloaded without its
+            # statement being checked, so the COPY INTO itself must be allowed
+            statement_type = "Copy"
+            valid = permissions.is_statement_allowed(statement_type)
+
         elif tool_name.lower().startswith("create") or tool_name.lower().startswith(
             "drop"
         ):
+            from mcp_server_snowflake.object_manager.tools import validate_object_tool
+
             statement_type, valid = validate_object_tool(
-                tool_name, self.sql_allow_list, self.sql_disallow_list
+                tool_name, sql_allow_list, sql_disallow_list
             )
 
         # Allow other tools to proceed
@@ -46,10 +84,193 @@ class CheckQueryType(Middleware):
             )
 
 
+class CoalesceToolCalls(Middleware):
+    """
+    Middleware that lets identical concurrent read-only tool calls share one run.
+
+    Calls to the service's coalesced_tools from the same MCP session with the
+    same normalized arguments wait for the call already in flight instead of
+    running again.
+    """
+
+    def __init__(self, snowflake_service, metrics: ToolMetrics = TOOL_METRICS):
+        self.snowflake_service = snowflake_service
+        self.metrics = metrics
+        self.single_flight = SingleFlight()
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        """Called for all MCP tool calls."""
+        tool_name = context.message.name
+        key = None
+        if tool_name in self.snowflake_service.coalesced_tools:
+            key = get_coalescing_key(
+                tool_name,
+                context.message.arguments,
+                get_session_id(context.fastmcp_context),
+            )
+        if key is None:
+            return await call_next(context)
+
+        result, shared = await self.single_flight.run(key, lambda: call_next(context))
+        if shared:
+            self.metrics.coalesced.inc((tool_name,))
+        return result
+
+
+class CancelStatements(Middleware):
+    """
+    Middleware that aborts a tool call's running statements when it is cancelled.
+
+    MCP cancellation notifications and client disconnects cancel the call's
+    task, while its statements keep running in a worker thread. They are
+    aborted so they stop using the warehouse, and the worker is released as
+    soon as Snowflake ends them.
+    """
+
+    def __init__(self, snowflake_service, metrics: ToolMetrics = TOOL_METRICS):
+        self.snowflake_service = snowflake_service
+        self.metrics = metrics
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        """Called for all MCP tool calls."""
+        tool_name = context.message.name
+        timeout = self.snowflake_service.statement_timeouts.timeout_for(tool_name)
+        with cancellable_call(timeout) as call:
+            try:
+                return await call_next(context)
+            except asyncio.CancelledError:
+                call.cancel_in_background()
+                self.metrics.cancelled.inc((tool_name,))
+                raise
+
+
+class AdmissionControl(Middleware):
+    """Middleware that queues or rejects tool calls over the configured limits."""
+
+    def __init__(self, controller: Optional[AdmissionController]):
+        self.controller = controller
+
+    def update_controller(self, controller: Optional[AdmissionController]) -> None:
+        """Apply new limits. Calls already admitted finish under the old ones."""
+        current = self.controller
+        if controller is None or current is None or controller.config != current.config:
+            self.controller = controller
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        """Called for all MCP tool calls."""
+        controller = self.controller
+        if controller is None:
+            return await call_next(context)
+
+        session = get_session_id(context.fastmcp_context)
+        try:
+            async with controller.admit(context.message.name, session):
+                return await call_next(context)
+        except AdmissionRejected as e:
+            raise ToolError(str(e))
+
+
+class ReloadServiceConfig(Middleware):
+    """Middleware that applies configuration file edits before each request."""
+
+    def __init__(self, config_manager):
+        self.config_manager = config_manager
+
+    async def on_message(self, context: MiddlewareContext, call_next):
+        """Called for all MCP messages."""
+        self.config_manager.reload_if_changed()
+        return await call_next(context)
+
+
+def get_request_meta(context: MiddlewareContext) -> Optional[dict]:
+    """Return the _meta of the MCP request being handled, if any."""
+    meta = getattr(context.message, "meta", None)
+    if meta is None and context.fastmcp_context is not None:
+        try:
+            meta = context.fastmcp_context.request_context.meta
+        except (AttributeError, LookupError, ValueError):
+            meta = None
+    return meta.model_dump() if meta is not None else None
+
+
+class ToolMetricsMiddleware(Middleware):
+    """
+    Middleware that records the duration and phases of every tool call.
+
+    When tracing is configured, each call is also a span whose children are
+    the timed phases.
+    """
+
+    def __init__(self, metrics: ToolMetrics = TOOL_METRICS):
+        self.metrics = metrics
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        """Called for all MCP tool calls."""
+        tool_name = context.message.name
+        tracer = get_tracer()
+        carriers = []
+        if tracer is not None:
+            # Clients propagate trace context in _meta or, over HTTP, headers
+            carriers = [get_request_meta(context), get_http_headers()]
+
+        start = time.perf_counter()
+        status = "error"
+        with (
+            tool_call_span(tool_name, carriers) as span,
+            start_tool_call(tool_name, tracer) as timer,
+        ):
+            try:
+                result = await call_next(context)
+                status = "ok"
+                return result
+            finally:
+                self.metrics.observe_call(timer, time.perf_counter() - start, status)
+                if span is not None:
+                    span.set_attribute("snowflake.statement_type", timer.statement_type)
+                    if timer.query_ids:
+                        span.set_attribute("snowflake.query_ids", timer.query_ids)
+
+
+class ToolExecutionTimer(Middleware):
+    """Innermost middleware marking when the tool itself starts and finishes."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        """Called for all MCP tool calls."""
+        timer = get_current_timer()
+        if timer is None:
+            return await call_next(context)
+        timer.tool_start = time.perf_counter()
+        try:
+            return await call_next(context)
+        finally:
+            timer.tool_end = time.perf_counter()
+
+
 def initialize_middleware(server: FastMCP, snowflake_service):
-    server.add_middleware(
-        CheckQueryType(
-            sql_allow_list=snowflake_service.sql_statement_allowed,
-            sql_disallow_list=snowflake_service.sql_statement_disallowed,
+    check_query_type = CheckQueryType(
+        sql_allow_list=snowflake_service.sql_statement_allowed,
+        sql_disallow_list=snowflake_service.sql_statement_disallowed,
+    )
+    snowflake_service.config_manager.add_listener(
+        lambda: check_query_type.update_permissions(
+            snowflake_service.sql_statement_allowed,
+            snowflake_service.sql_statement_disallowed,
         )
     )
+    admission_control = AdmissionControl(snowflake_service.admission_control)
+    snowflake_service.config_manager.add_listener(
+        lambda: admission_control.update_controller(snowflake_service.admission_control)
+    )
+    # Outermost, so time spent in every other middleware is measured
+    server.add_middleware(ToolMetricsMiddleware())
+    # Added before permission checks so they see the reloaded configuration
+    server.add_middleware(ReloadServiceConfig(snowflake_service.config_manager))
+    server.add_middleware(check_query_type)
+    # Before admission control, so calls sharing a result take no slots
+    server.add_middleware(CoalesceToolCalls(snowflake_service))
+    # After permission checks, so rejected calls never wait in a queue
+    server.add_middleware(admission_control)
+    # Inside admission control, so slots are only held by calls that run
+    server.add_middleware(CancelStatements(snowflake_service))
+    # Innermost, so the remaining time is the tool's own
+    server.add_middleware(ToolExecutionTimer())
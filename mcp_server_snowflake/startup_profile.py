@@ -0,0 +1,146 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, NamedTuple
+
+# Startup as the server performs it, without connecting to Snowflake
+PROFILE_SCRIPT = """
+import sys
+from fastmcp import FastMCP
+from mcp_server_snowflake.server import SnowflakeService, initialize_tools
+
+service = SnowflakeService(
+    service_config_file=sys.argv[1], transport="stdio", connection_params={}
+)
+initialize_tools(service, FastMCP("Snowflake MCP Server"))
+"""
+
+# Packages reported by their first two name components, such as snowflake.core
+NAMESPACE_PACKAGES = ("snowflake", "mcp_server_snowflake")
+
+
+class ImportRecord(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Parse the stderr output of python -X importtime."""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Header line
+        name = fields[2].rstrip()
+        module = name.lstrip()
+        records.append(
+            ImportRecord(
+                module=module,
+                self_us=int(fields[0]),
+                cumulative_us=int(fields[1]),
+                depth=(len(name) - len(module) - 1) // 2,
+            )
+        )
+    return records
+
+
+def package_of(module: str) -> str:
+    parts = module.split(".")
+    if parts[0] in NAMESPACE_PACKAGES and len(parts) > 1:
+        return ".".join(parts[:2])
+    return parts[0]
+
+
+def summarize_imports(records: List[ImportRecord]) -> Dict[str, Any]:
+    """
+    Summarize import time by package.
+
+    Returns
+    -------
+    dict
+        total_seconds is the time spent importing all modules.
+        package_seconds is the cumulative time of imports started by this
+        package, which excludes dependencies already loaded by FastMCP.
+        packages lists the time spent in each package's own modules.
+    """
+    by_package: Dict[str, int] = defaultdict(int)
+    for record in records:
+        by_package[package_of(record.module)] += record.self_us
+    package_us = sum(
+        record.cumulative_us
+        for record in records
+        if record.depth == 0 and record.module.startswith("mcp_server_snowflake")
+    )
+    return {
+        "total_seconds": sum(record.self_us for record in records) / 1e6,
+        "package_seconds": package_us / 1e6,
+        "packages": [
+            {"package": package, "seconds": us / 1e6}
+            for package, us in sorted(
+                by_package.items(), key=lambda item: item[1], reverse=True
+            )
+        ],
+    }
+
+
+def profile_startup(service_config_file: str) -> Dict[str, Any]:
+    """
+    Measure the imports made while the server loads its configuration and tools.
+
+    Startup runs in a fresh interpreter so that modules already imported by
+    the calling process are measured as well.
+
+    Parameters
+    ----------
+    service_config_file : str
+        Path to the service configuration file
+
+    Returns
+    -------
+    dict
+        Import summary from summarize_imports, plus the wall clock seconds of
+        the whole startup
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROFILE_SCRIPT, service_config_file],
+        capture_output=True,
+        text=True,
+    )
+    wall_seconds = time.perf_counter() - start
+    records = parse_importtime(result.stderr)
+    if result.returncode != 0:
+        errors = [
+            line for line in result.stderr.splitlines() if "import time:" not in line
+        ]
+        raise RuntimeError("Startup failed while profiling:\n" + "\n".join(errors))
+    return {**summarize_imports(records), "wall_seconds": wall_seconds}
+
+
+def format_startup_report(profile: Dict[str, Any], top: int = 15) -> str:
+    lines = [
+        f"{'Startup wall time':<26} {profile['wall_seconds']:.3f}s",
+        f"{'Import time, all modules':<26} {profile['total_seconds']:.3f}s",
+        f"{'Import time, this server':<26} {profile['package_seconds']:.3f}s",
+        "",
+        f"{'Package':<40} {'Seconds':>8}",
+    ]
+    for entry in profile["packages"][:top]:
+        lines.append(f"{entry['package']:<40} {entry['seconds']:>8.3f}")
+    return "\n".join(lines) + "\n"
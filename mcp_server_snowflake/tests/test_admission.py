@@ -0,0 +1,173 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+
+import pytest
+from fastmcp import Client, FastMCP
+
+from mcp_server_snowflake.admission import (
+    AdmissionRejected,
+    compile_admission_control,
+)
+from mcp_server_snowflake.server_utils import AdmissionControl
+
+
+class TestAdmissionController:
+    """Tests for tool call concurrency and rate limits."""
+
+    def test_rate_limit_rejects_with_retry_after(self):
+        controller = compile_admission_control(
+            {"rate_limits": {"run_snowflake_query": {"rate": 0.1, "burst": 2}}}
+        )
+
+        async def run():
+            for _ in range(2):
+                async with controller.admit("run_snowflake_query", "a"):
+                    pass
+            with pytest.raises(AdmissionRejected) as error:
+                async with controller.admit("run_snowflake_query", "a"):
+                    pass
+            # Other tools are not limited
+            async with controller.admit("list_objects", "a"):
+                pass
+            return error.value
+
+        error = asyncio.run(run())
+        assert 9 <= error.retry_after <= 10
+        assert "Retry after" in str(error)
+
+    def test_queue_timeout(self):
+        controller = compile_admission_control(
+            {"max_concurrent_per_session": 1, "queue_timeout_seconds": 0.05}
+        )
+
+        async def run():
+            async with controller.admit("run_snowflake_query", "a"):
+                # Another session is not affected by this session's limit
+                async with controller.admit("run_snowflake_query", "b"):
+                    pass
+                with pytest.raises(AdmissionRejected):
+                    async with controller.admit("run_snowflake_query", "a"):
+                        pass
+            # Slots are returned after a timeout
+            async with controller.admit("run_snowflake_query", "a"):
+                pass
+            return controller
+
+        controller = asyncio.run(run())
+        assert controller.global_limiter.active == 0
+        assert not controller.global_limiter.waiters
+        assert controller.limiters["query"].active == 0
+
+    def test_metadata_tools_bypass_query_queue(self):
+        controller = compile_admission_control(
+            {"max_concurrent_queries": 1, "queue_timeout_seconds": 0.05}
+        )
+
+        async def run():
+            async with controller.admit("run_snowflake_query", "a"):
+                async with controller.admit("list_semantic_views", "b"):
+                    pass
+                with pytest.raises(AdmissionRejected):
+                    async with controller.admit("query_semantic_view", "b"):
+                        pass
+
+        asyncio.run(run())
+
+    def test_slots_are_shared_round_robin(self):
+        controller = compile_admission_control({"max_concurrent": 1})
+        started = []
+
+        async def call(session):
+            async with controller.admit("run_snowflake_query", session):
+                started.append(session)
+                await asyncio.sleep(0.01)
+
+        async def run():
+            tasks = [asyncio.create_task(call("greedy")) for _ in range(4)]
+            await asyncio.sleep(0)
+            tasks += [asyncio.create_task(call(s)) for s in ("b", "c", "b")]
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        assert started == ["greedy", "greedy", "b", "c", "greedy", "b", "greedy"]
+
+
+class TestAdmissionLoad:
+    """Synthetic multi-client load test of admission control fairness."""
+
+    def test_greedy_client_does_not_starve_others(self):
+        server = FastMCP("test")
+        call_seconds = 0.01
+
+        @server.tool(name="run_snowflake_query")
+        async def query() -> str:
+            await asyncio.sleep(call_seconds)
+            return "ok"
+
+        # No per-session limit, so only round-robin sharing protects the others
+        server.add_middleware(
+            AdmissionControl(compile_admission_control({"max_concurrent": 2}))
+        )
+
+        async def timed_call(client, latencies):
+            start = time.perf_counter()
+            await client.call_tool("run_snowflake_query", {})
+            latencies.append(time.perf_counter() - start)
+
+        async def polite(latencies):
+            async with Client(server) as client:
+                for _ in range(5):
+                    await timed_call(client, latencies)
+
+        async def run():
+            greedy_latencies, polite_latencies = [], []
+            async with Client(server) as greedy:
+                flood = asyncio.gather(
+                    *(timed_call(greedy, greedy_latencies) for _ in range(60))
+                )
+                await asyncio.sleep(call_seconds)
+                await asyncio.gather(*(polite(polite_latencies) for _ in range(3)))
+                await flood
+            return greedy_latencies, polite_latencies
+
+        greedy_latencies, polite_latencies = asyncio.run(run())
+
+        # Without fair sharing, each polite call waits behind the whole flood
+        assert max(polite_latencies) < max(greedy_latencies) / 3
+
+    def test_rejection_is_a_tool_error(self):
+        server = FastMCP("test")
+
+        @server.tool(name="list_objects")
+        def list_objects() -> str:
+            return "ok"
+
+        server.add_middleware(
+            AdmissionControl(
+                compile_admission_control(
+                    {"rate_limits": {"list_objects": {"rate": 0.5, "burst": 1}}}
+                )
+            )
+        )
+
+        async def run():
+            async with Client(server) as client:
+                await client.call_tool("list_objects", {})
+                return await client.call_tool("list_objects", {}, raise_on_error=False)
+
+        result = asyncio.run(run())
+
+        assert result.is_error
+        assert "Retry after 2 seconds" in result.content[0].text
@@ -0,0 +1,256 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+import yaml
+from fastmcp import Client, FastMCP
+
+from mcp_server_snowflake.cancellation import (
+    StatementCancelled,
+    cancellable_call,
+    execute_statement,
+)
+from mcp_server_snowflake.metrics import TOOL_METRICS
+from mcp_server_snowflake.object_manager.plan import _run_concurrently
+from mcp_server_snowflake.server import (
+    SnowflakeService,
+    initialize_middleware,
+    initialize_tools,
+)
+
+
+class BlockingConnector:
+    """Snowflake connector stand-in whose queries run until they are aborted."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.finished = threading.Event()
+        self.executed = []
+        self.aborted = []
+        self.lock = threading.Lock()
+        self.aborts = {}
+
+    def connect(self, **kwargs):
+        return BlockingConnection(self)
+
+    def abort_event(self, request_id):
+        with self.lock:
+            return self.aborts.setdefault(str(request_id), threading.Event())
+
+
+class BlockingConnection:
+    def __init__(self, connector):
+        self.connector = connector
+
+    def cursor(self, cursor_class=None):
+        return BlockingCursor(self)
+
+    def _cancel_query(self, sql, request_id):
+        self.connector.aborted.append((sql, str(request_id)))
+        self.connector.abort_event(request_id).set()
+
+    def close(self):
+        pass
+
+
+class BlockingCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.sfqid = None
+
+    def execute(self, statement, params=None, _statement_params=None, **kwargs):
+        connector = self.connection.connector
+        if "SLOW" not in statement:
+            return self
+        connector.executed.append((statement, _statement_params))
+        connector.started.set()
+        aborted = connector.abort_event(_statement_params["requestId"]).wait(5)
+        connector.finished.set()
+        if aborted:
+            raise RuntimeError("SQL execution canceled")
+        return self
+
+    def fetchall(self):
+        return []
+
+    def fetchone(self):
+        return {}
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class TestExecuteStatement:
+    """Tests for statements executed inside and outside cancellable calls."""
+
+    def test_outside_a_call_arguments_are_unchanged(self):
+        cursor = MagicMock()
+
+        execute_statement(cursor, "SELECT 1", [1])
+
+        cursor.execute.assert_called_once_with("SELECT 1", [1])
+
+    def test_statements_get_request_id_and_timeout(self):
+        cursor = MagicMock()
+
+        with cancellable_call(timeout_seconds=60):
+            execute_statement(cursor, "SELECT 1", statement_params={"QUERY_TAG": "t"})
+
+        params = cursor.execute.call_args.kwargs["_statement_params"]
+        assert params["QUERY_TAG"] == "t"
+        assert params["STATEMENT_TIMEOUT_IN_SECONDS"] == 60
+        assert uuid.UUID(params["requestId"]).version == 4
+
+    def test_cancel_aborts_running_statements_and_refuses_new_ones(self):
+        cursor = MagicMock()
+        aborted = []
+
+        def execute(statement, _statement_params):
+            aborted.extend(call.cancel())
+
+        cursor.execute.side_effect = execute
+        with cancellable_call() as call:
+            execute_statement(cursor, "SELECT 1")
+            with pytest.raises(StatementCancelled):
+                execute_statement(cursor, "SELECT 2")
+
+        request_id = cursor.execute.call_args.kwargs["_statement_params"]["requestId"]
+        assert aborted == [request_id]
+        cursor.connection._cancel_query.assert_called_once_with(
+            "SELECT 1", uuid.UUID(request_id)
+        )
+        assert call.cancel() == []
+
+    def test_pooled_statements_belong_to_the_call(self):
+        cursors = [MagicMock() for _ in range(3)]
+        tasks = [
+            lambda cursor=cursor: execute_statement(cursor, "SELECT 1")
+            for cursor in cursors
+        ]
+
+        with cancellable_call(timeout_seconds=30):
+            _run_concurrently(tasks)
+
+        for cursor in cursors:
+            params = cursor.execute.call_args.kwargs["_statement_params"]
+            assert params["STATEMENT_TIMEOUT_IN_SECONDS"] == 30
+            assert uuid.UUID(params["requestId"]).version == 4
+
+    def test_cancel_skips_connections_without_abort(self):
+        cursor = MagicMock()
+        del cursor.connection._cancel_query
+        aborted = []
+        cursor.execute.side_effect = lambda *args, **kwargs: aborted.extend(
+            call.cancel()
+        )
+
+        with cancellable_call() as call:
+            execute_statement(cursor, "SELECT 1")
+
+        assert aborted == []
+
+
+class TestToolCallCancellation:
+    """Tests for cancelling run_snowflake_query while its statement runs."""
+
+    def make_server(self, tmp_path):
+        config_file = tmp_path / "config.yaml"
+        with open(config_file, "w") as f:
+            yaml.dump(
+                {
+                    "other_services": {"query_manager": True},
+                    "sql_statement_permissions": [{"Select": True}],
+                    "statement_timeouts": {
+                        "default": 600,
+                        "tools": {"run_snowflake_query": 30},
+                    },
+                },
+                f,
+            )
+        service = SnowflakeService(
+            service_config_file=str(config_file),
+            transport="stdio",
+            connection_params={"account": "test_account"},
+        )
+        server = FastMCP("test")
+        initialize_tools(service, server)
+        initialize_middleware(server, service)
+        return server
+
+    def run_cancelled(self, server, cancel):
+        connector = BlockingConnector()
+
+        async def run():
+            async with Client(server) as client:
+                call = asyncio.create_task(
+                    client.call_tool(
+                        "run_snowflake_query",
+                        {"statement": "SELECT * FROM SALES.PUBLIC.SLOW"},
+                    )
+                )
+                await asyncio.to_thread(connector.started.wait, 5)
+                await cancel(client, call)
+            # The worker thread returns once Snowflake ends the statement
+            return await asyncio.to_thread(connector.finished.wait, 5)
+
+        with (
+            patch("snowflake.connector.connect", side_effect=connector.connect),
+            patch("snowflake.core.Root"),
+        ):
+            finished = asyncio.run(run())
+        assert finished
+        return connector
+
+    def assert_aborted(self, connector):
+        [(statement, params)] = connector.executed
+        assert params["STATEMENT_TIMEOUT_IN_SECONDS"] == 30
+        assert connector.aborted == [(statement, params["requestId"])]
+
+    def test_client_cancellation_aborts_statement(self, tmp_path):
+        server = self.make_server(tmp_path)
+        cancelled_before = TOOL_METRICS.cancelled.get(("run_snowflake_query",))
+
+        async def cancel(client, call):
+            # The request id of the first call after initialization
+            await client.cancel(1, "No longer needed")
+            with pytest.raises(Exception):
+                await asyncio.wait_for(call, 5)
+
+        connector = self.run_cancelled(server, cancel)
+
+        self.assert_aborted(connector)
+        assert (
+            TOOL_METRICS.cancelled.get(("run_snowflake_query",)) - cancelled_before == 1
+        )
+
+    def test_disconnect_aborts_statement(self, tmp_path):
+        server = self.make_server(tmp_path)
+
+        async def cancel(client, call):
+            call.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await call
+
+        connector = self.run_cancelled(server, cancel)
+
+        self.assert_aborted(connector)
@@ -0,0 +1,262 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+import time
+import uuid
+from unittest.mock import patch
+
+import pytest
+import yaml
+from fastmcp import Client, FastMCP
+
+from mcp_server_snowflake.coalescing import (
+    SingleFlight,
+    get_coalesced_tools,
+    get_coalescing_key,
+)
+from mcp_server_snowflake.metrics import TOOL_METRICS
+from mcp_server_snowflake.server import (
+    SnowflakeService,
+    initialize_middleware,
+    initialize_tools,
+)
+
+
+class SlowConnector:
+    """Snowflake connector stand-in whose statements take a while to run."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.statements = []
+        self.lock = threading.Lock()
+
+    def connect(self, **kwargs):
+        return SlowConnection(self)
+
+
+class SlowConnection:
+    def __init__(self, connector):
+        self.connector = connector
+
+    def cursor(self, cursor_class=None):
+        return SlowCursor(self.connector)
+
+    def close(self):
+        pass
+
+
+class SlowCursor:
+    def __init__(self, connector):
+        self.connector = connector
+        self.sfqid = None
+
+    def execute(self, statement, params=None, **kwargs):
+        connector = self.connector
+        self.sfqid = str(uuid.uuid4())
+        with connector.lock:
+            connector.statements.append(statement)
+        time.sleep(connector.seconds)
+        return self
+
+    def fetchall(self):
+        return [{"N": 1}]
+
+    def fetchone(self):
+        return {"N": 1}
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class TestSingleFlight:
+    """Tests for de-duplicating concurrent calls."""
+
+    def test_concurrent_calls_share_one_run(self):
+        single_flight = SingleFlight()
+        runs = []
+
+        async def fn():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def run():
+            return await asyncio.gather(
+                *(single_flight.run("key", fn) for _ in range(5))
+            )
+
+        results = asyncio.run(run())
+
+        assert len(runs) == 1
+        assert results == [("result", False)] + [("result", True)] * 4
+        assert not len(single_flight)
+
+    def test_exceptions_are_shared(self):
+        single_flight = SingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise ValueError("failed")
+
+        async def run():
+            return await asyncio.gather(
+                *(single_flight.run("key", fn) for _ in range(3)),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    def test_waiting_call_runs_when_first_is_cancelled(self):
+        single_flight = SingleFlight()
+        runs = []
+
+        async def fn():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+            return len(runs)
+
+        async def run():
+            first = asyncio.create_task(single_flight.run("key", fn))
+            await asyncio.sleep(0)
+            second = asyncio.create_task(single_flight.run("key", fn))
+            await asyncio.sleep(0)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await second
+
+        assert asyncio.run(run()) == (2, False)
+
+    def test_calls_after_completion_run_again(self):
+        single_flight = SingleFlight()
+        runs = []
+
+        async def fn():
+            runs.append(1)
+            return "result"
+
+        async def run():
+            await single_flight.run("key", fn)
+            await single_flight.run("key", fn)
+
+        asyncio.run(run())
+        assert len(runs) == 2
+
+
+class TestCoalescingKey:
+    """Tests for which calls are treated as identical."""
+
+    def test_formatting_does_not_change_key(self):
+        assert get_coalescing_key(
+            "run_snowflake_query", {"statement": "select  *\nfrom T where id = 1"}
+        ) == get_coalescing_key(
+            "run_snowflake_query", {"statement": "SELECT * FROM T WHERE id = 1;"}
+        )
+
+    def test_statements_that_write_are_not_coalesced(self):
+        assert (
+            get_coalescing_key(
+                "run_snowflake_query", {"statement": "INSERT INTO T VALUES (1)"}
+            )
+            is None
+        )
+
+    def test_default_arguments_are_ignored(self):
+        assert get_coalescing_key(
+            "list_objects", {"object_type": "database", "like": None}
+        ) == get_coalescing_key("list_objects", {"object_type": "database"})
+        assert get_coalescing_key(
+            "list_objects", {"object_type": "database"}
+        ) != get_coalescing_key("list_objects", {"object_type": "schema"})
+
+    def test_sessions_do_not_share_keys(self):
+        arguments = {"object_type": "database"}
+        assert get_coalescing_key(
+            "list_objects", arguments, "session-1"
+        ) == get_coalescing_key("list_objects", arguments, "session-1")
+        assert get_coalescing_key(
+            "list_objects", arguments, "session-1"
+        ) != get_coalescing_key("list_objects", arguments, "session-2")
+
+    def test_disabled(self):
+        assert get_coalesced_tools({"enabled": False}) == frozenset()
+        assert "run_snowflake_query" in get_coalesced_tools(None)
+
+
+class TestServiceCoalescing:
+    """Tests for concurrent run_snowflake_query calls against a slow backend."""
+
+    def test_thundering_herd_runs_once(self, tmp_path):
+        config_file = tmp_path / "config.yaml"
+        with open(config_file, "w") as f:
+            yaml.dump(
+                {
+                    "other_services": {"query_manager": True},
+                    "sql_statement_permissions": [{"Select": True}],
+                },
+                f,
+            )
+        service = SnowflakeService(
+            service_config_file=str(config_file),
+            transport="stdio",
+            connection_params={"account": "test_account"},
+        )
+        server = FastMCP("test")
+        initialize_tools(service, server)
+        initialize_middleware(server, service)
+        connector = SlowConnector(seconds=0.05)
+        coalesced_before = TOOL_METRICS.coalesced.get(("run_snowflake_query",))
+
+        async def call(client, statement):
+            return await client.call_tool(
+                "run_snowflake_query", {"statement": statement}
+            )
+
+        async def run():
+            async with Client(server) as client, Client(server) as other_session:
+                herd = [
+                    call(client, "SELECT * FROM SALES.PUBLIC.ORDERS") for _ in range(5)
+                ]
+                herd += [
+                    call(client, "select *  from SALES.PUBLIC.ORDERS;")
+                    for _ in range(5)
+                ]
+                others = [
+                    call(client, f"SELECT {n} FROM SALES.PUBLIC.ORDERS")
+                    for n in range(3)
+                ]
+                # Calls are only shared within a session
+                others.append(call(other_session, "SELECT * FROM SALES.PUBLIC.ORDERS"))
+                return await asyncio.gather(*herd, *others)
+
+        with (
+            patch("snowflake.connector.connect", side_effect=connector.connect),
+            patch("snowflake.core.Root"),
+        ):
+            results = asyncio.run(run())
+
+        assert not any(result.is_error for result in results)
+        orders = [s for s in connector.statements if "SALES.PUBLIC.ORDERS" in s]
+        assert len(orders) == 5
+        assert (
+            TOOL_METRICS.coalesced.get(("run_snowflake_query",)) - coalesced_before == 9
+        )
@@ -0,0 +1,155 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import os
+from unittest.mock import patch
+
+import yaml
+from fastmcp import Client, FastMCP
+
+from mcp_server_snowflake.server import (
+    SnowflakeService,
+    initialize_resources,
+    initialize_tools,
+)
+from mcp_server_snowflake.server_utils import CheckQueryType, initialize_middleware
+
+SEARCH_SERVICE = {
+    "service_name": "docs_search",
+    "description": "Search service over product documentation",
+    "database_name": "DOCS_DB",
+    "schema_name": "PUBLIC",
+}
+
+
+def write_config(path, config):
+    with open(path, "w") as f:
+        yaml.dump(config, f)
+    # Make sure the edit is visible even on filesystems with coarse timestamps
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def make_server(tmp_path, config):
+    config_file = tmp_path / "config.yaml"
+    write_config(config_file, config)
+    service = SnowflakeService(
+        service_config_file=str(config_file),
+        transport="stdio",
+        connection_params={"account": "test_account"},
+    )
+    server = FastMCP("test")
+    initialize_tools(service, server)
+    initialize_middleware(server, service)
+    initialize_resources(service, server)
+    return service, server, config_file
+
+
+def list_tools(server):
+    async def run():
+        async with Client(server) as client:
+            return {tool.name: tool for tool in await client.list_tools()}
+
+    return asyncio.run(run())
+
+
+class TestServiceConfigManager:
+    """Tests for reloading the service configuration while serving."""
+
+    def test_unchanged_file_is_not_parsed_again(self, tmp_path):
+        service, _, _ = make_server(tmp_path, {"search_services": [SEARCH_SERVICE]})
+
+        with patch.object(
+            service, "unpack_service_specs", wraps=service.unpack_service_specs
+        ) as mock_unpack:
+            assert service.config_manager.reload_if_changed() is False
+            assert service.config_manager.get_config() == {
+                "search_services": [SEARCH_SERVICE]
+            }
+
+        mock_unpack.assert_not_called()
+
+    def test_added_search_service_is_served_on_next_request(self, tmp_path):
+        service, server, config_file = make_server(tmp_path, {})
+        assert "cortex_search" not in list_tools(server)
+
+        write_config(config_file, {"search_services": [SEARCH_SERVICE]})
+        tools = list_tools(server)
+
+        assert service.search_services == [SEARCH_SERVICE]
+        assert "docs_search" in tools["cortex_search"].description
+        assert service.config_manager.config == {"search_services": [SEARCH_SERVICE]}
+
+    def test_changed_service_list_updates_description_and_removes_tool(self, tmp_path):
+        service, server, config_file = make_server(
+            tmp_path, {"search_services": [SEARCH_SERVICE]}
+        )
+
+        renamed = {**SEARCH_SERVICE, "service_name": "kb_search"}
+        write_config(config_file, {"search_services": [renamed]})
+        description = list_tools(server)["cortex_search"].description
+        assert "kb_search" in description
+        assert "docs_search" not in description
+
+        write_config(config_file, {"search_services": []})
+        assert "cortex_search" not in list_tools(server)
+
+    def test_permissions_are_swapped_in_middleware(self, tmp_path):
+        service, server, config_file = make_server(
+            tmp_path, {"sql_statement_permissions": [{"Select": True}]}
+        )
+        middleware = next(m for m in server.middleware if isinstance(m, CheckQueryType))
+        assert middleware.permissions.allowed == {"select"}
+
+        write_config(
+            config_file,
+            {"sql_statement_permissions": [{"Select": True}, {"Drop": False}]},
+        )
+        assert service.config_manager.reload_if_changed() is True
+
+        assert middleware.permissions.allowed == {"select"}
+        assert middleware.permissions.disallowed == {"drop"}
+
+    def test_query_comment_template_is_replaced(self, tmp_path):
+        service, _, config_file = make_server(
+            tmp_path,
+            {"query_comment": {"enabled": True, "template": {"tool": "{tool_name}"}}},
+        )
+        assert service.build_query_comment("run_snowflake_query") == (
+            '{"tool": "run_snowflake_query"}'
+        )
+
+        write_config(
+            config_file,
+            {"query_comment": {"enabled": True, "template": {"source": "mcp"}}},
+        )
+        service.config_manager.reload_if_changed()
+
+        assert service.build_query_comment("run_snowflake_query") == (
+            '{"source": "mcp"}'
+        )
+
+    def test_invalid_file_keeps_previous_configuration(self, tmp_path):
+        service, _, config_file = make_server(
+            tmp_path, {"search_services": [SEARCH_SERVICE]}
+        )
+
+        with open(config_file, "w") as f:
+            f.write("search_services: [unterminated\n")
+        assert service.config_manager.reload_if_changed() is False
+        assert service.search_services == [SEARCH_SERVICE]
+
+        # The broken file is not parsed again until it changes
+        with patch.object(service, "unpack_service_specs") as mock_unpack:
+            assert service.config_manager.reload_if_changed() is False
+        mock_unpack.assert_not_called()
@@ -0,0 +1,288 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import re
+import threading
+import uuid
+from unittest.mock import patch
+
+import pytest
+import yaml
+from fastmcp import Client, FastMCP
+
+from mcp_server_snowflake.query_manager.export import compile_result_export
+from mcp_server_snowflake.server import (
+    SnowflakeService,
+    initialize_middleware,
+    initialize_tools,
+)
+
+RESULT_EXPORT = {
+    "stage": "@ANALYTICS.PUBLIC.MCP_EXPORTS/results",
+    "preview_rows": 2,
+    "max_file_size": 16_000_000,
+}
+
+ROWS = [{"REGION": region, "REVENUE": n} for n, region in enumerate("ABCDE")]
+
+
+class RecordingConnector:
+    """Snowflake connector stand-in that records statements and unloads results."""
+
+    def __init__(self):
+        self.statements = []
+        self.results = {}
+        self.lock = threading.Lock()
+
+    def connect(self, **kwargs):
+        return RecordingConnection(self)
+
+
+class RecordingConnection:
+    def __init__(self, connector):
+        self.connector = connector
+
+    def cursor(self, cursor_class=None):
+        return RecordingCursor(self.connector)
+
+    def close(self):
+        pass
+
+
+class RecordingCursor:
+    def __init__(self, connector):
+        self.connector = connector
+        self.rows = []
+        self.sfqid = None
+
+    def execute(self, statement, params=None, **kwargs):
+        connector = self.connector
+        with connector.lock:
+            connector.statements.append((statement, params))
+        self.sfqid = str(uuid.uuid4())
+        if "SALES" in statement:
+            connector.results[self.sfqid] = ROWS
+            self.rows = ROWS
+        elif statement.startswith("COPY INTO"):
+            location = re.match(r"COPY INTO @[\w.]+/(\S+)data_", statement).group(1)
+            query_id = re.search(r"RESULT_SCAN\('([\w-]+)'\)", statement).group(1)
+            rows = connector.results[query_id]
+            self.rows = [
+                {
+                    "FILE_NAME": f"{location}data_0_0_{n}.snappy.parquet",
+                    "FILE_SIZE": 1000 + n,
+                    "ROW_COUNT": count,
+                }
+                for n, count in enumerate((3, len(rows) - 3))
+            ]
+        elif "GET_PRESIGNED_URL" in statement:
+            self.rows = [
+                {"FILE_NAME": name, "URL": f"https://files.example.com/{name}?sig=1"}
+                for name in params[1:]
+            ]
+        elif "RESULT_SCAN" in statement:
+            limit = int(statement.rsplit("LIMIT", 1)[1])
+            self.rows = connector.results[params[0]][:limit]
+        else:
+            self.rows = [{"N": 1}]
+        return self
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def make_server(tmp_path, permissions=None):
+    config_file = tmp_path / "config.yaml"
+    with open(config_file, "w") as f:
+        yaml.dump(
+            {
+                "other_services": {"query_manager": True},
+                "sql_statement_permissions": permissions or [{"Select": True}],
+                "result_export": RESULT_EXPORT,
+            },
+            f,
+        )
+    service = SnowflakeService(
+        service_config_file=str(config_file),
+        transport="stdio",
+        connection_params={"account": "test_account"},
+    )
+    server = FastMCP("test")
+    initialize_tools(service, server)
+    initialize_middleware(server, service)
+    return server
+
+
+def call_tools(server, connector, calls):
+    async def run():
+        async with Client(server) as client:
+            return [
+                await client.call_tool(name, arguments, raise_on_error=False)
+                for name, arguments in calls
+            ]
+
+    with (
+        patch("snowflake.connector.connect", side_effect=connector.connect),
+        patch("snowflake.core.Root"),
+    ):
+        return asyncio.run(run())
+
+
+class TestExportQueryResults:
+    """Tests for unloading query results to a stage."""
+
+    def test_statement_is_exported_with_links_and_preview(self, tmp_path):
+        connector = RecordingConnector()
+
+        [result] = call_tools(
+            make_server(tmp_path),
+            connector,
+            [
+                (
+                    "export_query_results",
+                    {"statement": "SELECT region, revenue FROM SALES.PUBLIC.ORDERS"},
+                )
+            ],
+        )
+
+        assert not result.is_error
+        export = json.loads(result.content[0].text)
+        query_id = export["query_id"]
+        assert query_id in connector.results
+        [copy] = [s for s, _ in connector.statements if s.startswith("COPY INTO")]
+        assert copy.startswith(f"COPY INTO {export['location']}data_")
+        assert export["location"].startswith("@ANALYTICS.PUBLIC.MCP_EXPORTS/results/")
+        assert f"RESULT_SCAN('{query_id}')" in copy
+        assert "TYPE = PARQUET COMPRESSION = SNAPPY" in copy
+        assert "MAX_FILE_SIZE = 16000000" in copy
+        assert "DETAILED_OUTPUT = TRUE" in copy
+        # The query ran once; the export and preview read its stored result
+        assert sum("SALES.PUBLIC.ORDERS" in s for s, _ in connector.statements) == 1
+
+        assert export["row_count"] == len(ROWS)
+        directory = export["location"].split("/", 1)[1]
+        assert [f["file_name"] for f in export["files"]] == [
+            f"{directory}data_0_0_0.snappy.parquet",
+            f"{directory}data_0_0_1.snappy.parquet",
+        ]
+        assert all(
+            f["url"] == f"https://files.example.com/{f['file_name']}?sig=1"
+            for f in export["files"]
+        )
+        assert export["preview"] == ROWS[:2]
+
+    def test_previous_query_is_exported_as_csv(self, tmp_path):
+        connector = RecordingConnector()
+
+        results = call_tools(
+            make_server(tmp_path),
+            connector,
+            [
+                ("run_snowflake_query", {"statement": "SELECT * FROM SALES.PUBLIC.O"}),
+                ("export_query_results", {"file_format": "csv"}),
+            ],
+        )
+
+        export = json.loads(results[1].content[0].text)
+        assert export["query_id"] in connector.results
+        assert export["file_format"] == "csv"
+        [copy] = [s for s, _ in connector.statements if s.startswith("COPY INTO")]
+        assert "TYPE = CSV COMPRESSION = GZIP" in copy
+
+    @pytest.mark.parametrize("copy_allowed", [False, True])
+    def test_query_id_exports_need_copy_permission(self, tmp_path, copy_allowed):
+        connector = RecordingConnector()
+        query_id = str(uuid.uuid4())
+        connector.results[query_id] = ROWS
+        permissions = [{"Select": True}, {"Copy": copy_allowed}]
+
+        [result] = call_tools(
+            make_server(tmp_path, permissions=permissions),
+            connector,
+            [("export_query_results", {"query_id": query_id})],
+        )
+
+        if copy_allowed:
+            assert json.loads(result.content[0].text)["query_id"] == query_id
+        else:
+            assert result.is_error
+            assert "Copy is not allowed" in result.content[0].text
+            assert not any(s.startswith("COPY INTO") for s, _ in connector.statements)
+
+    def test_previous_query_is_per_session(self, tmp_path):
+        connector = RecordingConnector()
+        server = make_server(tmp_path)
+
+        async def run():
+            async with Client(server) as first, Client(server) as second:
+                await first.call_tool(
+                    "run_snowflake_query", {"statement": "SELECT * FROM SALES.PUBLIC.O"}
+                )
+                other = await second.call_tool(
+                    "export_query_results", {}, raise_on_error=False
+                )
+                own = await first.call_tool("export_query_results", {})
+                return other, own
+
+        with (
+            patch("snowflake.connector.connect", side_effect=connector.connect),
+            patch("snowflake.core.Root"),
+        ):
+            other, own = asyncio.run(run())
+
+        # The second session has not run a query, so it cannot export the first's
+        assert other.is_error
+        assert "no query has been run yet" in other.content[0].text
+        assert json.loads(own.content[0].text)["query_id"] in connector.results
+
+    @pytest.mark.parametrize(
+        "arguments, message",
+        [
+            ({"statement": "DELETE FROM SALES.PUBLIC.O"}, "not allowed"),
+            ({"statement": "SHOW TABLES"}, "Only queries"),
+            ({"query_id": "1; DROP TABLE T"}, "not a Snowflake query id"),
+            ({}, "no query has been run yet"),
+        ],
+    )
+    def test_invalid_exports_are_rejected(self, tmp_path, arguments, message):
+        connector = RecordingConnector()
+
+        [result] = call_tools(
+            make_server(
+                tmp_path, permissions=[{"Select": True}, {"Show": True}, {"Copy": True}]
+            ),
+            connector,
+            [("export_query_results", arguments)],
+        )
+
+        assert result.is_error
+        assert message in result.content[0].text
+        assert not any(s.startswith("COPY INTO") for s, _ in connector.statements)
+
+    def test_stage_must_be_a_stage(self):
+        with pytest.raises(ValueError):
+            compile_result_export({"stage": "ANALYTICS.PUBLIC.EXPORTS"})
+        assert compile_result_export(None) is None
@@ -0,0 +1,401 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastmcp import FastMCP
+
+from mcp_server_snowflake.inventory.store import InventoryStore
+from mcp_server_snowflake.inventory.tools import (
+    Inventory,
+    crawl_source,
+    get_default_inventory_path,
+    initialize_inventory_tools,
+)
+from mcp_server_snowflake.utils import SnowflakeException
+
+
+def table_row(name, schema="PUBLIC", database="SALES", last_altered=None, **extra):
+    return {
+        "object_type": "table",
+        "database_name": database,
+        "schema_name": schema,
+        "name": name,
+        "last_altered": last_altered,
+        **extra,
+    }
+
+
+class TestInventoryStore:
+    """Tests for the SQLite inventory snapshot."""
+
+    def test_search_orders_exact_matches_first(self):
+        store = InventoryStore(":memory:")
+        store.apply_batch(
+            "SALES",
+            "tables",
+            ("table", "view"),
+            [table_row("ORDERS_ARCHIVE"), table_row("ORDERS"), table_row("CUSTOMERS")],
+            replace=True,
+        )
+
+        results = store.search(query="orders")
+        assert [r["name"] for r in results] == ["ORDERS", "ORDERS_ARCHIVE"]
+        assert results[0]["database_name"] == "SALES"
+
+    def test_search_matches_comments_and_filters(self):
+        store = InventoryStore(":memory:")
+        store.apply_batch(
+            "SALES",
+            "tables",
+            ("table", "view"),
+            [
+                table_row("T1", comment="Revenue by region"),
+                table_row("T2", schema="RAW", comment="Revenue raw"),
+            ],
+            replace=True,
+        )
+
+        results = store.search(query="revenue", schema_name="raw")
+        assert [r["name"] for r in results] == ["T2"]
+
+    def test_incremental_batch_keeps_rows_and_advances_watermark(self):
+        store = InventoryStore(":memory:")
+        store.apply_batch(
+            "SALES",
+            "tables",
+            ("table", "view"),
+            [table_row("A", last_altered="2025-01-01T00:00:00+00:00")],
+            replace=True,
+        )
+        store.apply_batch(
+            "SALES",
+            "tables",
+            ("table", "view"),
+            [
+                table_row(
+                    "B",
+                    last_altered=datetime(2025, 2, 1, tzinfo=timezone.utc),
+                )
+            ],
+            replace=False,
+        )
+
+        assert {r["name"] for r in store.search()} == {"A", "B"}
+        assert store.get_watermark("SALES", "tables") == "2025-02-01T00:00:00+00:00"
+
+    def test_dropped_databases_are_removed(self):
+        store = InventoryStore(":memory:")
+        store.replace_databases(
+            [
+                {"object_type": "database", "name": "SALES"},
+                {"object_type": "database", "name": "OLD"},
+            ]
+        )
+        store.apply_batch(
+            "OLD", "tables", ("table", "view"), [table_row("T", database="OLD")], True
+        )
+
+        removed = store.replace_databases(
+            [{"object_type": "database", "name": "SALES"}]
+        )
+
+        assert removed == ["OLD"]
+        assert [r["name"] for r in store.search()] == ["SALES"]
+        assert store.get_watermark("OLD", "tables") is None
+
+    def test_schema_replace_keeps_other_schemas_and_watermark(self):
+        store = InventoryStore(":memory:")
+        store.apply_batch(
+            "SALES",
+            "tables",
+            ("table", "view"),
+            [
+                table_row("A", last_altered="2025-02-01T00:00:00+00:00"),
+                table_row("B", schema="RAW"),
+            ],
+            replace=True,
+        )
+
+        store.apply_batch(
+            "SALES", "tables", ("table", "view"), [], replace=True, schema_name="PUBLIC"
+        )
+
+        assert [r["name"] for r in store.search()] == ["B"]
+        assert store.count_by_schema("SALES", ("table", "view")) == {"RAW": 1}
+        assert store.get_watermark("SALES", "tables") == "2025-02-01T00:00:00+00:00"
+
+
+class TestInventoryCrawl:
+    """Tests for the parallel, incremental inventory crawler."""
+
+    def make_inventory(self, **kwargs):
+        return Inventory(MagicMock(), path=":memory:", **kwargs)
+
+    def fake_crawl_source(
+        self, snowflake_service, database_name, source, since=None, schema_name=None
+    ):
+        self.calls.append((database_name, source, since))
+        if source == "tables":
+            return [
+                table_row(
+                    f"{database_name}_T",
+                    database=database_name,
+                    last_altered="2025-01-01T00:00:00+00:00",
+                    **({"schema_count": 1} if since else {}),
+                )
+            ]
+        return []
+
+    def refresh(self, inventory, full=False, databases=("SALES", "SNOWFLAKE")):
+        with (
+            patch(
+                "mcp_server_snowflake.inventory.tools.execute_query",
+                return_value=[{"name": name} for name in databases],
+            ),
+            patch(
+                "mcp_server_snowflake.inventory.tools.crawl_source",
+                side_effect=self.fake_crawl_source,
+            ),
+        ):
+            return inventory.refresh(full=full)
+
+    def test_first_refresh_crawls_every_source(self):
+        self.calls = []
+        inventory = self.make_inventory()
+
+        result = self.refresh(inventory)
+
+        # The SNOWFLAKE database is excluded by default
+        assert sorted(self.calls) == [
+            ("SALES", "schemata", None),
+            ("SALES", "semantic_views", None),
+            ("SALES", "stages", None),
+            ("SALES", "tables", None),
+        ]
+        assert result["databases"] == 1
+        assert result["errors"] == []
+        assert [r["name"] for r in inventory.store.search(object_type="table")] == [
+            "SALES_T"
+        ]
+
+    def test_second_refresh_is_incremental(self):
+        self.calls = []
+        inventory = self.make_inventory()
+        self.refresh(inventory)
+        self.calls = []
+
+        self.refresh(inventory)
+
+        since = {source: since for _, source, since in self.calls}
+        assert since["tables"] == "2025-01-01T00:00:00+00:00"
+        # Semantic views have no LAST_ALTERED and are always replaced
+        assert since["semantic_views"] is None
+
+        self.calls = []
+        self.refresh(inventory, full=True)
+        assert all(since is None for _, _, since in self.calls)
+
+    def test_incremental_crawl_reports_schema_counts(self):
+        with patch(
+            "mcp_server_snowflake.inventory.tools.fetch_paged", return_value=[]
+        ) as mock_fetch:
+            crawl_source(MagicMock(), "SALES", "tables", since="2025-01-01")
+            crawl_source(MagicMock(), "SALES", "tables", schema_name="RAW")
+
+        incremental, schema = (call.args[1:] for call in mock_fetch.call_args_list)
+        assert "COUNT(*) OVER (PARTITION BY schema_name)" in incremental[0]
+        assert "QUALIFY last_altered > TO_TIMESTAMP_LTZ(?)" in incremental[0]
+        assert incremental[1][1:] == ["2025-01-01"]
+        assert schema[0].endswith("WHERE schema_name = ?")
+        assert schema[1] == ['"SALES".INFORMATION_SCHEMA.TABLES', "RAW"]
+
+    def test_incremental_refresh_removes_dropped_objects(self):
+        # Tables currently in Snowflake, keyed by schema
+        remote = {
+            "PUBLIC": ["A", "B"],
+            "RAW": ["C"],
+            "OLD": ["D"],
+        }
+        self.calls = []
+
+        def crawl(
+            snowflake_service, database_name, source, since=None, schema_name=None
+        ):
+            self.calls.append((database_name, source, since, schema_name))
+            if source != "tables":
+                return []
+            rows = [
+                table_row(name, schema=schema, last_altered="2025-01-01T00:00:00+00:00")
+                for schema, names in remote.items()
+                for name in names
+                if schema_name is None or schema == schema_name
+            ]
+            if since:
+                # First object of each schema, carrying the schema's count
+                return [
+                    {**row, "schema_count": len(remote[row["schema_name"]])}
+                    for row in rows
+                    if row["name"] == remote[row["schema_name"]][0]
+                ]
+            return rows
+
+        inventory = self.make_inventory()
+        with (
+            patch(
+                "mcp_server_snowflake.inventory.tools.execute_query",
+                return_value=[{"name": "SALES"}],
+            ),
+            patch(
+                "mcp_server_snowflake.inventory.tools.crawl_source", side_effect=crawl
+            ),
+        ):
+            inventory.refresh()
+            remote["PUBLIC"].remove("B")
+            del remote["OLD"]
+            self.calls = []
+            inventory.refresh()
+
+        names = {r["name"] for r in inventory.store.search(object_type="table")}
+        assert names == {"A", "C"}
+        # Only the schema that lost an object is crawled again
+        assert [call for call in self.calls if call[3] is not None] == [
+            ("SALES", "tables", None, "PUBLIC")
+        ]
+        assert inventory.store.get_watermark("SALES", "tables") == (
+            "2025-01-01T00:00:00+00:00"
+        )
+
+    def test_failed_source_is_reported(self):
+        self.calls = []
+        inventory = self.make_inventory()
+
+        def failing(snowflake_service, database_name, source, since=None):
+            if source == "stages":
+                raise Exception("Insufficient privileges")
+            return self.fake_crawl_source(
+                snowflake_service, database_name, source, since
+            )
+
+        with (
+            patch(
+                "mcp_server_snowflake.inventory.tools.execute_query",
+                return_value=[{"name": "SALES"}],
+            ),
+            patch(
+                "mcp_server_snowflake.inventory.tools.crawl_source",
+                side_effect=failing,
+            ),
+        ):
+            result = inventory.refresh()
+
+        assert result["errors"] == ["SALES.stages: Insufficient privileges"]
+        assert inventory.store.search(query="SALES_T")
+
+    def test_show_databases_failure_raises(self):
+        inventory = self.make_inventory()
+        with patch(
+            "mcp_server_snowflake.inventory.tools.execute_query",
+            side_effect=Exception("boom"),
+        ):
+            with pytest.raises(SnowflakeException):
+                inventory.refresh()
+
+    def test_search_serves_stale_snapshot_and_refreshes_in_background(self):
+        self.calls = []
+        inventory = self.make_inventory(refresh_interval_seconds=60)
+        self.refresh(inventory)
+        stale = datetime.now(timezone.utc) - timedelta(seconds=120)
+        inventory.store.set_metadata("last_refresh", stale.isoformat())
+
+        with patch.object(inventory, "refresh_in_background") as mock_background:
+            result = inventory.search(query="SALES_T")
+
+        mock_background.assert_called_once()
+        assert [r["name"] for r in result["results"]] == ["SALES_T"]
+        assert result["last_refresh"] == stale.isoformat()
+
+    def test_first_search_warms_snapshot(self):
+        self.calls = []
+        inventory = self.make_inventory()
+
+        with patch.object(inventory, "_refresh") as mock_refresh:
+            inventory.search(query="x")
+
+        mock_refresh.assert_called_once_with(full=False)
+
+    def test_concurrent_searches_refresh_once(self):
+        self.calls = []
+        inventory = self.make_inventory(refresh_interval_seconds=60)
+        started = threading.Event()
+        release = threading.Event()
+        refreshes = []
+
+        def slow_refresh(full):
+            refreshes.append(full)
+            started.set()
+            release.wait(5)
+            inventory.store.set_metadata(
+                "last_refresh", datetime.now(timezone.utc).isoformat()
+            )
+
+        with patch.object(inventory, "_refresh", side_effect=slow_refresh):
+            # Warm-up: searches waiting on the first refresh do not repeat it
+            searches = [
+                threading.Thread(target=inventory.search, kwargs={"query": "x"})
+                for _ in range(4)
+            ]
+            for search in searches:
+                search.start()
+            assert started.wait(5)
+            release.set()
+            for search in searches:
+                search.join(5)
+            assert refreshes == [False]
+
+            # Stale: only one background refresh starts
+            stale = datetime.now(timezone.utc) - timedelta(seconds=120)
+            inventory.store.set_metadata("last_refresh", stale.isoformat())
+            started.clear()
+            release.clear()
+            assert inventory.refresh_in_background()
+            assert started.wait(5)
+            assert not inventory.refresh_in_background()
+            assert inventory.search(query="x")["refreshing"]
+            release.set()
+
+        assert refreshes == [False, False]
+
+
+class TestInventoryPath:
+    """Tests for where the inventory snapshot is stored."""
+
+    def test_configured_path_is_used(self, tmp_path):
+        service = MagicMock()
+        service.inventory_config = {"path": str(tmp_path / "inventory.sqlite3")}
+
+        initialize_inventory_tools(FastMCP("test"), service)
+
+        assert (tmp_path / "inventory.sqlite3").exists()
+
+    def test_default_path_is_per_account(self, tmp_path):
+        service = MagicMock()
+        service.connection_params = {"account": "my-account"}
+
+        path = get_default_inventory_path(service)
+
+        # Tests keep HOME in tmp_path so snapshots never land in the repo
+        assert path.startswith(str(tmp_path))
+        assert path.endswith("inventory_my_account.sqlite3")
@@ -0,0 +1,172 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import uuid
+from unittest.mock import MagicMock, patch
+
+import httpx
+import yaml
+from fastmcp import Client, FastMCP
+
+from mcp_server_snowflake.metrics import (
+    METRICS_RESOURCE_URI,
+    TOOL_METRICS,
+    Histogram,
+    ToolMetrics,
+    start_tool_call,
+    time_phase,
+)
+from mcp_server_snowflake.server import (
+    SnowflakeService,
+    initialize_metrics_route,
+    initialize_middleware,
+    initialize_resources,
+    initialize_tools,
+)
+from mcp_server_snowflake.server_utils import ToolMetricsMiddleware
+
+PHASES = ["middleware", "validation", "parse", "connection", "execute", "fetch"]
+
+
+def make_server(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    with open(config_file, "w") as f:
+        yaml.dump(
+            {
+                "other_services": {"query_manager": True},
+                "sql_statement_permissions": [{"Select": True}],
+            },
+            f,
+        )
+    service = SnowflakeService(
+        service_config_file=str(config_file),
+        transport="stdio",
+        connection_params={"account": "test_account"},
+    )
+    server = FastMCP("test")
+    initialize_tools(service, server)
+    initialize_middleware(server, service)
+    initialize_resources(service, server)
+    return server
+
+
+def phase_counts(tool, statement_type):
+    counts = {}
+    for phase in PHASES:
+        sample = TOOL_METRICS.phases.get_sample((tool, statement_type, phase))
+        counts[phase] = sample[1] if sample else 0
+    return counts
+
+
+class TestHistogram:
+    """Tests for the Prometheus histogram."""
+
+    def test_render_cumulative_buckets(self):
+        histogram = Histogram("test_seconds", "Test.", ("tool",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(('say "hi"',), value)
+
+        assert histogram.render() == [
+            "# HELP test_seconds Test.",
+            "# TYPE test_seconds histogram",
+            'test_seconds_bucket{tool="say \\"hi\\"",le="0.1"} 1',
+            'test_seconds_bucket{tool="say \\"hi\\"",le="1"} 3',
+            'test_seconds_bucket{tool="say \\"hi\\"",le="+Inf"} 4',
+            'test_seconds_sum{tool="say \\"hi\\""} 6.05',
+            'test_seconds_count{tool="say \\"hi\\""} 4',
+        ]
+
+    def test_phases_outside_tool_calls_are_ignored(self):
+        metrics = ToolMetrics()
+        with time_phase("execute"):
+            pass
+        with start_tool_call("tool") as timer:
+            with time_phase("execute"):
+                pass
+            with time_phase("execute"):
+                pass
+        metrics.observe_call(timer, 0.01, "ok")
+
+        assert set(timer.phases) == {"execute"}
+        assert metrics.phases.get_sample(("tool", "none", "execute"))[1] == 1
+        assert metrics.calls.get_sample(("tool", "none", "ok")) == (0.01, 1)
+
+
+class TestToolMetricsMiddleware:
+    """Tests for per-phase tool call metrics."""
+
+    def test_query_phases_are_recorded(self, tmp_path):
+        statement = f"SELECT '{uuid.uuid4()}'"
+        before = phase_counts("run_snowflake_query", "Select")
+
+        async def run():
+            async with Client(make_server(tmp_path)) as client:
+                await client.call_tool("run_snowflake_query", {"statement": statement})
+                resource = await client.read_resource(METRICS_RESOURCE_URI)
+                return resource[0].text
+
+        with (
+            patch("snowflake.connector.connect") as mock_connect,
+            patch("snowflake.core.Root"),
+        ):
+            mock_connect.return_value = MagicMock()
+            cursor = mock_connect.return_value.cursor.return_value
+            cursor.fetchall.return_value = [{"A": 1}]
+            text = asyncio.run(run())
+
+        after = phase_counts("run_snowflake_query", "Select")
+        assert {phase: after[phase] - before[phase] for phase in PHASES} == {
+            phase: 1 for phase in PHASES
+        }
+        assert (
+            'snowflake_mcp_tool_call_seconds_count{tool="run_snowflake_query",'
+            'statement_type="Select",status="ok"}'
+        ) in text
+
+    def test_failed_calls_are_labelled(self, tmp_path):
+        before = TOOL_METRICS.calls.get_sample(("run_snowflake_query", "Drop", "error"))
+
+        async def run():
+            async with Client(make_server(tmp_path)) as client:
+                await client.call_tool(
+                    "run_snowflake_query",
+                    {"statement": "DROP TABLE t"},
+                    raise_on_error=False,
+                )
+
+        asyncio.run(run())
+
+        after = TOOL_METRICS.calls.get_sample(("run_snowflake_query", "Drop", "error"))
+        assert after[1] == (before[1] if before else 0) + 1
+
+    def test_middleware_is_outermost(self, tmp_path):
+        server = make_server(tmp_path)
+        assert isinstance(server.middleware[0], ToolMetricsMiddleware)
+
+    def test_metrics_endpoint(self):
+        server = FastMCP("test")
+        initialize_metrics_route(server)
+        TOOL_METRICS.calls.observe(("endpoint_tool", "none", "ok"), 0.2)
+
+        async def get():
+            transport = httpx.ASGITransport(app=server.http_app())
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                return await client.get("/metrics")
+
+        response = asyncio.run(get())
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'tool="endpoint_tool"' in response.text
@@ -0,0 +1,499 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from typing import get_args
+from unittest.mock import MagicMock, patch
+
+import pytest
+from snowflake.core.exceptions import NotFoundError
+from snowflake.core.warehouse import Warehouse
+
+from mcp_server_snowflake.object_manager.diff import diff_object
+from mcp_server_snowflake.object_manager.objects import (
+    SnowflakeDatabase,
+    SnowflakeRole,
+    SnowflakeSchema,
+    SnowflakeTable,
+    SnowflakeTableColumn,
+    SnowflakeWarehouse,
+    supported_objects,
+)
+from mcp_server_snowflake.object_manager.plan import (
+    DesiredState,
+    apply_objects,
+    plan_objects,
+)
+from mcp_server_snowflake.object_manager.registry import OBJECT_REGISTRY
+from mcp_server_snowflake.object_manager.tools import (
+    SHOW_FILTER_FUNCTIONS,
+    create_or_alter_object,
+    list_objects,
+    parse_object,
+)
+from mcp_server_snowflake.utils import SnowflakeException
+
+
+def make_root(existing=None, not_found=False):
+    """Build a mock Root whose warehouses collection returns the given object."""
+    root = MagicMock()
+    resource = MagicMock()
+    if not_found:
+        resource.fetch.side_effect = NotFoundError(root, status=404)
+    else:
+        resource.fetch.return_value = existing
+    root.warehouses.__getitem__.return_value = resource
+    return root, resource
+
+
+class TestDiffObject:
+    """Tests for diff_object function."""
+
+    def test_no_changes_when_in_desired_state(self):
+        desired = SnowflakeWarehouse(name="WH", warehouse_size="X-SMALL")
+        diff = diff_object(
+            desired, {"name": "WH", "warehouse_size": "XSMALL"}, "Warehouse"
+        )
+        assert diff.action == "none"
+        assert diff.changes == []
+
+    def test_detects_changed_property(self):
+        desired = SnowflakeWarehouse(name="WH", auto_suspend=60)
+        diff = diff_object(desired, {"name": "WH", "auto_suspend": 600}, "Warehouse")
+        assert diff.action == "alter"
+        assert [c.field for c in diff.changes] == ["auto_suspend"]
+        assert diff.changes[0].current == 600
+        assert diff.changes[0].desired == 60
+
+    def test_missing_object_is_create(self):
+        desired = SnowflakeDatabase(name="DB", comment="hello")
+        diff = diff_object(desired, None, "Database")
+        assert diff.action == "create"
+        assert [c.field for c in diff.changes] == ["comment"]
+
+    def test_defaults_and_identity_fields_are_ignored(self):
+        desired = SnowflakeDatabase(name="db")
+        diff = diff_object(desired, {"name": "DB", "kind": "TRANSIENT"}, "Database")
+        assert diff.action == "none"
+
+    def test_string_booleans_compare_equal(self):
+        desired = SnowflakeWarehouse(name="WH", auto_resume="true")
+        diff = diff_object(desired, {"name": "WH", "auto_resume": "true"}, "Warehouse")
+        assert diff.action == "none"
+
+    @pytest.mark.parametrize(
+        "desired, current, action",
+        [
+            ("INT", "NUMBER(38,0)", "none"),
+            ("decimal(10)", "NUMBER(10,0)", "none"),
+            ("VARCHAR", "VARCHAR(16777216)", "none"),
+            ("string", "VARCHAR(16777216)", "none"),
+            ("CHAR", "VARCHAR(1)", "none"),
+            ("TIMESTAMP", "TIMESTAMP_NTZ(9)", "none"),
+            ("double precision", "FLOAT", "none"),
+            ("VARIANT", "VARIANT", "none"),
+            ("NUMBER(10,2)", "NUMBER(38,0)", "alter"),
+            ("VARCHAR(100)", "VARCHAR(16777216)", "alter"),
+            ("TIMESTAMP_LTZ", "TIMESTAMP_NTZ(9)", "alter"),
+        ],
+    )
+    def test_datatype_synonyms_and_defaults_compare_equal(
+        self, desired, current, action
+    ):
+        table = SnowflakeTable(
+            name="T",
+            database_name="DB",
+            schema_name="PUBLIC",
+            columns=[{"name": "C", "datatype": desired}],
+        )
+        diff = diff_object(
+            table,
+            {"name": "T", "columns": [{"name": "C", "datatype": current}]},
+            "Table",
+        )
+        assert diff.action == action
+
+
+class TestCreateOrAlterObject:
+    """Tests for create_or_alter_object function."""
+
+    def test_skips_ddl_when_unchanged(self):
+        existing = Warehouse(name="WH", warehouse_size="XSMALL", auto_suspend=60)
+        root, resource = make_root(existing)
+
+        result = create_or_alter_object(
+            SnowflakeWarehouse(name="WH", warehouse_size="X-SMALL", auto_suspend=60),
+            root,
+        )
+
+        resource.create_or_alter.assert_not_called()
+        assert result["action"] == "none"
+
+    def test_alters_only_changed_properties(self):
+        existing = Warehouse(name="WH", warehouse_size="XSMALL", auto_suspend=60)
+        root, resource = make_root(existing)
+
+        result = create_or_alter_object(
+            SnowflakeWarehouse(name="WH", auto_suspend=300), root
+        )
+
+        resource.create_or_alter.assert_called_once_with(existing)
+        assert existing.auto_suspend == 300
+        assert existing.warehouse_size == "XSMALL"
+        assert result["action"] == "alter"
+        assert result["changes"] == [
+            {"field": "auto_suspend", "current": 60, "desired": 300}
+        ]
+
+    def test_creates_missing_object(self):
+        root, resource = make_root(not_found=True)
+
+        result = create_or_alter_object(
+            SnowflakeWarehouse(name="WH", auto_suspend=300), root
+        )
+
+        resource.create_or_alter.assert_called_once()
+        assert result["action"] == "create"
+
+
+class TestPlanObjects:
+    """Tests for batched plan/apply of desired-state documents."""
+
+    SHOW_RESULTS = {
+        "SHOW WAREHOUSES": [
+            {"name": "WH", "size": "X-Small", "type": "STANDARD", "auto_suspend": 60}
+        ],
+        "SHOW DATABASES": [{"name": "DB", "options": "", "retention_time": "1"}],
+        "SHOW schemas IN DATABASE identifier(?)": [
+            {"name": "PUBLIC", "options": "", "retention_time": "1"}
+        ],
+        "SHOW tables IN DATABASE identifier(?)": [
+            {"name": "T", "schema_name": "PUBLIC", "kind": "TABLE", "comment": ""}
+        ],
+    }
+
+    COLUMN_ROWS = [
+        {
+            "table_schema": "PUBLIC",
+            "table_name": "T",
+            "column_name": "ID",
+            "data_type": "NUMBER",
+            "numeric_precision": 38,
+            "numeric_scale": 0,
+            "is_nullable": "NO",
+        },
+        {
+            "table_schema": "PUBLIC",
+            "table_name": "T",
+            "column_name": "NAME",
+            "data_type": "TEXT",
+            "character_maximum_length": 100,
+            "is_nullable": "YES",
+        },
+    ]
+
+    def fake_execute_query(self, statement, snowflake_service, bindvars=[]):
+        self.statements.append(statement)
+        if "INFORMATION_SCHEMA" in str(bindvars):
+            self.column_bindvars.append(bindvars)
+            return self.COLUMN_ROWS
+        return self.SHOW_RESULTS[statement]
+
+    def make_desired_state(self):
+        return DesiredState(
+            warehouses=[SnowflakeWarehouse(name="wh", warehouse_size="X-SMALL")],
+            databases=[
+                SnowflakeDatabase(name="db", data_retention_time_in_days=1),
+                SnowflakeDatabase(name="new_db"),
+            ],
+            schemas=[
+                SnowflakeSchema(name="public", database_name="db"),
+                SnowflakeSchema(name="raw", database_name="new_db"),
+            ],
+            tables=[
+                SnowflakeTable(
+                    name="t", database_name="db", schema_name="public", comment="c"
+                ),
+            ],
+        )
+
+    @pytest.mark.parametrize(
+        "columns, action",
+        [
+            (
+                [
+                    {"name": "id", "datatype": "NUMBER(38,0)", "nullable": False},
+                    {"name": "name", "datatype": "varchar(100)"},
+                ],
+                "none",
+            ),
+            (
+                [
+                    {"name": "id", "datatype": "NUMBER(38,0)", "nullable": True},
+                    {"name": "name", "datatype": "VARCHAR(100)"},
+                ],
+                "alter",
+            ),
+            ([{"name": "id", "datatype": "NUMBER(38,0)"}], "alter"),
+        ],
+    )
+    def test_table_columns_are_compared_in_one_query(self, columns, action):
+        self.statements = []
+        self.column_bindvars = []
+        desired = DesiredState(
+            tables=[
+                SnowflakeTable(
+                    name=name,
+                    database_name="db",
+                    schema_name="public",
+                    columns=[SnowflakeTableColumn(**column) for column in columns],
+                )
+                for name in ("t", "new_t")
+            ]
+        )
+
+        with patch(
+            "mcp_server_snowflake.object_manager.plan.execute_query",
+            side_effect=self.fake_execute_query,
+        ):
+            plan = plan_objects(MagicMock(), desired)
+
+        assert self.column_bindvars == [["db.INFORMATION_SCHEMA.COLUMNS", "PUBLIC"]]
+        actions = {s.fully_qualified_name: s.diff.action for s in plan.steps}
+        assert actions == {"DB.PUBLIC.T": action, "DB.PUBLIC.NEW_T": "create"}
+
+    def test_plan_uses_batched_show_queries(self):
+        self.statements = []
+        with patch(
+            "mcp_server_snowflake.object_manager.plan.execute_query",
+            side_effect=self.fake_execute_query,
+        ):
+            plan = plan_objects(MagicMock(), self.make_desired_state())
+
+        # One SHOW per type, and nothing is queried inside NEW_DB
+        assert sorted(self.statements) == sorted(self.SHOW_RESULTS.keys())
+        actions = {s.fully_qualified_name: s.diff.action for s in plan.steps}
+        assert actions == {
+            "WH": "none",
+            "DB": "none",
+            "NEW_DB": "create",
+            "DB.PUBLIC": "none",
+            "NEW_DB.RAW": "create",
+            "DB.PUBLIC.T": "alter",
+        }
+        assert plan.summary == {"none": 3, "create": 2, "alter": 1}
+
+    def test_apply_skips_children_of_failed_parents(self):
+        self.statements = []
+        service = MagicMock()
+        with (
+            patch("snowflake.core.Root"),
+            patch(
+                "mcp_server_snowflake.object_manager.plan.execute_query",
+                side_effect=self.fake_execute_query,
+            ),
+            patch(
+                "mcp_server_snowflake.object_manager.tools.create_object",
+                side_effect=SnowflakeException(tool="create_object", message="boom"),
+            ) as mock_create,
+            patch(
+                "mcp_server_snowflake.object_manager.tools.create_or_alter_object"
+            ) as mock_alter,
+        ):
+            plan = apply_objects(service, self.make_desired_state())
+
+        statuses = {s.fully_qualified_name: s.status for s in plan.steps}
+        assert statuses == {
+            "WH": "unchanged",
+            "DB": "unchanged",
+            "NEW_DB": "failed",
+            "DB.PUBLIC": "unchanged",
+            "NEW_DB.RAW": "skipped",
+            "DB.PUBLIC.T": "applied",
+        }
+        mock_create.assert_called_once()
+        mock_alter.assert_called_once()
+
+    def test_apply_workers_do_not_share_a_root(self):
+        self.statements = []
+        desired = DesiredState(
+            warehouses=[SnowflakeWarehouse(name=f"new_wh_{n}") for n in range(4)]
+        )
+        started = threading.Barrier(4, timeout=5)
+        used = []
+
+        def create_object(obj, root, mode):
+            started.wait()
+            used.append((threading.get_ident(), root))
+
+        with (
+            patch("snowflake.core.Root", side_effect=lambda connection: MagicMock()),
+            patch(
+                "mcp_server_snowflake.object_manager.plan.execute_query",
+                side_effect=self.fake_execute_query,
+            ),
+            patch(
+                "mcp_server_snowflake.object_manager.tools.create_object",
+                side_effect=create_object,
+            ),
+        ):
+            plan = apply_objects(MagicMock(), desired, max_workers=4)
+
+        assert {step.status for step in plan.steps} == {"applied"}
+        assert len({thread for thread, _ in used}) == 4
+        assert len({id(root) for _, root in used}) == 4
+
+
+class TestObjectRegistry:
+    """Tests for the precompiled object type registry."""
+
+    def test_registry_covers_supported_objects(self):
+        assert set(OBJECT_REGISTRY) == set(get_args(supported_objects))
+
+    def test_parse_object_from_json_string(self):
+        parsed = parse_object('{"name": "WH", "auto_suspend": 60}', "warehouse")
+        assert isinstance(parsed, SnowflakeWarehouse)
+        assert parsed.auto_suspend == 60
+
+    def test_parse_object_from_dict(self):
+        parsed = parse_object({"name": "S", "database_name": "DB"}, "schema")
+        assert isinstance(parsed, SnowflakeSchema)
+
+    def test_parse_object_revalidates_wrong_union_member(self):
+        parsed = parse_object(SnowflakeDatabase(name="R"), "role")
+        assert isinstance(parsed, SnowflakeRole)
+        assert parsed.name == "R"
+
+    def test_parse_object_invalid_type(self):
+        with pytest.raises(ValueError):
+            parse_object("{}", "not_a_type")
+
+    @pytest.mark.parametrize(
+        "object_type, expected",
+        [
+            ("compute_pool", "SHOW compute pools"),
+            ("image_repository", "SHOW image repositories IN ACCOUNT"),
+            ("database", "SHOW databases"),
+            ("table", "SHOW tables IN ACCOUNT"),
+        ],
+    )
+    def test_list_objects_statement(self, object_type, expected):
+        with patch(
+            "mcp_server_snowflake.object_manager.tools.execute_query",
+            return_value=[{"name": "X"}],
+        ) as mock_execute:
+            list_objects(MagicMock(), object_type)
+        assert mock_execute.call_args[0][0] == expected
+
+
+class TestListObjectsPushdown:
+    """Tests for list_objects column projection, filtering and limits."""
+
+    def run_list_objects(self, object_type, **kwargs):
+        with (
+            patch(
+                "mcp_server_snowflake.object_manager.tools.execute_query",
+                return_value=[{"name": "X"}],
+            ) as mock_execute,
+            patch(
+                "mcp_server_snowflake.object_manager.tools.execute_result_scan",
+                return_value=[{"name": "X"}],
+            ) as mock_scan,
+        ):
+            list_objects(MagicMock(), object_type, **kwargs)
+        return mock_execute, mock_scan
+
+    def test_limit_pushed_into_show(self):
+        mock_execute, mock_scan = self.run_list_objects("table", limit=10)
+        assert mock_execute.call_args[0][0] == "SHOW tables IN ACCOUNT LIMIT 10"
+        mock_scan.assert_not_called()
+
+    def test_limit_applied_in_result_scan_when_show_lacks_limit(self):
+        mock_execute, mock_scan = self.run_list_objects("warehouse", limit=5)
+        mock_execute.assert_not_called()
+        statement, projection = mock_scan.call_args[0][:2]
+        assert statement == "SHOW warehouses IN ACCOUNT"
+        assert projection == "SELECT * FROM TABLE(RESULT_SCAN(?)) LIMIT 5"
+
+    def test_columns_and_where_are_projected(self):
+        _, mock_scan = self.run_list_objects(
+            "table",
+            database_name="DB",
+            columns=["name", "CREATED_ON"],
+            where="owner = 'SYSADMIN' AND rows > 0",
+            limit=20,
+        )
+        statement, projection, _, bindvars = mock_scan.call_args[0]
+        # The filter needs every row, so LIMIT is not pushed into SHOW
+        assert statement == "SHOW tables IN DATABASE identifier(?)"
+        assert bindvars == ["DB"]
+        assert projection == (
+            'SELECT "name", "created_on" FROM TABLE(RESULT_SCAN(?)) '
+            'WHERE "owner" = \'SYSADMIN\' AND "rows" > 0 LIMIT 20'
+        )
+
+    @pytest.mark.parametrize(
+        "where",
+        [
+            "name IN (SELECT name FROM secret_table)",
+            "1=1; DROP TABLE t",
+            "name = ",
+            "SYSTEM$WHITELIST() IS NOT NULL",
+            "SYSTEM$CANCEL_ALL_QUERIES('x') = 'done'",
+            "my_udf(name) = 1",
+            "db.schema.my_udf(name) = 1",
+            "LOWER(my_udf(name)) = 'x'",
+            "name = ?",
+        ],
+    )
+    def test_unsafe_or_invalid_where_rejected(self, where):
+        with pytest.raises(SnowflakeException):
+            self.run_list_objects("table", where=where)
+
+    def test_allowed_where_expressions(self):
+        _, mock_scan = self.run_list_objects(
+            "table",
+            where=(
+                "LOWER(name) ILIKE 'sales%' AND rows BETWEEN 1 AND 100 "
+                "AND kind IN ('TABLE', 'VIEW') AND comment IS NOT NULL "
+                "AND NOT STARTSWITH(name, 'TMP')"
+            ),
+        )
+        projection = mock_scan.call_args[0][1]
+        assert projection == (
+            "SELECT * FROM TABLE(RESULT_SCAN(?)) WHERE LOWER(\"name\") ILIKE 'sales%' "
+            "AND \"rows\" BETWEEN 1 AND 100 AND \"kind\" IN ('TABLE', 'VIEW') "
+            'AND NOT "comment" IS NULL AND NOT STARTSWITH("name", \'TMP\')'
+        )
+
+    @pytest.mark.parametrize("function", list(SHOW_FILTER_FUNCTIONS))
+    def test_advertised_where_functions_are_allowed(self, function):
+        arguments = {
+            "CURRENT_DATE": "",
+            "CURRENT_TIMESTAMP": "()",
+            "COALESCE": "(name, owner)",
+            "CONTAINS": "(name, 'x')",
+            "STARTSWITH": "(name, 'x')",
+            "ENDSWITH": "(name, 'x')",
+        }.get(function, "(name)")
+        _, mock_scan = self.run_list_objects(
+            "table", where=f"{function}{arguments} IS NOT NULL"
+        )
+        assert function in mock_scan.call_args[0][1]
+
+    def test_invalid_column_rejected(self):
+        with pytest.raises(SnowflakeException):
+            self.run_list_objects("table", columns=['name" FROM x --'])
+
+    def test_limit_out_of_range(self):
+        with pytest.raises(SnowflakeException):
+            self.run_list_objects("table", limit=5000)
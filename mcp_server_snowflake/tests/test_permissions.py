@@ -0,0 +1,177 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import itertools
+from unittest.mock import patch
+
+import pytest
+
+from mcp_server_snowflake.object_manager.tools import validate_object_tool
+from mcp_server_snowflake.query_manager.tools import validate_sql_type
+from mcp_server_snowflake.semantic_manager.tools import validate_semantic_view_tool
+from mcp_server_snowflake.utils import SqlPermissions, compile_sql_permissions
+
+# Permission keys exercised in every combination of allowed, disallowed,
+# both and neither
+PERMISSION_KEYS = ["all", "unknown", "select", "insert", "create", "drop"]
+STATEMENT_TYPES = [
+    "Select",
+    "Insert",
+    "Create",
+    "Drop",
+    "Update",
+    "Command",
+    "Unknown",
+]
+TOOL_NAMES = [
+    "create_object",
+    "create_or_alter_object",
+    "drop_object",
+    "list_objects",
+    "list_semantic_views",
+    "describe_object",
+]
+
+
+def reference_validate_sql_type(statement_type, sql_allow_list, sql_disallow_list):
+    """validate_sql_type before permissions were compiled."""
+    if "all" in sql_allow_list:
+        valid = True
+    elif statement_type.lower() in sql_disallow_list:
+        valid = False
+    elif statement_type.lower() in sql_allow_list:
+        valid = True
+    elif "unknown" in sql_allow_list:
+        valid = True
+    elif len(sql_allow_list) == 0 and len(sql_disallow_list) == 0:
+        valid = False
+    else:
+        valid = False
+    return (statement_type, valid)
+
+
+def reference_validate_object_tool(function_name, sql_allow_list, sql_disallow_list):
+    """validate_object_tool before permissions were compiled."""
+    if function_name.lower().startswith("create"):
+        func_type = "create"
+    elif function_name.lower().startswith("drop"):
+        func_type = "drop"
+    else:
+        return ("", True)
+    if len(sql_allow_list) == 0 and len(sql_disallow_list) == 0:
+        valid = False
+    if func_type in sql_allow_list:
+        valid = True
+    elif func_type in sql_disallow_list:
+        valid = False
+    else:
+        valid = False
+    return (func_type, valid)
+
+
+def reference_validate_semantic_view_tool(
+    function_name, sql_allow_list, sql_disallow_list
+):
+    """validate_semantic_view_tool before permissions were compiled."""
+    if function_name.lower().startswith("list"):
+        func_type = "select"
+    else:
+        return ("", True)
+    if len(sql_allow_list) == 0 and len(sql_disallow_list) == 0:
+        valid = False
+    if func_type in sql_allow_list:
+        valid = True
+    elif func_type in sql_disallow_list:
+        valid = False
+    else:
+        valid = False
+    return (func_type, valid)
+
+
+def permission_combinations():
+    """Yield every assignment of each key to allowed, disallowed, both or neither."""
+    for states in itertools.product(range(4), repeat=len(PERMISSION_KEYS)):
+        allowed = [key for key, state in zip(PERMISSION_KEYS, states) if state & 1]
+        disallowed = [key for key, state in zip(PERMISSION_KEYS, states) if state & 2]
+        yield allowed, disallowed
+
+
+class TestCompiledPermissionEquivalence:
+    """Compiled decisions must match the original validators in every case."""
+
+    def test_sql_statement_decisions(self):
+        with patch(
+            "mcp_server_snowflake.query_manager.tools.get_statement_type"
+        ) as mock_get_statement_type:
+            for allowed, disallowed in permission_combinations():
+                for statement_type in STATEMENT_TYPES:
+                    mock_get_statement_type.return_value = statement_type
+                    result = validate_sql_type("statement", allowed, disallowed)
+                    assert result == reference_validate_sql_type(
+                        statement_type, allowed, disallowed
+                    ), (statement_type, allowed, disallowed)
+
+    def test_object_tool_decisions(self):
+        for allowed, disallowed in permission_combinations():
+            for tool_name in TOOL_NAMES:
+                assert validate_object_tool(
+                    tool_name, allowed, disallowed
+                ) == reference_validate_object_tool(tool_name, allowed, disallowed), (
+                    tool_name,
+                    allowed,
+                    disallowed,
+                )
+
+    def test_semantic_view_tool_decisions(self):
+        for allowed, disallowed in permission_combinations():
+            for tool_name in TOOL_NAMES:
+                assert validate_semantic_view_tool(
+                    tool_name, allowed, disallowed
+                ) == reference_validate_semantic_view_tool(
+                    tool_name, allowed, disallowed
+                ), (tool_name, allowed, disallowed)
+
+
+class TestSqlPermissions:
+    """Tests for the compiled permission table."""
+
+    def test_lists_are_compiled_once(self):
+        first = compile_sql_permissions(["select", "insert"], ["drop"])
+        second = compile_sql_permissions(["select", "insert"], ["drop"])
+
+        assert first is second
+        assert first.allowed == frozenset({"select", "insert"})
+        # Compiled tuples map back to the same table
+        assert (
+            compile_sql_permissions(first.sql_allow_list, first.sql_disallow_list)
+            is first
+        )
+
+    def test_statement_decisions_are_cached(self):
+        permissions = SqlPermissions(["select"], ["drop"])
+
+        assert permissions.is_statement_allowed("Select") is True
+        assert permissions.is_statement_allowed("Drop") is False
+        assert permissions._statement_decisions == {"Select": True, "Drop": False}
+
+    @pytest.mark.parametrize(
+        "allowed,disallowed,statement_type,expected",
+        [
+            (["all"], ["select"], "Select", True),
+            (["unknown"], ["drop"], "Drop", False),
+            (["unknown"], [], "Merge", True),
+            ([], [], "Select", False),
+        ],
+    )
+    def test_precomputed_defaults(self, allowed, disallowed, statement_type, expected):
+        permissions = SqlPermissions(allowed, disallowed)
+        assert permissions.is_statement_allowed(statement_type) is expected
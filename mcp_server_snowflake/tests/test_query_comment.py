@@ -11,10 +11,15 @@
 
 import json
 import os
+import re
+import threading
 from unittest.mock import MagicMock, patch
 
+import pytest
 import yaml
 
+from mcp_server_snowflake.query_comment import MISSING, CompiledQueryComment
+from mcp_server_snowflake.query_manager.tools import run_query
 from mcp_server_snowflake.server import (
     DEFAULT_QUERY_COMMENT_TEMPLATE,
     SnowflakeService,
@@ -46,8 +51,8 @@ class TestQueryCommentConfiguration:
             yaml.dump(config, f)
 
         with (
-            patch("mcp_server_snowflake.server.connect") as mock_connect,
-            patch("mcp_server_snowflake.server.Root") as mock_root,
+            patch("snowflake.connector.connect") as mock_connect,
+            patch("snowflake.core.Root") as mock_root,
         ):
             mock_connect.return_value = MagicMock()
             mock_root.return_value = MagicMock()
@@ -69,8 +74,8 @@ class TestQueryCommentConfiguration:
         config_file = create_config_with_query_comment(tmp_path, {"enabled": True})
 
         with (
-            patch("mcp_server_snowflake.server.connect") as mock_connect,
-            patch("mcp_server_snowflake.server.Root") as mock_root,
+            patch("snowflake.connector.connect") as mock_connect,
+            patch("snowflake.core.Root") as mock_root,
         ):
             mock_connect.return_value = MagicMock()
             mock_root.return_value = MagicMock()
@@ -99,8 +104,8 @@ class TestQueryCommentConfiguration:
         )
 
         with (
-            patch("mcp_server_snowflake.server.connect") as mock_connect,
-            patch("mcp_server_snowflake.server.Root") as mock_root,
+            patch("snowflake.connector.connect") as mock_connect,
+            patch("snowflake.core.Root") as mock_root,
         ):
             mock_connect.return_value = MagicMock()
             mock_root.return_value = MagicMock()
@@ -129,8 +134,8 @@ class TestBuildQueryComment:
             yaml.dump(config, f)
 
         with (
-            patch("mcp_server_snowflake.server.connect") as mock_connect,
-            patch("mcp_server_snowflake.server.Root") as mock_root,
+            patch("snowflake.connector.connect") as mock_connect,
+            patch("snowflake.core.Root") as mock_root,
         ):
             mock_connect.return_value = MagicMock()
             mock_root.return_value = MagicMock()
@@ -154,8 +159,8 @@ class TestBuildQueryComment:
         config_file = create_config_with_query_comment(tmp_path, {"enabled": True})
 
         with (
-            patch("mcp_server_snowflake.server.connect") as mock_connect,
-            patch("mcp_server_snowflake.server.Root") as mock_root,
+            patch("snowflake.connector.connect") as mock_connect,
+            patch("snowflake.core.Root") as mock_root,
             patch.dict(os.environ, {"SNOWFLAKE_MCP_MODEL": "claude-sonnet-4"}),
         ):
             mock_connect.return_value = MagicMock()
@@ -206,8 +211,8 @@ class TestBuildQueryComment:
         )
 
         with (
-            patch("mcp_server_snowflake.server.connect") as mock_connect,
-            patch("mcp_server_snowflake.server.Root") as mock_root,
+            patch("snowflake.connector.connect") as mock_connect,
+            patch("snowflake.core.Root") as mock_root,
             patch.dict(os.environ, {"SNOWFLAKE_MCP_MODEL": "test-model"}),
         ):
             mock_connect.return_value = MagicMock()
@@ -237,8 +242,8 @@ class TestBuildQueryComment:
         config_file = create_config_with_query_comment(tmp_path, {"enabled": True})
 
         with (
-            patch("mcp_server_snowflake.server.connect") as mock_connect,
-            patch("mcp_server_snowflake.server.Root") as mock_root,
+            patch("snowflake.connector.connect") as mock_connect,
+            patch("snowflake.core.Root") as mock_root,
             patch.dict(os.environ, {}, clear=True),
         ):
             # Ensure SNOWFLAKE_MCP_MODEL is not set
@@ -272,8 +277,8 @@ class TestSetQueryContext:
         config_file = create_config_with_query_comment(tmp_path, {"enabled": True})
 
         with (
-            patch("mcp_server_snowflake.server.connect") as mock_connect,
-            patch("mcp_server_snowflake.server.Root") as mock_root,
+            patch("snowflake.connector.connect") as mock_connect,
+            patch("snowflake.core.Root") as mock_root,
         ):
             mock_connect.return_value = MagicMock()
             mock_root.return_value = MagicMock()
@@ -304,8 +309,8 @@ class TestSetQueryContext:
         config_file = create_config_with_query_comment(tmp_path, {"enabled": True})
 
         with (
-            patch("mcp_server_snowflake.server.connect") as mock_connect,
-            patch("mcp_server_snowflake.server.Root") as mock_root,
+            patch("snowflake.connector.connect") as mock_connect,
+            patch("snowflake.core.Root") as mock_root,
             patch.dict(os.environ, {"SNOWFLAKE_MCP_MODEL": "env-model"}),
         ):
             mock_connect.return_value = MagicMock()
@@ -336,8 +341,8 @@ class TestSetQueryContext:
         config_file = create_config_with_query_comment(tmp_path, {"enabled": True})
 
         with (
-            patch("mcp_server_snowflake.server.connect") as mock_connect,
-            patch("mcp_server_snowflake.server.Root") as mock_root,
+            patch("snowflake.connector.connect") as mock_connect,
+            patch("snowflake.core.Root") as mock_root,
         ):
             mock_connect.return_value = MagicMock()
             mock_root.return_value = MagicMock()
@@ -363,8 +368,8 @@ class TestSetQueryContext:
         config_file = create_config_with_query_comment(tmp_path, {"enabled": True})
 
         with (
-            patch("mcp_server_snowflake.server.connect") as mock_connect,
-            patch("mcp_server_snowflake.server.Root") as mock_root,
+            patch("snowflake.connector.connect") as mock_connect,
+            patch("snowflake.core.Root") as mock_root,
         ):
             mock_connect.return_value = MagicMock()
             mock_root.return_value = MagicMock()
@@ -384,6 +389,30 @@ class TestSetQueryContext:
             service.clear_query_context()
             assert service.query_context == {}
 
+    def test_concurrent_updates_replace_context(self, tmp_path):
+        """Test that concurrent updates are kept and never modify a context in use."""
+        config_file = create_config_with_query_comment(tmp_path, {"enabled": True})
+        service = SnowflakeService(
+            service_config_file=str(config_file),
+            transport="stdio",
+            connection_params={"account": "test"},
+        )
+        in_use = service.query_context
+
+        def set_keys(thread):
+            for n in range(50):
+                service.set_query_context(**{f"key_{thread}_{n}": "value"})
+                service.build_query_comment(tool_name="test_tool")
+
+        threads = [threading.Thread(target=set_keys, args=(t,)) for t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert in_use == {}
+        assert len(service.get_query_context()) == 8 * 50
+
     def test_custom_context_in_template(self, tmp_path):
         """Test that custom context keys are available for template substitution."""
         custom_template = {
@@ -395,8 +424,8 @@ class TestSetQueryContext:
         )
 
         with (
-            patch("mcp_server_snowflake.server.connect") as mock_connect,
-            patch("mcp_server_snowflake.server.Root") as mock_root,
+            patch("snowflake.connector.connect") as mock_connect,
+            patch("snowflake.core.Root") as mock_root,
         ):
             mock_connect.return_value = MagicMock()
             mock_root.return_value = MagicMock()
@@ -433,8 +462,8 @@ class TestSetQueryContext:
         )
 
         with (
-            patch("mcp_server_snowflake.server.connect") as mock_connect,
-            patch("mcp_server_snowflake.server.Root") as mock_root,
+            patch("snowflake.connector.connect") as mock_connect,
+            patch("snowflake.core.Root") as mock_root,
         ):
             mock_connect.return_value = MagicMock()
             mock_root.return_value = MagicMock()
@@ -462,3 +491,143 @@ class TestSetQueryContext:
         assert comment["model"] == "claude-opus-4"
         assert comment["session_id"] == "sess-abc123"
         assert comment["agent_name"] == "my-data-agent"
+
+
+class TestResultReuse:
+    """Tests for result-reuse mode, which keeps statement text stable."""
+
+    def make_service(self, tmp_path, query_comment_config):
+        config_file = create_config_with_query_comment(tmp_path, query_comment_config)
+        with (
+            patch("snowflake.connector.connect") as mock_connect,
+            patch("snowflake.core.Root"),
+        ):
+            mock_connect.return_value = MagicMock()
+            service = SnowflakeService(
+                service_config_file=str(config_file),
+                transport="stdio",
+                connection_params={"account": "test"},
+            )
+            service._ensure_connected()
+        return service
+
+    def executed(self, service, statements):
+        """Run statements and return the positional and keyword execute args."""
+        cursor = service.connection.cursor.return_value
+        cursor.reset_mock()
+        for statement in statements:
+            run_query(statement, service)
+        return [call.args[0] for call in cursor.execute.call_args_list], [
+            call.kwargs for call in cursor.execute.call_args_list
+        ]
+
+    def test_sql_is_byte_identical_across_runs(self, tmp_path):
+        service = self.make_service(tmp_path, {"enabled": True, "result_reuse": True})
+
+        texts, kwargs = self.executed(
+            service,
+            [
+                "select region, sum(amount) from sales group by region",
+                "SELECT region,\n  SUM(amount)\nFROM sales\nGROUP BY region;",
+                "select region, sum(amount) from sales group by region -- again",
+            ],
+        )
+
+        assert texts == ["SELECT region, SUM(amount) FROM sales GROUP BY region"] * 3
+        assert len({text.encode() for text in texts}) == 1
+        # Metadata is still recorded, per statement, in QUERY_TAG
+        tags = [json.loads(kw["_statement_params"]["QUERY_TAG"]) for kw in kwargs]
+        assert tags[0]["origin"] == "sf_sit"
+        assert tags[0]["query_comment"]["query"]["tool"] == "run_snowflake_query"
+        request_ids = {tag["query_comment"]["context"]["request_id"] for tag in tags}
+        assert len(request_ids) == 3
+
+    def test_default_mode_keeps_per_request_comment(self, tmp_path):
+        service = self.make_service(tmp_path, {"enabled": True})
+
+        texts, kwargs = self.executed(service, ["select 1", "select 1"])
+
+        assert texts[0] != texts[1]
+        assert texts[0].startswith("/* ")
+        assert kwargs == [{}, {}]
+
+    def test_long_comment_falls_back_to_stable_comment(self, tmp_path):
+        service = self.make_service(
+            tmp_path,
+            {
+                "enabled": True,
+                "result_reuse": True,
+                "template": {
+                    "request_id": "{request_id}",
+                    "tool": "{tool_name}",
+                    "padding": "x" * 2500,
+                },
+            },
+        )
+
+        texts, kwargs = self.executed(service, ["select 1", "select 1"])
+
+        assert texts[0] == texts[1]
+        comment = json.loads(texts[0].split("/* ", 1)[1].split(" */", 1)[0])
+        assert "request_id" not in comment
+        assert comment["tool"] == "run_snowflake_query"
+        assert kwargs == [{}, {}]
+
+
+def substitute_template(template, substitutions):
+    """Reference implementation of recursive per-call template substitution."""
+    if isinstance(template, str):
+        match = re.fullmatch(r"\{(\w+)\}", template)
+        if match and match.group(1) in substitutions:
+            return substitutions[match.group(1)]
+        for key, value in substitutions.items():
+            if value is not None:
+                template = template.replace(f"{{{key}}}", str(value))
+        return template
+    if isinstance(template, dict):
+        return {k: substitute_template(v, substitutions) for k, v in template.items()}
+    if isinstance(template, list):
+        return [substitute_template(item, substitutions) for item in template]
+    return template
+
+
+class TestCompiledQueryComment:
+    """Tests that compiled templates render like recursive substitution."""
+
+    SUBSTITUTIONS = {
+        "request_id": "0f7c",
+        "tool_name": "run_snowflake_query",
+        "intent": {"category": "aggregation", "domains": ["sales"]},
+        "query_parameters": None,
+        "count": 3,
+    }
+
+    @pytest.mark.parametrize(
+        "template",
+        [
+            DEFAULT_QUERY_COMMENT_TEMPLATE,
+            {"a": "{intent}", "b": "{query_parameters}", "c": "{unknown}"},
+            {"mixed": "tool={tool_name} id={request_id} qp={query_parameters}"},
+            {"list": ["{tool_name}", "x-{count}", 1, None, True], "n": 1.5},
+            {"nested": {"deeper": {"q": 'say "{tool_name}"'}}, 1: "{count}"},
+            {},
+        ],
+    )
+    def test_matches_reference_substitution(self, template):
+        compiled = CompiledQueryComment(template)
+        rendered = compiled.render(lambda key: self.SUBSTITUTIONS.get(key, MISSING))
+        assert rendered == json.dumps(substitute_template(template, self.SUBSTITUTIONS))
+
+    def test_each_variable_resolved_once(self):
+        calls = []
+        compiled = CompiledQueryComment({"a": "{tool_name}", "b": "x{tool_name}"})
+        compiled.render(lambda key: calls.append(key) or "t")
+        assert calls == ["tool_name"]
+
+    def test_omitted_variables_drop_their_leaves(self):
+        compiled = CompiledQueryComment(
+            {"context": {"request_id": "{request_id}"}, "tool": "{tool_name}"},
+            omit_variables=["request_id"],
+        )
+        assert compiled.variables == {"tool_name"}
+        assert compiled.render(lambda key: "t") == '{"context": {}, "tool": "t"}'
@@ -9,10 +9,31 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from mcp_server_snowflake.query_manager.cost import (
+    CostEstimator,
+    check_query_cost,
+    compile_query_cost,
+)
+from mcp_server_snowflake.query_manager.policy import (
+    compile_sql_policy,
+    enforce_sql_policy,
+)
+from mcp_server_snowflake.query_manager.profile import (
+    OPERATOR_STATS_STATEMENT,
+    get_query_profile,
+)
 from mcp_server_snowflake.query_manager.tools import (
     get_statement_type,
+    parse_statement,
+    run_query,
     validate_sql_type,
 )
+from mcp_server_snowflake.utils import SnowflakeException, SqlPermissions
 
 
 class TestGetStatementType:
@@ -253,3 +274,376 @@ class TestSnowflakeSpecificSyntax:
         """Test JSON path in WHERE clause."""
         sql = "SELECT * FROM my_table WHERE data:status = 'active'"
         assert get_statement_type(sql) == "Select"
+
+
+class TestSqlPolicy:
+    """Tests for SQL policies evaluated on the parsed statement."""
+
+    permissions = SqlPermissions(["select"], [])
+
+    def violations(self, sql, permissions=None, **policy):
+        compiled = compile_sql_policy(policy)
+        return compiled.evaluate(parse_statement(sql), permissions or self.permissions)
+
+    def test_no_policy_section_compiles_to_none(self):
+        assert compile_sql_policy(None) is None
+        assert compile_sql_policy({}) is None
+
+    def test_allowed_databases(self):
+        policy = {"allowed_databases": ["sales"]}
+        assert self.violations("SELECT * FROM SALES.PUBLIC.ORDERS", **policy) == []
+        assert self.violations(
+            "SELECT * FROM SALES.PUBLIC.ORDERS o JOIN HR.PUBLIC.SALARIES s ON o.id = s.id",
+            **policy,
+        ) == ["Database HR is not allowed."]
+
+    def test_unqualified_tables_use_default_database(self):
+        policy = {"allowed_databases": ["SALES"]}
+        assert self.violations("SELECT * FROM ORDERS", **policy) == [
+            "Table ORDERS must be qualified with a database name."
+        ]
+        assert (
+            self.violations("SELECT * FROM ORDERS", default_database="sales", **policy)
+            == []
+        )
+
+    def test_cte_names_are_not_tables(self):
+        sql = "WITH recent AS (SELECT * FROM SALES.PUBLIC.ORDERS) SELECT * FROM recent"
+        assert self.violations(sql, allowed_databases=["SALES"]) == []
+
+    def test_schema_rules(self):
+        sql = "SELECT * FROM SALES.RAW.EVENTS"
+        assert self.violations(sql, denied_schemas=["sales.raw"]) == [
+            "Schema SALES.RAW is not allowed."
+        ]
+        assert self.violations(sql, allowed_schemas=["SALES.PUBLIC"]) == [
+            "Schema SALES.RAW is not allowed."
+        ]
+
+    def test_denied_functions_and_prefixes(self):
+        sql = "SELECT SYSTEM$WHITELIST(), COUNT(*), my_udf(1) FROM SALES.PUBLIC.T"
+        assert self.violations(sql, denied_functions=["system$*", "count"]) == [
+            "Function SYSTEM$WHITELIST is not allowed.",
+            "Function COUNT is not allowed.",
+        ]
+
+    def test_max_joins(self):
+        sql = "SELECT * FROM a JOIN b ON a.id = b.id JOIN c ON b.id = c.id"
+        assert self.violations(sql, max_joins=2) == []
+        assert self.violations(sql, max_joins=1) == [
+            "Statement has 2 joins, more than the limit of 1."
+        ]
+
+    def test_nested_statements_use_permissions(self):
+        sql = "SELECT 1; DROP TABLE SALES.PUBLIC.ORDERS"
+        assert self.violations(sql, max_joins=10) == [
+            "Drop statement nested in Block is not allowed."
+        ]
+        permissions = SqlPermissions(["select", "drop"], [])
+        assert self.violations(sql, permissions, max_joins=10) == []
+
+    @pytest.mark.parametrize(
+        "sql",
+        ["CALL SALES.PUBLIC.CLEANUP()", "SELECT * FROM identifier('SALES.PUBLIC.T')"],
+    )
+    def test_unverifiable_references_are_rejected(self, sql):
+        assert self.violations(sql, allowed_databases=["SALES"])
+
+    def test_scan_size_is_checked_with_explain(self):
+        service = MagicMock()
+        service.sql_policy = compile_sql_policy({"max_scan_bytes": 1000})
+        service.cost_estimator = CostEstimator()
+        service.sql_statement_allowed = ["select"]
+        service.sql_statement_disallowed = []
+        sql = "SELECT * FROM SALES.PUBLIC.ORDERS"
+
+        with patch(
+            "mcp_server_snowflake.query_manager.cost.execute_query",
+            return_value=explain_json(10, 5, 5000),
+        ) as mock_execute:
+            with pytest.raises(SnowflakeException) as error:
+                enforce_sql_policy(sql, parse_statement(sql), service)
+
+        assert mock_execute.call_args[0][0] == f"EXPLAIN USING JSON {sql}"
+        assert "exceeds the limit of 1000 bytes" in error.value.message
+
+    def test_policy_and_cost_check_share_one_explain(self):
+        service = MagicMock()
+        service.sql_policy = compile_sql_policy({"max_scan_bytes": 10_000})
+        service.query_cost = compile_query_cost({"max_bytes_assigned": 10_000})
+        service.cost_estimator = service.query_cost.estimator
+        service.sql_statement_allowed = ["select"]
+        service.sql_statement_disallowed = []
+        sql = "select *\n  from SALES.PUBLIC.ORDERS"
+
+        with patch(
+            "mcp_server_snowflake.query_manager.cost.execute_query",
+            return_value=explain_json(10, 5, 5000),
+        ) as mock_execute:
+            expression = parse_statement(sql)
+            enforce_sql_policy(sql, expression, service)
+            assert check_query_cost(expression, service) is None
+
+        mock_execute.assert_called_once()
+
+    def test_explain_is_skipped_when_rules_fail(self):
+        service = MagicMock()
+        service.sql_policy = compile_sql_policy(
+            {"max_scan_bytes": 1000, "denied_databases": ["HR"]}
+        )
+        service.cost_estimator = CostEstimator()
+        service.sql_statement_allowed = ["select"]
+        service.sql_statement_disallowed = []
+        sql = "SELECT * FROM HR.PUBLIC.SALARIES"
+
+        with patch(
+            "mcp_server_snowflake.query_manager.cost.execute_query"
+        ) as mock_execute:
+            with pytest.raises(SnowflakeException):
+                enforce_sql_policy(sql, parse_statement(sql), service)
+
+        mock_execute.assert_not_called()
+
+
+QUERY_ID = "01b2c3d4-0000-1111-0000-000123456789"
+
+
+def operator_row(operator_id, operator_type, fraction, statistics, attributes=None):
+    """GET_QUERY_OPERATOR_STATS row with VARIANT columns as JSON text."""
+    return {
+        "QUERY_ID": QUERY_ID,
+        "OPERATOR_ID": operator_id,
+        "OPERATOR_TYPE": operator_type,
+        "OPERATOR_STATISTICS": json.dumps(statistics),
+        "EXECUTION_TIME_BREAKDOWN": json.dumps({"overall_percentage": fraction}),
+        "OPERATOR_ATTRIBUTES": json.dumps(attributes or {}),
+    }
+
+
+class TestQueryProfile:
+    """Tests for the get_query_profile tool."""
+
+    history = {
+        "QUERY_ID": QUERY_ID,
+        "EXECUTION_STATUS": "SUCCESS",
+        "WAREHOUSE_NAME": "COMPUTE_WH",
+        "TOTAL_ELAPSED_TIME": 42000,
+        "QUEUED_PROVISIONING_TIME": 0,
+        "QUEUED_REPAIR_TIME": 0,
+        "QUEUED_OVERLOAD_TIME": 1500,
+        "PARTITIONS_SCANNED": 950,
+        "PARTITIONS_TOTAL": 1000,
+    }
+    operators = [
+        operator_row(
+            1,
+            "Join",
+            0.3,
+            {"input_rows": 1000, "output_rows": 50000},
+            {"equality_join_condition": "(O.CUSTOMER_ID = C.ID)"},
+        ),
+        operator_row(
+            2,
+            "TableScan",
+            0.6,
+            {"pruning": {"partitions_scanned": 950, "partitions_total": 1000}},
+            {"table_name": "SALES.PUBLIC.ORDERS"},
+        ),
+        operator_row(
+            3,
+            "Sort",
+            0.1,
+            {"spilling": {"bytes_spilled_local_storage": 2048}},
+        ),
+    ]
+
+    def profile(self, history, operators, query_id=QUERY_ID):
+        def execute(statement, service, params=None):
+            if statement == OPERATOR_STATS_STATEMENT:
+                if isinstance(operators, Exception):
+                    raise operators
+                return operators
+            return history
+
+        with patch(
+            "mcp_server_snowflake.query_manager.profile.execute_query",
+            side_effect=execute,
+        ) as mock_execute:
+            profile = get_query_profile(MagicMock(), query_id)
+        assert all(call.args[2] == [QUERY_ID] for call in mock_execute.call_args_list)
+        return profile
+
+    def test_hotspots_are_sorted_by_time(self):
+        profile = self.profile([self.history], self.operators)
+
+        assert [
+            (h["operator_type"], h["percent_of_time"]) for h in profile["hotspots"]
+        ] == [
+            ("TableScan", 60.0),
+            ("Join", 30.0),
+            ("Sort", 10.0),
+        ]
+        assert profile["hotspots"][0]["table_name"] == "SALES.PUBLIC.ORDERS"
+        assert profile["hotspots"][1]["detail"] == "(O.CUSTOMER_ID = C.ID)"
+        assert profile["stats"]["queued_ms"] == 1500
+        assert profile["errors"] == []
+
+    def test_suggestions(self):
+        suggestions = " ".join(
+            self.profile([self.history], self.operators)["suggestions"]
+        )
+
+        assert "read 950 of 1000 partitions" in suggestions
+        assert "produced 50000 rows from 1000 input rows" in suggestions
+        assert "spilled 2048 bytes to local storage" in suggestions
+        assert "1500 ms in the warehouse queue" in suggestions
+
+    def test_unavailable_parts_are_reported(self):
+        profile = self.profile([], Exception("Statement not found"))
+
+        assert "stats" not in profile
+        assert profile["hotspots"] == []
+        assert len(profile["errors"]) == 2
+        assert "Statement not found" in profile["errors"][1]
+
+    def test_defaults_to_last_query(self):
+        service = MagicMock()
+        service.get_last_query_id.return_value = None
+        with pytest.raises(SnowflakeException) as error:
+            get_query_profile(service)
+        assert error.value.status_code == 400
+
+        service.get_last_query_id.return_value = QUERY_ID
+        with patch(
+            "mcp_server_snowflake.query_manager.profile.execute_query",
+            return_value=[],
+        ):
+            assert get_query_profile(service)["query_id"] == QUERY_ID
+
+    def test_malformed_query_id_is_rejected(self):
+        with patch(
+            "mcp_server_snowflake.query_manager.profile.execute_query"
+        ) as mock_execute:
+            with pytest.raises(SnowflakeException):
+                get_query_profile(MagicMock(), "1; DROP TABLE T")
+        mock_execute.assert_not_called()
+
+    def test_run_query_records_last_query_id(self):
+        service = MagicMock()
+        service.sql_policy = None
+        service.query_cost = None
+        service.query_comment_result_reuse = False
+        service.build_query_comment.return_value = None
+        cursor = MagicMock()
+        cursor.sfqid = QUERY_ID
+        cursor.fetchall.return_value = [{"N": 1}]
+        service.get_connection.return_value.__enter__.return_value = (
+            MagicMock(),
+            cursor,
+        )
+
+        assert run_query("SELECT 1 AS N", service) == [{"N": 1}]
+        service.set_last_query_id.assert_called_once_with(QUERY_ID)
+
+
+def explain_json(partitions_total, partitions_assigned, bytes_assigned):
+    """EXPLAIN USING JSON result row."""
+    plan = {
+        "GlobalStats": {
+            "partitionsTotal": partitions_total,
+            "partitionsAssigned": partitions_assigned,
+            "bytesAssigned": bytes_assigned,
+        },
+        "Operations": [[{"id": 0, "operation": "Result"}]],
+    }
+    return [{"content": json.dumps(plan)}]
+
+
+class TestQueryCost:
+    """Tests for the EXPLAIN-based query cost check."""
+
+    def service(self, **query_cost):
+        service = MagicMock()
+        service.query_cost = compile_query_cost(
+            {"max_bytes_assigned": 1000, "max_partitions_total": 100, **query_cost}
+        )
+        return service
+
+    def test_over_budget_query_is_rejected_with_estimate(self):
+        sql = "SELECT * FROM SALES.PUBLIC.ORDERS"
+
+        with patch(
+            "mcp_server_snowflake.query_manager.cost.execute_query",
+            return_value=explain_json(500, 400, 5000),
+        ) as mock_execute:
+            with pytest.raises(SnowflakeException) as error:
+                check_query_cost(parse_statement(sql), self.service())
+
+        assert mock_execute.call_args[0][0] == f"EXPLAIN USING JSON {sql}"
+        assert error.value.status_code == 403
+        assert "Estimated scan of 5000 bytes in 400 of 500 partitions" in (
+            error.value.message
+        )
+        assert "5000 bytes exceeds the limit of 1000" in error.value.message
+        assert "500 partitions exceeds the limit of 100" in error.value.message
+
+    def test_query_within_budget_runs_on_default_warehouse(self):
+        with patch(
+            "mcp_server_snowflake.query_manager.cost.execute_query",
+            return_value=explain_json(10, 1, 100),
+        ):
+            assert check_query_cost(parse_statement("SELECT 1"), self.service()) is None
+
+    def test_over_budget_query_is_routed(self):
+        with patch(
+            "mcp_server_snowflake.query_manager.cost.execute_query",
+            return_value=explain_json(500, 400, 5000),
+        ):
+            warehouse = check_query_cost(
+                parse_statement("SELECT * FROM SALES.PUBLIC.ORDERS"),
+                self.service(over_budget_warehouse="XL_WH"),
+            )
+
+        assert warehouse == "XL_WH"
+
+    def test_estimates_are_cached_by_normalized_sql(self):
+        service = self.service()
+
+        with patch(
+            "mcp_server_snowflake.query_manager.cost.execute_query",
+            return_value=explain_json(10, 1, 100),
+        ) as mock_execute:
+            for sql in [
+                "SELECT id FROM SALES.PUBLIC.ORDERS",
+                "select id\n  from SALES.PUBLIC.ORDERS -- retry",
+            ]:
+                check_query_cost(parse_statement(sql), service)
+
+        assert mock_execute.call_count == 1
+
+    def test_only_queries_are_estimated(self):
+        with patch(
+            "mcp_server_snowflake.query_manager.cost.execute_query"
+        ) as mock_execute:
+            sql = "DELETE FROM SALES.PUBLIC.ORDERS"
+            assert check_query_cost(parse_statement(sql), self.service()) is None
+
+        mock_execute.assert_not_called()
+
+    def test_run_query_uses_routed_warehouse(self):
+        service = self.service(over_budget_warehouse="XL_WH")
+        service.sql_policy = None
+        service.query_comment_result_reuse = False
+        service.build_query_comment.return_value = None
+        service.get_connection.return_value.__enter__.return_value = (
+            MagicMock(),
+            MagicMock(),
+        )
+
+        with patch(
+            "mcp_server_snowflake.query_manager.cost.execute_query",
+            return_value=explain_json(500, 400, 5000),
+        ):
+            run_query("SELECT * FROM SALES.PUBLIC.ORDERS", service)
+
+        assert service.get_connection.call_args.kwargs["warehouse"] == "XL_WH"
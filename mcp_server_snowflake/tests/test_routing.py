@@ -0,0 +1,309 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from unittest.mock import patch
+
+import yaml
+from fastmcp import Client, FastMCP
+
+from mcp_server_snowflake.query_manager.cost import QueryCostEstimate
+from mcp_server_snowflake.routing import ConnectionPool, compile_warehouse_routing
+from mcp_server_snowflake.server import (
+    SnowflakeService,
+    initialize_middleware,
+    initialize_tools,
+)
+
+DEFAULT_WAREHOUSE = "DEFAULT_WH"
+
+ROUTING = {
+    "rules": [
+        {"warehouse": "XS_WH", "tools": ["get_query_profile"]},
+        {
+            "warehouse": "XL_WH",
+            "statement_types": ["select"],
+            "min_bytes_assigned": 1_000_000_000,
+        },
+        {"warehouse": "S_WH", "statement_types": ["Select"]},
+    ],
+    "pool_size": 2,
+}
+
+
+class FakeConnector:
+    """Snowflake connector stand-in recording the warehouse of every statement."""
+
+    def __init__(self):
+        self.statements = []
+        self.connections = Counter()
+        self.lock = threading.Lock()
+
+    def connect(self, **kwargs):
+        warehouse = kwargs.get("warehouse", DEFAULT_WAREHOUSE)
+        with self.lock:
+            self.connections[warehouse] += 1
+        return FakeConnection(self, warehouse)
+
+
+class FakeConnection:
+    def __init__(self, connector, warehouse):
+        self.connector = connector
+        self.warehouse = warehouse
+        self.database = None
+        self.schema = None
+
+    def cursor(self, cursor_class=None):
+        return FakeCursor(self)
+
+    def close(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+        self.sfqid = None
+
+    def execute(self, statement, params=None, **kwargs):
+        with self.connection.connector.lock:
+            self.connection.connector.statements.append(
+                (self.connection.warehouse, statement)
+            )
+        self.sfqid = str(uuid.uuid4())
+        if statement.startswith("USE SCHEMA"):
+            names = statement.split()[-1].replace('"', "").split(".")
+            self.connection.database, self.connection.schema = names
+        if statement.startswith("EXPLAIN USING JSON"):
+            size = 5_000_000_000 if "BIG" in statement else 1000
+            plan = {"GlobalStats": {"partitionsAssigned": 1, "bytesAssigned": size}}
+            self.rows = [{"content": json.dumps(plan)}]
+        else:
+            self.rows = [{"N": 1}]
+        return self
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class FakeEstimator:
+    def __init__(self, bytes_assigned):
+        self.bytes_assigned = bytes_assigned
+        self.calls = 0
+
+    def estimate(self, statement, snowflake_service):
+        self.calls += 1
+        return QueryCostEstimate(bytes_assigned=self.bytes_assigned)
+
+
+class TestWarehouseRouter:
+    """Tests for warehouse_routing rules."""
+
+    def test_first_matching_rule_wins(self):
+        router = compile_warehouse_routing(ROUTING, FakeEstimator(10))
+
+        assert router.route("get_query_profile", "Select", "SELECT 1") == "XS_WH"
+        assert router.route("run_snowflake_query", "Select", "SELECT 1") == "S_WH"
+        assert router.route("run_snowflake_query", "Insert") is None
+        assert router.route(None) is None
+
+    def test_size_rules_use_estimates(self):
+        estimator = FakeEstimator(5_000_000_000)
+        router = compile_warehouse_routing(ROUTING, estimator)
+
+        assert router.route("run_snowflake_query", "Select", "SELECT 1") == "XL_WH"
+        # Without a statement to estimate, size rules do not match
+        assert router.route("run_snowflake_query", "Select") == "S_WH"
+        assert estimator.calls == 1
+
+    def test_no_routing_section(self):
+        assert compile_warehouse_routing(None) is None
+
+
+class TestConnectionPool:
+    """Tests for per-warehouse connection pools."""
+
+    def test_connections_are_reused(self):
+        pool = ConnectionPool(object, max_size=2)
+
+        for _ in range(3):
+            with pool.connection() as first:
+                with pool.connection() as second:
+                    assert first is not second
+
+        assert len(pool) == 2
+
+    def test_callers_wait_for_a_free_connection(self):
+        in_use = Counter()
+        peak = []
+        lock = threading.Lock()
+        pool = ConnectionPool(object, max_size=2)
+
+        def work():
+            with pool.connection() as connection:
+                with lock:
+                    in_use[id(connection)] += 1
+                    peak.append(sum(in_use.values()))
+                time.sleep(0.01)
+                with lock:
+                    in_use[id(connection)] -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max(peak) <= 2
+        assert len(pool) == 2
+
+
+class TestServiceRouting:
+    """Tests for the warehouse each tool call's statements run on."""
+
+    def make_server(self, tmp_path):
+        config_file = tmp_path / "config.yaml"
+        with open(config_file, "w") as f:
+            yaml.dump(
+                {
+                    "other_services": {"query_manager": True},
+                    "sql_statement_permissions": [
+                        {"Select": True},
+                        {"Insert": True},
+                        {"Use": True},
+                        {"Set": True},
+                    ],
+                    "warehouse_routing": ROUTING,
+                },
+                f,
+            )
+        service = SnowflakeService(
+            service_config_file=str(config_file),
+            transport="stdio",
+            connection_params={"account": "test_account"},
+        )
+        server = FastMCP("test")
+        initialize_tools(service, server)
+        initialize_middleware(server, service)
+        return service, server
+
+    def run_statements(self, server, statements):
+        connector = FakeConnector()
+
+        async def run():
+            async with Client(server) as client:
+                for statement in statements:
+                    await client.call_tool(
+                        "run_snowflake_query", {"statement": statement}
+                    )
+
+        with (
+            patch("snowflake.connector.connect", side_effect=connector.connect),
+            patch("snowflake.core.Root"),
+        ):
+            asyncio.run(run())
+        return [
+            (warehouse, statement)
+            for warehouse, statement in connector.statements
+            if not statement.startswith(("SELECT 'MCP", "EXPLAIN"))
+        ]
+
+    def test_routed_sessions_use_the_default_schema(self, tmp_path):
+        _, server = self.make_server(tmp_path)
+
+        statements = self.run_statements(
+            server,
+            ["USE SCHEMA SALES.PUBLIC", "SELECT * FROM SMALL", "SELECT * FROM SMALL"],
+        )
+
+        assert statements == [
+            (DEFAULT_WAREHOUSE, "USE SCHEMA SALES.PUBLIC"),
+            ("S_WH", 'USE SCHEMA "SALES"."PUBLIC"'),
+            ("S_WH", "SELECT * FROM SMALL"),
+            ("S_WH", "SELECT * FROM SMALL"),
+        ]
+
+    def test_session_variables_stop_routing(self, tmp_path):
+        service, server = self.make_server(tmp_path)
+
+        statements = self.run_statements(
+            server, ["SELECT * FROM SMALL", "SET X = 1", "SELECT $X FROM SMALL"]
+        )
+
+        assert statements == [
+            ("S_WH", "SELECT * FROM SMALL"),
+            (DEFAULT_WAREHOUSE, "SET X = 1"),
+            (DEFAULT_WAREHOUSE, "SELECT $X FROM SMALL"),
+        ]
+        assert service.routing_paused
+
+    def test_statements_land_on_routed_warehouses(self, tmp_path):
+        _, server = self.make_server(tmp_path)
+        connector = FakeConnector()
+        query_id = str(uuid.uuid4())
+
+        async def run():
+            async with Client(server) as client:
+                for statement in [
+                    "SELECT * FROM SALES.PUBLIC.BIG",
+                    "SELECT * FROM SALES.PUBLIC.SMALL",
+                    "INSERT INTO SALES.PUBLIC.SMALL VALUES (1)",
+                    "SELECT * FROM SALES.PUBLIC.SMALL",
+                ]:
+                    await client.call_tool(
+                        "run_snowflake_query", {"statement": statement}
+                    )
+                await client.call_tool("get_query_profile", {"query_id": query_id})
+
+        with (
+            patch("snowflake.connector.connect", side_effect=connector.connect),
+            patch("snowflake.core.Root"),
+        ):
+            asyncio.run(run())
+
+        landed = {
+            statement: warehouse
+            for warehouse, statement in connector.statements
+            if "SALES.PUBLIC" in statement and not statement.startswith("EXPLAIN")
+        }
+        assert landed == {
+            "SELECT * FROM SALES.PUBLIC.BIG": "XL_WH",
+            "SELECT * FROM SALES.PUBLIC.SMALL": "S_WH",
+            "INSERT INTO SALES.PUBLIC.SMALL VALUES (1)": DEFAULT_WAREHOUSE,
+        }
+        assert {
+            warehouse
+            for warehouse, statement in connector.statements
+            if "QUERY_HISTORY" in statement or "GET_QUERY_OPERATOR_STATS" in statement
+        } == {"XS_WH"}
+        # Each warehouse opened one pooled connection, reused across calls
+        assert connector.connections == Counter(
+            {DEFAULT_WAREHOUSE: 1, "XL_WH": 1, "S_WH": 1, "XS_WH": 1}
+        )
@@ -0,0 +1,393 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from mcp_server_snowflake.semantic_manager.catalog import (
+    CompiledSemanticView,
+    SemanticCatalog,
+)
+from mcp_server_snowflake.semantic_manager.objects import (
+    SemanticExpression,
+    SemanticView,
+    SemanticViewReference,
+)
+from mcp_server_snowflake.semantic_manager.tools import (
+    _semantic_view_template,
+    describe_semantic_views_bulk,
+    get_compiled_semantic_view,
+    query_semantic_view,
+    write_semantic_view_query,
+)
+from mcp_server_snowflake.utils import SnowflakeException, TTLCache
+
+DESCRIBE_ROWS = [
+    {"object_kind": None, "object_name": "SALES_SV", "parent_entity": None, "property": "COMMENT", "property_value": "Sales model"},
+    {"object_kind": "TABLE", "object_name": "ORDERS", "parent_entity": None, "property": "BASE_TABLE_DATABASE_NAME", "property_value": "DB"},
+    {"object_kind": "TABLE", "object_name": "ORDERS", "parent_entity": None, "property": "BASE_TABLE_SCHEMA_NAME", "property_value": "RAW"},
+    {"object_kind": "TABLE", "object_name": "ORDERS", "parent_entity": None, "property": "BASE_TABLE_NAME", "property_value": "ORDERS"},
+    {"object_kind": "TABLE", "object_name": "ORDERS", "parent_entity": None, "property": "PRIMARY_KEY", "property_value": '["ORDER_ID"]'},
+    {"object_kind": "DIMENSION", "object_name": "ORDER_DATE", "parent_entity": "ORDERS", "property": "TABLE", "property_value": "ORDERS"},
+    {"object_kind": "DIMENSION", "object_name": "ORDER_DATE", "parent_entity": "ORDERS", "property": "EXPRESSION", "property_value": "orders.o_orderdate"},
+    {"object_kind": "METRIC", "object_name": "TOTAL", "parent_entity": "ORDERS", "property": "EXPRESSION", "property_value": "SUM(orders.o_total)"},
+    {"object_kind": "EXTENSION", "object_name": "CA", "parent_entity": None, "property": "VALUE", "property_value": "{}"},
+]  # fmt: skip
+
+DIMENSION_ROWS = [
+    {"table_name": "ORDERS", "name": "ORDER_DATE", "data_type": "DATE", "synonyms": None, "comment": None},
+]  # fmt: skip
+
+METRIC_ROWS = [
+    {"table_name": "ORDERS", "name": "TOTAL", "data_type": "NUMBER(38,2)", "synonyms": None, "comment": "Order total"},
+]  # fmt: skip
+
+
+class TestDescribeSemanticViewsBulk:
+    """Tests for describe_semantic_views_bulk function."""
+
+    def fake_execute_query(self, statement, snowflake_service, bindvars=[]):
+        with self.lock:
+            self.statements.append((statement, tuple(bindvars)))
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(self.delay)
+            if "BROKEN" in bindvars[0]:
+                raise Exception("Semantic view does not exist")
+            if statement.startswith("DESCRIBE"):
+                return [dict(row) for row in DESCRIBE_ROWS]
+            if statement.startswith("SHOW SEMANTIC DIMENSIONS"):
+                return DIMENSION_ROWS
+            if statement.startswith("SHOW SEMANTIC METRICS"):
+                return METRIC_ROWS
+            return [{"DDL": "create semantic view SALES_SV ..."}]
+        finally:
+            with self.lock:
+                self.running -= 1
+
+    def describe(self, views, delay=0.0, **kwargs):
+        self.statements = []
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.delay = delay
+        with patch(
+            "mcp_server_snowflake.semantic_manager.tools.execute_query",
+            side_effect=self.fake_execute_query,
+        ):
+            return describe_semantic_views_bulk(MagicMock(), views, **kwargs)
+
+    def test_compact_structure(self):
+        view = SemanticViewReference(
+            database_name="DB", schema_name="ANALYTICS", view_name="SALES_SV"
+        )
+
+        [result] = self.describe([view], include_ddl=True)
+
+        assert result == {
+            "database_name": "DB",
+            "schema_name": "ANALYTICS",
+            "name": "SALES_SV",
+            "comment": "Sales model",
+            "tables": [
+                {
+                    "table_alias": "ORDERS",
+                    "name": "DB.RAW.ORDERS",
+                    "primary_keys": ["ORDER_ID"],
+                }
+            ],
+            "dimensions": [
+                {
+                    "table": "ORDERS",
+                    "name": "ORDER_DATE",
+                    "sql_expr": "orders.o_orderdate",
+                    "data_type": "DATE",
+                }
+            ],
+            "metrics": [
+                {
+                    "table": "ORDERS",
+                    "name": "TOTAL",
+                    "sql_expr": "SUM(orders.o_total)",
+                    "data_type": "NUMBER(38,2)",
+                    "comment": "Order total",
+                }
+            ],
+            "ddl": "create semantic view SALES_SV ...",
+        }
+
+    def test_queries_run_concurrently_and_duplicates_are_described_once(self):
+        views = [
+            SemanticViewReference(
+                database_name="DB", schema_name="S", view_name=f"SV{i}"
+            )
+            for i in range(3)
+        ]
+
+        results = self.describe([*views, views[0]], delay=0.05, include_ddl=True)
+
+        assert [r["name"] for r in results] == ["SV0", "SV1", "SV2"]
+        assert len(self.statements) == 12
+        assert self.peak > 1
+
+    def test_cached_views_are_not_queried_again(self):
+        cache = TTLCache(ttl_seconds=60)
+        view = SemanticViewReference(
+            database_name="DB", schema_name="S", view_name="SV"
+        )
+
+        first = self.describe([view], cache=cache)
+        second = self.describe([view], cache=cache)
+
+        assert self.statements == []
+        assert second == first
+
+    def test_failed_view_does_not_fail_others(self):
+        views = [
+            SemanticViewReference(database_name="DB", schema_name="S", view_name="SV"),
+            SemanticViewReference(
+                database_name="DB", schema_name="S", view_name="BROKEN"
+            ),
+        ]
+
+        ok, broken = self.describe(views)
+
+        assert "error" not in ok
+        assert "does not exist" in broken["error"]
+
+    def test_requires_views(self):
+        with pytest.raises(SnowflakeException):
+            self.describe([])
+
+
+def make_semantic_view():
+    view = SemanticViewReference(
+        database_name="DB", schema_name="ANALYTICS", view_name="SALES_SV"
+    )
+    rows = [
+        *DESCRIBE_ROWS,
+        {"object_kind": "FACT", "object_name": "O_TOTAL", "parent_entity": "ORDERS", "property": "EXPRESSION", "property_value": "o_total"},
+        {"object_kind": "RELATIONSHIP", "object_name": "ORDERS_TO_CUSTOMERS", "parent_entity": "ORDERS", "property": "REF_TABLE", "property_value": "CUSTOMERS"},
+        {"object_kind": "RELATIONSHIP", "object_name": "ORDERS_TO_CUSTOMERS", "parent_entity": "ORDERS", "property": "FOREIGN_KEY", "property_value": '["O_CUSTKEY"]'},
+    ]  # fmt: skip
+    return SemanticView.from_describe(view, rows)
+
+
+class TestSemanticCatalog:
+    """Tests for local validation of semantic view query arguments."""
+
+    def test_from_describe(self):
+        semantic_view = make_semantic_view()
+        assert semantic_view.comment == "Sales model"
+        assert [t.table_alias for t in semantic_view.tables] == ["ORDERS"]
+        assert semantic_view.tables[0].primary_keys == ["ORDER_ID"]
+        assert semantic_view.relationships[0].left_table_alias == "ORDERS"
+        assert semantic_view.relationships[0].right_table_alias == "CUSTOMERS"
+        assert semantic_view.relationships[0].left_table_columns == ["O_CUSTKEY"]
+        assert [f.name for f in semantic_view.facts] == ["O_TOTAL"]
+
+    def test_valid_arguments_are_case_insensitive(self):
+        compiled = CompiledSemanticView(make_semantic_view())
+        errors = compiled.validate(
+            dimensions=[SemanticExpression(table="orders", name="order_date")],
+            metrics=[SemanticExpression(table="ORDERS", name="TOTAL")],
+        )
+        assert errors == []
+
+    def test_typo_suggests_nearest_match(self):
+        compiled = CompiledSemanticView(make_semantic_view())
+        [error] = compiled.validate(
+            dimensions=[SemanticExpression(table="ORDERS", name="ORDR_DATE")]
+        )
+        assert error == (
+            "Unknown dimension ORDERS.ORDR_DATE. Did you mean ORDERS.ORDER_DATE?"
+        )
+
+    def test_wrong_table_suggests_same_name(self):
+        compiled = CompiledSemanticView(make_semantic_view())
+        [error] = compiled.validate(
+            metrics=[SemanticExpression(table="CUSTOMERS", name="TOTAL")]
+        )
+        assert error == (
+            "Unknown logical table CUSTOMERS for metric TOTAL. Did you mean ORDERS.TOTAL?"
+        )
+
+    def test_wrong_kind(self):
+        compiled = CompiledSemanticView(make_semantic_view())
+        [error] = compiled.validate(
+            dimensions=[SemanticExpression(table="ORDERS", name="TOTAL")]
+        )
+        assert error == "ORDERS.TOTAL is a metric, not a dimension."
+
+    def test_write_query_rejects_unknown_expression(self):
+        with pytest.raises(SnowflakeException, match="Did you mean ORDERS.ORDER_DATE"):
+            write_semantic_view_query(
+                "SALES_SV",
+                "DB",
+                "ANALYTICS",
+                dimensions=[SemanticExpression(table="ORDERS", name="ORDERDATE")],
+                semantic_view=CompiledSemanticView(make_semantic_view()),
+            )
+
+    def test_query_does_not_describe_uncached_views(self):
+        with (
+            patch(
+                "mcp_server_snowflake.semantic_manager.tools.describe_semantic_view"
+            ) as mock_describe,
+            patch(
+                "mcp_server_snowflake.semantic_manager.tools.execute_query",
+                return_value=[{"ORDER_DATE": "2025-01-01"}],
+            ) as mock_execute,
+        ):
+            query_semantic_view(
+                MagicMock(),
+                "SALES_SV",
+                "DB",
+                "ANALYTICS",
+                dimensions=[SemanticExpression(table="ORDERS", name="ORDER_DATE")],
+                catalog=SemanticCatalog(),
+            )
+
+        mock_describe.assert_not_called()
+        mock_execute.assert_called_once()
+
+    def test_snowflake_decides_names_missing_from_the_catalog(self):
+        catalog = SemanticCatalog()
+        catalog.put(make_semantic_view())
+        # Added to the view after it was described
+        dimensions = [SemanticExpression(table="ORDERS", name="ORDER_MONTH")]
+
+        with patch(
+            "mcp_server_snowflake.semantic_manager.tools.execute_query",
+            return_value=[{"ORDER_MONTH": "2025-01"}],
+        ) as mock_execute:
+            result = query_semantic_view(
+                MagicMock(),
+                "SALES_SV",
+                "DB",
+                "ANALYTICS",
+                dimensions=dimensions,
+                catalog=catalog,
+            )
+
+        assert result == [{"ORDER_MONTH": "2025-01"}]
+        mock_execute.assert_called_once()
+
+    def test_failed_queries_suggest_cached_names(self):
+        catalog = SemanticCatalog()
+        catalog.put(make_semantic_view())
+
+        with patch(
+            "mcp_server_snowflake.semantic_manager.tools.execute_query",
+            side_effect=Exception("invalid identifier 'ORDERS.ORDERDATE'"),
+        ):
+            with pytest.raises(SnowflakeException) as error:
+                query_semantic_view(
+                    MagicMock(),
+                    "SALES_SV",
+                    "DB",
+                    "ANALYTICS",
+                    dimensions=[SemanticExpression(table="ORDERS", name="ORDERDATE")],
+                    catalog=catalog,
+                )
+
+        assert "invalid identifier 'ORDERS.ORDERDATE'" in error.value.message
+        assert "Did you mean ORDERS.ORDER_DATE" in error.value.message
+
+    def test_only_cached_views_are_returned(self):
+        catalog = SemanticCatalog()
+        cold = get_compiled_semantic_view(catalog, "SALES_SV", "DB", "ANALYTICS")
+        catalog.put(make_semantic_view())
+        warm = get_compiled_semantic_view(catalog, "SALES_SV", "DB", "ANALYTICS")
+
+        assert cold is None
+        assert isinstance(warm, CompiledSemanticView)
+
+
+class TestWriteSemanticViewQuery:
+    """Tests for write_semantic_view_query statement templates."""
+
+    def test_statement_and_bindvars(self):
+        query = write_semantic_view_query(
+            "SV",
+            "DB",
+            "S",
+            dimensions=[
+                SemanticExpression(table="ORDERS", name="ORDER_DATE"),
+                SemanticExpression(table="ORDERS", name="REGION"),
+            ],
+            metrics=[SemanticExpression(table="ORDERS", name="TOTAL")],
+            where_clause="REGION = 'EU'",
+            order_by="TOTAL DESC",
+            limit=10,
+        )
+        assert query.statement == (
+            "SELECT * FROM SEMANTIC_VIEW (identifier(?) "
+            "DIMENSIONS identifier(?), identifier(?) METRICS identifier(?)) "
+            "WHERE REGION = 'EU' ORDER BY TOTAL DESC LIMIT 10"
+        )
+        assert query.bindvars == [
+            "DB.S.SV",
+            "ORDERS.ORDER_DATE",
+            "ORDERS.REGION",
+            "ORDERS.TOTAL",
+        ]
+
+    def test_template_is_reused_for_same_shape(self):
+        _semantic_view_template.cache_clear()
+        for view_name in ("SV1", "SV2"):
+            write_semantic_view_query(
+                view_name,
+                "DB",
+                "S",
+                facts=[SemanticExpression(table="T", name=view_name)],
+            )
+        info = _semantic_view_template.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+
+    def test_fingerprint_is_stable(self):
+        def fingerprint(where_clause):
+            return write_semantic_view_query(
+                "SV",
+                "DB",
+                "S",
+                metrics=[SemanticExpression(table="T", name="M")],
+                where_clause=where_clause,
+            ).fingerprint
+
+        assert fingerprint("A = 1") == fingerprint("A = 1")
+        assert fingerprint("A = 1") != fingerprint("A = 2")
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    def test_entries_expire(self):
+        cache = TTLCache(ttl_seconds=0.01)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        time.sleep(0.02)
+        assert cache.get("a") is None
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(ttl_seconds=60, max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert len(cache) == 2
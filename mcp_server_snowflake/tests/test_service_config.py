@@ -35,8 +35,8 @@ def mock_connection_params():
 def mock_snowflake_connect():
     """Mock the Snowflake connection for all tests."""
     with (
-        patch("mcp_server_snowflake.server.connect") as mock_connect,
-        patch("mcp_server_snowflake.server.Root") as mock_root,
+        patch("snowflake.connector.connect") as mock_connect,
+        patch("snowflake.core.Root") as mock_root,
     ):
         mock_connect.return_value = MagicMock()
         mock_root.return_value = MagicMock()
@@ -165,6 +165,35 @@ def test_optional_fields_loaded_correctly(
     assert search_service["limit"] == 25
 
 
+def test_warehouse_connections_are_separate(
+    mock_snowflake_connect, valid_config_yaml, mock_connection_params
+):
+    """Test that a warehouse override uses its own reused connection"""
+    service = SnowflakeService(
+        service_config_file=str(valid_config_yaml),
+        transport="stdio",
+        connection_params=mock_connection_params,
+    )
+    default_connection = MagicMock(database="SALES", schema="PUBLIC")
+    warehouse_connection = MagicMock(database=None, schema=None)
+    mock_snowflake_connect.side_effect = [default_connection, warehouse_connection]
+
+    with service.get_connection() as (con, cur):
+        assert con is default_connection
+    for _ in range(2):
+        with service.get_connection(warehouse="XL_WH") as (con, cur):
+            assert con is warehouse_connection
+
+    assert mock_snowflake_connect.call_count == 2
+    assert "warehouse" not in mock_snowflake_connect.call_args_list[0].kwargs
+    assert mock_snowflake_connect.call_args_list[1].kwargs["warehouse"] == "XL_WH"
+    assert "warehouse" not in mock_connection_params
+    # Checkouts switch to the default session's database and schema
+    warehouse_connection.cursor().__enter__().execute.assert_any_call(
+        'USE SCHEMA "SALES"."PUBLIC"'
+    )
+
+
 def test_missing_fields_handled_gracefully(
     mock_snowflake_connect, missing_required_fields, mock_connection_params
 ):
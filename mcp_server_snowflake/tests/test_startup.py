@@ -0,0 +1,94 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import subprocess
+import sys
+
+import yaml
+
+from mcp_server_snowflake.startup_profile import (
+    parse_importtime,
+    profile_startup,
+    summarize_imports,
+)
+
+# Seconds this package may add to startup imports beyond FastMCP, for a
+# configuration with only Cortex Search. Importing snowflake.core alone
+# takes several times longer.
+STARTUP_IMPORT_BUDGET_SECONDS = 0.5
+
+HEAVY_MODULES = ["snowflake.connector", "snowflake.core", "sqlglot"]
+
+
+class TestStartupImports:
+    """Regression tests for server cold start."""
+
+    def test_parse_importtime(self):
+        output = "\n".join(
+            [
+                "import time: self [us] | cumulative | imported package",
+                "import time:       100 |        100 |     snowflake.core.table",
+                "import time:        50 |        150 |   snowflake.core",
+                "import time:        10 |        160 | mcp_server_snowflake.server",
+                "some warning",
+            ]
+        )
+
+        records = parse_importtime(output)
+        summary = summarize_imports(records)
+
+        assert [(r.module, r.depth) for r in records] == [
+            ("snowflake.core.table", 2),
+            ("snowflake.core", 1),
+            ("mcp_server_snowflake.server", 0),
+        ]
+        assert summary["package_seconds"] == 160 / 1e6
+        assert summary["packages"][0] == {
+            "package": "snowflake.core",
+            "seconds": 150 / 1e6,
+        }
+
+    def test_server_import_defers_heavy_modules(self):
+        script = (
+            "import json, sys\n"
+            "import mcp_server_snowflake.server\n"
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True
+        )
+
+        assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+    def test_cortex_only_startup_within_import_budget(self, tmp_path):
+        config_file = tmp_path / "config.yaml"
+        with open(config_file, "w") as f:
+            yaml.dump(
+                {
+                    "search_services": [
+                        {
+                            "service_name": "docs_search",
+                            "description": "Search service over documentation",
+                            "database_name": "DOCS_DB",
+                            "schema_name": "PUBLIC",
+                        }
+                    ]
+                },
+                f,
+            )
+
+        profile = profile_startup(str(config_file))
+
+        assert profile["package_seconds"] < STARTUP_IMPORT_BUDGET_SECONDS, profile[
+            "packages"
+        ][:10]
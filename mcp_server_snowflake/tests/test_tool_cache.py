@@ -0,0 +1,243 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+from fastmcp import Client, FastMCP
+from mcp.types import ToolAnnotations
+from pydantic import BaseModel
+
+from mcp_server_snowflake.inventory.tools import initialize_inventory_tools
+from mcp_server_snowflake.tool_cache import (
+    ToolSchemaCache,
+    attach_tool_cache,
+    cached_tool,
+    get_default_tool_cache_path,
+)
+
+
+def register_tools(server, description="Add two numbers"):
+    @cached_tool(server, name="add", description=description)
+    def add(a: int, b: int = 1) -> int:
+        return a + b
+
+    @cached_tool(server, name="echo")
+    def echo(text: str) -> str:
+        """Return the text unchanged"""
+        return text
+
+
+def make_item_model(**fields):
+    class Item(BaseModel):
+        name: str
+
+    return type("Item", (Item,), {"__annotations__": fields})
+
+
+def register_item_tool(server, item_model):
+    @cached_tool(server, name="create_item", description="Create an item")
+    def create_item(item: item_model) -> str:
+        return item.name
+
+
+def make_server(cache=None, **kwargs):
+    server = FastMCP("test")
+    if cache is not None:
+        attach_tool_cache(server, cache)
+    register_tools(server, **kwargs)
+    return server
+
+
+def list_tools(server):
+    async def run():
+        async with Client(server) as client:
+            return {tool.name: tool for tool in await client.list_tools()}
+
+    return asyncio.run(run())
+
+
+def call_tool(server, name, arguments):
+    async def run():
+        async with Client(server) as client:
+            return await client.call_tool(name, arguments)
+
+    return asyncio.run(run())
+
+
+class TestToolSchemaCache:
+    """Tests for reusing generated tool schemas across starts."""
+
+    def test_warm_cache_reuses_schemas(self, tmp_path):
+        path = str(tmp_path / "tools.json")
+        cold = ToolSchemaCache(path)
+        cold_tools = list_tools(make_server(cold))
+        cold.save()
+        assert (cold.hits, cold.misses) == (0, 2)
+
+        warm = ToolSchemaCache(path)
+        warm_tools = list_tools(make_server(warm))
+
+        assert (warm.hits, warm.misses) == (2, 0)
+        assert warm_tools.keys() == cold_tools.keys()
+        for name, tool in warm_tools.items():
+            assert tool.description == cold_tools[name].description
+            assert tool.inputSchema == cold_tools[name].inputSchema
+            assert tool.outputSchema == cold_tools[name].outputSchema
+        assert warm_tools["echo"].description == "Return the text unchanged"
+
+    def test_matches_uncached_registration(self):
+        uncached = list_tools(make_server())
+        cached = list_tools(make_server(ToolSchemaCache("/nonexistent/tools.json")))
+
+        assert {
+            name: (tool.description, tool.inputSchema) for name, tool in cached.items()
+        } == {
+            name: (tool.description, tool.inputSchema)
+            for name, tool in uncached.items()
+        }
+
+    def test_cached_tool_validates_arguments(self, tmp_path):
+        path = str(tmp_path / "tools.json")
+        cold = ToolSchemaCache(path)
+        make_server(cold)
+        cold.save()
+
+        warm = ToolSchemaCache(path)
+        server = make_server(warm)
+        result = call_tool(server, "add", {"a": 2})
+
+        assert warm.hits == 2
+        # The default of b is applied by the function's own validation
+        assert result.data == 3
+
+    def test_changed_description_regenerates(self, tmp_path):
+        path = str(tmp_path / "tools.json")
+        cold = ToolSchemaCache(path)
+        make_server(cold)
+        cold.save()
+
+        warm = ToolSchemaCache(path)
+        tools = list_tools(make_server(warm, description="Sum two numbers"))
+
+        assert (warm.hits, warm.misses) == (1, 1)
+        assert tools["add"].description == "Sum two numbers"
+
+    def test_changed_model_field_regenerates(self, tmp_path):
+        path = str(tmp_path / "tools.json")
+        cold = ToolSchemaCache(path)
+        cold_server = FastMCP("test")
+        attach_tool_cache(cold_server, cold)
+        register_item_tool(cold_server, make_item_model(size=int))
+        cold.save()
+
+        warm = ToolSchemaCache(path)
+        warm_server = FastMCP("test")
+        attach_tool_cache(warm_server, warm)
+        register_item_tool(warm_server, make_item_model(color=str))
+        tools = list_tools(warm_server)
+
+        assert (warm.hits, warm.misses) == (0, 1)
+        assert "color" in json.dumps(tools["create_item"].inputSchema)
+
+    def test_cache_hit_keeps_tool_settings(self, tmp_path):
+        path = str(tmp_path / "tools.json")
+
+        def register(server):
+            @cached_tool(
+                server,
+                name="ping",
+                annotations=ToolAnnotations(readOnlyHint=True),
+                meta={"group": "health"},
+                tags={"health"},
+            )
+            def ping() -> str:
+                """Reply pong"""
+                return "pong"
+
+        cold = ToolSchemaCache(path)
+        cold_server = FastMCP("test")
+        attach_tool_cache(cold_server, cold)
+        register(cold_server)
+        cold.save()
+        warm = ToolSchemaCache(path)
+        warm_server = FastMCP("test")
+        attach_tool_cache(warm_server, warm)
+        register(warm_server)
+
+        cold_tool = list_tools(cold_server)["ping"]
+        warm_tool = list_tools(warm_server)["ping"]
+        assert warm.hits == 1
+        assert warm_tool.model_dump() == cold_tool.model_dump()
+        assert warm_tool.annotations.readOnlyHint
+        assert call_tool(warm_server, "ping", {}).data == "pong"
+
+    def test_inventory_tools_are_cached(self, tmp_path):
+        path = str(tmp_path / "tools.json")
+        service = MagicMock()
+        # A mocked config would otherwise become a snapshot path in the repo
+        service.inventory_config = {"path": ":memory:"}
+
+        cold = ToolSchemaCache(path)
+        cold_server = FastMCP("test")
+        attach_tool_cache(cold_server, cold)
+        initialize_inventory_tools(cold_server, service)
+        cold.save()
+        warm = ToolSchemaCache(path)
+        warm_server = FastMCP("test")
+        attach_tool_cache(warm_server, warm)
+        initialize_inventory_tools(warm_server, service)
+
+        assert (warm.hits, warm.misses) == (2, 0)
+        assert list_tools(warm_server).keys() == {
+            "search_inventory",
+            "refresh_inventory",
+        }
+
+    def test_version_mismatch_ignores_cache(self, tmp_path):
+        path = tmp_path / "tools.json"
+        cold = ToolSchemaCache(str(path))
+        make_server(cold)
+        cold.save()
+        contents = json.loads(path.read_text())
+        contents["versions"]["fastmcp"] = "0.0.0"
+        path.write_text(json.dumps(contents))
+
+        warm = ToolSchemaCache(str(path))
+        make_server(warm)
+
+        assert (warm.hits, warm.misses) == (0, 2)
+
+    def test_unreadable_cache_is_ignored(self, tmp_path):
+        path = tmp_path / "tools.json"
+        path.write_text("{not json")
+
+        cache = ToolSchemaCache(str(path))
+        make_server(cache)
+        cache.save()
+
+        assert cache.misses == 2
+        assert set(json.loads(path.read_text())["tools"]) == {"add", "echo"}
+
+    def test_default_path_follows_config_and_environment(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("SNOWFLAKE_MCP_TOOL_CACHE", str(tmp_path))
+        first = get_default_tool_cache_path({"other_services": {"query_manager": True}})
+        second = get_default_tool_cache_path(
+            {"other_services": {"query_manager": False}}
+        )
+
+        assert first.startswith(str(tmp_path))
+        assert first != second
+
+        monkeypatch.setenv("SNOWFLAKE_MCP_TOOL_CACHE", "false")
+        assert get_default_tool_cache_path({}) is None
@@ -0,0 +1,161 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+import yaml
+from fastmcp import Client, FastMCP
+
+from mcp_server_snowflake.server import (
+    SnowflakeService,
+    initialize_middleware,
+    initialize_tools,
+)
+from mcp_server_snowflake.tracing import (
+    configure_tracing,
+    get_current_trace_id,
+    get_span_exporter,
+    get_tracer,
+)
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (  # noqa: E402
+    InMemorySpanExporter,
+)
+
+CLIENT_TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+CLIENT_SPAN_ID = "00f067aa0ba902b7"
+
+
+def make_exporter():
+    return InMemorySpanExporter()
+
+
+@pytest.fixture(autouse=True)
+def reset_tracing():
+    yield
+    configure_tracing(None)
+
+
+def make_server(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    with open(config_file, "w") as f:
+        yaml.dump(
+            {
+                "other_services": {"query_manager": True},
+                "sql_statement_permissions": [{"Select": True}],
+                "query_comment": {
+                    "enabled": True,
+                    "template": {"trace": "{trace_id}", "tool": "{tool_name}"},
+                },
+            },
+            f,
+        )
+    service = SnowflakeService(
+        service_config_file=str(config_file),
+        transport="stdio",
+        connection_params={"account": "test_account"},
+    )
+    server = FastMCP("test")
+    initialize_tools(service, server)
+    initialize_middleware(server, service)
+    return server
+
+
+def run_query(tmp_path, meta=None):
+    """Run a unique statement and return the statement sent to Snowflake."""
+
+    async def run():
+        async with Client(make_server(tmp_path)) as client:
+            await client.call_tool(
+                "run_snowflake_query",
+                {"statement": f"SELECT '{uuid.uuid4()}'"},
+                meta=meta,
+            )
+
+    with (
+        patch("snowflake.connector.connect") as mock_connect,
+        patch("snowflake.core.Root"),
+    ):
+        mock_connect.return_value = MagicMock()
+        cursor = mock_connect.return_value.cursor.return_value
+        cursor.sfqid = "01b2c3d4-0000-0001-0000-000000000001"
+        cursor.fetchall.return_value = [{"A": 1}]
+        asyncio.run(run())
+        return cursor.execute.call_args.args[0]
+
+
+class TestTracing:
+    """Tests for OpenTelemetry spans of tool calls."""
+
+    def test_disabled_by_default(self):
+        assert configure_tracing(None) is None
+        assert get_tracer() is None
+        assert get_current_trace_id() is None
+
+    def test_tool_call_spans(self, tmp_path):
+        configure_tracing({"enabled": True, "exporter": "memory"})
+
+        statement = run_query(tmp_path)
+
+        spans = {span.name: span for span in get_span_exporter().get_finished_spans()}
+        root = spans["tools/call run_snowflake_query"]
+        assert root.parent is None
+        assert root.attributes["snowflake.statement_type"] == "Select"
+        assert root.attributes["snowflake.query_ids"] == (
+            "01b2c3d4-0000-0001-0000-000000000001",
+        )
+        for phase in ("parse", "connection", "execute", "fetch"):
+            assert spans[phase].parent.span_id == root.context.span_id
+        assert (
+            spans["execute"].attributes["snowflake.query_id"]
+            == "01b2c3d4-0000-0001-0000-000000000001"
+        )
+
+        # The trace id flows into the query comment
+        comment = json.loads(statement.split("*/")[0][len("/* ") :])
+        assert comment["trace"] == f"{root.context.trace_id:032x}"
+
+    def test_continues_client_trace(self, tmp_path):
+        configure_tracing({"enabled": True, "exporter": "memory"})
+
+        run_query(
+            tmp_path,
+            meta={"traceparent": f"00-{CLIENT_TRACE_ID}-{CLIENT_SPAN_ID}-01"},
+        )
+
+        root = next(
+            span
+            for span in get_span_exporter().get_finished_spans()
+            if span.name == "tools/call run_snowflake_query"
+        )
+        assert f"{root.context.trace_id:032x}" == CLIENT_TRACE_ID
+        assert f"{root.parent.span_id:016x}" == CLIENT_SPAN_ID
+
+    def test_exporter_factory(self):
+        configure_tracing(
+            {
+                "enabled": True,
+                "exporter": "mcp_server_snowflake.tests.test_tracing:make_exporter",
+            }
+        )
+
+        assert isinstance(get_span_exporter(), InMemorySpanExporter)
+
+    def test_unknown_exporter(self):
+        with pytest.raises(ValueError, match="Unknown span exporter"):
+            configure_tracing({"enabled": True, "exporter": "zipkin"})
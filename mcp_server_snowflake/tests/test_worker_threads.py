@@ -0,0 +1,222 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import contextvars
+import inspect
+import json
+import threading
+import time
+import uuid
+from unittest.mock import patch
+
+import yaml
+from fastmcp import Client, FastMCP
+
+from mcp_server_snowflake.server import (
+    SnowflakeService,
+    initialize_middleware,
+    initialize_tools,
+)
+from mcp_server_snowflake.utils import run_in_worker_thread
+
+
+class SlowConnector:
+    """Snowflake connector stand-in counting statements that run at once."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.statements = []
+        self.query_ids = {}
+        self.running = 0
+        self.peak_running = 0
+        self.lock = threading.Lock()
+
+    def connect(self, **kwargs):
+        return SlowConnection(self)
+
+
+class SlowConnection:
+    def __init__(self, connector):
+        self.connector = connector
+
+    def cursor(self, cursor_class=None):
+        return SlowCursor(self.connector)
+
+    def close(self):
+        pass
+
+
+class SlowCursor:
+    def __init__(self, connector):
+        self.connector = connector
+        self.sfqid = None
+
+    def execute(self, statement, params=None, **kwargs):
+        connector = self.connector
+        self.sfqid = str(uuid.uuid4())
+        with connector.lock:
+            connector.statements.append(statement)
+            connector.query_ids[statement] = self.sfqid
+            connector.running += 1
+            connector.peak_running = max(connector.peak_running, connector.running)
+        time.sleep(connector.seconds)
+        with connector.lock:
+            connector.running -= 1
+        return self
+
+    def fetchall(self):
+        return [{"N": 1}]
+
+    def fetchone(self):
+        return {"N": 1}
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+request_name = contextvars.ContextVar("request_name", default=None)
+
+
+class TestRunInWorkerThread:
+    """Tests for the wrapper cached_tool applies to tool functions."""
+
+    def test_sync_functions_run_off_the_event_loop(self):
+        def tool(value: int) -> tuple:
+            return value, threading.get_ident(), request_name.get()
+
+        wrapped = run_in_worker_thread(tool)
+
+        async def run():
+            request_name.set("call-1")
+            return await wrapped(value=1)
+
+        value, thread_id, name = asyncio.run(run())
+
+        assert inspect.iscoroutinefunction(wrapped)
+        assert inspect.signature(wrapped) == inspect.signature(tool)
+        assert value == 1
+        assert thread_id != threading.get_ident()
+        # Context variables such as the call's timer reach the thread
+        assert name == "call-1"
+
+    def test_async_functions_are_unchanged(self):
+        async def tool():
+            return 1
+
+        assert run_in_worker_thread(tool) is tool
+
+
+class TestConcurrentTools:
+    """Tests for different tools running at the same time in worker threads."""
+
+    def test_sessions_call_different_tools_concurrently(self, tmp_path):
+        config_file = tmp_path / "config.yaml"
+        with open(config_file, "w") as f:
+            yaml.dump(
+                {
+                    "other_services": {"query_manager": True, "object_manager": True},
+                    "sql_statement_permissions": [{"Select": True}],
+                    "query_comment": {"enabled": True},
+                },
+                f,
+            )
+        service = SnowflakeService(
+            service_config_file=str(config_file),
+            transport="stdio",
+            connection_params={"account": "test_account"},
+        )
+        server = FastMCP("test")
+        initialize_tools(service, server)
+        initialize_middleware(server, service)
+        connector = SlowConnector(seconds=0.05)
+
+        async def session(n):
+            async with Client(server) as client:
+                await client.call_tool("set_query_context", {"model": f"model-{n}"})
+                await client.call_tool(
+                    "run_snowflake_query", {"statement": f"SELECT {n} FROM SALES.T"}
+                )
+                # Defaults to this session's query, not the other session's
+                profile = await client.call_tool("get_query_profile", {})
+                return json.loads(profile.content[0].text)["query_id"]
+
+        async def list_databases():
+            async with Client(server) as client:
+                return await client.call_tool(
+                    "list_objects", {"object_type": "database"}
+                )
+
+        async def run():
+            return await asyncio.gather(
+                session(1), session(2), *(list_databases() for _ in range(3))
+            )
+
+        with (
+            patch("snowflake.connector.connect", side_effect=connector.connect),
+            patch("snowflake.core.Root"),
+        ):
+            first, second, *listed = asyncio.run(run())
+
+        assert not any(result.is_error for result in listed)
+        [first_query] = [s for s in connector.statements if "SELECT 1 FROM" in s]
+        [second_query] = [s for s in connector.statements if "SELECT 2 FROM" in s]
+        assert first == connector.query_ids[first_query]
+        assert second == connector.query_ids[second_query]
+        assert set(service.get_query_context()) == {"model"}
+        assert connector.peak_running > 1
+
+    def test_long_query_does_not_block_other_calls(self, tmp_path):
+        config_file = tmp_path / "config.yaml"
+        with open(config_file, "w") as f:
+            yaml.dump(
+                {
+                    "other_services": {"query_manager": True},
+                    "sql_statement_permissions": [{"Select": True}],
+                },
+                f,
+            )
+        service = SnowflakeService(
+            service_config_file=str(config_file),
+            transport="stdio",
+            connection_params={"account": "test_account"},
+        )
+        server = FastMCP("test")
+        initialize_tools(service, server)
+        initialize_middleware(server, service)
+        connector = SlowConnector(seconds=0.05)
+
+        async def run():
+            async with Client(server) as client:
+                await asyncio.gather(
+                    *(
+                        client.call_tool(
+                            "run_snowflake_query",
+                            {"statement": f"SELECT {n} FROM SALES.T"},
+                        )
+                        for n in range(4)
+                    )
+                )
+
+        with (
+            patch("snowflake.connector.connect", side_effect=connector.connect),
+            patch("snowflake.core.Root"),
+        ):
+            asyncio.run(run())
+
+        assert connector.peak_running > 1
@@ -0,0 +1,232 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import hashlib
+import inspect
+import json
+import os
+import threading
+import typing
+import weakref
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import fastmcp
+import pydantic
+from fastmcp import FastMCP
+from fastmcp.tools.tool import FunctionTool
+from fastmcp.utilities.logging import get_logger
+
+from mcp_server_snowflake.metrics import instrument_tool_function
+from mcp_server_snowflake.utils import run_in_worker_thread
+
+logger = get_logger(__name__)
+
+PACKAGE_NAME = "notion-snowflake-mcp"
+# Set to "false" to disable the cache, or to a directory to move it
+TOOL_CACHE_ENV_VAR = "SNOWFLAKE_MCP_TOOL_CACHE"
+DEFAULT_TOOL_CACHE_DIR = "~/.cache/mcp-server-snowflake"
+
+# Caches attached to servers by attach_tool_cache
+_server_caches: "weakref.WeakKeyDictionary[FastMCP, ToolSchemaCache]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_package_version() -> str:
+    try:
+        return version(PACKAGE_NAME)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def get_config_hash(service_config: Dict[str, Any]) -> str:
+    """Return a stable hash of a parsed service configuration."""
+    text = json.dumps(service_config, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _iter_models(annotation: Any) -> Iterator[type]:
+    """Yield the pydantic models used in a type annotation."""
+    if isinstance(annotation, type) and issubclass(annotation, pydantic.BaseModel):
+        yield annotation
+    for argument in typing.get_args(annotation):
+        yield from _iter_models(argument)
+
+
+@lru_cache(maxsize=None)
+def _model_schema(model: type) -> str:
+    return json.dumps(model.model_json_schema(), sort_keys=True, default=str)
+
+
+def get_function_fingerprint(fn: Callable, description: Optional[str]) -> str:
+    """
+    Hash what a tool's schema and description are generated from.
+
+    The signature only names the pydantic models of parameters, so their
+    JSON schemas are included to notice changed fields.
+    """
+    signature = inspect.signature(fn)
+    models = {
+        f"{model.__module__}.{model.__qualname__}": model
+        for parameter in signature.parameters.values()
+        for model in _iter_models(parameter.annotation)
+    }
+    text = "\x00".join(
+        (
+            f"{fn.__module__}.{fn.__qualname__}",
+            repr(signature),
+            *(_model_schema(models[name]) for name in sorted(models)),
+            # FastMCP falls back to the docstring when there is no description
+            description or fn.__doc__ or "",
+        )
+    )
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _tool_template() -> None:
+    pass
+
+
+class ToolSchemaCache:
+    """
+    On-disk cache of generated tool schemas and descriptions.
+
+    FastMCP generates a JSON schema for every tool argument when a tool is
+    registered, which is slow for large unions of pydantic models. Entries
+    are reused only when the package, FastMCP and pydantic versions match and
+    the tool's function signature and description are unchanged. A stale or
+    unreadable cache is ignored.
+
+    Parameters
+    ----------
+    path : str
+        Cache file location
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.versions = {
+            "package": get_package_version(),
+            "fastmcp": fastmcp.__version__,
+            "pydantic": pydantic.VERSION,
+        }
+        self.tools: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r") as file:
+                cached = json.load(file)
+        except (OSError, ValueError):
+            return
+        if isinstance(cached, dict) and cached.get("versions") == self.versions:
+            self.tools = cached.get("tools") or {}
+
+    def save(self) -> None:
+        """Write the cache if any tool schema was generated since it was loaded."""
+        with self._lock:
+            if not self._dirty:
+                return
+            contents = {"versions": self.versions, "tools": self.tools}
+            self._dirty = False
+        try:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            # Replace atomically so concurrent servers never read a partial file
+            temporary_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary_path, "w") as file:
+                json.dump(contents, file)
+            os.replace(temporary_path, self.path)
+        except OSError as e:
+            logger.warning(f"Unable to write tool schema cache {self.path}: {e}")
+
+    def create_tool(
+        self, fn: Callable, name: str, description: Optional[str], **kwargs
+    ) -> FunctionTool:
+        """Build a tool, reusing cached schemas when they are still valid."""
+        fingerprint = get_function_fingerprint(fn, description)
+        entry = self.tools.get(name)
+        if entry is not None and entry.get("fingerprint") == fingerprint:
+            self.hits += 1
+            # from_function sets everything but the schemas, such as the
+            # serializer, annotations and meta, the same way as on a miss.
+            # A function without parameters keeps that cheap.
+            template = FunctionTool.from_function(
+                _tool_template,
+                name=name,
+                description=entry["description"],
+                output_schema=entry["output_schema"],
+                **kwargs,
+            )
+            return template.model_copy(
+                update={"fn": fn, "parameters": entry["parameters"]}
+            )
+
+        self.misses += 1
+        tool = FunctionTool.from_function(
+            fn, name=name, description=description, **kwargs
+        )
+        with self._lock:
+            self.tools[name] = {
+                "fingerprint": fingerprint,
+                "description": tool.description,
+                "parameters": tool.parameters,
+                "output_schema": tool.output_schema,
+            }
+            self._dirty = True
+        return tool
+
+
+def get_default_tool_cache_path(service_config: Dict[str, Any]) -> Optional[str]:
+    """Return the cache file for a configuration, or None if caching is disabled."""
+    setting = os.environ.get(TOOL_CACHE_ENV_VAR, "")
+    if setting.lower() in ("false", "0", "no"):
+        return None
+    directory = Path(setting or DEFAULT_TOOL_CACHE_DIR).expanduser()
+    return str(directory / f"tool_schemas_{get_config_hash(service_config)[:16]}.json")
+
+
+def attach_tool_cache(server: FastMCP, cache: ToolSchemaCache) -> None:
+    """Make cached_tool reuse schemas from cache for tools added to server."""
+    _server_caches[server] = cache
+
+
+def get_tool_cache(server: FastMCP) -> Optional[ToolSchemaCache]:
+    return _server_caches.get(server)
+
+
+def cached_tool(
+    server: FastMCP, name: str, description: Optional[str] = None, **kwargs
+) -> Callable[[Callable], FunctionTool]:
+    """
+    Decorator that registers a tool like server.tool, using the server's cache.
+
+    Without an attached cache this is equivalent to server.tool. Tool
+    functions are instrumented for ToolMetricsMiddleware, and synchronous
+    ones run in a worker thread.
+    """
+
+    def decorator(fn: Callable) -> FunctionTool:
+        fn = instrument_tool_function(run_in_worker_thread(fn))
+        cache = _server_caches.get(server)
+        if cache is None:
+            return server.tool(name=name, description=description, **kwargs)(fn)
+        tool = cache.create_tool(fn, name=name, description=description, **kwargs)
+        server.add_tool(tool)
+        return tool
+
+    return decorator
@@ -0,0 +1,182 @@
+# Copyright 2025 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import importlib
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+from fastmcp.utilities.logging import get_logger
+from pydantic import BaseModel
+
+logger = get_logger(__name__)
+
+INSTRUMENTATION_NAME = "mcp_server_snowflake"
+TRACING_EXTRA_HINT = (
+    "Install the tracing extra, for example pip install 'notion-snowflake-mcp[tracing]'"
+)
+
+# Tracer used for tool call spans, or None when tracing is disabled
+_tracer: Any = None
+# Exporter created by the last configure_tracing call
+_exporter: Any = None
+
+
+class TracingConfig(BaseModel):
+    """Settings from the tracing section of the service configuration."""
+
+    enabled: bool = False
+    # otlp, console, memory, none to use the application's global tracer
+    # provider, or module:factory returning a SpanExporter
+    exporter: str = "otlp"
+    service_name: str = "mcp-server-snowflake"
+
+
+def _create_exporter(exporter: str) -> Any:
+    if exporter == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        return ConsoleSpanExporter()
+    if exporter == "memory":
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+            InMemorySpanExporter,
+        )
+
+        return InMemorySpanExporter()
+    if exporter == "otlp":
+        # Endpoint and headers come from the OTEL_EXPORTER_OTLP_* variables
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        return OTLPSpanExporter()
+    module_name, _, factory_name = exporter.partition(":")
+    if not factory_name:
+        raise ValueError(
+            f"Unknown span exporter {exporter}. Use otlp, console, memory, none "
+            "or module:factory."
+        )
+    return getattr(importlib.import_module(module_name), factory_name)()
+
+
+def configure_tracing(tracing_config: Optional[Dict[str, Any]]) -> Any:
+    """
+    Set up tool call tracing from the tracing configuration section.
+
+    Tracing is optional and needs the OpenTelemetry SDK unless the exporter is
+    none. Spans are exported through a tracer provider owned by the server, so
+    an application's global provider is left untouched.
+
+    Parameters
+    ----------
+    tracing_config : dict, optional
+        Parsed tracing section of the service configuration
+
+    Returns
+    -------
+    opentelemetry.trace.Tracer or None
+        Tracer for tool call spans, or None if tracing is disabled or
+        unavailable
+    """
+    global _tracer, _exporter
+    config = TracingConfig(**(tracing_config or {}))
+    _tracer, _exporter = None, None
+    if not config.enabled:
+        return None
+
+    try:
+        from opentelemetry import trace
+
+        if config.exporter == "none":
+            _tracer = trace.get_tracer(INSTRUMENTATION_NAME)
+            return _tracer
+
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import (
+            BatchSpanProcessor,
+            SimpleSpanProcessor,
+        )
+
+        exporter = _create_exporter(config.exporter)
+    except ImportError as e:
+        logger.warning(f"Tracing is disabled: {e}. {TRACING_EXTRA_HINT}.")
+        return None
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": config.service_name})
+    )
+    # Export immediately where it is cheap, so tests see spans synchronously
+    if config.exporter in ("console", "memory"):
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+    else:
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+    _tracer = provider.get_tracer(INSTRUMENTATION_NAME)
+    _exporter = exporter
+    return _tracer
+
+
+def get_tracer() -> Any:
+    return _tracer
+
+
+def get_span_exporter() -> Any:
+    """Return the exporter created by configure_tracing, such as the memory one."""
+    return _exporter
+
+
+def extract_trace_context(carriers: list[Optional[Mapping[str, Any]]]) -> Any:
+    """
+    Return the trace context propagated by the client, if any.
+
+    Carriers are checked in order, such as the MCP request _meta and then
+    HTTP headers, and the first one with a traceparent is used.
+    """
+    from opentelemetry.propagate import extract
+
+    for carrier in carriers:
+        if carrier and any(key.lower() == "traceparent" for key in carrier):
+            return extract({key.lower(): value for key, value in carrier.items()})
+    return None
+
+
+@contextmanager
+def tool_call_span(
+    tool_name: str, carriers: list[Optional[Mapping[str, Any]]]
+) -> Iterator[Any]:
+    """
+    Record a tool call as a server span, or yield None if tracing is disabled.
+
+    The span continues the client's trace when a carrier has a traceparent.
+    """
+    if _tracer is None:
+        yield None
+        return
+    from opentelemetry.trace import SpanKind
+
+    with _tracer.start_as_current_span(
+        f"tools/call {tool_name}",
+        context=extract_trace_context(carriers),
+        kind=SpanKind.SERVER,
+        attributes={"mcp.method.name": "tools/call", "gen_ai.tool.name": tool_name},
+    ) as span:
+        yield span
+
+
+def get_current_trace_id() -> Optional[str]:
+    """Return the hex trace id of the current span, or None if not tracing."""
+    if _tracer is None:
+        return None
+    from opentelemetry import trace
+
+    span_context = trace.get_current_span().get_span_context()
+    if not span_context.is_valid:
+        return None
+    return trace.format_trace_id(span_context.trace_id)
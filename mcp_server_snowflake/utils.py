@@ -9,25 +9,47 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
+import contextvars
+import inspect
 import json
 import os
 import re
 import sys
-from functools import wraps
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache, wraps
 from textwrap import dedent
-from typing import Awaitable, Callable, Optional, TypeVar, Union
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    Optional,
+    TypeVar,
+    Union,
+)
 
 import requests
-import yaml
+from fastmcp.server.dependencies import get_context
 from fastmcp.utilities.logging import get_logger
 from pydantic import BaseModel
 from typing_extensions import ParamSpec
 
+from mcp_server_snowflake.cancellation import execute_statement
+from mcp_server_snowflake.metrics import record_query_id, time_phase
+
 logger = get_logger(__name__)
 
 P = ParamSpec("P")
 R = TypeVar("R")
 
+# Session of requests made outside an MCP session, such as in tests
+DEFAULT_SESSION = "default"
+
 
 def warn_deprecated_params() -> None:
     """Warn about deprecated CLI arguments and environment variables."""
@@ -55,6 +77,59 @@ def warn_deprecated_params() -> None:
         logger.info(f"Deprecated parameters: {', '.join(deprecated_found)}")
 
 
+def run_in_worker_thread(fn: Callable[P, R]) -> Callable[P, Awaitable[R]]:
+    """
+    Make a synchronous tool function run in a worker thread.
+
+    FastMCP calls synchronous tools on the event loop, so one slow query
+    would otherwise block every other request. The wrapper keeps the
+    function's signature, and context variables such as the current tool
+    call's timer and MCP request are copied into the thread.
+
+    Tools then run concurrently, so state they share through the service
+    must be replaced rather than modified, or guarded by a lock.
+    """
+    if inspect.iscoroutinefunction(fn):
+        return fn
+
+    @wraps(fn)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    return wrapper
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    Thread pool whose tasks run in a copy of the submitting thread's context.
+
+    Context variables hold the cancellable tool call, with its statement
+    timeout and request ids, and the tool call's timer. Worker threads of a
+    plain ThreadPoolExecutor do not see them, so statements they send could
+    not be cancelled and would be missing from the call's metrics.
+    """
+
+    def submit(self, fn: Callable[..., R], /, *args: Any, **kwargs: Any) -> Future:
+        # Each task needs its own copy, as a context cannot be entered twice
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def get_session_id(fastmcp_context: Any = None) -> str:
+    """
+    Return the MCP session id of the request being handled.
+
+    Without a FastMCP context, the one of the current request is used, which
+    is also available in the worker thread running a tool. Outside a request
+    this returns DEFAULT_SESSION.
+    """
+    try:
+        if fastmcp_context is None:
+            fastmcp_context = get_context()
+        return fastmcp_context.session_id or DEFAULT_SESSION
+    except RuntimeError:
+        return DEFAULT_SESSION
+
+
 def execute_query(statement: str, snowflake_service, bindvars: list[str] = []):
     """Execute a Snowflake query and return the results using Python connector dictionary cursor."""
     with snowflake_service.get_connection(
@@ -64,8 +139,94 @@ def execute_query(statement: str, snowflake_service, bindvars: list[str] = []):
         con,
         cur,
     ):
-        cur.execute(statement, bindvars)
-        return cur.fetchall()
+        with time_phase("execute"):
+            execute_statement(cur, statement, bindvars)
+            record_query_id(cur.sfqid)
+        with time_phase("fetch"):
+            return cur.fetchall()
+
+
+def execute_result_scan(
+    statement: str, projection: str, snowflake_service, bindvars: list[str] = []
+):
+    """
+    Execute a statement and return a projection over its result set.
+
+    The projection must select from TABLE(RESULT_SCAN(?)), which is bound to the
+    query id of the first statement. Binding the id instead of using
+    LAST_QUERY_ID() keeps this correct when other threads share the session.
+    """
+    with snowflake_service.get_connection(
+        use_dict_cursor=True,
+        session_parameters=snowflake_service.get_query_tag_param(),
+    ) as (
+        con,
+        cur,
+    ):
+        with time_phase("execute"):
+            execute_statement(cur, statement, bindvars)
+            record_query_id(cur.sfqid)
+            execute_statement(cur, projection, [cur.sfqid])
+            record_query_id(cur.sfqid)
+        with time_phase("fetch"):
+            return cur.fetchall()
+
+
+def lower_keys(row: dict) -> dict:
+    """Return a result row with lowercase column names."""
+    return {key.lower(): value for key, value in row.items()}
+
+
+def optional_int(value: Any) -> Optional[int]:
+    """Convert a numeric column value to int, keeping NULL as None."""
+    return int(value) if value is not None else None
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache whose entries expire after a fixed time.
+
+    The least recently used entry is evicted once max_entries is reached.
+
+    Parameters
+    ----------
+    ttl_seconds : float
+        Seconds an entry stays valid after it is set
+    max_entries : int, default=256
+        Maximum number of entries kept
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
 
 def sanitize_tool_name(service_name: str) -> str:
@@ -92,6 +253,71 @@ def unpack_sql_statement_permissions(
     return allowed, disallowed
 
 
+class SqlPermissions:
+    """
+    SQL statement permissions compiled into a decision table.
+
+    Permission lists are frozen into sets once, and the decision for each
+    statement type is computed on first use and then served from a cache.
+
+    Parameters
+    ----------
+    sql_allow_list : Iterable[str]
+        Lowercase statement types that are allowed
+    sql_disallow_list : Iterable[str]
+        Lowercase statement types that are disallowed
+    """
+
+    def __init__(self, sql_allow_list: Iterable[str], sql_disallow_list: Iterable[str]):
+        self.sql_allow_list = tuple(sql_allow_list)
+        self.sql_disallow_list = tuple(sql_disallow_list)
+        self.allowed = frozenset(self.sql_allow_list)
+        self.disallowed = frozenset(self.sql_disallow_list)
+        # Escape hatch for allowing all statements if user elects to explicitly
+        self.allow_all = "all" in self.allowed
+        # There may be a new unmapped type that is not in the allow/disallow lists
+        self.allow_unknown = "unknown" in self.allowed
+        self._statement_decisions: dict[str, bool] = {}
+
+    def is_statement_allowed(self, statement_type: str) -> bool:
+        """Return whether a parsed statement type, such as "Select", may run."""
+        decision = self._statement_decisions.get(statement_type)
+        if decision is None:
+            if self.allow_all:
+                decision = True
+            elif statement_type.lower() in self.disallowed:
+                decision = False
+            elif statement_type.lower() in self.allowed:
+                decision = True
+            else:
+                # Covers empty permissions, which disallow every statement
+                decision = self.allow_unknown
+            self._statement_decisions[statement_type] = decision
+        return decision
+
+    def is_action_allowed(self, action: str) -> bool:
+        """
+        Return whether an object action, such as "create", may run.
+
+        Object actions must be allowed explicitly; "all" and "unknown" do not apply.
+        """
+        return action in self.allowed
+
+
+@lru_cache(maxsize=32)
+def _compile_sql_permissions(
+    sql_allow_list: tuple[str, ...], sql_disallow_list: tuple[str, ...]
+) -> SqlPermissions:
+    return SqlPermissions(sql_allow_list, sql_disallow_list)
+
+
+def compile_sql_permissions(
+    sql_allow_list: Iterable[str], sql_disallow_list: Iterable[str]
+) -> SqlPermissions:
+    """Return the shared compiled permissions for a pair of permission lists."""
+    return _compile_sql_permissions(tuple(sql_allow_list), tuple(sql_disallow_list))
+
+
 class AnalystResponse(BaseModel):
     """
     Response model for Cortex Analyst API results.
@@ -213,8 +439,11 @@ class SnowflakeResponse:
             con,
             cur,
         ):
-            cur.execute(statement)
-            return cur.fetchall()
+            with time_phase("execute"):
+                execute_statement(cur, statement)
+                record_query_id(cur.sfqid)
+            with time_phase("fetch"):
+                return cur.fetchall()
 
     def parse_analyst_response(
         self, response: requests.Response | dict, service, **kwargs
@@ -498,44 +727,15 @@ def cleanup_snowflake_service(snowflake_service):
         if hasattr(snowflake_service, "connection") and snowflake_service.connection:
             logger.info("Closing Snowflake connection...")
             snowflake_service.connection.close()
+        for warehouse, pool in getattr(
+            snowflake_service, "warehouse_pools", {}
+        ).items():
+            logger.info(f"Closing Snowflake connections to warehouse {warehouse}...")
+            pool.close()
     except Exception as e:
         logger.error(f"Error closing Snowflake connection: {e}")
 
 
-async def load_tools_config_resource(file_path: str) -> str:
-    """
-    Load tools configuration from YAML file as JSON string.
-
-    Parameters
-    ----------
-    file_path : str
-        Path to the YAML configuration file
-
-    Returns
-    -------
-    str
-        JSON string representation of the configuration
-
-    Raises
-    ------
-    FileNotFoundError
-        If the configuration file cannot be found
-    yaml.YAMLError
-        If the YAML file is malformed
-    """
-    try:
-        with open(file_path, "r") as file:
-            tools_config = yaml.safe_load(file)
-    except FileNotFoundError:
-        logger.error(f"Service configuration file not found: {file_path}")
-        raise FileNotFoundError(f"Service configuration file not found: {file_path}")
-    except yaml.YAMLError as e:
-        logger.error(f"Invalid YAML in configuration file {file_path}: {e}")
-        raise yaml.YAMLError(f"Invalid YAML in configuration file {file_path}: {e}")
-
-    return json.dumps(tools_config)
-
-
 def get_login_params() -> dict:
     """
     Get Snowflake login parameters configuration.